@@ -1,5 +1,17 @@
+import os
+
 import streamlit as st
 
+from iolab.charts import DEFAULT_BACKEND
+from iolab.profiling import profile_run, profiling_requested, render_panel
+from iolab.startup import start_warmup
+
+# --- Precalentamiento (una vez por proceso, en segundo plano) ---
+# Importa pandas/matplotlib, carga la caché de fuentes y hace el primer solve y la primera figura
+# mientras se muestra la portada. Desactivar con IOLAB_PREWARM=0.
+if os.environ.get("IOLAB_PREWARM", "1") != "0":
+    start_warmup()
+
 # --- Página de inicio ---
 def instrucciones():
     st.set_page_config(page_title="IO Lab — Modelos de Competencia", layout="wide")
@@ -7,18 +19,20 @@ def instrucciones():
 
     st.markdown(
         """
-Bienvenido/a. Este es un *multipágina* en Streamlit con **siete** modelos.  
+Bienvenido/a. Este es un *multipágina* en Streamlit con **nueve** modelos.  
 Usa el menú lateral (☰) o la lista de páginas (arriba a la izquierda) para navegar.  
 Cada página tiene su propia barra lateral con parámetros.
 
 ### Modelos incluidos
 - **Monopolio**: demanda lineal **P(Q)=a−bQ**; áreas **CS**, **π** y **DWL**; gráfico de **ingreso total** con regiones *inelástica* / *elástica*.
-- **Duopolio de Cournot**: cantidades simultáneas; precio, **CS**, **∑π**, **DWL** y pie de **cuotas**.
+- **Duopolio de Cournot**: cantidades simultáneas; precio, **CS**, **∑π**, **DWL** y pie de **cuotas**; opción de demanda general (isoelástica, exponencial, por tramos) con costos convexos.
 - **Duopolio de Bertrand homogéneo**: competencia en **precios** con costos **c₁, c₂** (posiblemente asimétricos); bienestar y **funciones de reacción** (**RF₁**, **RF₂**).
 - **Oligopolio de Cournot (asim.)**: **N** firmas con costos heterogéneos; precio, **CS**, **∑π**, **DWL** y **cuotas**.
+- **Cournot diferenciado**: bienes sustitutos imperfectos (matriz de sustitución **B**); cantidades, precios y márgenes por firma.
 - **Hotelling lineal**: precios entregados **p₁+tx** y **p₂+t(1−x)**; punto indiferente **x̂**; límites **a** y **1−b**; **CS** agregado y **mapa de precios**.
 - **Duopolio de Stackelberg**: líder–seguidor (cantidades secuenciales) y comparación con Cournot.
-- **Colusión Cournot**: regla de gatillo y comparación de bienestar frente a Cournot no cooperativo.
+- **Colusión Cournot**: regla de gatillo y comparación de bienestar frente a Cournot no cooperativo, y simulación del juego repetido con choques de demanda (gatillo, castigo finito y Green–Porter).
+- **Doble marginalización**: fabricante y **N** minoristas; precios mayoristas, integración vertical y tarifa en dos partes.
         """
     )
 
@@ -32,13 +46,33 @@ hotelling   = st.Page("pages/4_Hotelling_Lineal.py",                  title="5.
 stack       = st.Page("pages/2_Stackelberg_Duopolio.py",              title="6. Duopolio de Stackelberg")
 colusion    = st.Page("pages/3_Colusion.py",                          title="7. Colusión Cournot")
 dm          = st.Page("pages/Doble_marginalizacion.py",               title="8. Doble marginalización")
+diferenciado = st.Page("pages/6_Cournot_Diferenciado.py",            title="9. Cournot diferenciado")
 
 # --- Herramientas (nuevo) ---
 arbol       = st.Page("pages/arbol.py",               title="Diseña tu árbol secuencial")
 mixtas = st.Page("pages/mixtas.py", title="Equilibrios mixtos (2×2)")
 puras = st.Page("pages/Estrategias_puras.py", title="Equilibrios estrategias puras")
 
-st.navigation({
-    "Modelos": [home, monopolio, cournot, bertrand, oligo_asim, hotelling, stack, colusion, dm],
+pg = st.navigation({
+    "Modelos": [home, monopolio, cournot, bertrand, oligo_asim, hotelling, stack, colusion, dm, diferenciado],
     "Herramientas": [puras, arbol, mixtas],
-}).run()
+})
+
+# --- Backend de gráficos (IOLAB_CHARTS=vega o ?charts=vega como valor inicial) ---
+# Vega-Lite: el servidor solo envía un spec JSON con los datos y el navegador dibuja;
+# matplotlib: PNG rasterizado en el servidor (cacheado). Aplica a los gráficos con spec.
+if "client_charts" not in st.session_state:
+    st.session_state.client_charts = st.query_params.get("charts", DEFAULT_BACKEND) == "vega"
+st.sidebar.toggle("Gráficos en el navegador (Vega-Lite)", key="client_charts",
+                  help="Interactivos y sin rasterizar en el servidor.")
+
+# --- Instrumentación opcional (IOLAB_PROFILE=1 o ?profile=1) ---
+# Mide etapas (parse/solve/plot/serialize/table) y memoria pico; panel en la barra lateral y log local.
+if profiling_requested(st.query_params):
+    if "profile_session" not in st.session_state:
+        st.session_state.profile_session = os.urandom(4).hex()
+    with profile_run(pg.title, session=st.session_state.profile_session) as prof:
+        pg.run()
+    render_panel(st.sidebar, prof.record)
+else:
+    pg.run()
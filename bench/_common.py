@@ -0,0 +1,66 @@
+# bench/_common.py
+# Utilidades compartidas por los scripts de bench/: páginas registradas en app.py,
+# ejecución de un modo hijo en un proceso nuevo y memoria del proceso.
+import ast
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def registered_pages(app_path=os.path.join(ROOT, "app.py")):
+    # [(título, archivo)] de las llamadas st.Page en app.py; la portada (función) se mide con app.py
+    with open(app_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    pages = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and getattr(node.func, "attr", None) == "Page"):
+            continue
+        title = next((k.value.value for k in node.keywords
+                      if k.arg == "title" and isinstance(k.value, ast.Constant)), None)
+        target = node.args[0] if node.args else None
+        if isinstance(target, ast.Constant) and isinstance(target.value, str):
+            pages.append((title or target.value, target.value))
+        else:
+            pages.append((title or "home", "app.py"))
+    return sorted(pages, key=lambda p: (p[1] != "app.py", p[0]))
+
+
+def rss_mb():
+    # RSS actual del proceso (Linux: /proc/self/statm); en otros sistemas, el máximo histórico
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return maxrss_mb()
+
+
+def maxrss_mb():
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r / 2**20 if sys.platform == "darwin" else r / 1024   # macOS: bytes; Linux: KiB
+
+
+def run_child(script, args, env=None):
+    """
+    Ejecuta `script --child ...` en un proceso nuevo y retorna (resultado JSON, segundos de pared).
+    El hijo imprime su resultado como última línea de stdout.
+    """
+    env = dict(os.environ, IOLAB_PREWARM="0", **(env or {}))   # sin hilo de precalentamiento
+    cmd = [sys.executable, os.path.abspath(script), "--child"] + list(args)
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)}: {proc.stderr.strip()[-800:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), wall
+
+
+def child_setup():
+    # En el hijo: raíz del repo en sys.path y como directorio de trabajo (como `streamlit run app.py`)
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
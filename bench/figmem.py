@@ -0,0 +1,160 @@
+# bench/figmem.py
+# Regresión de memoria del ciclo de vida de figuras: miles de renders/reruns con las cachés
+# apagadas (cada iteración dibuja desde cero) y muestreo del RSS. Con iolab.figures el RSS
+# debe quedar plano; el modo "legacy" reproduce el patrón antiguo (plt.subplots + st.pyplot sin
+# cerrar) como contraste. Cada modo corre en un proceso nuevo.
+#
+#   python bench/figmem.py                        # managed (2000 renders) y legacy (300: crece ~2 MB/render)
+#   python bench/figmem.py -n 5000 --modes managed
+#   python bench/figmem.py --modes pages -n 300   # reruns reales de las páginas con AppTest
+import argparse
+import gc
+import sys
+import time
+
+from _common import child_setup, rss_mb, run_child
+
+MODES = ("managed", "legacy", "pages")
+
+
+def _draw_demand(fig, ax, i):
+    # Figura representativa: curvas, áreas rellenas, mathtext y leyenda (como Monopolio/Cournot)
+    import numpy as np
+
+    a, b, c = 20.0 + (i % 50) * 0.1, 1.0, 6.0
+    Q = np.linspace(0, a / b, 400)
+    ax.plot(Q, a - b * Q, label="Demanda")
+    ax.plot(Q, a - 2 * b * Q, label="MR")
+    ax.axhline(c, color="k", lw=1, label="MC")
+    Qm = (a - c) / (2 * b)
+    ax.fill_between(Q, a - b * Q, a - b * Qm, where=Q <= Qm, alpha=0.3, label="CS")
+    ax.fill_between(Q, a - b * Qm, c, where=Q <= Qm, alpha=0.3, label=r"$\pi$")
+    ax.set_xlabel("Q"); ax.set_ylabel("P"); ax.set_title(rf"$Q^*={Qm:.2f}$")
+    ax.legend()
+    return fig
+
+
+def _render_loop(mode, n, dpi, every):
+    import io
+
+    from iolab.figures import figure_bytes, live_figures, subplots
+
+    samples = []
+    for i in range(n):
+        if mode == "managed":
+            figure_bytes("figmem", (i,), lambda: _draw_demand(*subplots(), i), dpi=dpi)
+        else:
+            # Patrón antiguo: figura de pyplot que se codifica (st.pyplot) y nunca se cierra
+            import matplotlib.pyplot as plt
+
+            fig, ax = plt.subplots()
+            _draw_demand(fig, ax, i).savefig(io.BytesIO(), format="png", dpi=dpi, bbox_inches="tight")
+        if i % every == 0 or i == n - 1:
+            samples.append((i + 1, rss_mb()))
+    gc.collect()
+    return samples, live_figures()
+
+
+def _pages_loop(n, every):
+    # Reruns reales: rota páginas con figuras y cambia un parámetro en cada rerun (escenarios de bench/pages.py)
+    import os
+
+    from streamlit.testing.v1 import AppTest
+
+    from _common import ROOT
+    from pages import SCENARIOS
+    from iolab.figures import live_figures
+
+    plan = [(path, vary) for path, scs in SCENARIOS.items() for _, setup, vary in scs[:1] if vary is not None]
+    apps = {path: AppTest.from_file(os.path.join(ROOT, path), default_timeout=300).run() for path, _ in plan}
+    samples, errors = [], 0
+    for i in range(n):
+        path, vary = plan[i % len(plan)]
+        at = apps[path]
+        vary(at, i // len(plan))
+        at.run()
+        errors += len(at.exception)
+        if i % every == 0 or i == n - 1:
+            samples.append((i + 1, rss_mb()))
+    gc.collect()
+    return samples, {**live_figures(), "errors": errors}
+
+
+def child(mode, n, dpi, every):
+    child_setup()
+    from iolab.cache import RESULTS
+    from iolab.figures import FIGURES
+
+    # Sin cachés: cada iteración construye y codifica figuras nuevas
+    FIGURES.max_entries = 0
+    RESULTS.max_entries = 0
+    t0 = time.perf_counter()
+    if mode == "pages":
+        samples, live = _pages_loop(n, every)
+    else:
+        samples, live = _render_loop(mode, n, dpi, every)
+    import json
+    print(json.dumps({"mode": mode, "n": n, "seconds": time.perf_counter() - t0,
+                      "samples": samples, "live": live}))
+
+
+def slope_per_1000(samples):
+    # Pendiente de mínimos cuadrados del RSS (MB por cada 1000 iteraciones) en la segunda mitad
+    tail = samples[len(samples) // 2:]
+    if len(tail) < 2:
+        return 0.0
+    xs = [x for x, _ in tail]
+    ys = [y for _, y in tail]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    den = sum((x - mx) ** 2 for x in xs)
+    return 1000.0 * sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / den if den else 0.0
+
+
+def growth_mb(samples):
+    # RSS plano = la mediana del último cuarto no supera a la del segundo cuarto (ignora el arranque
+    # y el ruido del asignador); más robusto que la pendiente con pocas muestras
+    import statistics
+
+    k = max(1, len(samples) // 4)
+    q2 = [r for _, r in samples[k:2 * k]] or [samples[0][1]]
+    q4 = [r for _, r in samples[-k:]]
+    return statistics.median(q4) - statistics.median(q2)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="RSS a lo largo de miles de renders de figuras.")
+    ap.add_argument("-n", type=int, default=2000, help="renders (o reruns en modo pages) por modo")
+    ap.add_argument("--legacy-n", type=int, default=300, help="iteraciones del modo legacy (su RSS no se libera)")
+    ap.add_argument("--modes", default="managed,legacy", help=f"lista separada por comas de {MODES}")
+    ap.add_argument("--dpi", type=int, default=100)
+    ap.add_argument("--every", type=int, default=50, help="muestrear RSS cada tantas iteraciones")
+    ap.add_argument("--max-growth", type=float, default=16.0,
+                    help="MB de crecimiento permitido entre el 2.º y el último cuarto (managed/pages)")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        return child(args.child, args.n, args.dpi, args.every)
+
+    status = 0
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        if mode not in MODES:
+            ap.error(f"modo desconocido: {mode}")
+        n = min(args.n, args.legacy_n) if mode == "legacy" else args.n
+        res, _ = run_child(__file__, [mode, "-n", str(n), "--dpi", str(args.dpi),
+                                      "--every", str(args.every)])
+        s = res["samples"]
+        slope, growth = slope_per_1000(s), growth_mb(s)
+        ok = mode == "legacy" or (growth <= args.max_growth and res["live"]["pyplot_open"] == 0
+                                  and res["live"].get("errors", 0) == 0)
+        status |= 0 if ok else 1
+        print(f"{mode:<8} n={res['n']:<6} {res['seconds']:6.1f}s  RSS {s[0][1]:6.1f} → {s[-1][1]:6.1f} MB  "
+              f"crecimiento {growth:+6.1f} MB  pendiente {slope:+7.1f} MB/1000  "
+              f"figuras vivas {res['live']}  {'OK' if ok else 'CRECE'}")
+        marks = s[:: max(1, len(s) // 8)] + ([s[-1]] if len(s) > 1 else [])
+        print("         " + "  ".join(f"{i}:{r:.0f}" for i, r in marks))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+# bench/load.py
+# Prueba de carga multi-sesión: levanta `streamlit run app.py` en local y simula N estudiantes
+# concurrentes hablando el protocolo real del navegador (websocket /_stcore/stream, mensajes protobuf).
+# Cada sesión navega entre páginas y mueve widgets (δ en Colusión, celdas de pagos en mixtas, ...).
+# Reporta throughput, latencia de cola por página y crecimiento de memoria del servidor por sesión.
+#
+#   python bench/load.py -u 30 -d 60                       # 30 sesiones durante 60 s
+#   python bench/load.py -u 50 -d 120 --think 2 --json carga.json
+#   python bench/load.py --url ws://localhost:8501 --pid 1234   # contra un servidor ya levantado
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from _common import ROOT
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+
+# -------------------- Servidor local --------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, prewarm):
+    env = dict(os.environ, IOLAB_PREWARM="1" if prewarm else "0")
+    cmd = [sys.executable, "-m", "streamlit", "run", "app.py",
+           "--server.headless", "true", "--server.port", str(port),
+           "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/_stcore/health"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("el servidor de Streamlit terminó al arrancar")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as r:
+                if r.status == 200:
+                    return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("el servidor de Streamlit no respondió en 60 s")
+
+
+def rss_of(pid):
+    # RSS (MB) de un proceso por /proc; None si no se puede leer (otro sistema o sin pid)
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+# -------------------- Cliente (una sesión de navegador) --------------------
+class Session:
+    """
+    Sesión de navegador mínima: envía rerun_script con el estado de los widgets de la página
+    y espera script_finished. Recuerda los widgets (label -> id) que dibujó la última ejecución;
+    los widgets dentro de un st.fragment disparan, como en el navegador, solo el rerun del fragmento.
+    """
+
+    def __init__(self, url, sid, rng):
+        self.url = url.rstrip("/") + "/_stcore/stream"
+        self.sid = sid
+        self.rng = rng
+        self.ws = None
+        self.pages = {}          # título -> page_script_hash
+        self.page = None
+        self.widgets = {}        # (tipo, label) -> id, de la última ejecución
+        self.fragments = {}      # id -> fragment_id (widgets dentro de un fragmento)
+        self.state = {}          # id -> WidgetState (valores que esta sesión ya cambió)
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, trigger=None, fragment=""):
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.pages.get(self.page, "")
+        msg.rerun_script.fragment_id = fragment
+        msg.rerun_script.widget_states.widgets.extend(self.state.values())
+        if trigger is not None:
+            msg.rerun_script.widget_states.widgets.append(trigger)
+        t0 = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        widgets, errors = {}, 0
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "navigation":
+                self.pages = {p.page_name: p.page_script_hash for p in fwd.navigation.app_pages}
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                el = fwd.delta.new_element
+                etype = el.WhichOneof("type")
+                if etype == "exception":
+                    errors += 1
+                sub = getattr(el, etype)
+                wid = getattr(sub, "id", "")
+                if wid:
+                    # widgets sin key repetidos por label: gana el primero (como en la página)
+                    widgets.setdefault((etype, getattr(sub, "label", "")), wid)
+                    if fwd.delta.fragment_id:
+                        self.fragments[wid] = fwd.delta.fragment_id
+            elif kind == "script_finished":
+                break
+        # Un rerun de fragmento solo vuelve a dibujar sus widgets: el resto de la página sigue igual
+        self.widgets = {**self.widgets, **widgets} if fragment else widgets
+        return time.perf_counter() - t0, errors
+
+    async def goto(self, title):
+        self.page = title
+        self.state = {}          # el navegador solo envía los widgets de la página actual
+        self.fragments = {}
+        return await self.rerun()
+
+    def _wid(self, etype, label):
+        for (k, lab), wid in self.widgets.items():
+            if k == etype and lab.startswith(label):
+                return wid
+        return None
+
+    async def set_number(self, label, value):
+        wid = self._wid("number_input", label)
+        if wid is None:
+            return None
+        self.state[wid] = WidgetState(id=wid, double_value=float(value))
+        return await self.rerun(fragment=self.fragments.get(wid, ""))
+
+    async def set_slider(self, label, value):
+        wid = self._wid("slider", label)
+        if wid is None:
+            return None
+        ws = WidgetState(id=wid)
+        ws.double_array_value.data.append(float(value))
+        self.state[wid] = ws
+        return await self.rerun(fragment=self.fragments.get(wid, ""))
+
+    async def set_text(self, label, value):
+        wid = self._wid("text_input", label)
+        if wid is None:
+            return None
+        self.state[wid] = WidgetState(id=wid, string_value=str(value))
+        return await self.rerun(fragment=self.fragments.get(wid, ""))
+
+    async def edit_cell(self, index, row, col, value):
+        # data_editor: el estado es el JSON de ediciones acumuladas (como lo manda el navegador)
+        ids = [wid for (k, _), wid in self.widgets.items() if k in ("dataframe", "arrow_data_frame")]
+        if len(ids) <= index:
+            return None
+        wid = ids[index]
+        prev = json.loads(self.state[wid].string_value) if wid in self.state else \
+            {"edited_rows": {}, "added_rows": [], "deleted_rows": []}
+        prev["edited_rows"].setdefault(str(row), {})[col] = float(value)
+        self.state[wid] = WidgetState(id=wid, string_value=json.dumps(prev))
+        return await self.rerun(fragment=self.fragments.get(wid, ""))
+
+    async def click(self, label):
+        wid = self._wid("button", label)
+        if wid is None:
+            return None
+        trigger = WidgetState(id=wid, trigger_value=True)
+        return await self.rerun(trigger=trigger, fragment=self.fragments.get(wid, ""))
+
+
+# -------------------- Guion de la clase --------------------
+# Valores cuantizados: en un aula muchas sesiones repiten los mismos parámetros (como en la práctica).
+def _q(rng, lo, hi, step):
+    return round(lo + step * rng.randrange(int(round((hi - lo) / step)) + 1), 6)
+
+
+ACTIONS = {
+    "1. Monopolio": [
+        lambda s, r: s.set_number("a (intercepto", _q(r, 15, 30, 1)),
+        lambda s, r: s.set_number("c (costo marginal)", _q(r, 2, 8, 0.5)),
+    ],
+    "2. Duopolio de Cournot": [
+        lambda s, r: s.set_number("Costo marginal firma 1", _q(r, 10, 40, 2)),
+        lambda s, r: s.set_number("Costo marginal firma 2", _q(r, 10, 40, 2)),
+    ],
+    "3. Duopolio de Bertrand homogéneo": [
+        lambda s, r: s.set_number("c₂ (costo marginal 2)", _q(r, 6, 12, 0.5)),
+    ],
+    "4. Oligopolio de Cournot": [
+        lambda s, r: s.set_text("Costos marginales", ", ".join(
+            str(_q(r, 2, 12, 0.5)) for _ in range(r.randint(3, 20)))),
+        lambda s, r: s.set_slider("Número de firmas activas", r.randint(1, 3)),
+    ],
+    "5. Hotelling lineal": [
+        lambda s, r: s.set_number("Costo de transporte t", _q(r, 0.5, 2, 0.25)),
+    ],
+    "6. Duopolio de Stackelberg": [
+        lambda s, r: s.set_number("Costo marginal seguidor", _q(r, 10, 40, 2)),
+    ],
+    "7. Colusión Cournot": [
+        lambda s, r: s.set_slider("δ (factor de descuento)", _q(r, 0, 1, 0.05)),
+        lambda s, r: s.set_slider("δ (factor de descuento)", _q(r, 0, 1, 0.05)),
+        lambda s, r: s.set_number("Número de firmas N", r.randint(2, 8)),
+        lambda s, r: s.set_number("Intercepto a", _q(r, 80, 120, 5)),
+        lambda s, r: s.set_text("Valores de b", ",".join(str(_q(r, 0.5, 2, 0.1)) for _ in range(4))),
+        lambda s, r: s.click("Ejecutar barrido de b"),
+    ],
+    "8. Doble marginalización": [
+        lambda s, r: s.set_number("Número de minoristas N", r.randint(1, 5)),
+        lambda s, r: s.set_number("Costo marginal upstream", _q(r, 0, 30, 5)),
+        lambda s, r: s.set_text("Valores de N", ",".join(str(r.randint(1, 8)) for _ in range(4))),
+        lambda s, r: s.click("Ejecutar barrido N"),
+    ],
+    "Equilibrios estrategias puras": [
+        lambda s, r: s.set_number("Estrategias Jugador 1", r.randint(2, 4)),
+        lambda s, r: s.edit_cell(0, 0, "P21", r.randint(-5, 5)),
+    ],
+    "Diseña tu árbol secuencial": [
+        lambda s, r: s.set_text("Título opcional para el PNG", f"Juego {r.randint(1, 5)}"),
+    ],
+    "Equilibrios mixtos (2×2)": [
+        lambda s, r: s.edit_cell(0, r.randint(0, 1), r.choice("LR"), r.randint(0, 4)),
+        lambda s, r: s.edit_cell(1, r.randint(0, 1), r.choice("LR"), r.randint(0, 4)),
+    ],
+}
+
+
+async def student(sid, url, deadline, think, seed, log, actions_per_page):
+    rng = random.Random(seed * 1000 + sid)
+    s = Session(url, sid, rng)
+    await s.connect()
+    try:
+        dt, err = await s.rerun()                        # portada
+        log.append((sid, "Instrucciones:", "abrir", dt, err, time.perf_counter()))
+        while time.perf_counter() < deadline:
+            page = rng.choice([p for p in s.pages if p in ACTIONS] or list(s.pages))
+            dt, err = await s.goto(page)
+            log.append((sid, page, "navegar", dt, err, time.perf_counter()))
+            for _ in range(actions_per_page):
+                if time.perf_counter() >= deadline:
+                    break
+                await asyncio.sleep(rng.expovariate(1.0 / think) if think > 0 else 0)
+                act = rng.choice(ACTIONS.get(page, [lambda s, r: s.rerun()]))
+                res = await act(s, rng)
+                if res is not None:
+                    log.append((sid, page, "widget", res[0], res[1], time.perf_counter()))
+    finally:
+        await s.close()
+    return s
+
+
+def _pct(xs):
+    if not xs:
+        return None
+    xs = sorted(xs)
+    at = lambda q: xs[min(len(xs) - 1, int(round(q * (len(xs) - 1))))] * 1000.0
+    return {"n": len(xs), "p50": at(0.50), "p90": at(0.90), "p99": at(0.99),
+            "max": xs[-1] * 1000.0, "mean": statistics.fmean(xs) * 1000.0}
+
+
+async def run_load(url, users, duration, think, ramp, seed, pid, actions_per_page, sample_every=1.0):
+    log, samples = [], []
+    rss_idle = rss_of(pid)
+
+    # Una sesión previa paga imports y cachés frías, para no confundirlos con crecimiento por sesión
+    warm = Session(url, -1, random.Random(seed))
+    await warm.connect()
+    await warm.rerun()
+    for title in list(warm.pages):
+        await warm.goto(title)
+    await warm.close()
+    rss_base = rss_of(pid)
+
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    stop = asyncio.Event()
+
+    async def sampler():
+        while not stop.is_set():
+            samples.append((time.perf_counter() - t0, rss_of(pid)))
+            try:
+                await asyncio.wait_for(stop.wait(), sample_every)
+            except asyncio.TimeoutError:
+                pass
+
+    async def delayed(i):
+        await asyncio.sleep(ramp * i / max(users, 1))
+        return await student(i, url, deadline, think, seed, log, actions_per_page)
+
+    samp = asyncio.create_task(sampler())
+    results = await asyncio.gather(*(delayed(i) for i in range(users)), return_exceptions=True)
+    elapsed = time.perf_counter() - t0
+    rss_end = rss_of(pid)
+    stop.set()
+    await samp
+    await asyncio.sleep(2.0)
+    rss_after_close = rss_of(pid)
+
+    failures = [repr(r) for r in results if isinstance(r, BaseException)]
+    lat = [row[3] for row in log]
+    per_page = {}
+    for _, page, _, dt, _, _ in log:
+        per_page.setdefault(page, []).append(dt)
+    rss_vals = [r for _, r in samples if r is not None]
+    mem = None
+    if rss_base is not None and rss_end is not None:
+        mem = {
+            "idle_mb": rss_idle, "warm_mb": rss_base, "peak_mb": max(rss_vals, default=rss_end),
+            "end_mb": rss_end, "after_close_mb": rss_after_close,
+            "growth_per_session_mb": (rss_end - rss_base) / max(users, 1),
+            "retained_per_session_mb": ((rss_after_close or rss_end) - rss_base) / max(users, 1),
+        }
+    return {
+        "users": users, "duration_s": elapsed, "think_s": think,
+        "reruns": len(log), "throughput_rps": len(log) / elapsed if elapsed > 0 else 0.0,
+        "errors": sum(row[4] for row in log), "session_failures": failures,
+        "latency": _pct(lat),
+        "latency_by_kind": {k: _pct([r[3] for r in log if r[2] == k]) for k in ("navegar", "widget")},
+        "latency_by_page": {p: _pct(v) for p, v in sorted(per_page.items())},
+        "memory": mem,
+        "rss_timeline": samples,
+    }
+
+
+def report(res):
+    L = res["latency"] or {}
+    print(f"sesiones: {res['users']}  duración: {res['duration_s']:.1f} s  reruns: {res['reruns']}  "
+          f"throughput: {res['throughput_rps']:.1f} reruns/s  excepciones: {res['errors']}  "
+          f"sesiones caídas: {len(res['session_failures'])}")
+    if L:
+        print(f"latencia (ms)  p50 {L['p50']:.0f}  p90 {L['p90']:.0f}  p99 {L['p99']:.0f}  máx {L['max']:.0f}")
+    print(f"\n{'página':<36} {'n':>5} {'p50':>7} {'p90':>7} {'p99':>7} {'máx':>7}")
+    for page, d in res["latency_by_page"].items():
+        print(f"{page[:36]:<36} {d['n']:5d} {d['p50']:7.0f} {d['p90']:7.0f} {d['p99']:7.0f} {d['max']:7.0f}")
+    m = res["memory"]
+    if m:
+        print(f"\nRSS del servidor (MB): en reposo {m['idle_mb']:.0f} · tras calentar {m['warm_mb']:.0f} · "
+              f"pico {m['peak_mb']:.0f} · final {m['end_mb']:.0f} · tras cerrar sesiones {m['after_close_mb']:.0f}")
+        print(f"crecimiento por sesión: {m['growth_per_session_mb']:.2f} MB "
+              f"(retenido tras cerrar: {m['retained_per_session_mb']:.2f} MB)")
+    for f in res["session_failures"][:5]:
+        print("  sesión fallida:", f)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Carga con N sesiones concurrentes contra un servidor Streamlit local.")
+    ap.add_argument("-u", "--users", type=int, default=20, help="sesiones concurrentes")
+    ap.add_argument("-d", "--duration", type=float, default=60.0, help="segundos de carga")
+    ap.add_argument("--think", type=float, default=1.0, help="pausa media entre acciones (s, exponencial)")
+    ap.add_argument("--ramp", type=float, default=5.0, help="segundos para abrir todas las sesiones")
+    ap.add_argument("--actions", type=int, default=5, help="acciones por página antes de navegar")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--url", help="servidor existente (ws://host:puerto); por defecto se levanta uno local")
+    ap.add_argument("--pid", type=int, help="pid del servidor existente, para medir su RSS")
+    ap.add_argument("--port", type=int, help="puerto del servidor local (por defecto uno libre)")
+    ap.add_argument("--prewarm", action="store_true", help="servidor local con IOLAB_PREWARM=1")
+    ap.add_argument("--json", help="guardar resultados en este archivo")
+    args = ap.parse_args(argv)
+
+    proc = None
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        port = args.port or free_port()
+        proc = start_server(port, args.prewarm)
+        url, pid = f"ws://127.0.0.1:{port}", proc.pid
+    try:
+        res = asyncio.run(run_load(url, args.users, args.duration, args.think, args.ramp,
+                                   args.seed, pid, args.actions))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    report(res)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2, ensure_ascii=False)
+    return 1 if (res["errors"] or res["session_failures"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+# bench/pages.py
+# Suite de benchmark de páginas: recorre cada entrada de st.navigation en app.py con AppTest
+# (sin navegador), con entradas realistas, y mide latencia de rerun (percentiles) y memoria.
+# Cada página corre en un proceso nuevo para aislar cachés y RSS.
+#
+#   python bench/pages.py                                   # todas las páginas
+#   python bench/pages.py -k Colusion -n 30                 # filtra por ruta/título; 30 reruns
+#   python bench/pages.py --save-baseline bench/baseline.json
+#   python bench/pages.py --compare bench/baseline.json     # exit 1 si hay regresiones o escenarios sin baseline
+#
+# Por escenario:
+#   first  : primer render de la página con sus valores por defecto (cachés frías)
+#   setup  : cargar las entradas del escenario, incluidos los reruns intermedios y los botones
+#   rerun  : reruns con las mismas entradas (aciertos de caché; lo que ve quien mueve un widget sin efecto)
+#   miss   : reruns cambiando un parámetro cada vez (fallos de caché: solve + figuras desde cero)
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from _common import ROOT, child_setup, maxrss_mb, registered_pages, rss_mb, run_child
+
+
+# -------------------- Acceso a widgets de AppTest --------------------
+def widget(at, kind, label=None, key=None):
+    for w in getattr(at, kind):
+        if (key is not None and w.key == key) or (label is not None and w.label.startswith(label)):
+            return w
+    raise LookupError(f"{kind} {key or label!r} no encontrado")
+
+
+def set_value(at, kind, value, label=None, key=None):
+    widget(at, kind, label=label, key=key).set_value(value)
+
+
+def click(at, key=None, label=None):
+    widget(at, "button", label=label, key=key).click()
+
+
+# -------------------- Escenarios por página --------------------
+# Cada escenario: (nombre, setup(at), vary(at, i) o None). setup puede hacer reruns intermedios
+# (p. ej. fijar N antes de que existan los inputs c1..cN); vary cambia un parámetro por iteración.
+
+def _colusion_n20(at):
+    set_value(at, "number_input", 20, label="Número de firmas N")
+    at.run()
+    for i in range(20):
+        set_value(at, "number_input", 10.0 + i, key=f"c{i+1}")
+
+
+def _colusion_sweeps(at):
+    _colusion_n20(at)
+    at.run()
+    set_value(at, "text_input", ", ".join(str(v) for v in range(5, 40)), label="Valores de costo para esa firma")
+    set_value(at, "text_input", ", ".join(f"{0.2 + 0.1*i:.1f}" for i in range(30)), key="bvals")
+    set_value(at, "text_input", ", ".join(str(n) for n in range(2, 41)), key="Nvals")
+    at.run()
+    for k in ("btn_costsweep", "btn_bsweep", "btn_Nsweep"):
+        click(at, key=k)
+        at.run()
+
+
+def _wait_job(at, state_key, timeout=120.0):
+    # Reruns (como el sondeo del fragmento) hasta que termine el trabajo en segundo plano
+    from iolab import jobs
+
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        job = jobs.get(at.session_state[state_key]["id"])
+        if job is None or not job.running:
+            break
+        time.sleep(0.05)
+    at.run()
+
+
+def _colusion_grid(at):
+    _colusion_n20(at)
+    at.run()
+    click(at, key="btn_grid")
+    at.run()
+    _wait_job(at, "job_grid")
+
+
+def _colusion_min_delta(at):
+    _colusion_n20(at)
+    set_value(at, "radio", "Cuotas que minimizan δ*", key="cartel_mode")
+
+
+def _colusion_repeated(at):
+    set_value(at, "radio", "Green–Porter (choques no observables, precio gatillo)", key="rep_strategy")
+    at.run()
+    set_value(at, "number_input", 1000, key="rep_T")
+    set_value(at, "number_input", 100000, key="rep_paths")
+    click(at, key="btn_rep")
+    at.run()
+    _wait_job(at, "job_rep")
+
+
+def _colusion_resweep(at, i):
+    # Cambia a y vuelve a ejecutar uno de los tres barridos (rotando)
+    set_value(at, "number_input", 100.0 + i + 1, label="Intercepto a")
+    click(at, key=("btn_costsweep", "btn_bsweep", "btn_Nsweep")[i % 3])
+
+
+def _oligopolio_n(n):
+    def setup(at):
+        costs = ", ".join(f"{2 + 8*i/(n-1):.3f}" for i in range(n))
+        set_value(at, "number_input", 20.0, label="Intersección de demanda")
+        set_value(at, "text_input", costs, label="Costos marginales")
+    return setup
+
+
+def _diferenciado_random(n):
+    # Costos aleatorios con n firmas (la inversa de M queda en la caché entre reruns)
+    def setup(at):
+        set_value(at, "radio", "Aleatorios", key="dif_cost_source")
+        at.run()
+        set_value(at, "number_input", n, key="dif_N")
+    return setup
+
+
+def _multimercado(at):
+    set_value(at, "radio", "Multimercado (firmas en varios mercados)", key="oligo_mode")
+    at.run()
+    set_value(at, "number_input", 10_000, key="mm_N")
+    set_value(at, "number_input", 1000, key="mm_M")
+
+
+def _duopolio_general(at):
+    set_value(at, "radio", "General (numérica)", key="duo_demand")
+    at.run()
+    set_value(at, "selectbox", "Isoelástica: P = A·Q^(−1/ε)", key="duo_family")
+    set_value(at, "number_input", 0.5, key="duo_gd1")
+
+
+def _dm_sweeps(at):
+    set_value(at, "number_input", 10, label="Número de minoristas N")
+    set_value(at, "text_input", ", ".join(str(v) for v in range(0, 60, 2)), key="cU_vals")
+    set_value(at, "text_input", ", ".join(str(v) for v in range(0, 60, 2)), key="cD_vals")
+    set_value(at, "text_input", ", ".join(f"{0.2 + 0.1*i:.1f}" for i in range(30)), key="b_vals_dm")
+    set_value(at, "text_input", ", ".join(str(n) for n in range(1, 31)), key="N_vals_dm")
+    at.run()
+    for k in ("btn_cU", "btn_cD", "btn_b_dm", "btn_N_dm"):
+        click(at, key=k)
+        at.run()
+
+
+def _dm_resweep(at, i):
+    set_value(at, "number_input", 100.0 + i + 1, label="Intercepto a")
+    click(at, key=("btn_cU", "btn_cD", "btn_b_dm", "btn_N_dm")[i % 4])
+
+
+def _game(n, m, seed=0):
+    # Pagos aleatorios n×m ya cargados en el estado que usan los data_editor de la página
+    def setup(at):
+        import numpy as np
+        import pandas as pd
+
+        rows = [f"P1{i+1}" for i in range(n)]
+        cols = [f"P2{j+1}" for j in range(m)]
+        rng = np.random.default_rng(seed)
+        at.session_state[f"U1_{n}x{m}"] = pd.DataFrame(rng.integers(-9, 10, (n, m)).astype(float), rows, cols)
+        at.session_state[f"U2_{n}x{m}"] = pd.DataFrame(rng.integers(-9, 10, (n, m)).astype(float), rows, cols)
+        set_value(at, "number_input", n, label="Estrategias Jugador 1")
+        set_value(at, "number_input", m, label="Estrategias Jugador 2")
+    return setup
+
+
+def _deep_tree(depth=6, branching=2):
+    # Árbol completo: `depth` niveles de decisión alternando jugadores y terminales en las hojas
+    def setup(at):
+        S = at.session_state["state"]
+        frontier = [S.get_root()]
+        for d in range(1, depth):
+            nxt = []
+            for u in frontier:
+                for k in range(branching):
+                    nxt.append(S.add_child(u, f"a{d}{k}", 1 + d % 2))
+            frontier = nxt
+        for u in frontier:
+            for k in range(branching):
+                S.add_terminal(u, f"t{k}", (float(u % 7), float(k)))
+    return setup
+
+
+def _title(at, i):
+    set_value(at, "text_input", f"Árbol {i}", label="Título opcional para el PNG")
+
+
+def _num(label, base, step):
+    def vary(at, i):
+        set_value(at, "number_input", base + step * (i + 1), label=label)
+    return vary
+
+
+def _noop(at):
+    pass
+
+
+SCENARIOS = {
+    "app.py": [("portada", _noop, None)],
+    "pages/0_Monopolio.py": [("base", _noop, _num("a (intercepto", 20.0, 0.5))],
+    "pages/1_Duopolio_de_Cournot.py": [
+        ("base", _noop, _num("Costo marginal firma 1", 20.0, 0.5)),
+        ("demanda general", _duopolio_general, _num("Costo marginal firma 1", 20.0, 0.5)),
+    ],
+    "pages/2_Stackelberg_Duopolio.py": [("base", _noop, _num("Costo marginal seguidor", 30.0, 0.5))],
+    "pages/3_Colusion.py": [
+        ("N=2", _noop, _num("Intercepto a", 100.0, 1.0)),
+        ("N=20", _colusion_n20, _num("Intercepto a", 100.0, 1.0)),
+        ("N=20 + barridos", _colusion_sweeps, _colusion_resweep),
+        ("N=20 + malla 200×200×19", _colusion_grid, _num("Intercepto a", 100.0, 1.0)),
+        ("N=20 cuotas min δ*", _colusion_min_delta, _num("Intercepto a", 100.0, 1.0)),
+        ("juego repetido 10⁵×1000", _colusion_repeated, None),
+    ],
+    "pages/4_Hotelling_Lineal.py": [("base", _noop, _num("Costo de transporte t", 1.0, 0.05))],
+    "pages/5_Oligopolio_Cournot_Asimetrico.py": [
+        ("N=4", _noop, _num("Intersección de demanda", 20.0, 0.25)),
+        ("N=50", _oligopolio_n(50), _num("Intersección de demanda", 20.0, 0.25)),
+        ("multimercado 10⁴×10³", _multimercado, _num("Convexidad del costo", 0.05, 0.01)),
+    ],
+    "pages/6_Cournot_Diferenciado.py": [
+        ("N=4", _noop, _num("Intercepto de demanda", 20.0, 0.25)),
+        ("N=500 aleatorios", _diferenciado_random(500), _num("Intercepto de demanda", 20.0, 0.25)),
+    ],
+    "pages/7_Bertrand_Homogeneo.py": [("base", _noop, _num("c₂ (costo marginal 2)", 9.0, 0.25))],
+    "pages/Doble_marginalizacion.py": [
+        ("N=1", _noop, _num("Intercepto a", 100.0, 1.0)),
+        ("N=10 + barridos", _dm_sweeps, _dm_resweep),
+    ],
+    "pages/Estrategias_puras.py": [
+        ("2×2", _noop, None),
+        ("10×10", _game(10, 10), None),
+    ],
+    "pages/arbol.py": [
+        ("raíz", _noop, None),
+        ("profundo (6 niveles, 64 hojas)", _deep_tree(6, 2), _title),
+    ],
+    "pages/mixtas.py": [("2×2", _noop, None)],
+}
+
+
+# -------------------- Medición --------------------
+def _pct(xs):
+    import numpy as np
+
+    if not xs:
+        return None
+    a = np.asarray(xs) * 1000.0
+    return {"n": len(xs), "p50": float(np.percentile(a, 50)), "p90": float(np.percentile(a, 90)),
+            "p99": float(np.percentile(a, 99)), "max": float(a.max()), "mean": float(a.mean())}
+
+
+def _timed_run(at, errors):
+    t0 = time.perf_counter()
+    at.run()
+    dt = time.perf_counter() - t0
+    errors.extend(str(e.value)[:200] for e in at.exception)
+    return dt
+
+
+def child(path, n):
+    child_setup()
+    from streamlit.testing.v1 import AppTest
+
+    out = {"rss_start_mb": rss_mb(), "scenarios": {}}
+    for name, setup, vary in SCENARIOS.get(path, [("base", _noop, None)]):
+        errors = []
+        at = AppTest.from_file(os.path.join(ROOT, path), default_timeout=300)
+        first = _timed_run(at, errors)
+        rss0 = rss_mb()
+        t0 = time.perf_counter()
+        setup(at)
+        _timed_run(at, errors)
+        setup_s = time.perf_counter() - t0
+        rerun = [_timed_run(at, errors) for _ in range(n)]
+        miss = []
+        if vary is not None:
+            for i in range(n):
+                vary(at, i)
+                miss.append(_timed_run(at, errors))
+        out["scenarios"][name] = {
+            "first_ms": first * 1000.0, "setup_ms": setup_s * 1000.0,
+            "rerun": _pct(rerun), "miss": _pct(miss),
+            "rss_mb": rss_mb(), "rss_growth_mb": rss_mb() - rss0,
+            "errors": sorted(set(errors)),
+        }
+    out["rss_end_mb"] = rss_mb()
+    out["maxrss_mb"] = maxrss_mb()
+    print(json.dumps(out))
+
+
+def compare(results, baseline, tolerance, slack_ms):
+    """
+    Regresiones: p50/p90 de rerun y miss por encima de baseline*tolerance + slack_ms,
+    o RSS final por encima de baseline*tolerance. Los escenarios sin baseline no entran aquí
+    (main los reporta aparte).
+    """
+    problems = []
+    for key, cur in results.items():
+        ref = baseline.get(key)
+        if ref is None:
+            continue
+        for kind in ("rerun", "miss"):
+            if not (cur.get(kind) and ref.get(kind)):
+                continue
+            for q in ("p50", "p90"):
+                limit = ref[kind][q] * tolerance + slack_ms
+                if cur[kind][q] > limit:
+                    problems.append(f"{key} {kind} {q}: {cur[kind][q]:.1f} ms > {limit:.1f} ms "
+                                    f"(baseline {ref[kind][q]:.1f})")
+        if cur["rss_mb"] > ref["rss_mb"] * tolerance:
+            problems.append(f"{key} RSS: {cur['rss_mb']:.0f} MB > {ref['rss_mb'] * tolerance:.0f} MB")
+    return problems
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Latencia de rerun y memoria por página (AppTest).")
+    ap.add_argument("-n", "--reruns", type=int, default=10, help="reruns por escenario y tipo")
+    ap.add_argument("-k", "--filter", help="solo páginas cuya ruta o título contenga este texto")
+    ap.add_argument("--json", help="guardar resultados completos en este archivo")
+    ap.add_argument("--save-baseline", metavar="PATH", help="guardar estos resultados como baseline")
+    ap.add_argument("--compare", metavar="PATH", help="comparar con un baseline (exit 1 si hay regresiones)")
+    ap.add_argument("--tolerance", type=float, default=1.5, help="factor permitido sobre el baseline")
+    ap.add_argument("--slack-ms", type=float, default=10.0, help="holgura absoluta por percentil")
+    ap.add_argument("--allow-missing", action="store_true",
+                    help="no fallar por escenarios que no están en el baseline (solo avisar)")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        return child(args.child, args.reruns)
+
+    results, processes = {}, {}
+    hdr = (f"{'página / escenario':<46} {'1er':>7} {'setup':>7} {'rerun p50/p90':>15} "
+           f"{'miss p50/p90':>15} {'RSS':>7}")
+    print(hdr)
+    for title, path in registered_pages():
+        if args.filter and args.filter.lower() not in f"{path} {title}".lower():
+            continue
+        res, wall = run_child(__file__, [path, "-n", str(args.reruns)])
+        processes[path] = {"rss_start_mb": res["rss_start_mb"], "rss_end_mb": res["rss_end_mb"],
+                           "maxrss_mb": res["maxrss_mb"], "wall_s": wall}
+        for name, sc in res["scenarios"].items():
+            key = f"{path}::{name}"
+            results[key] = {"title": title, **sc}
+            fmt = lambda d: f"{d['p50']:6.0f}/{d['p90']:<6.0f}ms" if d else f"{'-':>15}"
+            flag = "  ¡excepción!" if sc["errors"] else ""
+            print(f"{(title + ' / ' + name)[:46]:<46} {sc['first_ms']:5.0f}ms {sc['setup_ms']:5.0f}ms "
+                  f"{fmt(sc['rerun']):>15} "
+                  f"{fmt(sc['miss']):>15} {sc['rss_mb']:5.0f}MB{flag}")
+
+    meta = {
+        "python": platform.python_version(), "platform": platform.platform(),
+        "machine": platform.machine(), "reruns": args.reruns,
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        import matplotlib, numpy, pandas, streamlit
+        meta.update(numpy=numpy.__version__, pandas=pandas.__version__,
+                    matplotlib=matplotlib.__version__, streamlit=streamlit.__version__)
+    except ImportError:
+        pass
+    doc = {"meta": meta, "processes": processes, "results": results}
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2, ensure_ascii=False)
+
+    status = 1 if any(r["errors"] for r in results.values()) else 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = json.load(f)
+        problems = compare(results, base["results"], args.tolerance, args.slack_ms)
+        missing = [key for key in results if key not in base["results"]]
+        print(f"\nComparación con {args.compare} (tolerancia ×{args.tolerance}, +{args.slack_ms} ms):")
+        for p in problems:
+            print("  REGRESIÓN", p)
+        for key in missing:
+            print("  SIN BASELINE", key, "(regenera con --save-baseline)")
+        if not problems and not missing:
+            print("  sin regresiones")
+        status = status or (1 if problems or (missing and not args.allow_missing) else 0)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# bench/solvers.py
+# Micro-benchmarks de los solvers de iolab con N grande (sin Streamlit): mejor y mediana de r
+# repeticiones por tamaño. Los casos usan costos aleatorios con semilla fija.
+#
+#   python bench/solvers.py                          # todos los casos, tamaños por defecto
+#   python bench/solvers.py cournot_asim -N 1000000  # un caso y un tamaño
+#   python bench/solvers.py --json solvers.json
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from _common import child_setup
+
+
+def _cournot_asim(N, rng):
+    from iolab import cournot_asim
+
+    c = rng.uniform(1.0, 50.0, N)
+    return lambda: cournot_asim(100.0, 1.0, c)
+
+
+def _cournot_k_sweep(N, rng):
+    from iolab import cournot_k_sweep
+
+    c = np.sort(rng.uniform(1.0, 50.0, N))
+    return lambda: cournot_k_sweep(100.0, 1.0, c)
+
+
+def _monte_carlo(N, rng):
+    # N = mercados simulados (20 firmas por mercado, costos uniformes), en un solo proceso
+    from iolab.montecarlo import monte_carlo
+
+    return lambda: monte_carlo(100.0, 1.0, 20, "uniform", (10.0, 40.0), N, workers=1)
+
+
+def _free_entry(N, rng):
+    # N firmas candidatas, malla de 400 costos fijos
+    from iolab import free_entry
+
+    c = np.sort(rng.uniform(1.0, 50.0, N))
+    F = np.linspace(0.0, 2000.0, 400)
+    return lambda: free_entry(100.0, 1.0, c, F)
+
+
+def _cournot_differentiated(N, rng):
+    # N firmas, 100 escenarios de costos con la misma demanda (M⁻¹ incluida en el tiempo)
+    from iolab import cournot_differentiated, substitution_matrix
+
+    B = substitution_matrix(N, 1.0, 0.3, "line")
+    c = rng.uniform(5.0, 60.0, (100, N))
+    return lambda: cournot_differentiated(np.full(N, 50.0), B, c)
+
+
+def _multimarket_cournot(N, rng):
+    # N firmas en N/10 mercados, 20 mercados por firma, costo convexo compartido
+    from iolab.multimarket import multimarket_cournot, random_incidence
+
+    firm, market = random_incidence(N, max(N // 10, 20), 20, seed=0)
+    c, d = rng.uniform(1.0, 30.0, N), rng.uniform(0.0, 0.05, N)
+    return lambda: multimarket_cournot(40.0, 1.0, firm, market, c, d)
+
+
+def _cournot_general(N, rng):
+    # N mercados de 5 firmas con demanda isoelástica y costos convexos, en un lote
+    from iolab import cournot_general
+
+    c, d = rng.uniform(5.0, 40.0, (N, 5)), rng.uniform(0.0, 1.0, (N, 5))
+    return lambda: cournot_general("isoelastic", (100.0, rng.uniform(1.2, 3.0, N)), c, d)
+
+
+def _collusion_grid(N, rng):
+    # Malla N valores de b × N valores de c_1 × 19 valores de N (2..20) con 5 costos base
+    from iolab.collusion import collusion_grid
+
+    c = rng.uniform(10.0, 30.0, 5)
+    return lambda: collusion_grid(100.0, np.linspace(0.2, 3.0, N), c, 0, np.linspace(5.0, 60.0, N),
+                                  np.arange(2, 21))
+
+
+def _cartel_min_delta(N, rng):
+    # N mercados de 20 firmas asimétricas: cuotas que minimizan δ* (bisección por lotes)
+    from iolab import collusion_outcomes
+
+    c = rng.uniform(5.0, 40.0, (N, 20))
+    return lambda: collusion_outcomes(100.0, 1.0, c, "min_delta")
+
+
+def _repeated_game(N, rng):
+    # N trayectorias × 1000 periodos de Green–Porter con 5 firmas (guerras de precios frecuentes)
+    from iolab.repeated import repeated_game
+
+    c = rng.uniform(10.0, 30.0, 5)
+    return lambda: repeated_game(100.0, 1.0, c, 0.9, "green_porter", T=1000, paths=N, sigma=10.0,
+                                 punishment=5, trigger_price=50.0)
+
+
+def _scenario_store(N, rng):
+    # Almacén con N capturas de Colusión (en un archivo temporal) y una búsqueda por rango de a y N
+    import os
+    import tempfile
+
+    from iolab import scenarios
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite")
+    for k in range(N):
+        n = int(rng.integers(2, 21))
+        params = {"a": float(rng.integers(50, 150)), "b": 1.0, "N": n, "c": rng.uniform(5.0, 40.0, n)}
+        scenarios.save("colusion", params, lambda: {"delta*": 0.5}, f"s{k}", f"u{k % 7}", path=path)
+    return lambda: scenarios.find("colusion", limit=N, path=path, a=(80, 120), N=(5, 10))
+
+
+def _pairwise_mergers(N, rng):
+    # N firmas -> N(N-1)/2 fusiones de dos firmas
+    from iolab import pairwise_mergers
+
+    c = rng.uniform(1.0, 50.0, N)
+    return lambda: pairwise_mergers(100.0, 1.0, c, efficiency=0.05)
+
+
+# nombre -> (tamaños por defecto, setup(N, rng) -> callable sin argumentos)
+CASES = {
+    "cournot_asim": ((10**3, 10**4, 10**5, 10**6), _cournot_asim),
+    "cournot_k_sweep": ((10**3, 10**4, 10**5, 10**6), _cournot_k_sweep),
+    "monte_carlo": ((10**4, 10**5, 10**6), _monte_carlo),
+    "free_entry": ((10**3, 10**5, 10**6), _free_entry),
+    "cournot_differentiated": ((100, 500, 1000), _cournot_differentiated),
+    "multimarket_cournot": ((10**3, 10**4, 10**5), _multimarket_cournot),
+    "cournot_general": ((10**3, 10**4, 10**5), _cournot_general),
+    "collusion_grid": ((50, 100, 200), _collusion_grid),
+    "cartel_min_delta": ((10**3, 10**4, 10**5), _cartel_min_delta),
+    "repeated_game": ((10**3, 10**4, 10**5), _repeated_game),
+    "scenario_store": ((10**2, 10**3, 10**4), _scenario_store),
+    "pairwise_mergers": ((100, 500, 2000), _pairwise_mergers),
+}
+
+
+def time_case(name, N, repeat, seed=0):
+    fn = CASES[name][1](N, np.random.default_rng(seed))
+    fn()                                     # primera llamada: imports y páginas de memoria
+    ts = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        ts.append(time.perf_counter() - t0)
+    return {"case": name, "N": N, "best_ms": min(ts) * 1000, "median_ms": statistics.median(ts) * 1000}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Tiempos de los solvers de iolab con N grande.")
+    ap.add_argument("cases", nargs="*", help=f"casos a medir (por defecto todos: {', '.join(CASES)})")
+    ap.add_argument("-N", type=float, action="append", help="tamaño (repetible); por defecto los del caso")
+    ap.add_argument("-r", "--repeat", type=int, default=5)
+    ap.add_argument("--json", help="guardar resultados en este archivo")
+    args = ap.parse_args(argv)
+    child_setup()
+
+    rows = []
+    for name in args.cases or list(CASES):
+        if name not in CASES:
+            ap.error(f"caso desconocido: {name}")
+        for N in [int(n) for n in args.N] if args.N else CASES[name][0]:
+            r = time_case(name, N, args.repeat)
+            rows.append(r)
+            print(f"{name:<20} N={N:<10,} mejor {r['best_ms']:9.2f} ms   mediana {r['median_ms']:9.2f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
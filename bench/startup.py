@@ -0,0 +1,101 @@
+# bench/startup.py
+# Benchmark de arranque en frío: tiempo hasta el primer render de cada página registrada en app.py.
+# Cada medición corre en un proceso nuevo (imports y cachés vacías), como tras un deploy o un autoscale.
+#
+#   python bench/startup.py                 # en frío, sin precalentar
+#   python bench/startup.py --prewarm       # con warm_up() previo (servidor ya precalentado)
+#   python bench/startup.py --cold-fonts    # además sin caché de fuentes de matplotlib en disco
+#   python bench/startup.py -r 5 --json startup.json
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from _common import ROOT, child_setup, registered_pages, run_child
+
+HEAVY = ("pandas", "matplotlib", "matplotlib.figure", "matplotlib.pyplot")
+
+
+def child(path, prewarm):
+    # Se ejecuta en el proceso nuevo: mide imports, precalentamiento, primer render y rerun
+    t0 = time.perf_counter()
+    child_setup()
+    from streamlit.testing.v1 import AppTest
+
+    res = {"import_streamlit": time.perf_counter() - t0, "warmup": None}
+    if prewarm:
+        from iolab.startup import warm_up
+        res["warmup"] = warm_up()
+
+    at = AppTest.from_file(os.path.join(ROOT, path), default_timeout=120)
+    t1 = time.perf_counter()
+    at.run()
+    res["first_render"] = time.perf_counter() - t1
+    res["loaded"] = [m for m in HEAVY if m in sys.modules]
+    t2 = time.perf_counter()
+    at.run()
+    res["rerun"] = time.perf_counter() - t2
+    res["exceptions"] = [str(e.value)[:200] for e in at.exception]
+    res["in_process"] = time.perf_counter() - t0
+    print(json.dumps(res))
+
+
+def measure(path, prewarm, cold_fonts):
+    env = {}
+    tmp = None
+    if cold_fonts:
+        tmp = tempfile.TemporaryDirectory()
+        env["MPLCONFIGDIR"] = tmp.name
+    try:
+        res, wall = run_child(__file__, [path] + (["--prewarm"] if prewarm else []), env=env)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+    res["process_wall"] = wall
+    return res
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Tiempo hasta el primer render por página (procesos nuevos).")
+    ap.add_argument("-r", "--repeat", type=int, default=1, help="procesos por página (se reporta la mediana)")
+    ap.add_argument("--prewarm", action="store_true", help="llamar warm_up() antes del primer render")
+    ap.add_argument("--cold-fonts", action="store_true", help="MPLCONFIGDIR vacío: reconstruye la caché de fuentes")
+    ap.add_argument("--json", help="guardar resultados en este archivo")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        return child(args.child, args.prewarm)
+
+    rows = []
+    print(f"{'página':<40} {'1er render':>11} {'rerun':>9} {'proceso':>9}  cargados")
+    for title, path in registered_pages():
+        runs = [measure(path, args.prewarm, args.cold_fonts) for _ in range(max(1, args.repeat))]
+        med = lambda k: statistics.median(r[k] for r in runs)
+        row = {
+            "title": title, "path": path,
+            "first_render_ms": 1000 * med("first_render"),
+            "rerun_ms": 1000 * med("rerun"),
+            "process_ms": 1000 * med("process_wall"),
+            "warmup_ms": 1000 * statistics.median(r["warmup"]["total"] for r in runs) if args.prewarm else None,
+            "loaded": runs[-1]["loaded"],
+            "exceptions": runs[-1]["exceptions"],
+        }
+        rows.append(row)
+        flag = "  ¡excepción!" if row["exceptions"] else ""
+        print(f"{title[:40]:<40} {row['first_render_ms']:9.0f}ms {row['rerun_ms']:7.0f}ms "
+              f"{row['process_ms']:7.0f}ms  {','.join(row['loaded']) or '-'}{flag}")
+
+    if args.json:
+        meta = {"prewarm": args.prewarm, "cold_fonts": args.cold_fonts, "repeat": args.repeat,
+                "python": sys.version.split()[0]}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "pages": rows}, f, indent=2, ensure_ascii=False)
+    return 1 if any(r["exceptions"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
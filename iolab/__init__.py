@@ -0,0 +1,70 @@
+# iolab — solvers de los modelos de IO Lab, sin dependencia de Streamlit.
+# Cada función acepta escalares o arreglos NumPy y calcula muchos escenarios en una llamada.
+from .bertrand import bertrand_homogeneous
+from .collusion import (
+    cartel_efficient,
+    cartel_equal_split,
+    cartel_min_delta,
+    collusion_outcomes,
+    deltas_robust,
+    one_shot_deviation_against_cartel,
+)
+from .duopoly import br1, br2, cournot_interior, stackelberg_linear
+from .general import cournot_general
+from .games import mixed_2x2, pure_best_responses
+from .hotelling import hotelling_nash_prices, hotelling_outcomes
+from .mergers import pairwise_mergers, simulate_merger
+from .monopoly import monopoly_linear
+from .montecarlo import monte_carlo, simulate_markets
+from .multimarket import multimarket_cournot
+from .oligopoly import (
+    concentration,
+    cournot_asim,
+    cournot_asym,
+    cournot_differentiated,
+    cournot_k_sweep,
+    differentiated_factor,
+    free_entry,
+    substitution_matrix,
+)
+from .vertical import dm_opt_w, dm_outcomes, regime_tpt, regime_vi
+from .welfare import cs_linear, welfare_metrics
+
+__all__ = [
+    "bertrand_homogeneous",
+    "br1",
+    "br2",
+    "cartel_efficient",
+    "cartel_equal_split",
+    "cartel_min_delta",
+    "collusion_outcomes",
+    "concentration",
+    "cournot_asim",
+    "cournot_asym",
+    "cournot_differentiated",
+    "cournot_general",
+    "cournot_interior",
+    "cournot_k_sweep",
+    "cs_linear",
+    "deltas_robust",
+    "differentiated_factor",
+    "dm_opt_w",
+    "dm_outcomes",
+    "free_entry",
+    "hotelling_nash_prices",
+    "hotelling_outcomes",
+    "mixed_2x2",
+    "monopoly_linear",
+    "monte_carlo",
+    "multimarket_cournot",
+    "one_shot_deviation_against_cartel",
+    "pairwise_mergers",
+    "pure_best_responses",
+    "regime_tpt",
+    "regime_vi",
+    "simulate_markets",
+    "simulate_merger",
+    "stackelberg_linear",
+    "substitution_matrix",
+    "welfare_metrics",
+]
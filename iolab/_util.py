@@ -0,0 +1,18 @@
+# iolab/_util.py
+# Utilidades internas compartidas por los solvers vectorizados.
+import numpy as np
+
+
+def as_float(x):
+    return np.asarray(x, dtype=float)
+
+
+def col(x):
+    # Parámetro por mercado (...,) -> (..., 1) para difundir contra el eje de firmas
+    return as_float(x)[..., None]
+
+
+def out(x):
+    # Arreglos 0-d -> escalar NumPy (así las páginas formatean f"{x:.2f}" sin cambios)
+    x = np.asarray(x)
+    return x[()] if x.ndim == 0 else x
@@ -0,0 +1,37 @@
+# iolab/bertrand.py
+# Bertrand homogéneo con P(Q)=a-bQ y costos c1, c2 (regla didáctica):
+# si c1≠c2, p* = max{c1,c2} y vende la firma de menor costo; si c1=c2, p* = c y se reparten.
+import numpy as np
+
+from ._util import as_float, out
+
+
+def bertrand_homogeneous(a, b, c1, c2):
+    """
+    Equilibrio "docente", bienestar y benchmark competitivo (P=c_min).
+    Retorna dict con p, Q, q1, q2, pi1, pi2, PI, CS, TS, c_min, Q_pc, TS_pc, DWL.
+    """
+    a, b, c1, c2 = as_float(a), as_float(b), as_float(c1), as_float(c2)
+    tie = np.isclose(c1, c2)
+    c_min, c_max = np.minimum(c1, c2), np.maximum(c1, c2)
+    p = np.where(tie, c_min, c_max)
+    Q = np.maximum((a - p) / b, 0.0)
+
+    q1 = np.where(tie, Q / 2.0, np.where(c1 < c2, Q, 0.0))
+    q2 = np.where(tie, Q / 2.0, np.where(c1 < c2, 0.0, Q))
+    pi1 = (p - c1) * q1
+    pi2 = (p - c2) * q2
+    PI = pi1 + pi2
+    CS = 0.5 * Q * (a - p)
+    TS = CS + PI
+
+    covered = a > c_min
+    Q_pc = np.where(covered, (a - c_min) / b, 0.0)
+    TS_pc = np.where(covered, 0.5 * (a - c_min) * Q_pc, 0.0)
+    DWL = np.maximum(TS_pc - TS, 0.0)
+
+    return {
+        "p": out(p), "Q": out(Q), "q1": out(q1), "q2": out(q2),
+        "pi1": out(pi1), "pi2": out(pi2), "PI": out(PI), "CS": out(CS), "TS": out(TS),
+        "c_min": out(c_min), "Q_pc": out(Q_pc), "TS_pc": out(TS_pc), "DWL": out(DWL),
+    }
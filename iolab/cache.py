@@ -0,0 +1,202 @@
+# iolab/cache.py
+# Caché LRU acotada y compartida por proceso (todas las sesiones de Streamlit la ven).
+# Se usa para memoizar equilibrios, tablas y barridos según los parámetros del modelo.
+import functools
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class LRUCache:
+    """
+    Diccionario con desalojo LRU, límite de entradas y de bytes, y contadores.
+    Seguro entre hilos (Streamlit atiende cada sesión en su propio hilo).
+    """
+
+    def __init__(self, max_entries=512, max_bytes=64 * 2**20):
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self._data = OrderedDict()   # key -> (value, nbytes)
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, nbytes=None):
+        nbytes = sizeof(value) if nbytes is None else int(nbytes)
+        if nbytes > self.max_bytes:
+            return False              # no cabe ni sola: no se guarda
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._data[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while len(self._data) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, freed) = self._data.popitem(last=False)
+                self.nbytes -= freed
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._data), "bytes": self.nbytes,
+            "max_entries": self.max_entries, "max_bytes": self.max_bytes,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+        }
+
+
+def sizeof(value):
+    # Tamaño aproximado en bytes (arreglos, DataFrames y contenedores anidados)
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 128
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) + 64
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    if hasattr(value, "memory_usage"):      # pandas.DataFrame / Series
+        try:
+            return int(np.sum(value.memory_usage(deep=True))) + 256
+        except TypeError:
+            pass
+    return sys.getsizeof(value)
+
+
+def _feed(h, obj):
+    # Serializa parámetros de forma estable para la llave (tipo + contenido)
+    if isinstance(obj, np.ndarray):
+        h.update(b"nd" + str(obj.dtype).encode() + str(obj.shape).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"(" if isinstance(obj, tuple) else b"[")
+        for v in obj:
+            _feed(h, v)
+            h.update(b",")
+        h.update(b")")
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj, key=repr):
+            _feed(h, k)
+            h.update(b":")
+            _feed(h, obj[k])
+        h.update(b"}")
+    elif isinstance(obj, (bytes, bytearray)):
+        # Contenido de archivos subidos: directo al hash (repr() de megabytes sería lento)
+        h.update(b"bytes" + str(len(obj)).encode())
+        h.update(obj)
+    elif isinstance(obj, (bool, int, float, str, type(None), np.generic)):
+        h.update(type(obj).__name__.encode() + repr(obj).encode())
+    else:
+        raise TypeError(f"parámetro no memoizable: {type(obj).__name__}")
+
+
+def make_key(*args, **kwargs):
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, args)
+    _feed(h, kwargs)
+    return h.hexdigest()
+
+
+def _freeze(value):
+    # Los resultados se comparten entre sesiones: los arreglos quedan de solo lectura
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+def _thaw(value):
+    # Los DataFrames/Series no se pueden congelar: cada llamada recibe su copia (los arreglos
+    # de solo lectura y los contenedores sin DataFrames se devuelven tal cual)
+    if hasattr(value, "memory_usage") and hasattr(value, "copy"):
+        return value.copy()
+    if isinstance(value, dict):
+        out = {k: _thaw(v) for k, v in value.items()}
+        return value if all(out[k] is v for k, v in value.items()) else type(value)(out)
+    if isinstance(value, (list, tuple)):
+        out = [_thaw(v) for v in value]
+        if all(a is b for a, b in zip(out, value)):
+            return value
+        return out if isinstance(value, list) else tuple(out)
+    return value
+
+
+def _feed_code(h, code):
+    # Bytecode y constantes (recursivo en funciones anidadas): cambiar un literal cambia la llave
+    h.update(code.co_code)
+    for c in code.co_consts:
+        if hasattr(c, "co_code"):
+            _feed_code(h, c)
+        else:
+            h.update(type(c).__name__.encode() + repr(c).encode())
+
+
+RESULTS = LRUCache(
+    max_entries=int(os.environ.get("IOLAB_CACHE_ENTRIES", 2048)),
+    max_bytes=int(float(os.environ.get("IOLAB_CACHE_MB", 128)) * 2**20),
+)
+
+
+def memoize(fn=None, *, cache=None):
+    """
+    Memoiza fn en una LRUCache (por defecto RESULTS) usando sus argumentos como llave.
+    La llave incluye archivo, nombre, bytecode y constantes de fn, así que funciones definidas
+    dentro de una página sobreviven a los reruns y se comparten entre sesiones. Los arreglos
+    del resultado quedan de solo lectura; los DataFrames se devuelven como copia.
+    Uso: @memoize, @memoize(cache=...) o memoize(fn).
+    """
+    if fn is None:
+        return lambda f: memoize(f, cache=cache)
+    store = RESULTS if cache is None else cache
+    code = fn.__code__
+    h = hashlib.blake2b(f"{code.co_filename}:{fn.__qualname__}".encode(), digest_size=8)
+    _feed_code(h, code)
+    ident = h.hexdigest()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = ident + make_key(*args, **kwargs)
+        value = store.get(key, _MISSING)
+        if value is _MISSING:
+            value = _freeze(fn(*args, **kwargs))
+            store.put(key, value)
+        return _thaw(value)
+
+    wrapper.cache = store
+    return wrapper
+
+
+_MISSING = object()
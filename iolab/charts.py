@@ -0,0 +1,347 @@
+# iolab/charts.py
+# Gráficos del lado del cliente: specs Vega-Lite (dicts JSON) que el navegador dibuja.
+# El servidor solo calcula unos pocos puntos (las curvas son lineales por tramos), así que
+# no rasteriza nada y el payload es un JSON pequeño en vez de un PNG.
+# show_chart() elige entre esto y la figura matplotlib cacheada según el backend de la sesión.
+import os
+
+import numpy as np
+
+from .figures import show_figure
+
+BACKENDS = ("matplotlib", "vega")
+DEFAULT_BACKEND = os.environ.get("IOLAB_CHARTS", "matplotlib")
+
+# Paleta tab10 de matplotlib, para que ambos backends se vean parecidos
+TAB = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b"]
+
+
+def chart_backend():
+    # Backend de la sesión: el toggle "client_charts" de app.py vive en session_state, que también
+    # ven los reruns de fragmentos (corren en otro hilo y sin pasar por app.py)
+    import streamlit as st
+
+    client = st.session_state.get("client_charts")
+    if client is None:
+        return DEFAULT_BACKEND
+    return "vega" if client else "matplotlib"
+
+
+def show_chart(target, kind, params, draw, spec=None):
+    """
+    Muestra el gráfico `kind`: con backend "vega" y `spec` dado, envía spec() a
+    target.vega_lite_chart; si no, rasteriza draw() con la caché de figuras.
+    """
+    if spec is not None and chart_backend() == "vega":
+        return target.vega_lite_chart(spec(), use_container_width=True)
+    return show_figure(target, kind, params, draw)
+
+
+# -------------------- Utilidades de specs --------------------
+def _r(x, nd=4):
+    return round(float(x), nd)
+
+
+def _rows(**cols):
+    # Columnas -> lista de registros (valores redondeados para achicar el JSON)
+    keys = list(cols)
+    n = len(cols[keys[0]])
+    out = []
+    for i in range(n):
+        row = {}
+        for k in keys:
+            v = cols[k][i]
+            row[k] = v if isinstance(v, str) else _r(v)
+        out.append(row)
+    return out
+
+
+def _spec(layers, title, xtitle, ytitle, xdomain=None, ydomain=None, height=320, legend=True):
+    x = {"type": "quantitative", "title": xtitle}
+    y = {"type": "quantitative", "title": ytitle}
+    if xdomain is not None:
+        x["scale"] = {"domain": [_r(v) for v in xdomain], "nice": False}
+    if ydomain is not None:
+        y["scale"] = {"domain": [_r(v) for v in ydomain], "nice": False}
+    spec = {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "height": height,
+        "encoding": {"x": {"field": "x", **x}, "y": {"field": "y", **y}},
+        "layer": layers,
+        "config": {"legend": {"orient": "bottom", "columns": 2} if legend else {"disable": True}},
+    }
+    if title:
+        spec["title"] = title
+    return spec
+
+
+def _color(series, domain, colors):
+    return {"field": "serie", "type": "nominal", "title": None,
+            "scale": {"domain": series if domain is None else domain, "range": colors}}
+
+
+def _piecewise_linear(f, x0, x1, kinks):
+    # Puntos de f en [x0, x1] con los quiebres dados (f lineal por tramos)
+    xs = sorted({x0, x1, *[k for k in kinks if x0 < k < x1]})
+    return np.array(xs), np.asarray(f(np.array(xs)), dtype=float)
+
+
+# -------------------- Demanda, MR y MC con CS, π y DWL --------------------
+def demand_mr_mc_spec(a, b, c, Q_m, P_m, Q_pc, Q_int, title="Monopolio: CS, π y DWL"):
+    names = ["Demanda inversa", "Ingreso marginal (MR)", "Costo marginal (MC)",
+             "Excedente del consumidor", "Ganancias del monopolio", "Pérdida de peso muerto"]
+    color = _color(names, None, TAB[:6])
+    lines = _rows(x=[0, Q_int, 0, Q_int / 2, 0, Q_int], y=[a, a - b * Q_int, a, 0, c, c],
+                  serie=names[:1] * 2 + names[1:2] * 2 + names[2:3] * 2)
+    areas = []
+    if Q_m > 0:
+        areas += _rows(x=[0, Q_m], y=[a, P_m], y2=[P_m, P_m], serie=[names[3]] * 2)
+    if P_m > c and Q_m > 0:
+        areas += _rows(x=[0, Q_m], y=[P_m, P_m], y2=[c, c], serie=[names[4]] * 2)
+    if Q_pc > Q_m:
+        areas += _rows(x=[Q_m, Q_pc], y=[a - b * Q_m, a - b * Q_pc], y2=[c, c], serie=[names[5]] * 2)
+    guides = _rows(x=[Q_m, Q_pc], label=["Q*", "Q_pc"], y=[P_m, c])
+    layers = [
+        {"data": {"values": areas}, "mark": {"type": "area", "opacity": 0.25},
+         "encoding": {"y2": {"field": "y2"}, "color": color, "detail": {"field": "serie"}}},
+        {"data": {"values": lines}, "mark": {"type": "line", "strokeWidth": 2},
+         "encoding": {"color": color, "strokeDash": {"condition": {
+             "test": f"datum.serie == '{names[2]}'", "value": [6, 4]}, "value": [1, 0]}}},
+        {"data": {"values": guides}, "mark": {"type": "rule", "strokeDash": [2, 3], "color": "#444"},
+         "encoding": {"y": {"value": 0}, "y2": {"value": "height"}}},
+        {"data": {"values": guides}, "mark": {"type": "text", "align": "left", "dx": 4, "dy": -6},
+         "encoding": {"text": {"field": "label"}}},
+    ]
+    return _spec(layers, title, "Cantidad Q", "Precio / Costo", xdomain=(0, Q_int),
+                 ydomain=(0, max(a, P_m, c) * 1.05))
+
+
+# -------------------- Cruce de mejores respuestas (Cournot / Stackelberg) --------------------
+def br_crossing_spec(a, b, c1, c2, q1s, q2s, q_max, leader=False, title=None):
+    """
+    BR2 como q₂(q₁) y BR1 como q₁(q₂) en el plano (q₁, q₂), con el equilibrio marcado.
+    leader=True: versión Stackelberg (BR1 de referencia punteada y compromiso del líder q₁*).
+    """
+    k2 = (a - c2) / b                       # BR2 toca 0 en q1 = (a-c2)/b
+    k1 = (a - c1) / b
+    q1, q2 = _piecewise_linear(lambda x: np.maximum((a - c2 - b * x) / (2 * b), 0.0), 0.0, q_max, [k2])
+    p2, p1 = _piecewise_linear(lambda y: np.maximum((a - c1 - b * y) / (2 * b), 0.0), 0.0, q_max, [k1])
+    n2 = "BR seguidor: q₂(q₁)" if leader else "BR firma 2: q₂(q₁)"
+    n1 = "BR firma 1 (Cournot, ref.)" if leader else "BR firma 1: q₁(q₂)"
+    n3 = "Compromiso del líder: q₁*" if leader else "Bisectriz: q₂=q₁"
+    color = _color([n2, n1, n3], None, TAB[:3])
+    curves = (_rows(x=q1, y=q2, t=range(len(q1)), serie=[n2] * len(q1))
+              + _rows(x=p1, y=p2, t=range(len(p1)), serie=[n1] * len(p1)))
+    if leader:
+        curves += _rows(x=[q1s, q1s], y=[0, q_max], t=[0, 1], serie=[n3] * 2)
+    else:
+        curves += _rows(x=[0, q_max], y=[0, q_max], t=[0, 1], serie=[n3] * 2)
+    dash = {"condition": [{"test": f"datum.serie == '{n3}'", "value": [2, 3]}]
+            + ([{"test": f"datum.serie == '{n1}'", "value": [6, 4]}] if leader else []),
+            "value": [1, 0]}
+    eq = _rows(x=[q1s], y=[q2s], label=[f"({q1s:.2f}, {q2s:.2f})"])
+    notes = [] if leader else _rows(x=[0.72 * q_max, 0.86 * q_max], y=[0.86 * q_max, 0.72 * q_max],
+                                    label=["q₁ < q₂", "q₁ > q₂"])
+    layers = [
+        {"data": {"values": curves}, "mark": {"type": "line", "strokeWidth": 2},
+         "encoding": {"color": color, "order": {"field": "t"}, "strokeDash": dash}},
+        {"data": {"values": eq}, "mark": {"type": "point", "filled": True, "size": 70, "color": "black"}},
+        {"data": {"values": eq}, "mark": {"type": "text", "align": "left", "dx": 8, "dy": -8},
+         "encoding": {"text": {"field": "label"}}},
+        {"data": {"values": notes}, "mark": {"type": "text", "align": "left", "opacity": 0.85, "fontSize": 12},
+         "encoding": {"text": {"field": "label"}}},
+    ]
+    return _spec(layers, title, "q₁ (líder)" if leader else "q₁", "q₂ (seguidor)" if leader else "q₂",
+                 xdomain=(0, q_max), ydomain=(0, q_max), height=380)
+
+
+# -------------------- Línea vs k (barridos de número de firmas) --------------------
+def line_vs_k_spec(k, y, ytitle, title, xtitle="Número de firmas activas (k)", ydomain=None, points=True):
+    data = _rows(x=k, y=y)
+    layers = [{"data": {"values": data}, "mark": {"type": "line", "point": points, "color": TAB[0]}}]
+    spec = _spec(layers, title, xtitle, ytitle, ydomain=ydomain, legend=False)
+    spec["encoding"]["x"]["axis"] = {"tickMinStep": 1, "format": "d"}
+    return spec
+
+
+def lines_spec(x, series, title, xtitle, ytitle, rule=None, step=False, ydomain=None):
+    """
+    Varias curvas sobre la misma x: `series` es un dict nombre -> arreglo. `rule`: x de una
+    línea vertical de referencia; step=True dibuja escalones (p. ej. número de firmas).
+    """
+    names = list(series)
+    data = []
+    for name in names:
+        data += _rows(x=x, y=series[name], serie=[name] * len(x))
+    mark = {"type": "line", "strokeWidth": 2}
+    if step:
+        mark["interpolate"] = "step-after"
+    layers = [{"data": {"values": data}, "mark": mark,
+               "encoding": {"color": _color(names, None, TAB[:len(names)])}}]
+    if rule is not None:
+        layers.append({"data": {"values": [{"x": _r(rule)}]},
+                       "mark": {"type": "rule", "strokeDash": [2, 3], "color": "#444"},
+                       "encoding": {"y": {"value": 0}, "y2": {"value": "height"}}})
+    return _spec(layers, title, xtitle, ytitle, ydomain=ydomain)
+
+
+# -------------------- Barras por firma (δ_i*, utilidades) --------------------
+def bars_spec(values, title, ytitle, xtitle="Firma i", ydomain=None, series=None):
+    """
+    Barras por firma. `values`: arreglo (N,) o dict serie -> arreglo (N,) para barras agrupadas.
+    """
+    if not isinstance(values, dict):
+        values = {series or ytitle: values}
+    names = list(values)
+    data = []
+    for name in names:
+        v = np.asarray(values[name], dtype=float)
+        data += _rows(firma=[str(i + 1) for i in range(v.size)], y=v, serie=[name] * v.size)
+    y = {"field": "y", "type": "quantitative", "title": ytitle}
+    if ydomain is not None:
+        y["scale"] = {"domain": list(ydomain)}
+    enc = {"x": {"field": "firma", "type": "ordinal", "title": xtitle, "sort": None, "axis": {"labelAngle": 0}},
+           "y": y, "color": _color(names, None, TAB[:len(names)])}
+    if len(names) > 1:
+        enc["xOffset"] = {"field": "serie", "sort": names}
+    return {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "title": title, "height": 320,
+        "data": {"values": data},
+        "mark": {"type": "bar", "tooltip": True},
+        "encoding": enc,
+        "config": {"legend": {"orient": "bottom"} if len(names) > 1 else {"disable": True}},
+    }
+
+
+# -------------------- Juego 2×2: utilidades esperadas y cuadrado de BR --------------------
+def eu_lines_spec(A, q_star=None):
+    # EU₁(U,q) y EU₁(D,q) son rectas en q: bastan los extremos
+    A = np.asarray(A, dtype=float)
+    names = ["EU₁(U,q)", "EU₁(D,q)"]
+    data = _rows(x=[0, 1, 0, 1], y=[A[0, 1], A[0, 0], A[1, 1], A[1, 0]],
+                 serie=[names[0]] * 2 + [names[1]] * 2)
+    layers = [{"data": {"values": data}, "mark": {"type": "line", "strokeWidth": 2},
+               "encoding": {"color": _color(names, None, TAB[:2]),
+                            "strokeDash": {"condition": {"test": f"datum.serie == '{names[1]}'",
+                                                         "value": [6, 4]}, "value": [1, 0]}}}]
+    if q_star is not None:
+        y = q_star * A[0, 0] + (1 - q_star) * A[0, 1]
+        layers.append({"data": {"values": _rows(x=[q_star], y=[y])},
+                       "mark": {"type": "point", "filled": True, "size": 60, "color": "black"}})
+    return _spec(layers, None, "q", "EU₁", xdomain=(0, 1))
+
+
+def mixed_br_square_spec(p_star, q_star, mixed_strict):
+    # BR J1 (p|q) y BR J2 (q|p) como trayectorias escalonadas en el cuadrado [0,1]²
+    names = ["BR J1 (p|q)", "BR J2 (q|p)"]
+    layers = [{"data": {"values": _rows(x=[0, 1, 1, 0, 0], y=[0, 0, 1, 1, 0], t=range(5))},
+               "mark": {"type": "line", "color": "black", "strokeWidth": 1.3},
+               "encoding": {"order": {"field": "t"}}}]
+    if mixed_strict:
+        paths = (_rows(x=[0, 0, 1, 1], y=[0, q_star, q_star, 1], t=range(4), serie=[names[0]] * 4)
+                 + _rows(x=[0, p_star, p_star, 1], y=[0, 0, 1, 1], t=range(4), serie=[names[1]] * 4))
+        layers += [
+            {"data": {"values": paths}, "mark": {"type": "line", "strokeWidth": 3},
+             "encoding": {"color": _color(names, None, [TAB[0], TAB[4]]), "order": {"field": "t"}}},
+            {"data": {"values": _rows(x=[p_star], y=[q_star])},
+             "mark": {"type": "point", "filled": True, "size": 80, "color": "black"}},
+        ]
+    else:
+        layers.append({"data": {"values": [{"x": 0.5, "y": 0.5, "label": "No hay mixto interior"}]},
+                       "mark": {"type": "text", "opacity": 0.4, "fontSize": 14},
+                       "encoding": {"text": {"field": "label"}}})
+    spec = _spec(layers, None, "p", "q", xdomain=(0, 1), ydomain=(0, 1), height=380)
+    spec["width"] = 380
+    return spec
+
+
+# -------------------- Histogramas (conteos ya agrupados en el servidor) --------------------
+def histogram_spec(edges, counts, title, xtitle, ytitle="Mercados"):
+    edges, counts = np.asarray(edges, dtype=float), np.asarray(counts)
+    data = [{"x": _r(lo, 6), "x2": _r(hi, 6), "y": int(n)} for lo, hi, n in zip(edges[:-1], edges[1:], counts)]
+    return {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "title": title, "height": 260,
+        "data": {"values": data},
+        "mark": {"type": "bar", "color": TAB[0], "tooltip": True},
+        "encoding": {"x": {"field": "x", "type": "quantitative", "title": xtitle, "bin": {"binned": True}},
+                     "x2": {"field": "x2"},
+                     "y": {"field": "y", "type": "quantitative", "title": ytitle}},
+    }
+
+
+# -------------------- Mapas de calor (mallas de parámetros) --------------------
+HEATMAP_CELLS = 80         # celdas por eje en el spec (la malla se submuestrea para achicar el JSON)
+
+
+def heatmap_spec(x, y, z, title, xtitle, ytitle, ztitle, zdomain=None):
+    """
+    Mapa de calor de z (len(y), len(x)) sobre la malla x × y (ascendentes). Cada eje se
+    submuestrea a ≤ HEATMAP_CELLS valores; las celdas van de punto medio a punto medio.
+    """
+    x, y, z = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(z, dtype=float)
+    ix = np.unique(np.linspace(0, x.size - 1, min(x.size, HEATMAP_CELLS)).round().astype(int))
+    iy = np.unique(np.linspace(0, y.size - 1, min(y.size, HEATMAP_CELLS)).round().astype(int))
+    x, y, z = x[ix], y[iy], z[np.ix_(iy, ix)]
+
+    def edges(v):
+        if v.size == 1:
+            return np.array([v[0] - 0.5, v[0] + 0.5])
+        mid = 0.5 * (v[1:] + v[:-1])
+        return np.r_[2 * v[0] - mid[0], mid, 2 * v[-1] - mid[-1]]
+    ex, ey = edges(x), edges(y)
+    data = [{"x": _r(ex[j]), "x2": _r(ex[j + 1]), "y": _r(ey[k]), "y2": _r(ey[k + 1]), "z": _r(z[k, j])}
+            for k in range(y.size) for j in range(x.size)]
+    scale = {"scheme": "viridis"}
+    if zdomain is not None:
+        scale["domain"] = [_r(v) for v in zdomain]
+    return {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "title": title, "height": 320,
+        "data": {"values": data},
+        "mark": {"type": "rect", "tooltip": True},
+        "encoding": {"x": {"field": "x", "type": "quantitative", "title": xtitle, "scale": {"nice": False}},
+                     "x2": {"field": "x2"},
+                     "y": {"field": "y", "type": "quantitative", "title": ytitle, "scale": {"nice": False}},
+                     "y2": {"field": "y2"},
+                     "color": {"field": "z", "type": "quantitative", "title": ztitle, "scale": scale}},
+    }
+
+
+# -------------------- Cuotas: pastel y curva de concentración --------------------
+def pie_spec(labels, values, title):
+    v = np.asarray(values, dtype=float)
+    tot = v.sum() or 1.0
+    data = [{"firma": str(l), "y": _r(x, 6), "pct": f"{100 * x / tot:.1f}%", "orden": i}
+            for i, (l, x) in enumerate(zip(labels, v))]
+    return {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "title": title, "height": 320,
+        "data": {"values": data},
+        "encoding": {"theta": {"field": "y", "type": "quantitative", "stack": True},
+                     "order": {"field": "orden"},
+                     "color": {"field": "firma", "type": "nominal", "title": None, "sort": None,
+                               "scale": {"scheme": "tableau10"}},
+                     "tooltip": [{"field": "firma"}, {"field": "pct", "title": "cuota"}]},
+        "layer": [{"mark": {"type": "arc", "outerRadius": 120}},
+                  {"mark": {"type": "text", "radius": 140},
+                   "encoding": {"text": {"field": "pct"}}}],
+        "config": {"legend": {"orient": "right"}},
+    }
+
+
+def concentration_spec(k, cr, n, title="Curva de concentración"):
+    # CR_k vs k/N, con la diagonal de cuotas iguales como referencia
+    names = ["CR_k (k mayores)", "Cuotas iguales"]
+    x = np.asarray(k, dtype=float) / max(int(n), 1)
+    data = _rows(x=np.r_[0.0, x], y=np.r_[0.0, cr], serie=[names[0]] * (x.size + 1)) \
+        + _rows(x=[0, 1], y=[0, 1], serie=[names[1]] * 2)
+    layers = [{"data": {"values": data}, "mark": {"type": "line", "strokeWidth": 2},
+               "encoding": {"color": _color(names, None, [TAB[0], "#888"]),
+                            "strokeDash": {"condition": {"test": f"datum.serie == '{names[1]}'",
+                                                         "value": [4, 4]}, "value": [1, 0]}}}]
+    spec = _spec(layers, title, "Fracción de firmas (mayores primero)", "Cuota acumulada",
+                 xdomain=(0, 1), ydomain=(0, 1))
+    spec["encoding"]["x"]["axis"] = spec["encoding"]["y"]["axis"] = {"format": "%"}
+    return spec
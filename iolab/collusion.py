@@ -0,0 +1,202 @@
+# iolab/collusion.py
+# Colusión (grim trigger) a partir de Cournot con costos asimétricos.
+# Igual que en iolab.oligopoly: costos con forma (..., N), el último eje son las firmas.
+# Repartos del cartel (CARTELS): partes iguales, eficiente (máxima utilidad conjunta) y cuotas
+# sin pagos laterales que minimizan δ*.
+import numpy as np
+
+from ._util import as_float, col, out
+from .oligopoly import cournot_asym
+
+
+def cartel_equal_split(a, b, cs_arr):
+    # Cartel "simple": Q^C de monopolio con costo promedio, repartido por igual
+    cs_arr = as_float(cs_arr)
+    N = cs_arr.shape[-1]
+    cbar = cs_arr.mean(axis=-1)
+    QC = np.maximum((as_float(a) - cbar) / (2*as_float(b)), 0.0)
+    PC = as_float(a) - as_float(b)*QC
+    qC = np.broadcast_to((QC / N)[..., None], cs_arr.shape).copy()
+    piC = np.maximum(PC[..., None] - cs_arr, 0.0) * qC
+    return qC, out(QC), out(PC), piC
+
+
+def cartel_efficient(a, b, cs_arr):
+    # Cartel eficiente (máxima utilidad conjunta): con costos marginales constantes solo produce
+    # la firma más barata (las empatadas se reparten por igual) el Q de monopolio con c_min
+    cs_arr = as_float(cs_arr)
+    cmin = cs_arr.min(axis=-1)
+    low = cs_arr <= cmin[..., None] + 1e-12
+    QC = np.maximum((as_float(a) - cmin) / (2*as_float(b)), 0.0)
+    PC = as_float(a) - as_float(b)*QC
+    qC = low * (QC / low.sum(axis=-1))[..., None]
+    piC = np.maximum(PC[..., None] - cs_arr, 0.0) * qC
+    return qC, out(QC), out(PC), piC
+
+
+def ic_quota_bounds(a, b, cs_arr, Q, delta, piN=None):
+    """
+    Cuotas compatibles con incentivos de cada firma cuando el cartel produce Q en total.
+    Con m_i = P(Q) - c_i, la ganancia de desviarse es π^D - π^C = (m_i - b q_i)²/(4b), así que
+    δ_i(q_i) ≤ δ es una desigualdad cuadrática en q_i: un intervalo cerrado [lo_i, hi_i]
+    (las firmas con m_i ≤ 0 producen 0). Retorna lo, hi (..., N) y ok (...,): False si alguna
+    firma activa no tiene cuota que la sostenga con ese δ.
+    """
+    cs_arr = as_float(cs_arr)
+    if piN is None:
+        piN = cournot_asym(a, b, cs_arr)[3]
+    bb, d = col(b), col(delta)
+    m = col(as_float(a) - as_float(b)*as_float(Q)) - cs_arr
+    act = m > 0
+    disc = m*m - bb*(1 - d)*piN
+    r = 2*np.sqrt(d*np.maximum(disc, 0.0))
+    x_hi = m*(1 + d) + r                          # raíz mayor por (1-δ), estable cuando δ → 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lo = np.where(act, ((1 - d)*m*m + 4*bb*d*piN) / x_hi / bb, 0.0)
+        hi = np.where(act, x_hi / np.maximum(1 - d, 1e-300) / bb, 0.0)
+    return lo, hi, np.all(~act | (disc >= 0), axis=-1)
+
+
+def cartel_min_delta(a, b, cs_arr, Q=None, iters=50):
+    """
+    Cuotas sin pagos laterales que minimizan δ* = max_i δ_i cuando el cartel produce Q
+    (por omisión el Q^C del reparto igual, así que el precio es el mismo). Los intervalos de
+    ic_quota_bounds crecen con δ, así que δ* mínimo es el menor δ con ∑lo ≤ Q ≤ ∑hi: bisección
+    en δ, vectorizada sobre todos los mercados. Con ese δ el Q - ∑lo que sobra se asigna a las
+    firmas más baratas primero (mínimo costo entre las cuotas que sostienen el cartel).
+    Misma salida que cartel_equal_split: qC, QC, PC, piC.
+    """
+    cs_arr = as_float(cs_arr)
+    a_, b_ = as_float(a), as_float(b)
+    shape = np.broadcast_shapes(cs_arr.shape, a_.shape + (1,), b_.shape + (1,))
+    cs_arr = np.broadcast_to(cs_arr, shape)
+    N = shape[-1]
+    if Q is None:
+        Q = cartel_equal_split(a, b, cs_arr)[1]
+    Q = np.broadcast_to(as_float(Q), shape[:-1])
+    piN = cournot_asym(a, b, cs_arr)[3]
+
+    def feasible(d):
+        lo, hi, ok = ic_quota_bounds(a, b, cs_arr, Q, d, piN)
+        slack = 1e-12 * (1.0 + Q)
+        return ok & (lo.sum(axis=-1) <= Q + slack) & (hi.sum(axis=-1) >= Q - slack), lo, hi
+
+    d_lo, d_hi = np.zeros(shape[:-1]), np.full(shape[:-1], 1.0 - 1e-12)
+    for _ in range(iters):
+        mid = 0.5*(d_lo + d_hi)
+        f = feasible(mid)[0]
+        d_lo, d_hi = np.where(f, d_lo, mid), np.where(f, mid, d_hi)
+    f, lo, hi = feasible(d_hi)
+
+    # Sobrante a las más baratas: orden por costo y capacidad acumulada
+    order = np.argsort(cs_arr, axis=-1)
+    cap = np.take_along_axis(hi - lo, order, axis=-1)
+    extra = (Q - lo.sum(axis=-1))[..., None]
+    add = np.clip(extra - (np.cumsum(cap, axis=-1) - cap), 0.0, cap)
+    qC = lo.copy()
+    np.put_along_axis(qC, order, np.take_along_axis(qC, order, axis=-1) + add, axis=-1)
+    # Sin cuotas sostenibles ni con δ → 1 (Q muy chico frente a ∑lo, o nadie con P > c_i):
+    # se escala lo a Q o, si no hay firmas activas, se reparte por igual
+    tot = lo.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fallback = np.where(tot > 0, lo * Q[..., None] / tot, Q[..., None] / N)
+    qC = np.where(f[..., None], qC, fallback)
+    PC = a_ - b_*Q
+    piC = np.maximum(PC[..., None] - cs_arr, 0.0) * qC
+    return qC, out(Q), out(PC), piC
+
+
+def one_shot_deviation_against_cartel(a, b, cs_arr, QC, qC=None):
+    # Mejor respuesta de i cuando las demás producen su cuota del cartel (qC; por omisión, QC/N)
+    cs_arr = as_float(cs_arr)
+    N = cs_arr.shape[-1]
+    Q_others_C = col(QC) * (N - 1) / N if qC is None else col(QC) - qC
+    qD = np.maximum((col(a) - cs_arr - col(b)*Q_others_C) / (2*col(b)), 0.0)
+    PD = col(a) - col(b)*(qD + Q_others_C)
+    piD = np.maximum(PD - cs_arr, 0.0) * qD
+    return qD, PD, piD
+
+
+def deltas_robust(piN, piC, piD):
+    """
+    δ_i* = (π_i^D - π_i^C) / (π_i^D - π_i^N), con manejo robusto de bordes.
+    Retorna: δ_i (..., N), δ* = max_i δ_i y el índice de la firma que lo fija.
+    """
+    piN, piC, piD = as_float(piN), as_float(piC), as_float(piD)
+    den = piD - piN  # π^D - π^N
+    num = piD - piC  # π^D - π^C
+    eps = 1e-12
+    mask_pos = den > eps
+    ratio = np.divide(num, den, out=np.zeros_like(den), where=mask_pos)
+    delta_i = np.where(mask_pos, np.clip(ratio, 0.0, 1.0), np.where(num > 0, 1.0, 0.0))
+    if delta_i.shape[-1] == 0:
+        return delta_i, out(np.ones(delta_i.shape[:-1])), out(np.zeros(delta_i.shape[:-1], dtype=int))
+    delta_star = delta_i.max(axis=-1)
+    binder_idx = delta_i.argmax(axis=-1)
+    return delta_i, out(delta_star), out(binder_idx)
+
+
+# reparto -> cartel(a, b, cs_arr) -> qC, QC, PC, piC
+CARTELS = {
+    "equal": cartel_equal_split,
+    "efficient": cartel_efficient,
+    "min_delta": cartel_min_delta,
+}
+
+
+def collusion_outcomes(a, b, cs_arr, cartel="equal"):
+    """
+    Encadena Cournot, cartel (reparto `cartel`, ver CARTELS), desvío y δ* para cada mercado.
+    Retorna dict con los resultados por firma y agregados.
+    """
+    if cartel not in CARTELS:
+        raise ValueError(f"reparto desconocido: {cartel!r} (opciones: {', '.join(CARTELS)})")
+    qN, QN, PN, piN = cournot_asym(a, b, cs_arr)
+    qC, QC, PC, piC = CARTELS[cartel](a, b, cs_arr)
+    qD, PD, piD = one_shot_deviation_against_cartel(a, b, cs_arr, QC, None if cartel == "equal" else qC)
+    delta_i, delta_star, binder_idx = deltas_robust(piN, piC, piD)
+    return {
+        "qN": qN, "QN": QN, "PN": PN, "piN": piN,
+        "qC": qC, "QC": QC, "PC": PC, "piC": piC,
+        "qD": qD, "PD": PD, "piD": piD,
+        "delta_i": delta_i, "delta_star": delta_star, "binder_idx": binder_idx,
+    }
+
+
+GRID_BLOCK = 1 << 18       # celdas (mercado, firma) por llamada en collusion_grid
+
+
+def collusion_grid(a, b_vals, cs_arr, i=0, c_vals=None, Ns=None, c_new=None, cartel="equal"):
+    """
+    δ* y la firma que lo fija sobre la malla cartesiana N × b × c_i. Para cada N el mercado son
+    las N primeras firmas de `cs_arr` (completadas con costo c_new, por defecto el promedio) y la
+    firma i (índice 0) toma cada valor de c_vals (si i < N). Todos los (b, c_i) de un mismo N van
+    en una sola llamada a collusion_outcomes (reparto `cartel`) sobre un arreglo
+    (len(b), len(c), N): el lazo es solo sobre los valores distintos de N.
+    Retorna un dict con b, c, N y arreglos (len(N), len(b), len(c)): delta_star, binder_idx, QN, PN.
+    """
+    cs_arr = as_float(cs_arr).ravel()
+    b_vals = as_float(b_vals).ravel()
+    c_vals = cs_arr[i:i + 1] if c_vals is None else as_float(c_vals).ravel()
+    Ns = np.array([cs_arr.size] if Ns is None else Ns, dtype=int).ravel()
+    c_new = float(cs_arr.mean()) if c_new is None else float(c_new)
+    if Ns.size and Ns.min() < 1:
+        raise ValueError("cada N debe ser ≥ 1")
+    if np.any(b_vals <= 0):
+        raise ValueError("se necesita b > 0")
+    shape = (Ns.size, b_vals.size, c_vals.size)
+    res = {"b": b_vals, "c": c_vals, "N": Ns, "delta_star": np.empty(shape),
+           "binder_idx": np.empty(shape, dtype=int), "QN": np.empty(shape), "PN": np.empty(shape)}
+    for k, n in enumerate(Ns):
+        base = np.concatenate([cs_arr[:n], np.full(max(n - cs_arr.size, 0), c_new)])
+        # Bloques de b con ≤ GRID_BLOCK celdas mercado × firma (acota la memoria de los intermedios)
+        step = max(1, GRID_BLOCK // max(c_vals.size * n, 1))
+        for lo in range(0, b_vals.size, step):
+            bb = b_vals[lo:lo + step]
+            costs = np.broadcast_to(base, (bb.size, c_vals.size, n)).copy()
+            if i < n:
+                costs[..., i] = c_vals
+            r = collusion_outcomes(a, bb[:, None], costs, cartel)
+            for key in ("delta_star", "binder_idx", "QN", "PN"):
+                res[key][k, lo:lo + step] = r[key]
+    return res
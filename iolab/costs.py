@@ -0,0 +1,141 @@
+# iolab/costs.py
+# Lectura de vectores de costos marginales: texto separado por comas o archivos CSV, NPY y
+# Parquet con 10⁵+ firmas. Todo se convierte por bloques con NumPy/pandas (sin bucles por
+# token) y los .npy se mapean en memoria (archivo en disco) o se leen sin copiar (bytes subidos).
+import io
+import os
+
+import numpy as np
+
+COST_COLUMNS = ("c", "cost", "costs", "costo", "costos", "mc", "cmg")
+CHUNK_ROWS = 1_000_000
+FORMATS = ("csv", "txt", "npy", "parquet")
+
+
+def _clean(c):
+    # float64 1-D sin NaN/inf; retorna (costos, descartados)
+    c = np.asarray(c, dtype=float).ravel()
+    ok = np.isfinite(c)
+    return (c if ok.all() else c[ok]), int(c.size - ok.sum())
+
+
+def parse_costs_text(txt):
+    """Costos de un texto '4, 6, 7.5'; los tokens no numéricos se descartan. Retorna (costos, descartados)."""
+    import pandas as pd
+
+    parts = pd.Series(txt.split(","), dtype=str).str.strip()
+    parts = parts[parts != ""]
+    return _clean(pd.to_numeric(parts, errors="coerce").to_numpy(dtype=float))
+
+
+def _npy(source):
+    # Archivo en disco: memmap (solo se leen las páginas que se tocan). Bytes: vista sin copia.
+    if isinstance(source, (str, os.PathLike)):
+        return np.load(source, mmap_mode="r", allow_pickle=False)
+    buf = memoryview(source)
+    f = io.BytesIO(buf)
+    version = np.lib.format.read_magic(f)
+    read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+    shape, fortran, dtype = read_header(f)
+    arr = np.frombuffer(buf, dtype=dtype, count=int(np.prod(shape)), offset=f.tell())
+    return arr.reshape(shape, order="F" if fortran else "C")
+
+
+def _pick_column(names):
+    lower = {str(n).strip().lower(): n for n in names}
+    for k in COST_COLUMNS:
+        if k in lower:
+            return lower[k]
+    return None
+
+
+def _first_lines(source, n=2):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            lines = [f.readline() for _ in range(n)]
+    else:
+        lines = bytes(source[:1 << 16]).splitlines(keepends=True)[:n]
+    return [ln.decode("utf-8", "replace").strip() for ln in lines if ln.strip()]
+
+
+def _csv(source, column, chunk_rows):
+    import pandas as pd
+
+    lines = _first_lines(source)
+    if not lines:
+        return np.empty(0)
+    first = lines[0].lstrip("\ufeff")
+    # ";" manda sobre ",": con ";" como separador la coma es el decimal ("7,5;8,2")
+    sep = ";" if ";" in first else "," if "," in first else r"\s+"
+    tokens = [t.strip() for t in (first.split() if sep == r"\s+" else first.split(sep))]
+    f = source if isinstance(source, (str, os.PathLike)) else io.BytesIO(source)
+    # Una sola fila con varios valores: el formato "4, 6, 7.5" del cuadro de texto, en archivo
+    if len(lines) == 1 and len(tokens) > 1:
+        raw = open(f, "rb").read() if isinstance(f, (str, os.PathLike)) else bytes(source)
+        vals = pd.Series(raw.decode("utf-8-sig", "replace").split(None if sep == r"\s+" else sep)).str.strip()
+        if sep == ";":
+            vals = vals.str.replace(",", ".", regex=False)
+        return pd.to_numeric(vals, errors="coerce").to_numpy(dtype=float)
+
+    has_header = bool(pd.to_numeric(pd.Series(tokens), errors="coerce").isna().all())
+    if has_header:
+        col = column if column is not None else (_pick_column(tokens) or tokens[0])
+        if col not in tokens:
+            raise ValueError(f"no existe la columna {col!r} (columnas: {tokens})")
+        usecols, header = [tokens.index(col)], 0
+    else:
+        try:
+            idx = int(column) if column is not None else 0
+        except (TypeError, ValueError):
+            raise ValueError(f"el archivo no tiene encabezado: indica la columna por índice (0 a "
+                             f"{len(tokens) - 1}), no por nombre ({column!r})") from None
+        if not 0 <= idx < len(tokens):
+            raise ValueError(f"no existe la columna {idx} (el archivo tiene {len(tokens)})")
+        usecols, header = [idx], None
+    parts = []
+    # ";" como separador suele venir con coma decimal (hojas de cálculo en español)
+    reader = pd.read_csv(f, header=header, usecols=usecols, sep=sep, skipinitialspace=True,
+                         decimal="," if sep == ";" else ".", chunksize=chunk_rows, encoding="utf-8-sig")
+    for chunk in reader:
+        parts.append(pd.to_numeric(chunk.iloc[:, 0], errors="coerce").to_numpy(dtype=float))
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def _parquet(source, column, chunk_rows):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("leer Parquet requiere pyarrow (pip install pyarrow)") from e
+    pf = pq.ParquetFile(source if isinstance(source, (str, os.PathLike)) else io.BytesIO(source))
+    names = pf.schema_arrow.names
+    col = column if column is not None else (_pick_column(names) or names[0])
+    if col not in names:
+        raise ValueError(f"no existe la columna {col!r} (columnas: {names})")
+    out = np.empty(pf.metadata.num_rows, dtype=float)
+    i = 0
+    for batch in pf.iter_batches(batch_size=chunk_rows, columns=[col]):
+        v = batch.column(0).to_numpy(zero_copy_only=False)
+        out[i:i + v.size] = v
+        i += v.size
+    return out[:i]
+
+
+def load_costs(source, name=None, column=None, chunk_rows=CHUNK_ROWS):
+    """
+    Costos desde `source`: ruta de archivo o bytes (p. ej. un archivo subido). El formato sale
+    de la extensión de `name` (o de la ruta). CSV/TXT: una columna (nombre en COST_COLUMNS o la
+    primera; `column` la fija) o una sola fila separada por comas. NPY: cualquier forma, se aplana.
+    Parquet: una columna, por lotes (requiere pyarrow). Retorna (costos float64 1-D, descartados).
+    """
+    name = str(name if name is not None else source)
+    ext = os.path.splitext(name)[1].lower().lstrip(".")
+    if ext not in FORMATS:
+        raise ValueError(f"formato no soportado: .{ext} (usa {', '.join('.' + f for f in FORMATS)})")
+    if ext == "npy":
+        arr = _npy(source)
+        if arr.dtype.kind not in "iuf":
+            raise ValueError(f"el .npy debe ser numérico (dtype {arr.dtype})")
+        return _clean(arr)
+    if ext == "parquet":
+        return _clean(_parquet(source, column, chunk_rows))
+    return _clean(_csv(source, column, chunk_rows))
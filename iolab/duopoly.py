@@ -0,0 +1,34 @@
+# iolab/duopoly.py
+# Duopolios en cantidades (Cournot y Stackelberg) con P(Q)=a-bQ.
+# Se asume solución interior, igual que en las páginas.
+from ._util import as_float, out
+
+
+def cournot_interior(a, b, c1, c2):
+    a, b, c1, c2 = as_float(a), as_float(b), as_float(c1), as_float(c2)
+    q1 = (a - 2*c1 + c2) / (3*b)
+    q2 = (a - 2*c2 + c1) / (3*b)
+    Q = q1 + q2
+    P = a - b*Q
+    return out(q1), out(q2), out(Q), out(P)
+
+
+def br1(q2, a, b, c1):  # q1(q2)
+    return (a - c1 - b*as_float(q2)) / (2*b)
+
+
+def br2(q1, a, b, c2):  # q2(q1)
+    return (a - c2 - b*as_float(q1)) / (2*b)
+
+
+def stackelberg_linear(a, b, c1, c2):
+    # Líder=1, seguidor=2:
+    # q1* = (a + c2 - 2 c1) / (2 b)
+    # q2* = (a - 3 c2 + 2 c1) / (4 b)
+    # P*  = (a + c2 + 2 c1) / 4
+    a, b, c1, c2 = as_float(a), as_float(b), as_float(c1), as_float(c2)
+    q1 = (a + c2 - 2*c1) / (2*b)
+    q2 = (a - 3*c2 + 2*c1) / (4*b)
+    Q = q1 + q2
+    P = a - b*Q
+    return out(q1), out(q2), out(Q), out(P)
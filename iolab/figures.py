@@ -0,0 +1,100 @@
+# iolab/figures.py
+# Caché de figuras ya rasterizadas: se guarda el PNG/SVG codificado, no el objeto Figure.
+# En un acierto no se importa ni se ejecuta matplotlib; se sirven los bytes directamente.
+# Ciclo de vida: las páginas crean figuras con subplots() (sin el registro global de pyplot)
+# y figure_bytes() libera todas las que se crearon al dibujar, aunque draw() falle.
+import io
+import os
+import sys
+import threading
+import weakref
+
+from .cache import LRUCache, make_key
+from .profiling import stage
+
+FIGURES = LRUCache(
+    max_entries=int(os.environ.get("IOLAB_FIGCACHE_ENTRIES", 512)),
+    max_bytes=int(float(os.environ.get("IOLAB_FIGCACHE_MB", 64)) * 2**20),
+)
+
+# Mismos valores por defecto que st.pyplot (recorte "tight" y 200 dpi)
+DEFAULT_DPI = 200
+
+_local = threading.local()          # pila de listas: figuras creadas dentro de cada draw()
+_LIVE = weakref.WeakSet()           # figuras creadas con subplots() que siguen vivas
+
+
+def subplots(nrows=1, ncols=1, *, figsize=None, dpi=None, **kwargs):
+    """
+    Igual que plt.subplots(), pero la Figure no entra al registro global de pyplot:
+    no se acumula entre reruns ni entre sesiones, y no comparte estado entre hilos.
+    Dentro de figure_bytes() queda registrada para liberarse al terminar.
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    axes = fig.subplots(nrows, ncols, **kwargs)
+    owned = getattr(_local, "stack", None)
+    if owned:
+        owned[-1].append(fig)
+    _LIVE.add(fig)
+    return fig, axes
+
+
+def release(fig):
+    # Cierra la figura en pyplot si la administra (código antiguo) y suelta artistas y búferes
+    if fig is None:
+        return
+    plt = sys.modules.get("matplotlib.pyplot")
+    if plt is not None:
+        plt.close(fig)
+    fig.clear()
+
+
+def live_figures():
+    # Figuras de subplots() aún no recolectadas y figuras abiertas en pyplot (ambas deben quedar en 0)
+    plt = sys.modules.get("matplotlib.pyplot")
+    return {"managed": len(_LIVE), "pyplot_open": len(plt.get_fignums()) if plt is not None else 0}
+
+
+def figure_bytes(kind, params, draw, fmt="png", dpi=DEFAULT_DPI):
+    """
+    Bytes codificados de la figura `kind` para `params`.
+    `draw()` construye y retorna la Figure; solo se llama en un fallo de caché, así que
+    todo lo que dibuja debe quedar determinado por `params`. Todas las figuras creadas
+    durante draw() (y la retornada) se liberan al codificar, también si hay excepción.
+    """
+    key = make_key(kind, params, fmt, dpi)
+    data = FIGURES.get(key)
+    if data is None:
+        if not hasattr(_local, "stack"):
+            _local.stack = []
+        _local.stack.append([])
+        fig = None
+        try:
+            with stage("plot"):
+                fig = draw()
+            with stage("serialize"):
+                buf = io.BytesIO()
+                fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight")
+        finally:
+            owned = _local.stack.pop()
+            for f in owned:
+                release(f)
+            if fig is not None and all(fig is not f for f in owned):
+                release(fig)
+        data = buf.getvalue()
+        FIGURES.put(key, data)
+    return data
+
+
+def show_figure(target, kind, params, draw, fmt="png", dpi=DEFAULT_DPI):
+    # Muestra la figura en `target` (st, una columna o un contenedor de Streamlit)
+    data = figure_bytes(kind, params, draw, fmt=fmt, dpi=dpi)
+    if fmt == "svg":
+        return target.image(data.decode("utf-8"), use_container_width=True)
+    return target.image(data, use_container_width=True)
+
+
+def figure_cache_stats():
+    return FIGURES.stats()
@@ -0,0 +1,50 @@
+# iolab/games.py
+# Juegos bimatriciales: mejores respuestas puras y mixto estricto 2×2.
+# Las matrices de pagos tienen forma (..., n, m); los ejes iniciales son juegos independientes.
+import numpy as np
+
+from ._util import as_float, out
+
+
+def pure_best_responses(U1, U2):
+    """
+    Máscaras booleanas (..., n, m):
+    BR1[i, j] si la fila i es mejor respuesta de J1 ante la columna j,
+    BR2[i, j] si la columna j es mejor respuesta de J2 ante la fila i,
+    NE = BR1 & BR2 (equilibrios puros).
+    """
+    U1, U2 = as_float(U1), as_float(U2)
+    BR1 = U1 == U1.max(axis=-2, keepdims=True)
+    BR2 = U2 == U2.max(axis=-1, keepdims=True)
+    return BR1, BR2, BR1 & BR2
+
+
+def mixed_2x2(A, B, eps=1e-9):
+    """
+    Equilibrio estrictamente mixto de un juego 2×2 (p = Pr[J1 juega U], q = Pr[J2 juega L]).
+    q* = (a22 - a12) / (a11 - a12 - a21 + a22)
+    p* = (b22 - b21) / (b11 - b12 - b21 + b22)
+    Retorna dict con p_star, q_star (NaN si no hay denominador), mixed_strict, EU1, EU2.
+    """
+    A, B = as_float(A), as_float(B)
+    den_q = A[..., 0, 0] - A[..., 0, 1] - A[..., 1, 0] + A[..., 1, 1]
+    den_p = B[..., 0, 0] - B[..., 0, 1] - B[..., 1, 0] + B[..., 1, 1]
+    has_q = np.abs(den_q) > 1e-12
+    has_p = np.abs(den_p) > 1e-12
+
+    q_star = np.divide(A[..., 1, 1] - A[..., 0, 1], den_q,
+                       out=np.full(den_q.shape, np.nan), where=has_q)
+    p_star = np.divide(B[..., 1, 1] - B[..., 1, 0], den_p,
+                       out=np.full(den_p.shape, np.nan), where=has_p)
+
+    mixed_strict = (
+        has_q & has_p
+        & (q_star > eps) & (q_star < 1 - eps)
+        & (p_star > eps) & (p_star < 1 - eps)
+    )
+    EU1 = q_star*A[..., 0, 0] + (1 - q_star)*A[..., 0, 1]
+    EU2 = p_star*B[..., 0, 0] + (1 - p_star)*B[..., 1, 0]
+    return {
+        "p_star": out(p_star), "q_star": out(q_star),
+        "mixed_strict": out(mixed_strict), "EU1": out(EU1), "EU2": out(EU2),
+    }
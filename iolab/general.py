@@ -0,0 +1,206 @@
+# iolab/general.py
+# Cournot con demanda inversa general P(Q) y costos convexos Cᵢ(q) = cᵢq + dᵢq²/2, sin fórmulas
+# cerradas: las condiciones de primer orden se resuelven numéricamente para muchos conjuntos de
+# parámetros a la vez (lotes (..., N)). El jacobiano de las FOC es diagonal más rango uno,
+#     ∂gᵢ/∂qⱼ = δᵢⱼ (P' - dᵢ) + (P' + P'' qᵢ),
+# así que cada paso de Newton cuesta O(N) por mercado (Sherman–Morrison), sin sistemas densos.
+import numpy as np
+
+from ._util import as_float
+
+_TINY = 1e-12
+KINK_WIDTH = 0.02          # ancho relativo del suavizado del quiebre en la demanda por tramos
+
+
+def _linear(Q, a, b):
+    P = a - b * Q
+    return P, -b + 0.0 * Q, 0.0 * Q, a * Q - 0.5 * b * Q * Q
+
+
+def _isoelastic(Q, A, eps):
+    # P = A Q^(-1/ε); el excedente bruto ∫P solo es finito con ε > 1
+    Q = np.maximum(Q, _TINY)
+    P = A * Q ** (-1.0 / eps)
+    U = np.where(eps > 1, P * Q * eps / np.where(eps > 1, eps - 1.0, 1.0), np.inf)
+    return P, -P / (eps * Q), P * (1.0 + 1.0 / eps) / (eps * Q * Q), U
+
+
+def _exponential(Q, a, b):
+    P = a * np.exp(-b * Q)
+    return P, -b * P, b * b * P, (a - P) / b
+
+
+def _piecewise(Q, a, b1, Qk, b2):
+    # Lineal por tramos: pendiente b1 hasta Qk y b2 después. El quiebre se suaviza con una
+    # parábola en [Qk - w, Qk + w] (w = KINK_WIDTH·Qk) para que P' sea continua: con el quiebre
+    # exacto la FOC salta en Qk y puede no tener raíz
+    w = KINK_WIDTH * Qk + _TINY
+    z = Q - Qk
+    mid = np.abs(z) < w
+    s = np.where(z >= w, z, np.where(mid, (z + w) ** 2 / (4 * w), 0.0))
+    ds = np.where(z >= w, 1.0, np.where(mid, (z + w) / (2 * w), 0.0))
+    d2s = np.where(mid, 1.0 / (2 * w), 0.0)
+    S = np.where(z >= w, 2 * w * w / 3 + 0.5 * (z * z - w * w), np.where(mid, (z + w) ** 3 / (12 * w), 0.0))
+    k = b2 - b1
+    return a - b1 * Q - k * s, -b1 - k * ds, -k * d2s, a * Q - 0.5 * b1 * Q * Q - k * S
+
+
+# familia -> (nombres de parámetros, P(Q, *params) -> (P, P', P'', ∫₀^Q P))
+DEMANDS = {
+    "linear": (("a", "b"), _linear),
+    "isoelastic": (("A", "eps"), _isoelastic),
+    "exponential": (("a", "b"), _exponential),
+    "piecewise": (("a", "b1", "Qk", "b2"), _piecewise),
+}
+
+
+def _demand(kind, params):
+    if kind not in DEMANDS:
+        raise ValueError(f"demanda desconocida: {kind!r} (opciones: {', '.join(DEMANDS)})")
+    names, fn = DEMANDS[kind]
+    if len(params) != len(names):
+        raise ValueError(f"la demanda {kind!r} lleva parámetros {names}")
+    params = [as_float(p) for p in params]
+    pos = {"linear": (0, 1), "isoelastic": (0, 1), "exponential": (0, 1), "piecewise": (1, 3)}[kind]
+    if any(np.any(params[i] <= 0) for i in pos) or (kind == "piecewise" and np.any(params[2] < 0)):
+        raise ValueError(f"parámetros inválidos para {kind!r}: {', '.join(names[i] for i in pos)} deben ser > 0")
+    return fn, params
+
+
+def inverse_demand(kind, Q, *params):
+    """P(Q), P'(Q) y P''(Q) de la familia `kind` (ver DEMANDS), difundidos contra Q."""
+    fn, params = _demand(kind, params)
+    return fn(as_float(Q), *params)[:3]
+
+
+def _bisect_decreasing(f, shape, iters=60):
+    # Raíz de f decreciente en [0, ∞) por lote: si f(0) ≤ 0 la raíz es 0; si no, se dobla el
+    # extremo superior hasta que f < 0 y se bisecta
+    lo, hi = np.zeros(shape), np.ones(shape)
+    for _ in range(60):
+        grow = f(hi) > 0
+        if not grow.any():
+            break
+        lo, hi = np.where(grow, hi, lo), np.where(grow, 2 * hi, hi)
+    for _ in range(iters):
+        mid = 0.5 * (lo + hi)
+        up = f(mid) > 0
+        lo, hi = np.where(up, mid, lo), np.where(up, hi, mid)
+    return np.where(f(np.zeros(shape)) > 0, 0.5 * (lo + hi), 0.0)
+
+
+def best_response_general(kind, params, c, d, q_other):
+    """
+    Mejor respuesta qᵢ(Q₋ᵢ) con demanda `kind` y costo cᵢq + dᵢq²/2: raíz de
+    P(q + Q₋ᵢ) + P'(q + Q₋ᵢ) q - cᵢ - dᵢq (o 0 si es negativa en q = 0), por bisección
+    vectorizada sobre todos los valores de q_other.
+    """
+    fn, params = _demand(kind, params)
+    c, d, y = as_float(c), as_float(d), as_float(q_other)
+    shape = np.broadcast_shapes(y.shape, c.shape, d.shape, *(p.shape for p in params))
+
+    def foc(x):
+        P, dP = fn(x + y, *params)[:2]
+        return P + dP * x - c - d * x
+    return _bisect_decreasing(foc, shape)
+
+
+def cournot_general(kind, params, c, d=0.0, q0=None, tol=1e-10, max_iter=100):
+    """
+    Equilibrio de Cournot con demanda inversa `kind` (ver DEMANDS) y costos cᵢq + dᵢq²/2.
+    `params`: tupla con los parámetros de la demanda (escalares o forma (...,) por mercado);
+    c, d: forma (..., N). Resuelve la complementariedad qᵢ ≥ 0, gᵢ ≤ 0, qᵢgᵢ = 0 con
+    gᵢ = P(Q) + P'(Q) qᵢ - cᵢ - dᵢqᵢ mediante Newton semisuave amortiguado sobre
+    rᵢ = min(qᵢ, -gᵢ): cada paso es O(N) por mercado y se acorta a la mitad mientras el residuo
+    no baje. El punto inicial sale del equilibrio simétrico con costos promedio (bisección).
+    Retorna un dict con q, Q, P, CS, pi y los diagnósticos por mercado: converged, iterations,
+    residual (máx |r|) y soc (segundo orden 2P' + P''qᵢ - dᵢ < 0 en las activas).
+    """
+    fn, params = _demand(kind, params)
+    c = as_float(c)
+    if c.ndim == 0:
+        c = c[None]
+    d = as_float(d)
+    if np.any(d < 0):
+        raise ValueError("se necesita d ≥ 0 (costos convexos)")
+    shape = np.broadcast_shapes(c.shape, d.shape, *(p.shape + (1,) for p in params))
+    N = shape[-1]
+    c = np.broadcast_to(c, shape).reshape(-1, N)
+    d = np.broadcast_to(d, shape).reshape(-1, N)
+    S = c.shape[0]
+    pr = [np.broadcast_to(p, shape[:-1]).reshape(S) for p in params]
+
+    def foc(q, rows):
+        Q = q.sum(axis=1)
+        P, dP, d2P, _ = fn(Q, *(p[rows] for p in pr))
+        return P[:, None] + dP[:, None] * q - c[rows] - d[rows] * q, dP, d2P
+
+    def natural(q, g):
+        r = np.abs(np.minimum(q, -g)).max(axis=1)
+        return np.where(np.isfinite(r), r, np.inf)
+
+    every = np.arange(S)
+    if q0 is None:
+        cm, dm = c.mean(axis=1), d.mean(axis=1)
+
+        def sym(Q):
+            P, dP = fn(Q, *pr)[:2]
+            return P + dP * Q / N - cm - dm * Q / N
+        Q0 = _bisect_decreasing(sym, (S,), iters=40)
+        P0, dP0 = fn(Q0, *pr)[:2]
+        q = np.maximum(P0[:, None] - c, 0.0) / (d - dP0[:, None])
+        q = np.where(q.sum(axis=1, keepdims=True) > 0, q, Q0[:, None] / N + 1e-6)
+    else:
+        q = np.array(np.broadcast_to(as_float(q0), shape).reshape(S, N))
+
+    g = foc(q, every)[0]
+    res = natural(q, g)
+    scale = 1.0 + np.abs(c).max(axis=1)
+    iters = np.zeros(S, dtype=int)
+    todo = every[res > tol * scale]
+    for _ in range(max_iter):
+        if todo.size == 0:
+            break
+        iters[todo] += 1
+        qt, dt = q[todo], d[todo]
+        gt, dP, d2P = foc(qt, todo)
+        # Índices que el paso manda a 0 (min = q) y activas (min = -g): J_AA Δq_A = -g_A - J_AI Δq_I
+        zero = qt <= -gt
+        D = dP[:, None] - dt                              # diagonal (< 0)
+        u = dP[:, None] + d2P[:, None] * qt               # columna del rango uno
+        act = ~zero
+        s_zero = -np.where(zero, qt, 0.0).sum(axis=1)
+        num = np.where(act, -gt / D, 0.0).sum(axis=1) + s_zero
+        den = 1.0 + np.where(act, u / D, 0.0).sum(axis=1)
+        den = np.where(np.abs(den) < _TINY, np.copysign(_TINY, den), den)
+        s = num / den                                     # 1ᵀΔq
+        dq = np.where(zero, -qt, (-gt - u * s[:, None]) / D)
+        # Amortiguamiento: paso t ∈ {1, 1/2, ...} por mercado hasta que baje el residuo
+        step = np.ones(todo.size)
+        q1 = np.maximum(qt + dq, 0.0)
+        r1 = natural(q1, foc(q1, todo)[0])
+        bad = ~(r1 < res[todo])
+        for _ in range(30):
+            if not bad.any():
+                break
+            step = np.where(bad, 0.5 * step, step)
+            rows = np.flatnonzero(bad)
+            qb = np.maximum(qt[rows] + step[rows, None] * dq[rows], 0.0)
+            rb = natural(qb, foc(qb, todo[rows])[0])
+            q1[rows], r1[rows] = qb, rb
+            bad[rows] = ~(rb < res[todo[rows]])
+        q[todo], res[todo] = q1, r1
+        todo = todo[res[todo] > tol * scale[todo]]
+
+    Q = q.sum(axis=1)
+    P, dP, d2P, U = fn(Q, *pr)
+    pi = P[:, None] * q - c * q - 0.5 * d * q * q
+    soc = np.all((q <= 0) | (2 * dP[:, None] + d2P[:, None] * q - d < 0), axis=1)
+    conv = res <= tol * scale
+    lead = shape[:-1]
+    return {
+        "q": q.reshape(shape), "Q": Q.reshape(lead), "P": P.reshape(lead),
+        "CS": (U - P * Q).reshape(lead), "pi": pi.reshape(shape),
+        "converged": conv.reshape(lead), "iterations": iters.reshape(lead),
+        "residual": res.reshape(lead), "soc": soc.reshape(lead),
+    }
@@ -0,0 +1,45 @@
+# iolab/hotelling.py
+# Hotelling lineal: firmas en 0 y 1, consumidores uniformes en [0,1], demanda unitaria
+# con valor de reserva S y costo de transporte t (precios entregados p1+tx y p2+t(1-x)).
+import numpy as np
+
+from ._util import as_float, out
+
+
+def hotelling_nash_prices(c1, c2, t):
+    # Equilibrio estándar con cobertura total:
+    # p1* = (2c1 + c2 + 3t)/3,  p2* = (c1 + 2c2 + 3t)/3
+    c1, c2, t = as_float(c1), as_float(c2), as_float(t)
+    return out((2*c1 + c2 + 3*t) / 3), out((c1 + 2*c2 + 3*t) / 3)
+
+
+def hotelling_outcomes(S, t, c1, c2, p1, p2):
+    """
+    Cuotas, ganancias y CS exactos (sin malla) para precios dados.
+    Empates en el precio entregado se asignan a la firma 1.
+    Retorna dict con x_star, a_cut, one_minus_b, q1, q2, no_buy, pi1, pi2, CS.
+    """
+    S, t = as_float(S), as_float(t)
+    c1, c2, p1, p2 = as_float(c1), as_float(c2), as_float(p1), as_float(p2)
+
+    x_hat = (p2 - p1 + t) / (2*t)           # punto indiferente sin truncar
+    reach1 = (S - p1) / t                   # S = p1 + t*x
+    reach2 = 1 - (S - p2) / t               # S = p2 + t*(1-x)
+
+    # Firma 1 atiende [0, q1] y firma 2 atiende [1-q2, 1]
+    q1 = np.clip(np.minimum(x_hat, reach1), 0.0, 1.0)
+    q2 = 1.0 - np.clip(np.maximum(x_hat, reach2), 0.0, 1.0)
+
+    pi1 = np.maximum(p1 - c1, 0.0) * q1
+    pi2 = np.maximum(p2 - c2, 0.0) * q2
+
+    # Integral exacta de max(S - precio entregado, 0) en cada tramo atendido
+    CS = (S - p1)*q1 - 0.5*t*q1**2 + (S - p2)*q2 - 0.5*t*q2**2
+
+    return {
+        "x_star": out(np.clip(x_hat, 0.0, 1.0)),
+        "a_cut": out(np.clip(reach1, 0.0, 1.0)),
+        "one_minus_b": out(np.clip(reach2, 0.0, 1.0)),
+        "q1": out(q1), "q2": out(q2), "no_buy": out(1.0 - (q1 + q2)),
+        "pi1": out(pi1), "pi2": out(pi2), "CS": out(CS),
+    }
@@ -0,0 +1,188 @@
+# iolab/jobs.py
+# Barridos en segundo plano: un trabajo aplica fn a cada valor de una lista en un pool de hilos
+# (o de procesos), por bloques, y va juntando las filas a medida que terminan. El registro es
+# del proceso (como la caché), así que un trabajo sobrevive a los reruns de Streamlit: la página
+# solo guarda su id en session_state y vuelve a leer el progreso en cada rerun. Dos sesiones
+# que piden el mismo barrido (misma `key`) comparten el trabajo: cada una queda como suscriptora
+# y cancel() solo la desengancha; el trabajo se detiene cuando ya no queda ninguna.
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import make_key, sizeof
+
+WORKERS = int(os.environ.get("IOLAB_JOB_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+MAX_JOBS = 64              # trabajos recordados (se olvidan primero los terminados más viejos)
+MAX_BYTES = 256 * 2**20    # filas guardadas entre todos los trabajos terminados
+
+_jobs = OrderedDict()      # id -> SweepJob
+_by_key = {}               # key -> id
+_lock = threading.Lock()
+_pool = {"executor": None}
+
+
+def _apply(fn, part):
+    # Un bloque de valores -> lista de filas (función de módulo para poder ir a procesos)
+    return [fn(x) for x in part]
+
+
+def _threads():
+    with _lock:
+        if _pool["executor"] is None:
+            _pool["executor"] = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="iolab-job")
+        return _pool["executor"]
+
+
+class SweepJob:
+    """
+    Estado de un barrido: status ("running", "done", "cancelled" o "error"), done/total
+    valores terminados y rows() con las filas de los bloques ya listos, en el orden de la lista.
+    """
+
+    def __init__(self, key, total, n_chunks):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.total = total
+        self.done = 0
+        self.status = "running"
+        self.error = None
+        self.started = time.time()
+        self.finished = None
+        self.nbytes = 0
+        self._parts = [None] * n_chunks
+        self._pending = n_chunks
+        self._futures = []
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self.status == "running"
+
+    def progress(self):
+        return self.done / self.total if self.total else 1.0
+
+    def elapsed(self):
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def subscribers(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def rows(self):
+        with self._lock:
+            return [row for part in self._parts if part is not None for row in part]
+
+    def cancel(self, subscriber=None):
+        """
+        Desengancha a `subscriber`; si ya no queda nadie (o sin subscriber: para todos), los
+        bloques pendientes no se ejecutan y los que ya corren terminan pero se descartan.
+        Retorna True si el trabajo quedó cancelado.
+        """
+        with self._lock:
+            if subscriber is not None:
+                self._subscribers.discard(subscriber)
+                if self._subscribers:
+                    return False
+            if self.status != "running":
+                return self.status == "cancelled"
+            self.status = "cancelled"
+            self.finished = time.time()
+        for f in self._futures:
+            f.cancel()
+        return True
+
+    def _collect(self, i, size, future):
+        if future.cancelled():
+            return
+        err = future.exception()
+        with self._lock:
+            if self.status != "running":
+                return
+            if err is not None:
+                self.status, self.error, self.finished = "error", f"{type(err).__name__}: {err}", time.time()
+            else:
+                self._parts[i] = future.result()
+                self.done += size
+                self._pending -= 1
+                if self._pending == 0:
+                    self.status, self.finished = "done", time.time()
+                    self.nbytes = sizeof(self._parts)
+        if err is not None:
+            for f in self._futures:
+                f.cancel()
+
+
+def _forget_old():
+    # Bajo _lock: se olvidan trabajos terminados (los más viejos primero) hasta caber en los límites
+    total = sum(j.nbytes for j in _jobs.values())
+    for job_id in list(_jobs):
+        if len(_jobs) <= MAX_JOBS and total <= MAX_BYTES:
+            break
+        job = _jobs[job_id]
+        if job.running:
+            continue
+        total -= job.nbytes
+        del _jobs[job_id]
+        if _by_key.get(job.key) == job_id:
+            del _by_key[job.key]
+
+
+def submit(fn, values, key=None, chunk=1, executor=None, subscriber=None):
+    """
+    Lanza fn(v) para cada v de `values` en bloques de `chunk` valores y devuelve el SweepJob
+    sin esperar. Con `key` (cualquier cosa que acepte make_key: parámetros del barrido), si ya
+    hay un trabajo con esa clave corriendo o terminado se reutiliza. `subscriber`: quién lo
+    pide (p. ej. el id de la sesión; por omisión, uno nuevo por llamada), ver SweepJob.cancel.
+    `executor`: pool propio (p. ej. de procesos, con fn picklable); por defecto, el pool de
+    hilos compartido.
+    """
+    values = list(values)
+    k = make_key(key) if key is not None else None
+    subscriber = uuid.uuid4().hex if subscriber is None else subscriber
+    chunk = max(1, int(chunk))
+    parts = [values[i:i + chunk] for i in range(0, len(values), chunk)]
+    # Búsqueda y alta en una sola sección: dos pedidos iguales simultáneos comparten el trabajo
+    with _lock:
+        old = _jobs.get(_by_key.get(k)) if k is not None else None
+        if old is not None:
+            with old._lock:
+                reuse = old.status in ("running", "done")
+                if reuse:
+                    old._subscribers.add(subscriber)
+            if reuse:
+                _jobs.move_to_end(old.id)
+                return old
+        job = SweepJob(k, len(values), len(parts))
+        job._subscribers.add(subscriber)
+        if not parts:
+            job.status, job.finished = "done", job.started
+        _jobs[job.id] = job
+        if k is not None:
+            _by_key[k] = job.id
+        _forget_old()
+    ex = executor if executor is not None else _threads()
+    for i, part in enumerate(parts):
+        if not job.running:
+            break
+        f = ex.submit(_apply, fn, part)
+        job._futures.append(f)
+        f.add_done_callback(lambda f, i=i, n=len(part): job._collect(i, n, f))
+    return job
+
+
+def get(job_id):
+    """El trabajo con ese id, o None si no existe (o ya se olvidó)."""
+    with _lock:
+        return _jobs.get(job_id) if job_id is not None else None
+
+
+def jobs_stats():
+    with _lock:
+        running = sum(j.running for j in _jobs.values())
+        return {"jobs": len(_jobs), "running": running, "workers": WORKERS,
+                "bytes": sum(j.nbytes for j in _jobs.values())}
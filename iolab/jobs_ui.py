@@ -0,0 +1,71 @@
+# iolab/jobs_ui.py
+# Lado Streamlit de iolab.jobs, compartido por las páginas con trabajos en segundo plano: lanzar
+# un trabajo desde un panel, registrarlo como fragmento con sondeo mientras corre y mostrar
+# progreso, cancelación y estado. La sesión guarda en session_state[state_key] solo el id del
+# trabajo y los parámetros con que se lanzó (más lo que la página agregue).
+import uuid
+
+import streamlit as st
+
+from . import jobs
+
+POLL_S = 0.5               # segundos entre reruns del panel mientras el trabajo corre
+
+
+def session_id():
+    # Suscriptor de los trabajos: uno por sesión (dos paneles de la misma sesión son trabajos distintos)
+    if "job_subscriber" not in st.session_state:
+        st.session_state.job_subscriber = uuid.uuid4().hex
+    return st.session_state.job_subscriber
+
+
+def start(state_key, fn, values, key, params, chunk=1, **extra):
+    """Lanza (o se suma a) el trabajo y lo recuerda en session_state[state_key]; rerun si corre."""
+    job = jobs.submit(fn, values, key=key, chunk=chunk, subscriber=session_id())
+    st.session_state[state_key] = {"id": job.id, "params": params, **extra}
+    if job.running:
+        st.rerun()
+    return job
+
+
+def live_fragment(state_key):
+    # Con un trabajo corriendo el panel se registra con run_every (sondeo); si no, sin temporizador
+    state = st.session_state.get(state_key) or {}
+    job = None if state.get("detached") else jobs.get(state.get("id"))
+    live = job is not None and job.running
+    st.session_state[f"{state_key}_live"] = live
+    return st.fragment(run_every=POLL_S if live else None)
+
+
+def job_view(state_key, params, unit="valores", what="el barrido"):
+    """
+    Progreso, botón de cancelar y aviso si el trabajo es de otros parámetros. `unit`: qué se
+    cuenta ("valores de N"); `what`: el trabajo con artículo ("la malla"). Cancelar solo
+    desengancha a esta sesión (otras que pidieron lo mismo lo siguen viendo correr).
+    Retorna el trabajo (o None).
+    """
+    state = st.session_state.get(state_key)
+    job = jobs.get(state["id"]) if state else None
+    if job is None:
+        return None
+    if state.get("detached"):
+        st.caption(f"Cancelaste {what} con {state['done_at_cancel']:,} de {job.total:,} {unit} listos"
+                   + (" (sigue corriendo para otras sesiones)." if job.running else "."))
+    elif job.running:
+        st.progress(job.progress(), text=f"{job.done:,} de {job.total:,} {unit} · {job.elapsed():.1f} s")
+        if st.button("Cancelar", key=f"cancel_{state_key}"):
+            job.cancel(session_id())
+            state["detached"], state["done_at_cancel"] = True, job.done
+            st.rerun()        # rerun completo: el panel se vuelve a registrar sin temporizador
+    elif job.status == "cancelled":
+        st.caption(f"Se canceló {what}: {job.done:,} de {job.total:,} {unit}.")
+    elif job.status == "error":
+        st.error(f"Falló {what}: {job.error}")
+    elif job.status == "done":
+        st.caption(f"{job.total:,} {unit} en {job.elapsed():.2f} s.")
+    if state["params"] != params:
+        st.caption(f"Estos resultados son de los parámetros con que se lanzó {what}; para actualizarlos, "
+                   "vuelve a ejecutar el cálculo.")
+    if not job.running and st.session_state.get(f"{state_key}_live"):
+        st.rerun()            # terminó: rerun completo para registrar el panel sin temporizador
+    return job
@@ -0,0 +1,152 @@
+# iolab/mergers.py
+# Simulación de fusiones sobre el Cournot asimétrico (P = a - bQ, costos constantes).
+# Una fusión reemplaza a las firmas del grupo por una sola con el menor de sus costos, reducido
+# en una eficiencia opcional: c_m = (1 - e)·min_i c_i. Con costos constantes el equilibrio solo
+# depende del conjunto de costos, así que todas las parejas se evalúan juntas con las sumas
+# prefijas de los costos ordenados (sin armar un mercado por pareja): para cada pareja, la
+# secuencia ordenada post-fusión es la original sin i, j y con c_m insertado, y su conjunto
+# activo sale de una búsqueda binaria vectorizada (O(log N) pasos sobre todas las parejas).
+import numpy as np
+
+from ._util import as_float
+from .oligopoly import cournot_asim
+
+# Cambios (post - pre) de cada fusión; HHI es el nivel post-fusión (0–10 000)
+MERGER_OUTCOMES = ("dP", "dCS", "dHHI", "dPI", "dPI_rivals", "dTS", "HHI")
+
+
+def _pre_merger(a, b, c):
+    q, P, Q, pi = cournot_asim(a, b, c)
+    HHI = 10_000.0 * float(((q / Q) ** 2).sum()) if Q > 0 else 0.0
+    return float(P), HHI, pi
+
+
+def _changes(a, b, P0, HHI0, PI0, parties0, P1, HHI1, PI1, parties1):
+    # CS = (a - P)²/(2b) con demanda lineal; parties: ganancias de las firmas que se fusionan
+    dCS = ((a - P1) ** 2 - (a - P0) ** 2) / (2 * b)
+    dPI = parties1 - parties0
+    dPI_rivals = (PI1 - parties1) - (PI0 - parties0)
+    return {"dP": P1 - P0, "dCS": dCS, "dHHI": HHI1 - HHI0, "dPI": dPI,
+            "dPI_rivals": dPI_rivals, "dTS": dCS + dPI + dPI_rivals, "HHI": HHI1}
+
+
+def merged_cost(c_group, efficiency=0.0):
+    """Costo de la firma fusionada: (1 - efficiency)·min(c_group)."""
+    return (1.0 - as_float(efficiency)) * np.min(as_float(c_group), axis=-1)
+
+
+def simulate_merger(a, b, costs, group, efficiency=0.0):
+    """
+    Fusión de las firmas `group` (índices en `costs`) en una sola firma con costo
+    (1 - efficiency)·min c_i; el resto del mercado no cambia. Resuelve el mercado post-fusión
+    con cournot_asim. Retorna un dict con MERGER_OUTCOMES (escalares) más P y n_active post.
+    """
+    c = as_float(costs).ravel()
+    group = np.unique(np.asarray(group, dtype=int))
+    if group.size < 2:
+        raise ValueError("una fusión necesita al menos dos firmas distintas")
+    if group.min() < 0 or group.max() >= c.size:
+        raise ValueError(f"índices de firma fuera de rango (hay {c.size} firmas)")
+    P0, HHI0, pi0 = _pre_merger(a, b, c)
+    cm = float(merged_cost(c[group], efficiency))
+    c1 = np.append(np.delete(c, group), cm)
+    P1, HHI1, pi1 = _pre_merger(a, b, c1)
+    res = _changes(a, b, P0, HHI0, float(pi0.sum()), float(pi0[group].sum()),
+                   P1, HHI1, float(pi1.sum()), float(pi1[-1]))
+    res["P"], res["n_active"] = P1, int((pi1 > 0).sum())
+    return res
+
+
+def _pairs_sorted(a, b, d, D, D2, i, j, dm):
+    """
+    Equilibrio post-fusión de las parejas (i, j), i < j, índices en los costos ordenados.
+    Todo va desplazado por c_(1): d = c - c_(1), dm = c_m - c_(1), a = a - c_(1).
+    D, D2: sumas prefijas de d y d² con D[0] = 0. Retorna P - c_(1), ∑(P - c)², y si la
+    firma fusionada produce.
+    """
+    M = d.size - 1                                   # firmas después de la fusión
+    r = np.searchsorted(d, dm, side="left")          # firmas con costo < c_m (r ≤ i)
+    di, dj, di2, dj2 = d[i], d[j], d[i] ** 2, d[j] ** 2
+
+    def span(u):
+        # Cuántos costos originales cubren los u primeros de la lista sin i ni j
+        e = u + (u > i)
+        return e + (e > j)
+
+    def prefix(u):
+        e = span(u)
+        return D[e] - di * (e > i) - dj * (e > j), D2[e] - di2 * (e > i) - dj2 * (e > j)
+
+    def head(t):
+        # Suma y suma de cuadrados de las t más baratas post-fusión (c_m va en la posición r)
+        s, s2 = prefix(np.maximum(t - 1, 0))
+        s0, s20 = prefix(np.minimum(t, r))
+        after = t > r
+        return np.where(after, s + dm, s0), np.where(after, s2 + dm * dm, s20)
+
+    def cost_at(t):
+        o = np.minimum(span(np.maximum(t - 1, 0) + 1) - 1, d.size - 1)
+        return np.where(t < r, d[np.minimum(t, d.size - 1)], np.where(t == r, dm, d[o]))
+
+    # La firma t entra si su costo está bajo P_t = (a + S_t)/(t+1) de las t anteriores;
+    # la condición vale en un prefijo, así que n* sale por búsqueda binaria
+    lo, hi = np.zeros_like(i), np.full_like(i, M)
+    for _ in range(int(np.ceil(np.log2(M + 1))) + 1):
+        todo = lo < hi
+        if not todo.any():
+            break
+        mid = (lo + hi) // 2
+        s, _ = head(mid)
+        ok = ((a + s) / (mid + 1) - cost_at(np.minimum(mid, M - 1))) / b > 1e-12
+        lo = np.where(todo & ok, mid + 1, lo)
+        hi = np.where(todo & ~ok, mid, hi)
+    n = lo
+    s, s2 = head(n)
+    P = (a + s) / (n + 1)
+    sq = np.maximum(n * P * P - 2 * P * s + s2, 0.0)
+    return P, sq, r < n
+
+
+def pairwise_mergers(a, b, costs, efficiency=0.0, pairs=None, chunk=1_000_000):
+    """
+    Todas las fusiones de dos firmas (o las de `pairs`, arreglo (M, 2) de índices en `costs`)
+    en una llamada vectorizada. Cada pareja se fusiona en una firma con costo
+    (1 - efficiency)·min(c_i, c_j), con el resto del mercado fijo. Las parejas se procesan en
+    bloques de `chunk`. Retorna un dict con "i", "j" (índices, i < j) y MERGER_OUTCOMES.
+    """
+    c = as_float(costs).ravel()
+    a, b, N = float(a), float(b), c.size
+    if pairs is None:
+        pi_, pj_ = np.triu_indices(N, 1)
+    else:
+        pairs = np.sort(np.asarray(pairs, dtype=int).reshape(-1, 2), axis=1)
+        if pairs.size and (pairs.min() < 0 or pairs.max() >= N or (pairs[:, 0] == pairs[:, 1]).any()):
+            raise ValueError(f"parejas inválidas (hay {N} firmas; índices distintos en cada pareja)")
+        pi_, pj_ = pairs[:, 0], pairs[:, 1]
+    res = {"i": pi_, "j": pj_, **{k: np.empty(pi_.size) for k in MERGER_OUTCOMES}}
+    if pi_.size == 0:
+        return res
+
+    P0, HHI0, pi0 = _pre_merger(a, b, c)
+    PI0 = float(pi0.sum())
+    order = np.argsort(c, kind="stable")
+    rank = np.empty(N, dtype=int)
+    rank[order] = np.arange(N)
+    cs = c[order]
+    d = cs - cs[0]
+    D, D2 = np.r_[0.0, np.cumsum(d)], np.r_[0.0, np.cumsum(d * d)]
+    a0 = a - cs[0]
+    for lo in range(0, pi_.size, chunk):
+        sl = slice(lo, lo + chunk)
+        u, v = rank[pi_[sl]], rank[pj_[sl]]
+        i, j = np.minimum(u, v), np.maximum(u, v)
+        dm = (1.0 - efficiency) * cs[i] - cs[0]
+        P, sq, merged_on = _pairs_sorted(a0, b, d, D, D2, i, j, dm)
+        Qb = a0 - P                                  # b·Q
+        HHI1 = np.where(Qb > 0, 10_000.0 * sq / np.where(Qb > 0, Qb, 1.0) ** 2, 0.0)
+        parties1 = np.where(merged_on, (P - dm) ** 2 / b, 0.0)
+        ch = _changes(a0, b, P0 - cs[0], HHI0, PI0, pi0[pi_[sl]] + pi0[pj_[sl]],
+                      P, HHI1, sq / b, parties1)
+        for k in MERGER_OUTCOMES:
+            res[k][sl] = ch[k]
+    return res
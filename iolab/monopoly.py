@@ -0,0 +1,34 @@
+# iolab/monopoly.py
+# Monopolio con demanda lineal P(Q)=a-bQ y costo marginal constante c.
+import numpy as np
+
+from ._util import as_float, out
+
+
+def monopoly_linear(a, b, c):
+    """
+    Óptimo de monopolio, benchmark competitivo y áreas de bienestar.
+    a, b, c pueden ser escalares o arreglos (se difunden entre sí).
+    Retorna dict con Q_int, Q_pc, Q_m, P_m, CS, pi, DWL, Q_R, R_R.
+    """
+    a, b, c = as_float(a), as_float(b), as_float(c)
+    interior = a > c
+
+    Q_int = a / b                                     # intersección de demanda con eje Q
+    Q_pc = np.where(interior, (a - c) / b, 0.0)       # competitivo: P=MC=c
+    Q_m = np.where(interior, (a - c) / (2*b), 0.0)    # monopolio: MR=a-2bQ=c
+    P_m = a - b*Q_m
+
+    # Máximo de ingresos (ε = -1)
+    Q_R = np.where(a > 0, a / (2*b), 0.0)
+    R_R = a*Q_R - b*Q_R**2
+
+    CS = 0.5 * Q_m * (a - P_m)
+    pi = (P_m - c) * Q_m
+    DWL = 0.5 * np.maximum(Q_pc - Q_m, 0.0) * np.maximum(P_m - c, 0.0)
+
+    return {
+        "Q_int": out(Q_int), "Q_pc": out(Q_pc), "Q_m": out(Q_m), "P_m": out(P_m),
+        "CS": out(CS), "pi": out(pi), "DWL": out(DWL),
+        "Q_R": out(Q_R), "R_R": out(R_R),
+    }
@@ -0,0 +1,134 @@
+# iolab/montecarlo.py
+# Monte Carlo del oligopolio de Cournot asimétrico: muchos mercados con costos aleatorios,
+# resueltos como un arreglo 2-D (mercados × firmas) con cournot_asim/welfare_metrics.
+# Las firmas que salen quedan con q_i = 0 (máscara), sin filas de tamaño variable.
+# Los bloques de mercados se reparten en un pool de procesos; cada bloque tiene su propia
+# semilla (SeedSequence.spawn), así que el resultado no depende del número de procesos.
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .oligopoly import cournot_asim
+from .welfare import welfare_metrics
+
+# nombre -> nombres de sus parámetros (en ese orden)
+COST_DISTRIBUTIONS = {
+    "uniform": ("low", "high"),
+    "normal": ("mean", "sd"),          # truncada en 0 (se vuelven a sortear los negativos)
+    "lognormal": ("mean", "sd"),       # media y desviación del costo (no del log)
+    "triangular": ("low", "mode", "high"),
+}
+OUTCOMES = ("P", "Q", "HHI", "CS", "DWL", "n_active")
+
+WORKERS = int(os.environ.get("IOLAB_MC_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+CHUNK_MARKETS = 20_000     # mercados por bloque como máximo
+CELL_BUDGET = 1 << 20      # celdas mercado × firma por bloque (~8 MB por arreglo float64)
+_pool = {"executor": None, "workers": 0}
+_pool_lock = threading.Lock()
+
+
+def draw_costs(dist, params, size, rng):
+    """Costos marginales ≥ 0 con forma `size` según la distribución `dist`."""
+    if dist not in COST_DISTRIBUTIONS:
+        raise ValueError(f"distribución desconocida: {dist!r} (opciones: {tuple(COST_DISTRIBUTIONS)})")
+    p = [float(x) for x in params]
+    if len(p) != len(COST_DISTRIBUTIONS[dist]):
+        raise ValueError(f"{dist} necesita los parámetros {COST_DISTRIBUTIONS[dist]}")
+    if dist == "uniform":
+        c = rng.uniform(p[0], p[1], size)
+    elif dist == "normal":
+        # Truncada (no censurada): los sorteos negativos se repiten, sin masa en c = 0
+        if p[0] + 3 * p[1] <= 0:
+            raise ValueError("la normal truncada en 0 necesita media + 3·desv. > 0")
+        c = rng.normal(p[0], p[1], size)
+        bad = np.flatnonzero(c < 0)
+        while bad.size:
+            c.flat[bad] = rng.normal(p[0], p[1], bad.size)
+            bad = bad[c.flat[bad] < 0]
+    elif dist == "lognormal":
+        mean, sd = max(p[0], 1e-12), max(p[1], 0.0)
+        sigma2 = np.log1p((sd / mean) ** 2)
+        c = rng.lognormal(np.log(mean) - sigma2 / 2, np.sqrt(sigma2), size)
+    else:
+        c = rng.triangular(p[0], p[1], p[2], size)
+    return np.maximum(c, 0.0)
+
+
+def simulate_markets(a, b, costs):
+    """
+    Resultados por mercado para costos de forma (M, N): P, Q, HHI (0–10 000), CS, DWL y
+    número de firmas activas. Mercados sin producción (a ≤ c_min) quedan con HHI = 0.
+    """
+    q, P, Q, pi = cournot_asim(a, b, costs)
+    CS, PS, TS, DWL = welfare_metrics(a, b, q, P, costs)
+    Qs = np.where(Q > 0, Q, 1.0)
+    HHI = 10_000.0 * ((q / Qs[..., None]) ** 2).sum(axis=-1)
+    return {"P": P, "Q": Q, "HHI": HHI, "CS": CS, "DWL": DWL,
+            "n_active": (q > 0).sum(axis=-1)}
+
+
+def _run_chunk(a, b, N, dist, params, n_markets, seed):
+    rng = np.random.default_rng(seed)
+    return simulate_markets(a, b, draw_costs(dist, params, (n_markets, N), rng))
+
+
+def _executor(workers):
+    # Pool persistente por proceso (arrancar procesos cuesta más que un bloque); "spawn" para
+    # no hacer fork de un servidor con hilos
+    import multiprocessing
+
+    with _pool_lock:
+        if _pool["executor"] is None or _pool["workers"] != workers:
+            if _pool["executor"] is not None:
+                _pool["executor"].shutdown(wait=False, cancel_futures=True)
+            ctx = multiprocessing.get_context("spawn")
+            _pool["executor"] = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+            _pool["workers"] = workers
+        return _pool["executor"]
+
+
+def monte_carlo(a, b, N, dist, params, n_markets, chunk=None, workers=None, seed=0):
+    """
+    Simula `n_markets` mercados de Cournot con N firmas cuyos costos salen de `dist`.
+    Parte el trabajo en bloques de `chunk` mercados (por omisión, los que caben en CELL_BUDGET
+    celdas mercado × firma, hasta CHUNK_MARKETS); con workers > 1 y más de un bloque, los
+    reparte en el pool de procesos. Retorna un dict de arreglos (n_markets,) por resultado.
+    """
+    n_markets, N = int(n_markets), int(N)
+    chunk = min(CHUNK_MARKETS, max(1, CELL_BUDGET // max(N, 1))) if chunk is None else max(1, int(chunk))
+    sizes = [min(chunk, n_markets - i) for i in range(0, n_markets, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(float(a), float(b), N, dist, tuple(params), m, s) for m, s in zip(sizes, seeds)]
+    workers = WORKERS if workers is None else int(workers)
+    if workers > 1 and len(args) > 1:
+        ex = _executor(workers)
+        parts = list(ex.map(_run_chunk, *zip(*args)))
+    else:
+        parts = [_run_chunk(*x) for x in args]
+    if not parts:
+        return {k: np.empty(0) for k in OUTCOMES}
+    return {k: np.concatenate([p[k] for p in parts]) for k in OUTCOMES}
+
+
+def summarize(results, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), bins=40):
+    """
+    Media, desviación y cuantiles de cada resultado, más histogramas (bordes, conteos)
+    para graficar sin mandar los arreglos completos.
+    """
+    stats, hists = {}, {}
+    for k, v in results.items():
+        v = np.asarray(v, dtype=float)
+        if v.size == 0:
+            continue
+        qs = np.quantile(v, quantiles)
+        stats[k] = {"media": v.mean(), "desv.": v.std(), **{f"q{int(round(q*100)):02d}": x
+                                                              for q, x in zip(quantiles, qs)}}
+        lo, hi = float(v.min()), float(v.max())
+        if k == "n_active":
+            edges = np.arange(lo - 0.5, hi + 1.5)
+        else:
+            edges = np.linspace(lo, hi if hi > lo else lo + 1.0, bins + 1)
+        hists[k] = (edges, np.histogram(v, bins=edges)[0])
+    return stats, hists
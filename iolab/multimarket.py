@@ -0,0 +1,186 @@
+# iolab/multimarket.py
+# Cournot multimercado: N firmas presentes en M mercados según una incidencia dispersa (COO:
+# pares firma–mercado). Cada mercado m tiene demanda P_m = a_m - b_m Q_m y cada firma i un
+# costo convexo compartido entre mercados, C_i(X_i) = c_i X_i + d_i X_i²/2 con X_i = ∑_m x_im.
+# Nada se arma denso: todas las sumas por firma o por mercado son np.bincount sobre la COO.
+import io
+import os
+
+import numpy as np
+
+from ._util import as_float
+from .costs import _first_lines
+
+
+def _per(x, n, name):
+    x = as_float(x)
+    if x.ndim == 0:
+        return np.full(n, float(x))
+    if x.shape != (n,):
+        raise ValueError(f"{name} debe ser escalar o tener {n} valores (tiene {x.shape})")
+    return x
+
+
+def _cg(matvec, rhs, diag, tol, max_iter):
+    # Gradiente conjugado con precondicionador diagonal (sistema simétrico definido positivo)
+    x = np.zeros_like(rhs)
+    r = rhs.copy()
+    z = r / diag
+    p = z.copy()
+    rz = r @ z
+    stop = tol * max(np.linalg.norm(rhs), 1e-300)
+    for _ in range(max_iter):
+        if np.linalg.norm(r) <= stop:
+            break
+        Ap = matvec(p)
+        alpha = rz / (p @ Ap)
+        x += alpha * p
+        r -= alpha * Ap
+        z = r / diag
+        rz, rz_old = r @ z, rz
+        p = z + (rz / rz_old) * p
+    return x
+
+
+def multimarket_cournot(a, b, firm, market, c, d=0.0, n_firms=None, n_markets=None,
+                        tol=1e-10, max_iter=100):
+    """
+    Equilibrio de Cournot con firmas en varios mercados. `firm` y `market` (mismo largo) son la
+    incidencia: la firma firm[k] compite en market[k]. a, b: escalares o (M,); c, d: escalares
+    o (N,). Con el precio P_m y el costo marginal mc_i = c_i + d_i X_i, la FOC da
+    x_im = max(P_m - mc_i, 0)/b_m, así que el equilibrio resuelve (M + N incógnitas)
+        P_m - a_m + ∑_i (P_m - mc_i)₊ = 0,      mc_i - c_i - d_i ∑_m (P_m - mc_i)₊/b_m = 0.
+    Se usa Newton semisuave: eliminando mc, cada paso es un sistema M×M simétrico definido
+    positivo (diagonal menos términos de rango uno por firma) que se resuelve con gradiente
+    conjugado sin formar la matriz. Con d = 0 los mercados se desacoplan (Cournot asimétrico).
+    Retorna un dict: P, Q, CS, n_active (por mercado), X, mc, pi (por firma), x (por par),
+    iterations y residual.
+    """
+    firm, market = np.asarray(firm, dtype=np.int64), np.asarray(market, dtype=np.int64)
+    if firm.shape != market.shape or firm.ndim != 1:
+        raise ValueError("firm y market deben ser arreglos 1-D del mismo largo")
+    N = int(n_firms) if n_firms is not None else (int(firm.max()) + 1 if firm.size else 0)
+    M = int(n_markets) if n_markets is not None else (int(market.max()) + 1 if market.size else 0)
+    if firm.size and (firm.min() < 0 or firm.max() >= N or market.min() < 0 or market.max() >= M):
+        raise ValueError("índices de firma o mercado fuera de rango")
+    a, b = _per(a, M, "a"), _per(b, M, "b")
+    c, d = _per(c, N, "c"), _per(d, N, "d")
+    if np.any(b <= 0) or np.any(d < 0):
+        raise ValueError("se necesita b > 0 y d ≥ 0")
+    bk = b[market]
+
+    def residual(P, mc):
+        m = np.maximum(P[market] - mc[firm], 0.0)
+        FP = P - a + np.bincount(market, m, minlength=M)
+        Fmc = mc - c - d * np.bincount(firm, m / bk, minlength=N)
+        return FP, Fmc
+
+    def norm(FP, Fmc):
+        return max(np.abs(FP).max(initial=0.0), np.abs(Fmc).max(initial=0.0))
+
+    P, mc = a.copy(), c.copy()
+    FP, Fmc = residual(P, mc)
+    res, scale = norm(FP, Fmc), 1.0 + np.abs(a).max(initial=0.0)
+    it = 0
+    while res > tol * scale and it < max_iter:
+        it += 1
+        s = (P[market] > mc[firm]).astype(float)     # pares activos
+        n_m = np.bincount(market, s, minlength=M)
+        sigma = np.bincount(firm, s / bk, minlength=N)
+        w = d / (1.0 + d * sigma)
+        # (2) da Δmc_i = (-Fmc_i + d_i t_i)/(1 + d_i σ_i) con t_i = ∑_m s_im ΔP_m/b_m;
+        # en (1), dividido por b_m: [diag((1+n)/b) - U diag(w) Uᵀ] ΔP = rhs/b con U_mi = s_im/b_m
+        rhs = -FP - np.bincount(market, s * (Fmc / (1.0 + d * sigma))[firm], minlength=M)
+
+        def matvec(v):
+            t = np.bincount(firm, s * v[market] / bk, minlength=N)
+            return (1.0 + n_m) / b * v - np.bincount(market, s * (w * t)[firm], minlength=M) / b
+
+        diag = (1.0 + n_m) / b - np.bincount(market, s * w[firm] / bk, minlength=M) / b
+        dP = _cg(matvec, rhs / b, diag, 1e-12, 4 * M + 50)
+        t = np.bincount(firm, s * dP[market] / bk, minlength=N)
+        dmc = (-Fmc + d * t) / (1.0 + d * sigma)
+        # Paso completo salvo que el residuo no baje (cambios de conjunto activo): se acorta
+        step = 1.0
+        while True:
+            P1, mc1 = P + step * dP, mc + step * dmc
+            FP1, Fmc1 = residual(P1, mc1)
+            res1 = norm(FP1, Fmc1)
+            if res1 < res or step < 1e-4:
+                break
+            step *= 0.5
+        P, mc, FP, Fmc, res = P1, mc1, FP1, Fmc1, res1
+
+    x = np.maximum(P[market] - mc[firm], 0.0) / bk
+    X = np.bincount(firm, x, minlength=N)
+    Q = np.bincount(market, x, minlength=M)
+    P = a - b * Q
+    revenue = np.bincount(firm, P[market] * x, minlength=N)
+    return {
+        "P": P, "Q": Q, "CS": 0.5 * b * Q * Q,
+        "n_active": np.bincount(market, x > 0, minlength=M).astype(int),
+        "X": X, "mc": c + d * X, "pi": revenue - c * X - 0.5 * d * X * X,
+        "x": x, "iterations": it, "residual": res,
+    }
+
+
+def random_incidence(n_firms, n_markets, markets_per_firm, seed=0):
+    """Incidencia aleatoria: cada firma entra a `markets_per_firm` mercados distintos."""
+    rng = np.random.default_rng(seed)
+    k = min(int(markets_per_firm), int(n_markets))
+    # k mercados distintos por firma: los k menores de una permutación aleatoria por fila, por bloques
+    firms, markets = [], []
+    step = max(1, (1 << 22) // max(int(n_markets), 1))
+    for lo in range(0, int(n_firms), step):
+        n = min(step, int(n_firms) - lo)
+        pick = np.argpartition(rng.random((n, int(n_markets))), k - 1, axis=1)[:, :k] if k else np.empty((n, 0), int)
+        firms.append(np.repeat(np.arange(lo, lo + n), k))
+        markets.append(pick.ravel())
+    return np.concatenate(firms), np.concatenate(markets)
+
+
+INCIDENCE_COLUMNS = ("firm", "market")
+OPTIONAL_COLUMNS = ("c", "d", "a", "b")
+
+
+def load_incidence(source, name=None):
+    """
+    Incidencia firma–mercado desde CSV/TXT o Parquet (ruta o bytes) con columnas `firm` y
+    `market` (cualquier etiqueta) y, opcionales, `c`, `d` (por firma) y `a`, `b` (por mercado;
+    se toma la primera aparición). Retorna (firm, market, firm_labels, market_labels, params),
+    con params un dict de arreglos por firma/mercado (NaN donde no vino el dato).
+    """
+    import pandas as pd
+
+    name = str(name if name is not None else source)
+    ext = os.path.splitext(name)[1].lower().lstrip(".")
+    buf = source if isinstance(source, (str, os.PathLike)) else io.BytesIO(source)
+    if ext == "parquet":
+        try:
+            df = pd.read_parquet(buf)
+        except ImportError as e:
+            raise ValueError("leer Parquet requiere pyarrow (pip install pyarrow)") from e
+    elif ext in ("csv", "txt"):
+        first = (_first_lines(source, 1) or [""])[0].lstrip("\ufeff")
+        sep = "," if "," in first else ";" if ";" in first else "\t" if "\t" in first else r"\s+"
+        df = pd.read_csv(buf, sep=sep, skipinitialspace=True, decimal="," if sep == ";" else ".",
+                         encoding="utf-8-sig")
+    else:
+        raise ValueError(f"formato no soportado: .{ext} (usa .csv, .txt o .parquet)")
+    df.columns = [str(col).strip().lower() for col in df.columns]
+    missing = [col for col in INCIDENCE_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"faltan columnas {missing} (columnas: {list(df.columns)})")
+    df = df.dropna(subset=list(INCIDENCE_COLUMNS)).drop_duplicates(subset=list(INCIDENCE_COLUMNS))
+    firm, firm_labels = pd.factorize(df["firm"])
+    market, market_labels = pd.factorize(df["market"])
+    params = {}
+    for col, idx, n in (("c", firm, len(firm_labels)), ("d", firm, len(firm_labels)),
+                        ("a", market, len(market_labels)), ("b", market, len(market_labels))):
+        v = np.full(n, np.nan)
+        if col in df.columns:
+            vals = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+            ids, first = np.unique(idx, return_index=True)      # primera aparición
+            v[ids] = vals[first]
+        params[col] = v
+    return firm, market, np.asarray(firm_labels), np.asarray(market_labels), params
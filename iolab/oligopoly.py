@@ -0,0 +1,314 @@
+# iolab/oligopoly.py
+# Oligopolio de Cournot con N firmas y costos marginales heterogéneos, P(Q)=a-bQ.
+# Los costos llegan con forma (..., N): el último eje son las firmas y los ejes
+# anteriores son mercados independientes; a y b se difunden sobre esos ejes.
+# free_entry trabaja sobre un solo mercado (costos 1-D) y una malla de costos fijos F.
+# cournot_differentiated generaliza a bienes diferenciados: p = α - Bq con B de N×N.
+import numpy as np
+
+from ._util import as_float, col, out
+
+
+def cournot_asym(a, b, cs_arr):
+    """
+    Cournot con la fórmula cerrada q_i^N = (a - (N+1)c_i + S) / ((N+1)b)
+    sobre las N firmas, truncando en cero (sin recalcular el conjunto activo).
+    Retorna: qN, QN, PN, piN.
+    """
+    cs_arr = as_float(cs_arr)
+    N = cs_arr.shape[-1]
+    S = cs_arr.sum(axis=-1, keepdims=True)
+    qN = (col(a) - (N+1)*cs_arr + S) / ((N+1)*col(b))
+    qN = np.maximum(qN, 0.0)
+    QN = qN.sum(axis=-1)
+    PN = as_float(a) - as_float(b)*QN
+    piN = np.maximum(PN[..., None] - cs_arr, 0.0) * qN
+    return qN, out(QN), out(PN), piN
+
+
+def cournot_asim(a, b, c_list):
+    """
+    Equilibrio de Cournot con P(Q)=a-bQ y costos c_i heterogéneos.
+    Sobre el conjunto activo S (N = |S|):
+        q_i = [ a + N*(c̄_{-i} - c_i) - c̄_{-i} ] / [ b*(N+1) ] = (a + ∑_S c_j - (N+1)c_i) / (b(N+1)).
+    Con costos constantes el conjunto activo son las k firmas más baratas: con sumas prefijas
+    S_k de los costos ordenados, P_k = (a + S_k)/(k+1) y k* es el mayor k con c_(k) < P_k
+    (la condición se cumple en un prefijo). Como P* ≤ (a + c_min)/2, solo se ordenan las firmas
+    por debajo de esa cota: O(N) para separarlas más O(m log m) para las m candidatas.
+    Retorna: q (con ceros en inactivas), P, Q, π.
+    """
+    c = as_float(c_list)
+    a_col, b_col = col(a), col(b)
+    N = c.shape[-1]
+    if N == 0:
+        P = as_float(a) + 0.0*as_float(b)
+        return c.copy(), out(P), out(np.zeros_like(P)), c.copy()
+
+    # Candidatas: c_i bajo el precio de monopolio de la firma más barata (cota superior de P*)
+    cap = (a_col + c.min(axis=-1, keepdims=True)) / 2
+    m = max(int((c < cap).sum(axis=-1).max()), 1)
+    if np.all(c[..., 1:] >= c[..., :-1]):
+        cs = c[..., :m]                      # ya ordenados (barrido en k, costos de las páginas)
+    elif m < N:
+        cs = np.sort(np.partition(c, m - 1, axis=-1)[..., :m], axis=-1)
+    else:
+        cs = np.sort(c, axis=-1)
+    k = np.arange(1, m + 1)
+    P_k = (a_col + np.cumsum(cs, axis=-1)) / (k + 1)
+    # Mismo umbral que la eliminación iterativa: solo firmas con q_i > 1e-12
+    ok = np.logical_and.accumulate((P_k - cs) / b_col > 1e-12, axis=-1)
+    n_act = ok.sum(axis=-1, keepdims=True)
+    P = np.where(n_act > 0, np.take_along_axis(P_k, np.maximum(n_act - 1, 0), axis=-1), a_col)
+
+    # Cantidades en el orden original (sin permutaciones inversas: activa <=> c_i < P*)
+    q = (P - c) / b_col
+    active = q > 1e-12
+    q *= active
+
+    Q = q.sum(axis=-1)
+    P = as_float(a) - as_float(b)*Q
+    pi = (P[..., None] - c) * q
+    pi *= active
+    pi += 0.0                                # -0.0 -> 0.0 en las inactivas
+    return q, out(P), out(Q), pi
+
+
+def cournot_k_sweep(a, b, c_sorted):
+    """
+    Barrido en el número de firmas: para cada prefijo k = 1..K de los costos ordenados,
+    P, CS, ∑π y DWL del Cournot con esas k firmas, en una pasada con sumas acumuladas.
+    Las activas del prefijo k son las min(k, k*) más baratas, así que con
+        S_n = ∑_{j≤n} c_(j),   P_n = (a + S_n)/(n+1),   Q_n = (a - P_n)/b,
+        ∑π_n = ∑_{j≤n} (P_n - c_(j))² / b = [n(P_n - c_(1))² - 2(P_n - c_(1))D_n + D2_n] / b
+    (D y D2: sumas de c_(j)-c_(1) y de sus cuadrados, para no perder precisión).
+    Retorna: k, P, CS, PI, DWL, cada uno con forma (..., K). Costos sin ordenar se ordenan.
+    """
+    c = as_float(c_sorted)
+    if not np.all(c[..., 1:] >= c[..., :-1]):
+        c = np.sort(c, axis=-1)
+    a_col, b_col = col(a), col(b)
+    K = c.shape[-1]
+    k = np.arange(1, K + 1, dtype=float)
+
+    c1 = c[..., :1]
+    d = c - c1
+    D, D2 = np.cumsum(d, axis=-1), np.cumsum(d * d, axis=-1)
+    P_k = (a_col + k * c1 + D) / (k + 1)
+    # Conjunto activo de cada prefijo: n(k) = min(k, k*) (mismo umbral que cournot_asim)
+    ok = np.logical_and.accumulate((P_k - c) / b_col > 1e-12, axis=-1)
+    n = np.minimum(k, ok.sum(axis=-1, keepdims=True))
+    idx = np.maximum(n.astype(int) - 1, 0)
+    Dn, D2n = np.take_along_axis(D, idx, axis=-1), np.take_along_axis(D2, idx, axis=-1)
+    m = np.where(n > 0, np.take_along_axis(P_k, idx, axis=-1) - c1, 0.0)   # P - c_(1)
+
+    P = np.where(n > 0, c1 + m, a_col)
+    Q = (a_col - P) / b_col
+    CS = 0.5 * Q * (a_col - P)
+    PI = np.maximum(n * m * m - 2 * m * Dn + D2n, 0.0) / b_col
+    TS_pc = np.where(a_col <= c1, 0.0, 0.5 * (a_col - c1)**2 / b_col)
+    DWL = np.maximum(TS_pc - CS - PI, 0.0)
+    return np.broadcast_to(k, P.shape), P, CS, PI, DWL
+
+
+def concentration(q, points=None):
+    """
+    Concentración de las cantidades q (1-D): cuotas de mayor a menor, HHI (0–10 000), CR4, CR8
+    y la curva CR_k (cuota acumulada de las k mayores). Con `points`, la curva se submuestrea
+    a ~points valores de k (incluye el primero y el último) para graficar con N grande.
+    """
+    q = as_float(q).ravel()
+    Q = q.sum()
+    s = np.sort(q)[::-1] / Q if Q > 0 else np.zeros_like(q)
+    cr = np.cumsum(s)
+    k = np.arange(1, q.size + 1)
+    res = {
+        "shares": s,
+        "HHI": 10_000.0 * float((s * s).sum()),
+        "CR4": float(cr[min(3, q.size - 1)]) if q.size else 0.0,
+        "CR8": float(cr[min(7, q.size - 1)]) if q.size else 0.0,
+        "n_active": int((q > 0).sum()),
+    }
+    if points is not None and q.size > points:
+        idx = np.unique(np.linspace(0, q.size - 1, int(points)).round().astype(int))
+        k, cr = k[idx], cr[idx]
+    res["k"], res["cr"] = k, cr
+    return res
+
+
+def _argmax_monotone(TS, F):
+    # argmax_k TS[k] - kF para F ascendente: el maximizador no crece con F (diferencias
+    # estrictamente decrecientes), así que divide y vencerás sobre la malla acota el rango de k
+    ks = np.arange(TS.size, dtype=float)
+    best = np.empty(F.size, dtype=int)
+    stack = [(0, F.size, 0, TS.size)]
+    while stack:
+        g0, g1, k0, k1 = stack.pop()
+        if g0 >= g1:
+            continue
+        g = (g0 + g1) // 2
+        best[g] = k0 + int(np.argmax(TS[k0:k1] - ks[k0:k1] * F[g]))
+        stack.append((g0, g, best[g], k1))          # F menores: k ≥ best
+        stack.append((g + 1, g1, k0, best[g] + 1))  # F mayores: k ≤ best
+    return best
+
+
+def free_entry(a, b, c_sorted, F):
+    """
+    Entrada libre con costo fijo F (un mercado, costos 1-D): las firmas entran de la más barata
+    a la más cara y la k-ésima entra si gana al menos F en el Cournot con k firmas. Con costos
+    ordenados la ganancia de la última entrante, π_k = max(P_k - c_(k), 0)²/b, no crece con k,
+    así que n_e(F) = #{k : π_k ≥ F} sale de cournot_k_sweep con un searchsorted por valor de F.
+    El óptimo de segundo mejor (se elige cuántas entran, no cómo compiten) maximiza
+    W(k) = CS_k + ∑π_k - kF. F escalar o arreglo ≥ 0.
+    Retorna un dict con la forma de F: n_entry, n_opt, excess, P, CS, PI (neto de F), W, W_opt.
+    """
+    c = np.sort(as_float(c_sorted).ravel())
+    F = as_float(F)
+    if np.any(F < 0):
+        raise ValueError("el costo fijo F debe ser ≥ 0")
+    Ff = F.ravel()
+    k, P, CS, PI, _ = cournot_k_sweep(a, b, c)
+    # Ganancia de la última entrante; el mínimo acumulado solo quita ruido de redondeo
+    pi_last = np.minimum.accumulate(np.maximum(P - c, 0.0) ** 2 / float(b))
+    n_pos = int((pi_last > 0).sum())
+    n_entry = np.minimum(np.searchsorted(-pi_last, -Ff, side="right"), n_pos)
+
+    # k = 0 (nadie entra): P = a, sin excedentes
+    P0, CS0, PI0 = np.r_[float(a), P], np.r_[0.0, CS], np.r_[0.0, PI]
+    TS = (CS0 + PI0)[: n_pos + 1]                    # más allá de k* el TS no cambia
+    order = np.argsort(Ff, kind="stable")
+    n_opt = np.empty(Ff.size, dtype=int)
+    n_opt[order] = _argmax_monotone(TS, Ff[order])
+
+    W = TS[n_entry] - n_entry * Ff
+    res = {
+        "n_entry": n_entry, "n_opt": n_opt, "excess": n_entry - n_opt,
+        "P": P0[n_entry], "CS": CS0[n_entry], "PI": PI0[n_entry] - n_entry * Ff,
+        "W": W, "W_opt": TS[n_opt] - n_opt * Ff,
+    }
+    return {key: out(v.reshape(F.shape)) for key, v in res.items()}
+
+
+# -------------------- Cournot con bienes diferenciados --------------------
+BLOCK_PIVOTS = 10          # iteraciones de pivoteo por bloques antes de pasar a un pivote por vez
+_SOLVE_BUDGET = 1 << 24    # elementos de las matrices rellenadas por lote (~128 MB)
+
+
+def substitution_matrix(N, b, gamma, kind="common"):
+    """
+    Matriz B (N×N) de la demanda inversa p = α - Bq con B_ii = b.
+    "common": B_ij = γb (γ = 1 es el bien homogéneo, γ = 0 monopolios independientes);
+    "line": B_ij = γ^|i-j|·b (firmas en una línea que compiten más con sus vecinas).
+    """
+    N = int(N)
+    if kind == "common":
+        B = np.full((N, N), float(gamma))
+        np.fill_diagonal(B, 1.0)
+    elif kind == "line":
+        d = np.abs(np.subtract.outer(np.arange(N), np.arange(N)))
+        B = float(gamma) ** d
+    else:
+        raise ValueError(f"tipo de sustitución desconocido: {kind!r} (opciones: 'common', 'line')")
+    return float(b) * B
+
+
+def differentiated_factor(B):
+    """
+    M = B + diag(B) (matriz de las condiciones de primer orden) y su inversa, para reutilizarlas
+    entre llamadas con la misma demanda. M debe ser simétrica definida positiva.
+    """
+    B = as_float(B)
+    if B.ndim != 2 or B.shape[0] != B.shape[1] or not np.allclose(B, B.T):
+        raise ValueError("B debe ser una matriz cuadrada simétrica")
+    M = B + np.diag(np.diag(B))
+    try:
+        np.linalg.cholesky(M)
+    except np.linalg.LinAlgError as e:
+        raise ValueError("B + diag(B) no es definida positiva: revisa la sustitución γ") from e
+    return M, np.linalg.inv(M)
+
+
+def _solve_subsets(A, sel, rhs):
+    # Para cada fila s resuelve A[sel_s, sel_s] x = rhs[s, sel_s] (conjuntos de distinto tamaño,
+    # rellenados con la identidad hasta el mayor) y esparce x en (S, N) con ceros fuera de sel
+    S, N = sel.shape
+    x = np.zeros((S, N))
+    m = sel.sum(axis=1)
+    k = int(m.max()) if S else 0
+    if k == 0:
+        return x
+    step = max(1, _SOLVE_BUDGET // (k * k))
+    eye = np.eye(k)
+    for lo in range(0, S, step):
+        rows = slice(lo, lo + step)
+        idx = np.argsort(~sel[rows], axis=1, kind="stable")[:, :k]
+        valid = np.arange(k) < m[rows, None]
+        G = np.where(valid[:, :, None] & valid[:, None, :], A[idx[:, :, None], idx[:, None, :]], eye)
+        r = np.where(valid, np.take_along_axis(rhs[rows], idx, axis=1), 0.0)
+        sol = np.linalg.solve(G, r[..., None])[..., 0]
+        np.put_along_axis(x[rows], idx, np.where(valid, sol, 0.0), axis=1)
+    return x
+
+
+def cournot_differentiated(alpha, B, costs, factor=None, max_iter=200):
+    """
+    Cournot con bienes diferenciados: p_i = α_i - ∑_j B_ij q_j (B simétrica; B_ij/B_ii mide qué
+    tan sustitutos son i y j). Las FOC con q ≥ 0 forman un problema de complementariedad lineal
+        q ≥ 0,  w = Mq - (α - c) ≥ 0,  q·w = 0,   M = B + diag(B),
+    con M definida positiva (solución única). Se resuelve por pivoteo de conjuntos activos
+    sobre una sola factorización: M⁻¹ se calcula una vez (o llega en `factor`) y cada escenario
+    con pocas firmas fuera se corrige con el complemento de Schur sobre M⁻¹; si quedan pocas
+    activas se resuelve directo sobre ellas. Con B = b·11ᵀ coincide con cournot_asim.
+    costs: (..., N) escenarios; alpha: (N,) o difundible contra costs.
+    Retorna: q, p (precios por firma), CS = ½qᵀBq, π, con las formas de costs.
+    """
+    M, Minv = factor if factor is not None else differentiated_factor(B)
+    B = as_float(B)
+    N = M.shape[0]
+    c = as_float(costs)
+    shape = np.broadcast_shapes(c.shape, np.shape(alpha))
+    if shape[-1] != N:
+        raise ValueError(f"costos con {shape[-1]} firmas para una matriz de {N}×{N}")
+    r = np.broadcast_to(as_float(alpha) - c, shape).reshape(-1, N)
+    tol = 1e-12 * (1.0 + np.abs(r).max(axis=1, keepdims=True))
+
+    # Todas activas (la solución interior); luego se corrige el conjunto activo de cada escenario
+    q0 = r @ Minv
+    q = q0.copy()
+    active = np.ones(r.shape, dtype=bool)
+    todo = np.arange(r.shape[0])
+    for it in range(max_iter):
+        qt, at = q[todo], active[todo]
+        w = qt @ M - r[todo]
+        bad = np.where(at, qt < -tol[todo], w < -tol[todo])
+        ok = ~bad.any(axis=1)
+        todo, bad, at = todo[~ok], bad[~ok], at[~ok]
+        if todo.size == 0:
+            break
+        if it >= BLOCK_PIVOTS:
+            # Regla de Murty (primer índice infactible): termina con M definida positiva
+            first = bad.argmax(axis=1)
+            bad = np.zeros_like(bad)
+            bad[np.arange(todo.size), first] = True
+        at = at ^ bad
+        active[todo] = at
+        out_n = (~at).sum(axis=1)
+        schur = out_n <= at.sum(axis=1)
+        qn = np.empty((todo.size, N))
+        if schur.any():
+            # q = q0 + M⁻¹μ con μ en las inactivas tal que q_I = 0: (M⁻¹)_II μ_I = -q0_I
+            mu = _solve_subsets(Minv, ~at[schur], -q0[todo[schur]])
+            qn[schur] = q0[todo[schur]] + mu @ Minv
+        if (~schur).any():
+            qn[~schur] = _solve_subsets(M, at[~schur], r[todo[~schur]])
+        qn[~at] = 0.0
+        q[todo] = qn
+    else:
+        raise RuntimeError(f"el pivoteo no convergió en {max_iter} iteraciones ({todo.size} escenarios)")
+
+    q = np.maximum(q, 0.0)
+    Bq = q @ B
+    p = np.broadcast_to(as_float(alpha), shape).reshape(-1, N) - Bq
+    CS = 0.5 * np.einsum("si,si->s", q, Bq)
+    pi = (p - np.broadcast_to(c, shape).reshape(-1, N)) * q
+    return q.reshape(shape), p.reshape(shape), out(CS.reshape(shape[:-1])), pi.reshape(shape)
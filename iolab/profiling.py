@@ -0,0 +1,205 @@
+# iolab/profiling.py
+# Instrumentación opcional por rerun: tiempo y memoria pico por etapa con nombre
+# (parse, solve, plot, serialize, table...). Sin perfil activo, stage() no hace nada.
+# El perfil vive en el hilo de la sesión (Streamlit ejecuta cada rerun en su propio hilo).
+import csv
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_local = threading.local()
+_tracing = {"owners": 0}
+_tracing_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+LOG_PATH = os.environ.get("IOLAB_PROFILE_LOG", "iolab_profile.jsonl")
+# tracemalloc encarece cada asignación; IOLAB_PROFILE_MEMORY=0 deja solo los tiempos
+MEMORY = os.environ.get("IOLAB_PROFILE_MEMORY", "1") != "0"
+
+
+def profiling_requested(query_params=None):
+    # Activo con IOLAB_PROFILE=1 (todo el servidor) o con ?profile=1 en la URL (una sesión)
+    if os.environ.get("IOLAB_PROFILE", "0") not in ("", "0"):
+        return True
+    if query_params is not None:
+        return str(query_params.get("profile", "0")) not in ("", "0")
+    return False
+
+
+class RunProfile:
+    """
+    Tiempos de un rerun. Las etapas se acumulan por nombre (ms, llamadas, pico en KiB);
+    la memoria pico sale de tracemalloc y es relativa a la memoria viva al entrar a la etapa.
+    tracemalloc es de todo el proceso: con varias sesiones perfiladas a la vez el pico es aproximado.
+    """
+
+    def __init__(self, page, session=None, memory=None):
+        self.page = page
+        self.session = session
+        self.memory = MEMORY if memory is None else memory
+        self.stages = {}          # nombre -> {"ms", "calls", "peak_kb"}
+        self._stack = []          # marcos abiertos: [base, pico visto]
+        self._depth = 0
+        self._top_ms = 0.0        # ms de etapas de primer nivel (las anidadas no se suman dos veces)
+        self.t0 = None
+        self.record = None
+
+    def _peak_now(self):
+        return tracemalloc.get_traced_memory()[1] if self.memory else 0
+
+    def _enter(self):
+        # Antes de reiniciar el pico, los marcos abiertos guardan el que llevan visto
+        if self.memory:
+            cur, peak = tracemalloc.get_traced_memory()
+            for frame in self._stack:
+                frame[1] = max(frame[1], peak)
+            tracemalloc.reset_peak()
+            self._stack.append([cur, cur])
+        return time.perf_counter()
+
+    def _exit(self, t0):
+        ms = (time.perf_counter() - t0) * 1000.0
+        peak_kb = 0.0
+        if self.memory:
+            base, seen = self._stack.pop()
+            peak = max(seen, self._peak_now())
+            peak_kb = max(peak - base, 0) / 1024.0
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+        return ms, peak_kb
+
+    @contextmanager
+    def stage(self, name):
+        t0 = self._enter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            ms, peak_kb = self._exit(t0)
+            if self._depth == 0:
+                self._top_ms += ms
+            s = self.stages.setdefault(name, {"ms": 0.0, "calls": 0, "peak_kb": 0.0})
+            s["ms"] += ms
+            s["calls"] += 1
+            s["peak_kb"] = max(s["peak_kb"], peak_kb)
+
+    def start(self):
+        if self.memory:
+            with _tracing_lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                _tracing["owners"] += 1
+        self.t0 = self._enter()
+        _local.profile = self
+        return self
+
+    def finish(self):
+        _local.profile = None
+        total_ms, peak_kb = self._exit(self.t0)
+        if self.memory:
+            with _tracing_lock:
+                _tracing["owners"] -= 1
+                if _tracing["owners"] == 0:
+                    tracemalloc.stop()
+        self.record = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "page": self.page,
+            "session": self.session,
+            "total_ms": round(total_ms, 3),
+            "peak_kb": round(peak_kb, 1),
+            # "other": el resto del script fuera de etapas (widgets, markdown, métricas...)
+            "other_ms": round(max(total_ms - self._top_ms, 0.0), 3),
+            "stages": {k: {"ms": round(v["ms"], 3), "calls": v["calls"], "peak_kb": round(v["peak_kb"], 1)}
+                       for k, v in self.stages.items()},
+        }
+        return self.record
+
+
+@contextmanager
+def stage(name):
+    # Marca una etapa del rerun actual; sin perfil activo es un no-op
+    prof = getattr(_local, "profile", None)
+    if prof is None:
+        yield
+        return
+    with prof.stage(name):
+        yield
+
+
+@contextmanager
+def profile_run(page, session=None, memory=None, log_path=None):
+    """
+    Perfila el bloque (un rerun completo) y, al salir, agrega el registro al log.
+    Uso en app.py: with profile_run(pg.title) as prof: pg.run()
+    """
+    prof = RunProfile(page, session=session, memory=memory).start()
+    try:
+        yield prof
+    finally:
+        record = prof.finish()
+        append_log(record, log_path or LOG_PATH)
+
+
+def append_log(record, path=LOG_PATH):
+    """
+    Agrega el registro a `path`: una línea JSON por rerun (.jsonl) o
+    una fila por etapa (.csv; la etapa "total" lleva el rerun completo).
+    """
+    with _log_lock:
+        if path.endswith(".csv"):
+            fields = ["ts", "page", "session", "stage", "ms", "calls", "peak_kb"]
+            new = not os.path.exists(path)
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                w = csv.DictWriter(f, fieldnames=fields)
+                if new:
+                    w.writeheader()
+                base = {k: record[k] for k in ("ts", "page", "session")}
+                w.writerow({**base, "stage": "total", "ms": record["total_ms"],
+                            "calls": 1, "peak_kb": record["peak_kb"]})
+                for name, s in record["stages"].items():
+                    w.writerow({**base, "stage": name, **s})
+        else:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def process_stats():
+    # Estado compartido del proceso (todas las sesiones): cachés, trabajos y precalentamiento
+    from .cache import RESULTS
+    from .figures import figure_cache_stats
+    from .jobs import jobs_stats
+    from .startup import warmup_status
+
+    return {"results": RESULTS.stats(), "figures": figure_cache_stats(), "jobs": jobs_stats(),
+            "warmup": warmup_status()}
+
+
+def render_panel(target, record, title="⏱️ Rendimiento de este rerun", process=None):
+    # Panel plegable con la tabla de etapas y el estado del proceso (target: st, st.sidebar o un
+    # contenedor); process: el dict de process_stats() (por omisión, el actual)
+    box = target.expander(title, expanded=False)
+    rows = [{"etapa": k, "ms": v["ms"], "llamadas": v["calls"], "pico (KiB)": v["peak_kb"]}
+            for k, v in sorted(record["stages"].items(), key=lambda kv: -kv[1]["ms"])]
+    rows.append({"etapa": "otros", "ms": record["other_ms"], "llamadas": None, "pico (KiB)": None})
+    rows.append({"etapa": "total", "ms": record["total_ms"], "llamadas": 1, "pico (KiB)": record["peak_kb"]})
+    box.caption(f"{record['page']} · {record['ts']}")
+    box.table(rows)
+    ps = process_stats() if process is None else process
+    for label, s in (("Caché de resultados", ps["results"]), ("Caché de figuras", ps["figures"])):
+        box.caption(f"{label}: {s['entries']:,} entradas, {s['bytes'] / 2**20:.1f} de "
+                    f"{s['max_bytes'] / 2**20:.0f} MB · {s['hits']:,} aciertos, {s['misses']:,} fallos, "
+                    f"{s['evictions']:,} desalojos")
+    j, w = ps["jobs"], ps["warmup"]
+    box.caption(f"Trabajos en segundo plano: {j['jobs']} ({j['running']} corriendo, {j['workers']} hilos, "
+                f"{j['bytes'] / 2**20:.1f} MB)")
+    if w["error"]:
+        box.caption(f"Precalentamiento: falló ({w['error']})")
+    elif w["timings"]:
+        box.caption(f"Precalentamiento: listo en {w['timings']['total'] * 1000:.0f} ms")
+    else:
+        box.caption(f"Precalentamiento: {'en curso' if w['state'] == 'running' else 'no iniciado'}")
+    return box
@@ -0,0 +1,158 @@
+# iolab/repeated.py
+# Juego de Cournot repetido jugado hacia adelante en muchas trayectorias Monte Carlo, con choques
+# de demanda a_t = a + σ z_t. El cartel es el de collusion_outcomes (reparto `cartel`) y el castigo
+# es el Cournot de la etapa. Estrategias:
+#   "grim"         gatillo: tras una ruptura, Cournot para siempre.
+#   "finite"       castigo de L periodos y vuelta al cartel.
+#   "green_porter" monitoreo imperfecto: nadie se desvía, pero si el precio cae bajo p̄ (por un
+#                  choque malo, que no se observa) hay guerra de precios de L periodos.
+# Con "grim"/"finite" el choque se observa antes de producir (Rotemberg–Saloner): la firma i
+# rompe el cartel si la ganancia de desviarse hoy supera la pérdida esperada del castigo.
+# Los choques se discretizan en una malla de `grid` valores de z: toda la etapa (precios,
+# ganancias, quién se desvía) se precalcula por punto de la malla y cada periodo solo indexa
+# tablas sobre el arreglo de trayectorias.
+from math import erf
+
+import numpy as np
+
+from ._util import as_float
+from .collusion import collusion_outcomes
+
+STRATEGIES = ("grim", "finite", "green_porter")
+Z_MAX = 4.0                # los choques se truncan en ±Z_MAX desviaciones estándar
+
+
+def _shock_grid(sigma, grid):
+    # Malla uniforme en z con la masa normal de cada celda (las colas van a los extremos)
+    if sigma <= 0:
+        return np.zeros(1), np.ones(1), 0.0
+    z = np.linspace(-Z_MAX, Z_MAX, grid)
+    dz = z[1] - z[0]
+    edges = np.r_[-40.0, z[:-1] + dz / 2, 40.0]
+    cdf = 0.5 * (1.0 + np.vectorize(erf)(edges / np.sqrt(2.0)))
+    return z, np.diff(cdf), dz
+
+
+def stage_tables(a, b, costs, delta, strategy="grim", sigma=0.0, punishment=1, trigger_price=None,
+                 grid=801, cartel="equal"):
+    """
+    Tablas por punto de la malla de choques: precio y ∑π en cartel (con la ruptura ya aplicada
+    donde alguien se desvía), en Cournot, la firma que rompe y la probabilidad de cada punto.
+    Retorna un dict; "threshold" es la pérdida esperada del castigo de cada firma.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"estrategia desconocida: {strategy!r} (opciones: {STRATEGIES})")
+    c = as_float(costs).ravel()
+    z, prob, dz = _shock_grid(float(sigma), int(grid))
+    a_g = np.maximum(float(a) + float(sigma) * z, 0.0)
+    res = collusion_outcomes(a_g, b, np.broadcast_to(c, (a_g.size, c.size)), cartel)
+    piC, piD, piN = res["piC"], res["piD"], res["piN"]
+    PC, PN = np.broadcast_to(res["PC"], a_g.shape), np.broadcast_to(res["PN"], a_g.shape)
+    L = int(punishment)
+    if strategy != "grim" and L < 1:
+        raise ValueError("el castigo debe durar al menos un periodo")
+
+    # Pérdida esperada de romper hoy: δ/(1-δ) (gatillo) o δ(1-δ^L)/(1-δ) periodos de E[π^C - π^N]
+    gap = prob @ (piC - piN)
+    if delta >= 1:
+        weight = np.inf if strategy == "grim" else float(L)
+    else:
+        weight = delta / (1 - delta) if strategy == "grim" else delta * (1 - delta ** L) / (1 - delta)
+    threshold = weight * gap
+    excess = piD - piC - threshold
+    breaker = excess.argmax(axis=1)
+    rows = np.arange(a_g.size)
+    tempt = (excess[rows, breaker] > 1e-12) if strategy != "green_porter" else np.zeros(a_g.size, bool)
+
+    # Periodo de ruptura: la que rompe produce q^D y las demás su cuota
+    qD_i = res["qD"][rows, breaker]
+    qC = res["qC"]
+    Q_dev = qC.sum(axis=1) - qC[rows, breaker] + qD_i
+    P_dev = a_g - b * Q_dev
+    q_dev = qC.copy()
+    q_dev[rows, breaker] = qD_i
+    PI_dev = (np.maximum(P_dev[:, None] - c, 0.0) * q_dev).sum(axis=1)
+
+    if trigger_price is None:
+        trigger_price = -np.inf
+    war = (PC < trigger_price) if strategy == "green_porter" else np.zeros(a_g.size, bool)
+    return {
+        "a": a_g, "prob": prob, "z0": -Z_MAX if z.size > 1 else 0.0, "dz": dz,
+        "price_C": np.where(tempt, P_dev, PC), "profit_C": np.where(tempt, PI_dev, piC.sum(axis=1)),
+        "price_N": PN, "profit_N": piN.sum(axis=1),
+        "break": tempt | war, "tempt": tempt, "breaker": breaker,
+        "threshold": threshold, "p_break": float(prob @ (tempt | war)),
+    }
+
+
+def repeated_game(a, b, costs, delta, strategy="grim", T=1000, paths=10_000, sigma=0.0, punishment=1,
+                  trigger_price=None, seed=0, grid=801, block=32, cartel="equal"):
+    """
+    Simula `paths` trayectorias de T periodos del Cournot repetido (ver STRATEGIES). Vectorizado
+    sobre trayectorias: cada periodo son unas pocas operaciones sobre arreglos (paths,).
+    Retorna un dict con, por trayectoria: duration (periodos hasta la primera ruptura; T si no
+    hubo), censored, wars (rupturas), collusive_share (fracción de periodos en cartel), price y
+    profit (promedios por periodo) y value ((1-δ)∑δᵗ∑π); además colluding (T,) (fracción de
+    trayectorias en cartel en cada t), breaks_by_firm (N,) (desvíos por firma; las guerras de
+    Green–Porter no cuentan) y la etapa (stage_tables).
+    """
+    c = as_float(costs).ravel()
+    T, paths = int(T), int(paths)
+    st = stage_tables(a, b, c, delta, strategy, sigma, punishment, trigger_price, grid, cartel)
+    rng = np.random.default_rng(seed)
+    n_g = st["a"].size
+    # Tablas apiladas [cartel; castigo]: el índice g + n_g·(en castigo) elige ambas cosas a la vez
+    price = np.r_[st["price_C"], st["price_N"]]
+    profit = np.r_[st["profit_C"], st["profit_N"]]
+    brk = np.r_[st["break"], np.zeros(n_g, bool)]
+    tempt, breaker = st["tempt"], st["breaker"]
+    L = -1 if strategy == "grim" else int(punishment)
+
+    phase = np.zeros(paths, dtype=np.int32)         # 0: cartel; k > 0: castigo restante; -1: para siempre
+    duration = np.full(paths, T, dtype=np.int32)
+    wars = np.zeros(paths, dtype=np.int32)
+    in_cartel = np.zeros(paths, dtype=np.int32)
+    price_sum = np.zeros(paths)
+    profit_sum = np.zeros(paths)
+    value = np.zeros(paths)
+    colluding = np.empty(T)
+    breaks_by_firm = np.zeros(c.size, dtype=np.int64)
+    disc = 1.0
+    for t0 in range(0, T, block):
+        nb = min(block, T - t0)
+        if n_g > 1:
+            z = rng.standard_normal((nb, paths), dtype=np.float32)
+            idx = np.clip(np.rint((z - st["z0"]) / st["dz"]), 0, n_g - 1).astype(np.intp)
+        else:
+            idx = np.zeros((nb, paths), dtype=np.intp)
+        for s in range(nb):
+            t = t0 + s
+            g = idx[s]
+            coll = phase == 0
+            n_coll = np.count_nonzero(coll)
+            colluding[t] = n_coll / paths
+            k = g + np.where(coll, 0, n_g)
+            pi_t = profit[k]
+            price_sum += price[k]
+            profit_sum += pi_t
+            value += disc * pi_t
+            disc *= delta
+            in_cartel += coll
+            broke = brk[k]
+            # Castigo: cuenta regresiva (los de por vida quedan en -1)
+            if n_coll < paths:
+                phase = np.where(phase > 0, phase - 1, phase)
+            if broke.any():
+                hit = np.flatnonzero(broke)
+                phase[hit] = L
+                wars[hit] += 1
+                first = hit[duration[hit] == T]
+                duration[first] = t
+                gh = g[hit]
+                breaks_by_firm += np.bincount(breaker[gh[tempt[gh]]], minlength=c.size)
+    return {
+        "duration": duration, "censored": wars == 0, "wars": wars,
+        "collusive_share": in_cartel / T, "price": price_sum / T, "profit": profit_sum / T,
+        "value": (1 - delta) * value if delta < 1 else profit_sum / T,
+        "colluding": colluding, "breaks_by_firm": breaks_by_firm, "stage": st,
+    }
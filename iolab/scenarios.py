@@ -0,0 +1,200 @@
+# iolab/scenarios.py
+# Almacén de escenarios en disco (SQLite): cada escenario se identifica por el hash de su
+# contenido (página + parámetros normalizados), así que el mismo escenario guardado por varias
+# sesiones se calcula y se guarda una sola vez; cada sesión solo agrega su etiqueta (nombre).
+# Los parámetros escalares van además a una tabla (hash, clave, valor) con índice para buscar
+# por parámetros sin leer los JSON. Una conexión por operación: sirve desde cualquier hilo.
+# Retención: cada save() deja solo las últimas KEEP_PER_OWNER capturas de quien guarda y
+# MAX_LABELS en total; los escenarios que se quedan sin etiqueta se borran.
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import numpy as np
+
+from .cache import make_key
+
+STORE_PATH = os.environ.get("IOLAB_SCENARIOS", "iolab_scenarios.sqlite")
+KEEP_PER_OWNER = int(os.environ.get("IOLAB_SCENARIOS_KEEP", 500))
+MAX_LABELS = int(os.environ.get("IOLAB_SCENARIOS_MAX", 100_000))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    hash TEXT PRIMARY KEY, page TEXT NOT NULL, params TEXT NOT NULL, results TEXT NOT NULL,
+    created REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS scenario_params (
+    hash TEXT NOT NULL REFERENCES scenarios(hash) ON DELETE CASCADE, key TEXT NOT NULL, value);
+CREATE INDEX IF NOT EXISTS scenario_params_kv ON scenario_params (key, value, hash);
+CREATE INDEX IF NOT EXISTS scenarios_page ON scenarios (page, created);
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, hash TEXT NOT NULL REFERENCES scenarios(hash) ON DELETE CASCADE,
+    name TEXT NOT NULL, owner TEXT NOT NULL, created REAL NOT NULL, UNIQUE (hash, name, owner));
+CREATE INDEX IF NOT EXISTS labels_owner ON labels (owner, created);
+CREATE INDEX IF NOT EXISTS labels_hash ON labels (hash);
+"""
+_ready = set()
+_ready_lock = threading.Lock()
+
+
+def _connect(path):
+    path = path or STORE_PATH
+    con = sqlite3.connect(path, timeout=30)
+    con.execute("PRAGMA foreign_keys = ON")
+    if path not in _ready:
+        with _ready_lock:                             # varias sesiones pueden abrir el almacén a la vez
+            if path not in _ready:
+                con.execute("PRAGMA journal_mode = WAL")      # lectores y un escritor a la vez
+                con.executescript(_SCHEMA)
+                _ready.add(path)
+    return con
+
+
+def _prune(con, owner):
+    # Borra las etiquetas más viejas que las últimas KEEP_PER_OWNER de `owner` y MAX_LABELS en
+    # total (los id crecen con el tiempo), y los escenarios que quedan sin ninguna
+    hashes = set()
+    for where, args, keep in (("WHERE owner = ?", (owner,), KEEP_PER_OWNER), ("", (), MAX_LABELS)):
+        row = con.execute(f"SELECT id FROM labels {where} ORDER BY id DESC LIMIT 1 OFFSET ?",
+                          (*args, keep)).fetchone()
+        if row is None:
+            continue
+        cond = f"{where} AND id <= ?" if where else "WHERE id <= ?"
+        hashes.update(h for (h,) in con.execute(f"SELECT DISTINCT hash FROM labels {cond}", (*args, row[0])))
+        con.execute(f"DELETE FROM labels {cond}", (*args, row[0]))
+    con.executemany("DELETE FROM scenarios WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM labels WHERE hash = ?)",
+                    [(h, h) for h in hashes])
+
+
+def _canonical(value):
+    # Números -> float (int si es entero), arreglos -> listas: 2, 2.0 y np.float64(2) son el
+    # mismo escenario
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        x = float(value)
+        return int(x) if x.is_integer() and abs(x) < 2**53 else x
+    if value is None or isinstance(value, str):
+        return value
+    raise TypeError(f"parámetro no guardable: {type(value).__name__}")
+
+
+def scenario_hash(page, params):
+    """Hash del contenido del escenario (página + parámetros normalizados)."""
+    return make_key(page, _canonical(params))
+
+
+def save(page, params, compute, name, owner="", path=None):
+    """
+    Guarda el escenario `params` de `page` con la etiqueta `name` de `owner`. compute() (que
+    retorna un dict de resultados serializable) solo se llama si el escenario no estaba ya
+    guardado. Retorna (hash, nuevo): nuevo es False si otro ya lo había calculado.
+    """
+    params = _canonical(params)
+    h = make_key(page, params)
+    now = time.time()
+    with closing(_connect(path)) as con:
+        new = con.execute("SELECT 1 FROM scenarios WHERE hash = ?", (h,)).fetchone() is None
+        if new:
+            results = json.dumps(_canonical(compute()))
+            with con:
+                cur = con.execute("INSERT OR IGNORE INTO scenarios VALUES (?, ?, ?, ?, ?)",
+                                  (h, page, json.dumps(params), results, now))
+                new = cur.rowcount == 1
+                if new:
+                    con.executemany("INSERT INTO scenario_params VALUES (?, ?, ?)",
+                                    [(h, k, v) for k, v in params.items() if not isinstance(v, (list, dict))])
+        with con:
+            con.execute("INSERT OR IGNORE INTO labels (hash, name, owner, created) VALUES (?, ?, ?, ?)",
+                        (h, str(name), str(owner), now))
+            _prune(con, str(owner))
+    return h, new
+
+
+def find(page=None, owner=None, limit=1000, path=None, **where):
+    """
+    Capturas (una fila por etiqueta) más recientes primero. `where`: parámetros escalares, con
+    un valor (igualdad) o una tupla (lo, hi) (rango cerrado); cada uno usa el índice
+    (clave, valor). owner=None: las de todas las sesiones. Retorna una lista de dicts con
+    id, name, owner, created, hash, page, params y results (dicts).
+    """
+    sql = ["SELECT l.id, l.name, l.owner, l.created, s.hash, s.page, s.params, s.results "
+           "FROM labels l JOIN scenarios s ON s.hash = l.hash WHERE 1"]
+    args = []
+    if page is not None:
+        sql.append("AND s.page = ?"); args.append(page)
+    if owner is not None:
+        sql.append("AND l.owner = ?"); args.append(str(owner))
+    for k, v in where.items():
+        if isinstance(v, tuple):
+            sql.append("AND s.hash IN (SELECT hash FROM scenario_params WHERE key = ? AND value BETWEEN ? AND ?)")
+            args += [k, *_canonical(v)]
+        else:
+            sql.append("AND s.hash IN (SELECT hash FROM scenario_params WHERE key = ? AND value = ?)")
+            args += [k, _canonical(v)]
+    sql.append("ORDER BY l.created DESC, l.id DESC LIMIT ?"); args.append(int(limit))
+    with closing(_connect(path)) as con:
+        rows = con.execute(" ".join(sql), args).fetchall()
+    cols = ("id", "name", "owner", "created", "hash", "page", "params", "results")
+    out = []
+    for row in rows:
+        r = dict(zip(cols, row))
+        r["params"], r["results"] = json.loads(r["params"]), json.loads(r["results"])
+        out.append(r)
+    return out
+
+
+def delete(label_id, path=None):
+    """Borra una etiqueta; el escenario se borra también si ya nadie lo tiene etiquetado."""
+    with closing(_connect(path)) as con, con:
+        row = con.execute("SELECT hash FROM labels WHERE id = ?", (int(label_id),)).fetchone()
+        if row is None:
+            return False
+        con.execute("DELETE FROM labels WHERE id = ?", (int(label_id),))
+        con.execute("DELETE FROM scenarios WHERE hash = ? AND NOT EXISTS "
+                    "(SELECT 1 FROM labels WHERE hash = ?)", (row[0], row[0]))
+    return True
+
+
+def _fmt(x):
+    return f"{x:.2f}" if isinstance(x, (int, float)) and not isinstance(x, bool) else str(x)
+
+
+def to_frame(rows):
+    """Filas de find() como DataFrame plano: etiqueta, parámetros y resultados en columnas."""
+    import pandas as pd
+
+    flat = [{"escenario": r["name"], "guardado": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r["created"])),
+             **{k: ", ".join(_fmt(x) for x in v) if isinstance(v, list) else v for k, v in r["params"].items()},
+             **r["results"], "hash": r["hash"][:12]} for r in rows]
+    return pd.DataFrame(flat)
+
+
+def export(rows, fmt="csv"):
+    """Exportación en bloque de filas de find(): bytes en CSV, Parquet o JSON (una fila por línea)."""
+    df = to_frame(rows)
+    if fmt == "csv":
+        return df.to_csv(index=False).encode()
+    if fmt == "parquet":
+        import io
+
+        buf = io.BytesIO()
+        df.to_parquet(buf, index=False)
+        return buf.getvalue()
+    if fmt == "json":
+        return df.to_json(orient="records", lines=True, date_format="iso").encode()
+    raise ValueError(f"formato desconocido: {fmt!r} (csv, parquet o json)")
+
+
+def store_stats(path=None):
+    with closing(_connect(path)) as con:
+        n_s = con.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
+        n_l = con.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+    p = path or STORE_PATH
+    return {"scenarios": n_s, "labels": n_l, "bytes": os.path.getsize(p) if os.path.exists(p) else 0}
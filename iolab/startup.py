@@ -0,0 +1,142 @@
+# iolab/startup.py
+# Arranque en frío: importaciones diferidas y precalentamiento del proceso del servidor.
+# Las páginas solo cargan matplotlib al dibujar (iolab.figures.subplots, sin pyplot): si todas
+# sus figuras salen de la caché, no se importa. app.py lanza warm_up() en segundo plano una vez por proceso.
+import importlib
+import io
+import sys
+import threading
+import time
+import types
+
+
+class _LazyModule(types.ModuleType):
+    # Proxy de módulo: el primer acceso a un atributo hace el import real
+    def __getattr__(self, attr):
+        mod = self.__dict__.get("_module")
+        if mod is None:
+            # import_module es seguro entre hilos (lock por módulo del sistema de imports)
+            mod = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = mod
+        return getattr(mod, attr)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+
+def lazy_import(name):
+    """
+    Módulo `name` diferido hasta su primer uso.
+    Si ya está importado se retorna tal cual (sin proxy).
+    Uso: plt = lazy_import("matplotlib.pyplot")
+    """
+    mod = sys.modules.get(name)
+    if mod is not None:
+        return mod
+    return _LazyModule(name)
+
+
+def _draw_probe():
+    # Figura pequeña que ejercita lo que usan las páginas: ejes, texto, mathtext, leyenda, relleno
+    import numpy as np
+
+    from .figures import subplots
+
+    fig, ax = subplots(figsize=(3, 2))
+    x = np.linspace(0, 1, 50)
+    ax.plot(x, 1 - x, label="P(Q)")
+    ax.fill_between(x, 0.5, 1 - x, where=(1 - x) > 0.5, alpha=0.3, label="CS")
+    ax.set_xlabel(r"$Q$")
+    ax.set_ylabel(r"$\delta^*$, $\pi_i$")
+    ax.set_title("warm-up")
+    ax.legend()
+    return fig
+
+
+def warm_up():
+    """
+    Paga los costos de primera vez en el proceso actual y retorna los tiempos (s) por etapa:
+    imports pesados, caché de fuentes de matplotlib, primera llamada a los solvers
+    y primera figura rasterizada (no se guarda en la caché de figuras).
+    """
+    timings = {}
+
+    def stage(name, fn):
+        t0 = time.perf_counter()
+        fn()
+        timings[name] = time.perf_counter() - t0
+
+    def fonts():
+        from matplotlib import font_manager, rcParams
+
+        # fontManager construye (o lee) la caché de fuentes; findfont resuelve la familia por defecto
+        font_manager.findfont(font_manager.FontProperties(family=rcParams["font.family"]))
+
+    def solve():
+        import numpy as np
+
+        from .collusion import collusion_outcomes
+        from .monopoly import monopoly_linear
+        from .oligopoly import cournot_asim
+
+        monopoly_linear(100.0, 1.0, np.array([10.0, 20.0]))
+        cournot_asim(100.0, 1.0, np.array([[10.0, 20.0, 30.0]]))
+        collusion_outcomes(100.0, 1.0, np.array([10.0, 10.0, 10.0]))
+
+    def render():
+        from .figures import release
+
+        fig = _draw_probe()
+        try:
+            fig.savefig(io.BytesIO(), format="png", dpi=100, bbox_inches="tight")
+        finally:
+            release(fig)
+
+    stage("import_numpy", lambda: importlib.import_module("numpy"))
+    stage("import_pandas", lambda: importlib.import_module("pandas"))
+    stage("import_matplotlib", lambda: importlib.import_module("matplotlib"))
+    stage("font_cache", fonts)
+    stage("import_backend", lambda: (importlib.import_module("matplotlib.figure"),
+                                     importlib.import_module("matplotlib.backends.backend_agg")))
+    stage("first_solve", solve)
+    stage("first_render", render)
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+_WARMUP = {"thread": None, "timings": None, "error": None}
+_WARMUP_LOCK = threading.Lock()
+
+
+def start_warmup():
+    """
+    Lanza warm_up() en un hilo daemon, una sola vez por proceso (llamadas repetidas no hacen nada).
+    Así la primera página no espera a matplotlib si el precalentamiento ya terminó.
+    """
+    with _WARMUP_LOCK:
+        if _WARMUP["thread"] is not None:
+            return _WARMUP["thread"]
+
+        def run():
+            try:
+                _WARMUP["timings"] = warm_up()
+            except Exception as e:      # el precalentamiento nunca debe tumbar la app
+                _WARMUP["error"] = repr(e)
+
+        t = threading.Thread(target=run, name="iolab-warmup", daemon=True)
+        _WARMUP["thread"] = t
+        t.start()
+        return t
+
+
+def warmup_status():
+    # "pending", "running" o "done"; con tiempos por etapa o el error si lo hubo
+    t = _WARMUP["thread"]
+    state = "pending" if t is None else ("running" if t.is_alive() else "done")
+    return {"state": state, "timings": _WARMUP["timings"], "error": _WARMUP["error"]}
+
+
+if __name__ == "__main__":
+    # python -m iolab.startup: precalienta (p. ej. al construir la imagen, para dejar la caché de fuentes en disco)
+    for name, secs in warm_up().items():
+        print(f"{name:<18} {secs*1000:9.1f} ms")
@@ -0,0 +1,61 @@
+# iolab/vertical.py
+# Doble marginalización: upstream U con costo c_U vende a N minoristas con costo c_D.
+# Todas las funciones aceptan escalares o arreglos y retornan dicts sin redondear.
+import numpy as np
+
+from ._util import as_float, out
+
+
+def _cs(a, P, Q):
+    # Con P(Q)=a-bQ: CS = 0.5 * Q * (a - P)
+    return 0.5 * Q * (a - P)
+
+
+def regime_vi(a, b, cU, cD):
+    # Integración vertical = monopolio con costo marginal cU + cD
+    a, b = as_float(a), as_float(b)
+    c = as_float(cU) + as_float(cD)
+    p = (a + c)/2.0
+    Q = (a - p)/b            # = (a - c)/(2b)
+    pi = (p - c)*Q
+    CS = _cs(a, p, Q)
+    return {
+        "w": None, "p": out(p), "P": out(p), "Q": out(Q),
+        "pi_U": None, "pi_D": None, "pi_total": out(pi),
+        "CS": out(CS), "PS": out(pi), "W": out(CS + pi),
+    }
+
+
+def dm_opt_w(a, cU, cD):
+    # Óptimo de U (con N minoristas Cournot también): w* = (a - cD + cU)/2
+    return (as_float(a) - as_float(cD) + as_float(cU))/2.0
+
+
+def dm_outcomes(a, b, cU, cD, N):
+    # DM con N minoristas simétricos (Cournot abajo).
+    # U elige w*; cada minorista compite en cantidades con costo marginal c_eff = w + cD.
+    # Con N=1 el precio coincide con p = (a + w + cD)/2.
+    a, b, N = as_float(a), as_float(b), as_float(N)
+    w = dm_opt_w(a, cU, cD)
+    c_eff = w + as_float(cD)
+    Q = N * (a - c_eff) / (b * (N + 1))
+    P = a - b*Q
+    pi_D = (P - c_eff) * Q           # suma de minoristas
+    pi_U = (w - as_float(cU)) * Q
+    CS = _cs(a, P, Q)
+    PS = pi_U + pi_D
+    return {
+        "w": out(w), "p": out(np.where(N == 1, P, np.nan)), "P": out(P), "Q": out(Q),
+        "pi_U": out(pi_U), "pi_D": out(pi_D), "pi_total": out(PS),
+        "CS": out(CS), "PS": out(PS), "W": out(CS + PS),
+    }
+
+
+def regime_tpt(a, b, cU, cD, F=0.0):
+    # Tarifa en dos partes: w = cU; reproduce VI en p y Q. F redistribuye rentas.
+    res = dict(regime_vi(a, b, cU, cD))
+    res.update({
+        "w": out(as_float(cU)), "pi_U": out(as_float(F)),
+        "pi_D": out(res["pi_total"] - as_float(F)),
+    })
+    return res
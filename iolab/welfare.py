@@ -0,0 +1,29 @@
+# iolab/welfare.py
+# Excedentes con demanda lineal P(Q)=a-bQ.
+import numpy as np
+
+from ._util import as_float, out
+
+
+def cs_linear(a, P, Q):
+    # CS = 0.5 * Q * (a - P); cero si no hay ventas o P >= a
+    a, P, Q = as_float(a), as_float(P), as_float(Q)
+    return out(np.where((Q <= 0) | (P >= a), 0.0, 0.5 * (a - P) * Q))
+
+
+def welfare_metrics(a, b, q, P, costs):
+    """
+    CS, PS, TS y DWL de un oligopolio con costos marginales constantes.
+    q y costs tienen forma (..., N); a, b y P forma (...).
+    El óptimo competitivo es P = c_min (PS competitivo = 0).
+    """
+    q, costs = as_float(q), as_float(costs)
+    a, b, P = as_float(a), as_float(b), as_float(P)
+    Q = q.sum(axis=-1)
+    CS = 0.5 * Q * (a - P)
+    PS = ((P[..., None] - costs) * q).sum(axis=-1)
+    cmin = costs.min(axis=-1)
+    TS_pc = np.where(a <= cmin, 0.0, 0.5 * (a - cmin)**2 / b)
+    TS = CS + PS
+    DWL = np.maximum(TS_pc - TS, 0.0)
+    return out(CS), out(PS), out(TS), out(DWL)
@@ -3,17 +3,193 @@
 # Esta página reproduce el visualizador de Cournot con dos gráficas:
 # 1) Cruce de mejores respuestas (plano (q1, q2) + bisectriz y regiones)
 # 2) Demanda inversa con excedente del consumidor (triángulo), P* y Q*
-# Asumimos solución interior.
+# Asumimos solución interior. Con "Demanda → General" la página resuelve numéricamente
+# demandas no lineales y costos convexos (iolab.general).
 #
 # Importante: este archivo NO modifica tu script original; es una versión
 # autónoma para integrarse al multipágina.
 
 import numpy as np
-import matplotlib.pyplot as plt
 import streamlit as st
 
+from iolab import br1, br2, cournot_interior, cs_linear
+from iolab.cache import memoize
+from iolab.general import best_response_general, cournot_general, inverse_demand
+from iolab import charts
+from iolab.charts import show_chart
+from iolab.figures import show_figure, subplots
+from iolab.profiling import stage
+
 st.title("Duopolio de Cournot")
 
+# -----------------------------
+# Demanda general: P(Q) no lineal y costos cᵢq + dᵢq²/2, resuelto numéricamente
+# -----------------------------
+FAMILIES = {
+    "Isoelástica: P = A·Q^(−1/ε)": "isoelastic",
+    "Exponencial: P = a·e^(−bQ)": "exponential",
+    "Lineal por tramos (pendiente b₁ hasta Qₖ, b₂ después)": "piecewise",
+    "Lineal: P = a − bQ": "linear",
+}
+SWEEP_POINTS = 300
+
+
+@memoize
+def general_equilibrium(kind, params, c, d):
+    return cournot_general(kind, params, c, d)
+
+
+@memoize
+def general_br(kind, params, c, d, q_max):
+    grid = np.linspace(0, q_max, 400)
+    return grid, best_response_general(kind, params, c, d, grid)
+
+
+@memoize
+def general_sweep(kind, params, c, d, c1_max):
+    # Todos los equilibrios del barrido de c₁ en una sola llamada (lote de SWEEP_POINTS mercados)
+    c1 = np.linspace(0.0, c1_max, SWEEP_POINTS)
+    cc = np.column_stack([c1, np.full(SWEEP_POINTS, c[1])])
+    res = cournot_general(kind, params, cc, np.asarray(d))
+    return c1, res["q"][:, 0], res["q"][:, 1], res["P"], res["converged"], res["iterations"]
+
+
+def general_view():
+    with st.sidebar:
+        kind = FAMILIES[st.selectbox("Familia de demanda", list(FAMILIES), key="duo_family")]
+        if kind == "isoelastic":
+            params = (st.number_input("Escala A", value=100.0, step=5.0, min_value=0.01, key="duo_A"),
+                      st.number_input("Elasticidad ε (>½ para duopolio)", value=1.5, step=0.1, min_value=0.05,
+                                      format="%.2f", key="duo_eps"))
+        elif kind == "exponential":
+            params = (st.number_input("Precio máximo a", value=100.0, step=5.0, min_value=0.01, key="duo_ea"),
+                      st.number_input("Semielasticidad b", value=0.02, step=0.005, min_value=0.0001,
+                                      format="%.4f", key="duo_eb"))
+        elif kind == "piecewise":
+            params = (st.number_input("Intercepto a", value=100.0, step=1.0, min_value=0.0, key="duo_pa"),
+                      st.number_input("Pendiente b₁", value=0.5, step=0.1, min_value=0.0001, format="%.4f",
+                                      key="duo_pb1"),
+                      st.number_input("Quiebre Qₖ", value=50.0, step=5.0, min_value=0.0, key="duo_pQk"),
+                      st.number_input("Pendiente b₂", value=2.0, step=0.1, min_value=0.0001, format="%.4f",
+                                      key="duo_pb2"))
+        else:
+            params = (st.number_input("Intercepto a", value=100.0, step=1.0, min_value=0.0, key="duo_la"),
+                      st.number_input("Pendiente b", value=1.0, step=0.1, min_value=0.0001, format="%.4f",
+                                      key="duo_lb"))
+        params = tuple(float(p) for p in params)
+        c = (st.number_input("Costo marginal firma 1 (c1)", value=20.0, step=1.0, min_value=0.0, key="duo_gc1"),
+             st.number_input("Costo marginal firma 2 (c2)", value=30.0, step=1.0, min_value=0.0, key="duo_gc2"))
+        d = (st.number_input("Convexidad del costo d1", value=0.0, step=0.1, min_value=0.0, key="duo_gd1"),
+             st.number_input("Convexidad del costo d2", value=0.0, step=0.1, min_value=0.0, key="duo_gd2"))
+        st.caption("Costo Cᵢ(q) = cᵢq + dᵢq²/2. Con d = 0 y demanda lineal coincide con las fórmulas cerradas.")
+    c, d = np.array(c, dtype=float), np.array(d, dtype=float)
+
+    try:
+        with stage("solve"):
+            res = general_equilibrium(kind, params, c, d)
+    except ValueError as e:
+        st.error(f"Parámetros inválidos: {e}")
+        return
+    (q1s, q2s), Qs, Ps = res["q"], float(res["Q"]), float(res["P"])
+    if not res["converged"]:
+        st.warning(f"Newton no convergió (residuo {float(res['residual']):.2e}); el punto mostrado es aproximado.")
+    elif not res["soc"]:
+        st.warning("La condición de segundo orden falla en el punto encontrado: no es un máximo local.")
+
+    q_max = max(1.5 * Qs, 1.0)
+    col1, col2 = st.columns(2, gap="large")
+    with col1:
+        st.subheader("1) Cruce de mejores respuestas")
+
+        def draw_br_general():
+            grid, r1 = general_br(kind, params, c[0], d[0], q_max)
+            _, r2 = general_br(kind, params, c[1], d[1], q_max)
+            fig1, ax1 = subplots(figsize=(6.2, 5.2))
+            ax1.plot(grid, r2, label="BR firma 2: q₂(q₁)")
+            ax1.plot(r1, grid, label="BR firma 1: q₁(q₂)")
+            ax1.plot([0, q_max], [0, q_max], linestyle=":", linewidth=1.2, label="Bisectriz: q₂=q₁")
+            ax1.scatter([q1s], [q2s], zorder=5)
+            ax1.annotate(fr"({q1s:.2f}, {q2s:.2f})", (q1s, q2s), textcoords="offset points", xytext=(8, 6))
+            ax1.set_xlabel("q₁"); ax1.set_ylabel("q₂")
+            ax1.set_xlim(0, q_max); ax1.set_ylim(0, q_max)
+            ax1.grid(True, linewidth=0.5, alpha=0.5)
+            ax1.legend(loc="best")
+            return fig1
+
+        show_figure(st, "cournot/general_br", (kind, params, c, d), draw_br_general)
+    with col2:
+        st.subheader("2) Demanda inversa con excedente del consumidor, P* y Q*")
+
+        def draw_demand_general():
+            Q_line = np.linspace(q_max / 400, q_max, 400)
+            P_line = inverse_demand(kind, Q_line, *params)[0]
+            fig2, ax2 = subplots(figsize=(6.2, 5.2))
+            ax2.plot(Q_line, np.maximum(P_line, 0.0), label="Demanda inversa P(Q)")
+            inside = Q_line <= Qs
+            ax2.fill_between(Q_line[inside], P_line[inside], Ps, alpha=0.2, label="Excedente del consumidor")
+            ax2.axvline(Qs, linestyle="--")
+            ax2.axhline(Ps, linestyle="--")
+            ax2.scatter([Qs], [Ps], zorder=5)
+            ax2.set_xlabel("Q"); ax2.set_ylabel("P")
+            ax2.set_xlim(0, q_max)
+            ax2.set_ylim(0, max(3 * Ps, Ps + 1.0))
+            ax2.grid(True, linewidth=0.5, alpha=0.5)
+            ax2.legend(loc="best")
+            return fig2
+
+        show_figure(st, "cournot/general_demanda", (kind, params, c, d), draw_demand_general)
+
+    st.markdown("---")
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("q₁*", f"{q1s:.2f}")
+    m2.metric("q₂*", f"{q2s:.2f}")
+    m3.metric("Q*", f"{Qs:.2f}")
+    m4.metric("P*", f"{Ps:.2f}")
+    CS = float(res["CS"])
+    st.caption(f"Excedente del consumidor ≈ {CS:.2f}" if np.isfinite(CS) else "Excedente del consumidor infinito (ε ≤ 1)")
+    st.caption(f"π₁ = {res['pi'][0]:.2f}, π₂ = {res['pi'][1]:.2f} · Newton: {int(res['iterations'])} iteraciones, "
+               f"residuo {float(res['residual']):.1e}")
+
+    # Barrido: un lote de SWEEP_POINTS equilibrios (uno por valor de c₁) en una llamada
+    st.subheader("Barrido del costo de la firma 1")
+    c1_max = max(2.0 * Ps, c[0] + 1.0)
+    with stage("solve"):
+        c1, s1, s2, sP, conv, its = general_sweep(kind, params, c, d, c1_max)
+
+    def draw_sweep():
+        fig3, ax3 = subplots()
+        ax3.plot(c1, s1, label="q₁*")
+        ax3.plot(c1, s2, label="q₂*")
+        ax3.plot(c1, sP, label="P*")
+        ax3.axvline(c[0], linestyle=":", color="#444")
+        ax3.set_xlabel("c₁"); ax3.set_ylabel("Cantidad / precio")
+        ax3.legend()
+        return fig3
+
+    show_chart(st, "cournot/general_barrido", (kind, params, c, d, c1_max), draw_sweep,
+               spec=lambda: charts.lines_spec(c1, {"q₁*": s1, "q₂*": s2, "P*": sP}, "Equilibrio según c₁",
+                                              "c₁", "Cantidad / precio", rule=c[0]))
+    st.caption(f"{SWEEP_POINTS} equilibrios resueltos en una llamada: {int(conv.sum())} convergieron, "
+               f"máx. {int(its.max())} iteraciones de Newton.")
+
+    with st.expander("Fórmulas usadas"):
+        st.markdown(
+            r"""
+- **FOC** de cada firma: \( P(Q) + P'(Q)\,q_i - c_i - d_i q_i = 0 \) si \(q_i>0\) (y \(\le 0\) si \(q_i=0\)).
+- **Newton amortiguado**: el jacobiano es \( \operatorname{diag}(P'-d_i) + (P' + P''q_i)\,\mathbf 1^\top \),
+  diagonal más rango uno; el paso se acorta a la mitad mientras el residuo \( \max_i|\min(q_i,-g_i)| \) no baje.
+- **Segundo orden**: \( 2P' + P''q_i - d_i < 0 \) en las firmas activas.
+- **CS**: \( \int_0^{Q^*} P(x)\,dx - P^*Q^* \). Lineal por tramos: el quiebre se suaviza en \(Q_k \pm 2\%\).
+            """
+        )
+
+
+with st.sidebar:
+    demand_mode = st.radio("Demanda", ["Lineal (fórmulas cerradas)", "General (numérica)"], key="duo_demand")
+if demand_mode != "Lineal (fórmulas cerradas)":
+    general_view()
+    st.stop()
+
 # -----------------------------
 # Sidebar de parámetros
 # -----------------------------
@@ -25,30 +201,12 @@ with st.sidebar:
     c2 = st.number_input("Costo marginal firma 2 (c2)", value=30.0,   step=1.0, min_value=0.0, format="%.2f")
     st.caption("Ejemplo: a=100, b=1, c1=20, c2=30 (solución interior).")
 
-# -----------------------------
-# Funciones
-# -----------------------------
-def cournot_interior(a, b, c1, c2):
-    q1 = (a - 2*c1 + c2) / (3*b)
-    q2 = (a - 2*c2 + c1) / (3*b)
-    Q  = q1 + q2
-    P  = a - b*Q
-    return q1, q2, Q, P
-
-def br1(q2, a, b, c1):  # q1(q2)
-    return (a - c1 - b*q2) / (2*b)
-
-def br2(q1, a, b, c2):  # q2(q1)
-    return (a - c2 - b*q1) / (2*b)
-
-def cs_linear(a, P, Q):
-    return 0.0 if (Q <= 0 or P >= a) else 0.5 * (a - P) * Q
-
 # -----------------------------
 # Cálculo del equilibrio
 # -----------------------------
-q1s, q2s, Qs, Ps = cournot_interior(a, b, c1, c2)
-CS = cs_linear(a, Ps, Qs)
+with stage("solve"):
+    q1s, q2s, Qs, Ps = cournot_interior(a, b, c1, c2)
+    CS = cs_linear(a, Ps, Qs)
 
 # Rango para gráficas
 q_sum_star = max(q1s + q2s, 1.0)
@@ -61,68 +219,77 @@ col1, col2 = st.columns(2, gap="large")
 # ---------------------------------
 with col1:
     st.subheader("1) Cruce de mejores respuestas")
-    fig1, ax1 = plt.subplots(figsize=(6.2, 5.2))
 
-    q1_grid = np.linspace(0, q_max, 400)
-    q2_grid = np.linspace(0, q_max, 400)
+    def draw_br_crossing():
+        fig1, ax1 = subplots(figsize=(6.2, 5.2))
+
+        q1_grid = np.linspace(0, q_max, 400)
+        q2_grid = np.linspace(0, q_max, 400)
+
+        # BR2: y = q2(q1)
+        ax1.plot(q1_grid, br2(q1_grid, a, b, c2), label="BR firma 2: q₂(q₁)")
+        # BR1: x = q1(q2), y = q2  (para dibujarla en el plano (q1, q2))
+        ax1.plot(br1(q2_grid, a, b, c1), q2_grid, label="BR firma 1: q₁(q₂)")
 
-    # BR2: y = q2(q1)
-    ax1.plot(q1_grid, br2(q1_grid, a, b, c2), label="BR firma 2: q₂(q₁)")
-    # BR1: x = q1(q2), y = q2  (para dibujarla en el plano (q1, q2))
-    ax1.plot(br1(q2_grid, a, b, c1), q2_grid, label="BR firma 1: q₁(q₂)")
+        # Bisectriz q2 = q1
+        ax1.plot([0, q_max], [0, q_max], linestyle=":", linewidth=1.2, label="Bisectriz: q₂=q₁")
 
-    # Bisectriz q2 = q1
-    ax1.plot([0, q_max], [0, q_max], linestyle=":", linewidth=1.2, label="Bisectriz: q₂=q₁")
+        # Punto de equilibrio
+        ax1.scatter([q1s], [q2s], zorder=5)
+        ax1.annotate(fr"({q1s:.2f}, {q2s:.2f})", (q1s, q2s), textcoords="offset points", xytext=(8, 6))
 
-    # Punto de equilibrio
-    ax1.scatter([q1s], [q2s], zorder=5)
-    ax1.annotate(fr"({q1s:.2f}, {q2s:.2f})", (q1s, q2s), textcoords="offset points", xytext=(8, 6))
+        # Etiquetas de regiones
+        ax1.text(0.72*q_max, 0.86*q_max, "q₁ < q₂", fontsize=11, alpha=0.85)
+        ax1.text(0.86*q_max, 0.72*q_max, "q₁ > q₂", fontsize=11, alpha=0.85)
 
-    # Etiquetas de regiones
-    ax1.text(0.72*q_max, 0.86*q_max, "q₁ < q₂", fontsize=11, alpha=0.85)
-    ax1.text(0.86*q_max, 0.72*q_max, "q₁ > q₂", fontsize=11, alpha=0.85)
+        ax1.set_xlabel("q₁")
+        ax1.set_ylabel("q₂")
+        ax1.set_xlim(0, q_max)
+        ax1.set_ylim(0, q_max)
+        ax1.grid(True, linewidth=0.5, alpha=0.5)
+        ax1.legend(loc="best")
+        return fig1
 
-    ax1.set_xlabel("q₁")
-    ax1.set_ylabel("q₂")
-    ax1.set_xlim(0, q_max)
-    ax1.set_ylim(0, q_max)
-    ax1.grid(True, linewidth=0.5, alpha=0.5)
-    ax1.legend(loc="best")
-    st.pyplot(fig1)
+    show_chart(st, "cournot/br_cruce", (a, b, c1, c2), draw_br_crossing,
+               spec=lambda: charts.br_crossing_spec(a, b, c1, c2, q1s, q2s, q_max))
 
 # ---------------------------------
 # (2) Demanda inversa + excedente del consumidor (triángulo), P* y Q*
 # ---------------------------------
 with col2:
     st.subheader("2) Demanda inversa con excedente del consumidor, P* y Q*")
-    fig2, ax2 = plt.subplots(figsize=(6.2, 5.2))
-
-    Qmax = max(1.2*Qs, a / max(b, 1e-9))
-    Q_line = np.linspace(0, Qmax, 400)
-    P_line = np.maximum(a - b*Q_line, 0.0)
-    ax2.plot(Q_line, P_line, label="Demanda inversa: P(Q)=a−bQ")
-
-    # Triángulo del excedente del consumidor entre P(Q) y P* en [0, Q*]
-    if Qs > 0 and Ps < a:
-        Q_fill = np.linspace(0, Qs, 200)
-        P_fill = a - b*Q_fill
-        ax2.fill_between(Q_fill, P_fill, Ps, alpha=0.2, label="Excedente del consumidor")
-
-    # Líneas y punto de equilibrio
-    ax2.axvline(Qs, linestyle="--")
-    ax2.axhline(Ps, linestyle="--")
-    ax2.scatter([Qs], [Ps], zorder=5)
-
-    ax2.annotate(fr"Q*={Qs:.2f}", (Qs, 0), textcoords="offset points", xytext=(5, 6))
-    ax2.annotate(fr"P*={Ps:.2f}", (0, Ps), textcoords="offset points", xytext=(5, 6))
-
-    ax2.set_xlabel("Q")
-    ax2.set_ylabel("P")
-    ax2.set_xlim(0, max(Qmax, Qs*1.1, 1.0))
-    ax2.set_ylim(0, max(a*1.05, Ps*1.2 + 1.0))
-    ax2.grid(True, linewidth=0.5, alpha=0.5)
-    ax2.legend(loc="best")
-    st.pyplot(fig2)
+
+    def draw_demand_cs():
+        fig2, ax2 = subplots(figsize=(6.2, 5.2))
+
+        Qmax = max(1.2*Qs, a / max(b, 1e-9))
+        Q_line = np.linspace(0, Qmax, 400)
+        P_line = np.maximum(a - b*Q_line, 0.0)
+        ax2.plot(Q_line, P_line, label="Demanda inversa: P(Q)=a−bQ")
+
+        # Triángulo del excedente del consumidor entre P(Q) y P* en [0, Q*]
+        if Qs > 0 and Ps < a:
+            Q_fill = np.linspace(0, Qs, 200)
+            P_fill = a - b*Q_fill
+            ax2.fill_between(Q_fill, P_fill, Ps, alpha=0.2, label="Excedente del consumidor")
+
+        # Líneas y punto de equilibrio
+        ax2.axvline(Qs, linestyle="--")
+        ax2.axhline(Ps, linestyle="--")
+        ax2.scatter([Qs], [Ps], zorder=5)
+
+        ax2.annotate(fr"Q*={Qs:.2f}", (Qs, 0), textcoords="offset points", xytext=(5, 6))
+        ax2.annotate(fr"P*={Ps:.2f}", (0, Ps), textcoords="offset points", xytext=(5, 6))
+
+        ax2.set_xlabel("Q")
+        ax2.set_ylabel("P")
+        ax2.set_xlim(0, max(Qmax, Qs*1.1, 1.0))
+        ax2.set_ylim(0, max(a*1.05, Ps*1.2 + 1.0))
+        ax2.grid(True, linewidth=0.5, alpha=0.5)
+        ax2.legend(loc="best")
+        return fig2
+
+    show_figure(st, "cournot/demanda_cs", (a, b, c1, c2), draw_demand_cs)
 
 # -----------------------------
 # Métricas
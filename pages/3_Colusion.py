@@ -1,9 +1,22 @@
 # pages/3_Colusion.py
+import functools
+import uuid
+
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd
 
+from iolab import collusion_outcomes, cs_linear, scenarios
+from iolab.collusion import collusion_grid
+from iolab.montecarlo import summarize
+from iolab.repeated import repeated_game
+from iolab.cache import make_key, memoize
+from iolab.jobs_ui import job_view, live_fragment, start
+from iolab import charts
+from iolab.charts import show_chart
+from iolab.figures import subplots
+from iolab.profiling import stage
+
 st.set_page_config(layout="wide")
 st.title("Colusión (grim) desde Cournot — simulador sin presets")
 
@@ -13,51 +26,66 @@ st.markdown(
 )
 
 # ========================= Helpers =========================
-def cournot_asym(a, b, cs_arr):
-    N = len(cs_arr)
-    S = cs_arr.sum()
-    # Fórmula correcta: q_i^N = (a - (N+1)c_i + S) / ((N+1)b)
-    qN = (a - (N+1)*cs_arr + S) / ((N+1)*b)
-    qN = np.maximum(qN, 0.0)
-    QN = qN.sum()
-    PN = a - b*QN
-    piN = np.maximum(PN - cs_arr, 0.0) * qN
-    return qN, QN, PN, piN
-
-def cartel_equal_split(a, b, cs_arr):
-    N = len(cs_arr)
-    cbar = cs_arr.mean()
-    QC = max((a - cbar) / (2*b), 0.0)
-    PC = a - b*QC
-    qC = np.array([QC / N] * N)
-    piC = np.maximum(PC - cs_arr, 0.0) * qC
-    return qC, QC, PC, piC
-
-def one_shot_deviation_against_cartel(a, b, cs_arr, QC):
-    N = len(cs_arr)
-    Q_others_C = QC * (N - 1) / N
-    qD = np.maximum((a - cs_arr - b * Q_others_C) / (2*b), 0.0)
-    PD = a - b * (qD + Q_others_C)
-    piD = np.maximum(PD - cs_arr, 0.0) * qD
-    return qD, PD, piD
-
-def deltas_robust(piN, piC, piD):
-    den = (piD - piN)  # π^D - π^N
-    num = (piD - piC)  # π^D - π^C
-    delta_i = np.zeros_like(den)
-    eps = 1e-12
-    mask_pos = den > eps
-    delta_i[mask_pos] = np.clip(num[mask_pos] / den[mask_pos], 0.0, 1.0)
-    mask_nonpos = ~mask_pos
-    delta_i[mask_nonpos & (num <= 0)] = 0.0
-    delta_i[mask_nonpos & (num > 0)] = 1.0
-    delta_star = float(np.max(delta_i)) if len(delta_i) > 0 else 1.0
-    binder_idx = int(np.argmax(delta_i)) if len(delta_i) > 0 else 0
-    return delta_i, delta_star, binder_idx
-
-def cs_linear(a, b, Q, P):
-    # Con P(Q)=a-bQ: CS = 0.5 * Q * (a - P)
-    return 0.5 * Q * (a - P)
+# Todo lo que depende solo de los parámetros se memoiza (caché LRU compartida entre
+# reruns y sesiones): cambiar δ o escribir un nombre de captura no recalcula nada.
+@memoize
+def collusion_base(a, b, cs_arr, cartel="equal"):
+    res = dict(collusion_outcomes(a, b, cs_arr, cartel))
+    res["CS_N"] = cs_linear(a, res["PN"], res["QN"]); res["PS_N"] = float(np.sum(res["piN"]))
+    res["CS_C"] = cs_linear(a, res["PC"], res["QC"]); res["PS_C"] = float(np.sum(res["piC"]))
+    res["table"] = pd.DataFrame({
+        "Firma": [f"i={i+1}" for i in range(len(cs_arr))],
+        "c_i": np.round(cs_arr, 2),
+        "q_i^N": np.round(res["qN"], 2),
+        "π_i^N": np.round(res["piN"], 2),
+        "q_i^C": np.round(res["qC"], 2),
+        "π_i^C": np.round(res["piC"], 2),
+        "q_i^D": np.round(res["qD"], 2),
+        "π_i^D": np.round(res["piD"], 2),
+        "δ_i*": np.round(res["delta_i"], 2),
+    })
+    return res
+
+# Los barridos son cortes de collusion_grid (malla N × b × c_i resuelta por lotes, sin lazos por valor)
+@memoize
+def cost_sweep(a, b, cs_arr, i_firma, vals, cartel="equal"):
+    res = collusion_grid(a, [b], cs_arr, i_firma-1, vals, cartel=cartel)
+    return pd.DataFrame({
+        "c_i": np.round(vals, 2),
+        "δ*": np.round(res["delta_star"][0, 0], 2),
+        "binder": res["binder_idx"][0, 0] + 1,
+    })
+
+@memoize
+def b_sweep(a, cs_arr, b_vals, cartel="equal"):
+    res = collusion_grid(a, b_vals, cs_arr, cartel=cartel)
+    return pd.DataFrame({
+        "b": np.round(b_vals, 2),
+        "Q^N": np.round(res["QN"][0, :, 0], 2),
+        "P^N": np.round(res["PN"][0, :, 0], 2),
+        "δ*": np.round(res["delta_star"][0, :, 0], 2),
+        "binder": res["binder_idx"][0, :, 0] + 1,
+    })
+
+@memoize
+def N_sweep(a, b, cs_arr, Ns, c_new, cartel="equal"):
+    res = collusion_grid(a, [b], cs_arr, Ns=Ns, c_new=c_new, cartel=cartel)
+    return pd.DataFrame({
+        "N": np.asarray(Ns, dtype=int),
+        "δ*": np.round(res["delta_star"][:, 0, 0], 2),
+        "binder": res["binder_idx"][:, 0, 0] + 1,
+    })
+
+def grid_slice(a, cs_arr, i_firma, b_vals, c_vals, c_new, cartel, NN):
+    # Un valor de N de la malla (una fila del trabajo en segundo plano)
+    res = collusion_grid(a, b_vals, cs_arr, i_firma-1, c_vals, [NN], c_new, cartel)
+    return {"N": int(NN), "delta": res["delta_star"][0], "binder": res["binder_idx"][0] + 1}
+
+def repeated_chunk(a, b, cs_arr, cartel, delta, strategy, T, paths, sigma, L, p_bar, seed, k):
+    # Un bloque de trayectorias del juego repetido (semilla propia por bloque)
+    r = repeated_game(a, b, cs_arr, delta, strategy, T, paths, sigma, L, p_bar, seed=[seed, k], cartel=cartel)
+    keep = ("duration", "censored", "wars", "collusive_share", "price", "value", "colluding", "breaks_by_firm")
+    return {key: r[key] for key in keep} | {"p_break": r["stage"]["p_break"]}
 
 def parse_list_floats(txt):
     if not txt.strip():
@@ -69,6 +97,12 @@ def parse_list_ints(txt):
         return []
     return [int(float(x.strip())) for x in txt.split(",") if x.strip()]
 
+CARTEL_MODES = {
+    "Partes iguales": "equal",
+    "Eficiente (máx. utilidad conjunta)": "efficient",
+    "Cuotas que minimizan δ*": "min_delta",
+}
+
 # ========================= Sidebar =========================
 with st.sidebar:
     st.header("Parámetros (ajústalos libremente)")
@@ -82,22 +116,29 @@ with st.sidebar:
     for i in range(int(N)):
         cs.append(st.number_input(f"c{i+1}", value=20.0, step=1.0, min_value=0.0, format="%.2f", key=f"c{i+1}"))
 
+    st.subheader("Reparto del cartel")
+    cartel = CARTEL_MODES[st.radio("Cuotas", list(CARTEL_MODES), key="cartel_mode", help=(
+        "Partes iguales: Q^C de monopolio con costo promedio, repartido por igual. Eficiente: máxima "
+        "utilidad conjunta (solo produce la firma más barata; sin pagos laterales las demás se desvían). "
+        "Cuotas que minimizan δ*: mismo Q^C, repartido para que el cartel se sostenga con el menor δ."))]
+
     st.divider()
     st.subheader("Chequeo de sostenibilidad")
     delta_user = st.slider("δ (factor de descuento)", min_value=0.0, max_value=1.0, value=0.80, step=0.01)
 
 # ========================= Cálculo base =========================
 cs_arr = np.array(cs, dtype=float)
-qN, QN, PN, piN = cournot_asym(a, b, cs_arr)
-qC, QC, PC, piC = cartel_equal_split(a, b, cs_arr)
-qD, PD, piD = one_shot_deviation_against_cartel(a, b, cs_arr, QC)
-delta_i, delta_star, binder_idx = deltas_robust(piN, piC, piD)
+with stage("solve"):
+    base = collusion_base(a, b, cs_arr, cartel)
+QN, PN, piN = base["QN"], base["PN"], base["piN"]
+QC, PC, piC = base["QC"], base["PC"], base["piC"]
+delta_i, delta_star, binder_idx = base["delta_i"], base["delta_star"], base["binder_idx"]
 
 sostenible = (delta_user + 1e-12) >= delta_star
 
 # Welfare
-CS_N = cs_linear(a, b, QN, PN); PS_N = float(np.sum(piN)); W_N = CS_N + PS_N
-CS_C = cs_linear(a, b, QC, PC); PS_C = float(np.sum(piC)); W_C = CS_C + PS_C
+CS_N, PS_N = base["CS_N"], base["PS_N"]; W_N = CS_N + PS_N
+CS_C, PS_C = base["CS_C"], base["PS_C"]; W_C = CS_C + PS_C
 
 # ========================= UI principal =========================
 c1, c2, c3, c4, c5 = st.columns(5)
@@ -110,37 +151,35 @@ c5.metric("¿Sostenible con δ?", "Sí ✅" if sostenible else "No ❌", help="S
 st.caption(r"Fórmula: $\delta_i^* = \frac{\pi_i^D - \pi_i^C}{\pi_i^D - \pi_i^N}$, con manejo robusto de bordes.")
 st.write(f"**Firma que fija δ***: i={binder_idx+1}")
 
-df = pd.DataFrame({
-    "Firma": [f"i={i+1}" for i in range(int(N))],
-    "c_i": np.round(cs_arr, 2),
-    "q_i^N": np.round(qN, 2),
-    "π_i^N": np.round(piN, 2),
-    "q_i^C": np.round(qC, 2),
-    "π_i^C": np.round(piC, 2),
-    "q_i^D": np.round(qD, 2),
-    "π_i^D": np.round(piD, 2),
-    "δ_i*": np.round(delta_i, 2),
-})
-st.dataframe(df, use_container_width=True)
+with stage("table"):
+    st.dataframe(base["table"], use_container_width=True)
 
 g1, g2 = st.columns(2)
 with g1:
-    fig1, ax1 = plt.subplots()
-    ax1.bar(np.arange(1, int(N)+1), delta_i)
-    ax1.set_xlabel("Firma i"); ax1.set_ylabel("δ_i*"); ax1.set_ylim(0, 1)
-    ax1.set_title("Umbrales individuales δ_i*")
-    st.pyplot(fig1)
+    def draw_delta_bars():
+        fig1, ax1 = subplots()
+        ax1.bar(np.arange(1, int(N)+1), delta_i)
+        ax1.set_xlabel("Firma i"); ax1.set_ylabel("δ_i*"); ax1.set_ylim(0, 1)
+        ax1.set_title("Umbrales individuales δ_i*")
+        return fig1
+
+    show_chart(st, "colusion/delta_i", (a, b, cs_arr, cartel), draw_delta_bars,
+               spec=lambda: charts.bars_spec(delta_i, "Umbrales individuales δ_i*", "δ_i*", ydomain=(0, 1)))
 
 with g2:
-    width = 0.35
-    idx = np.arange(1, int(N)+1)
-    fig2, ax2 = plt.subplots()
-    ax2.bar(idx - width/2, piN, width, label="π_i^N")
-    ax2.bar(idx + width/2, piC, width, label="π_i^C")
-    ax2.set_xlabel("Firma i"); ax2.set_ylabel("Utilidad")
-    ax2.set_title("Utilidades: Cournot vs Cartel")
-    ax2.legend()
-    st.pyplot(fig2)
+    def draw_profit_bars():
+        width = 0.35
+        idx = np.arange(1, int(N)+1)
+        fig2, ax2 = subplots()
+        ax2.bar(idx - width/2, piN, width, label="π_i^N")
+        ax2.bar(idx + width/2, piC, width, label="π_i^C")
+        ax2.set_xlabel("Firma i"); ax2.set_ylabel("Utilidad")
+        ax2.set_title("Utilidades: Cournot vs Cartel")
+        ax2.legend()
+        return fig2
+
+    show_chart(st, "colusion/pi_N_vs_C", (a, b, cs_arr, cartel), draw_profit_bars,
+               spec=lambda: charts.bars_spec({"π_i^N": piN, "π_i^C": piC}, "Utilidades: Cournot vs Cartel", "Utilidad"))
 
 st.divider()
 st.subheader("Bienestar (comparativo)")
@@ -154,135 +193,298 @@ cW2.metric("PS Cartel (∑π)", f"{PS_C:.2f}")
 cW3.metric("W Cartel", f"{W_C:.2f}")
 
 # ========================= Snapshots para la PPT =========================
+# Las capturas van al almacén en disco (iolab.scenarios): persisten entre sesiones, se buscan por
+# parámetros y un escenario idéntico guardado por varias sesiones se calcula y guarda una vez.
 st.divider()
 st.subheader("Capturas de escenario (para tu PPT)")
-if "snapshots" not in st.session_state:
-    st.session_state.snapshots = []
-
-colS1, colS2 = st.columns([2,1])
-with colS1:
-    snap_name = st.text_input("Nombre corto del escenario (ej. 'Base', 'b=1.8', 'N=3, asim')", value="")
-with colS2:
-    if st.button("Guardar captura actual", use_container_width=True):
-        if snap_name.strip():
-            st.session_state.snapshots.append({
-                "escenario": snap_name.strip(),
-                "a": round(a,2), "b": round(b,2), "N": int(N),
-                "c": ", ".join([f"{x:.2f}" for x in cs_arr]),
-                "QN": round(QN,2), "PN": round(PN,2), "QC": round(QC,2),
-                "delta*": round(delta_star,2), "binder": int(binder_idx+1),
-                "CS_N": round(CS_N,2), "PS_N": round(PS_N,2), "W_N": round(W_N,2),
-                "CS_C": round(CS_C,2), "PS_C": round(PS_C,2), "W_C": round(W_C,2),
-            })
-            # límite suave para no crecer infinito
-            if len(st.session_state.snapshots) > 10:
-                st.session_state.snapshots = st.session_state.snapshots[-10:]
-        else:
-            st.warning("Ponle un nombre a la captura antes de guardar.")
-
-if st.session_state.snapshots:
-    df_snaps = pd.DataFrame(st.session_state.snapshots)
-    st.dataframe(df_snaps, use_container_width=True)
-    if st.button("Borrar última captura"):
-        st.session_state.snapshots = st.session_state.snapshots[:-1]
+if "scenario_owner" not in st.session_state:
+    st.session_state.scenario_owner = uuid.uuid4().hex[:12]
+
+@st.fragment
+def snapshot_panel(params, results):
+    owner = st.session_state.scenario_owner
+    colS1, colS2, colS3 = st.columns([2,1,1])
+    with colS1:
+        snap_name = st.text_input("Nombre corto del escenario (ej. 'Base', 'b=1.8', 'N=3, asim')", value="")
+    with colS2:
+        if st.button("Guardar captura actual", use_container_width=True):
+            if snap_name.strip():
+                _, new = scenarios.save("colusion", params, lambda: results, snap_name.strip(), owner)
+                if not new:
+                    st.caption("Ese escenario ya estaba guardado (por ti o por otra sesión): se agregó tu nombre sin recalcularlo.")
+            else:
+                st.warning("Ponle un nombre a la captura antes de guardar.")
+    with colS3:
+        if st.button("Borrar última captura", use_container_width=True):
+            last = scenarios.find("colusion", owner=owner, limit=1)
+            if last:
+                scenarios.delete(last[0]["id"])
+
+    f1, f2, f3 = st.columns([1, 1, 2])
+    mine = f1.toggle("Solo mis capturas", value=True, key="snap_mine")
+    same_ab = f2.checkbox("Mismos a y b", value=False, key="snap_same_ab")
+    N_lo, N_hi = f3.slider("N entre", min_value=1, max_value=50, value=(1, 50), key="snap_N")
+    where = {"N": (N_lo, N_hi)}
+    if same_ab:
+        where.update(a=params["a"], b=params["b"])
+    rows = scenarios.find("colusion", owner=owner if mine else None, limit=SNAP_LIMIT, **where)
+    if not rows:
+        return
+    st.dataframe(scenarios.to_frame(rows).round(2), use_container_width=True)
+    # Los archivos se arman al hacer clic (descarga diferida), no en cada rerun del panel
+    e1, e2 = st.columns(2)
+    e1.download_button("Exportar CSV", lambda: scenarios.export(rows, "csv"), "capturas_colusion.csv", "text/csv",
+                       use_container_width=True)
+    e2.download_button("Exportar Parquet", lambda: scenarios.export(rows, "parquet"), "capturas_colusion.parquet",
+                       "application/octet-stream", use_container_width=True)
+    stats = scenarios.store_stats()
+    st.caption(f"{len(rows):,} capturas con estos filtros (máx. {SNAP_LIMIT:,}) · almacén: {stats['scenarios']:,} "
+               f"escenarios distintos, {stats['labels']:,} capturas, {stats['bytes'] / 2**20:.1f} MB.")
+
+SNAP_LIMIT = 500
+snapshot_panel(
+    {"a": a, "b": b, "N": int(N), "c": cs_arr, "cuotas": cartel},
+    {"QN": QN, "PN": PN, "QC": QC, "delta*": delta_star, "binder": int(binder_idx+1),
+     "CS_N": CS_N, "PS_N": PS_N, "W_N": W_N, "CS_C": CS_C, "PS_C": PS_C, "W_C": W_C},
+)
 
 # ========================= Barridos personalizados (sin escenarios fijos) =========================
 st.divider()
 st.subheader("Barridos personalizados (elige tus propios valores)")
+# Cada barrido es un fragmento: sus widgets vuelven a ejecutar solo esa sección
+# (con los parámetros de la última ejecución completa), no el equilibrio base ni los gráficos.
 
 # ----- Barrido de costos (elige una firma y valores de c_i) -----
-with st.expander("Barrido de costos (elige firma y lista de valores)", expanded=False):
-    colC1, colC2, colC3 = st.columns([1,2,1])
-    with colC1:
-        i_firma = st.number_input("Firma a barrer (i)", min_value=1, max_value=int(N), value=1, step=1)
-    with colC2:
-        c_values_txt = st.text_input("Valores de costo para esa firma (coma-separados, p. ej. 15,18,20,22)", value="")
-    with colC3:
-        run_cost_sweep = st.button("Ejecutar barrido de costos", use_container_width=True, key="btn_costsweep")
-    if run_cost_sweep:
-        vals = parse_list_floats(c_values_txt)
-        rows = []
-        for v in vals:
-            cs_tmp = cs_arr.copy()
-            cs_tmp[int(i_firma)-1] = v
-            qN_e, QN_e, PN_e, piN_e = cournot_asym(a, b, cs_tmp)
-            qC_e, QC_e, PC_e, piC_e = cartel_equal_split(a, b, cs_tmp)
-            qD_e, PD_e, piD_e = one_shot_deviation_against_cartel(a, b, cs_tmp, QC_e)
-            _, dstar_e, bind_e = deltas_robust(piN_e, piC_e, piD_e)
-            rows.append({
-                "c_i": round(v,2),
-                "δ*": round(dstar_e,2),
-                "binder": int(bind_e+1)
-            })
-        if rows:
-            st.dataframe(pd.DataFrame(rows), use_container_width=True)
+@st.fragment
+def cost_sweep_panel(a, b, cs_arr, N, cartel):
+    with st.expander("Barrido de costos (elige firma y lista de valores)", expanded=False):
+        colC1, colC2, colC3 = st.columns([1,2,1])
+        with colC1:
+            i_firma = st.number_input("Firma a barrer (i)", min_value=1, max_value=int(N), value=1, step=1)
+        with colC2:
+            c_values_txt = st.text_input("Valores de costo para esa firma (coma-separados, p. ej. 15,18,20,22)", value="")
+        with colC3:
+            run_cost_sweep = st.button("Ejecutar barrido de costos", use_container_width=True, key="btn_costsweep")
+        if run_cost_sweep:
+            vals = parse_list_floats(c_values_txt)
+            if vals:
+                st.dataframe(cost_sweep(a, b, cs_arr, int(i_firma), vals, cartel), use_container_width=True)
+
+cost_sweep_panel(a, b, cs_arr, N, cartel)
 
 # ----- Barrido de elasticidad (lista de b) -----
-with st.expander("Barrido de elasticidad (lista de b)", expanded=False):
-    colB1, colB2 = st.columns([3,1])
-    with colB1:
-        b_values_txt = st.text_input("Valores de b (coma-separados, p. ej. 0.6,1.0,1.8)", value="", key="bvals")
-    with colB2:
-        run_b_sweep = st.button("Ejecutar barrido de b", use_container_width=True, key="btn_bsweep")
-    if run_b_sweep:
-        b_vals = parse_list_floats(b_values_txt)
-        rows = []
-        for b_v in b_vals:
-            qN_e, QN_e, PN_e, piN_e = cournot_asym(a, b_v, cs_arr)
-            qC_e, QC_e, PC_e, piC_e = cartel_equal_split(a, b_v, cs_arr)
-            qD_e, PD_e, piD_e = one_shot_deviation_against_cartel(a, b_v, cs_arr, QC_e)
-            _, dstar_e, bind_e = deltas_robust(piN_e, piC_e, piD_e)
-            rows.append({
-                "b": round(b_v,2),
-                "Q^N": round(QN_e,2),
-                "P^N": round(PN_e,2),
-                "δ*": round(dstar_e,2),
-                "binder": int(bind_e+1)
-            })
-        if rows:
-            st.dataframe(pd.DataFrame(rows), use_container_width=True)
+@st.fragment
+def b_sweep_panel(a, cs_arr, cartel):
+    with st.expander("Barrido de elasticidad (lista de b)", expanded=False):
+        colB1, colB2 = st.columns([3,1])
+        with colB1:
+            b_values_txt = st.text_input("Valores de b (coma-separados, p. ej. 0.6,1.0,1.8)", value="", key="bvals")
+        with colB2:
+            run_b_sweep = st.button("Ejecutar barrido de b", use_container_width=True, key="btn_bsweep")
+        if run_b_sweep:
+            b_vals = [v for v in parse_list_floats(b_values_txt) if v > 0]
+            if b_vals:
+                st.dataframe(b_sweep(a, cs_arr, b_vals, cartel), use_container_width=True)
+
+b_sweep_panel(a, cs_arr, cartel)
 
 # ----- Barrido de entrada (lista de N) -----
-with st.expander("Barrido de entrada (lista de N)", expanded=False):
-    colN1, colN2, colN3 = st.columns([2,2,1])
-    with colN1:
-        N_values_txt = st.text_input("Valores de N (coma-separados, p. ej. 2,3,4)", value="", key="Nvals")
-    with colN2:
-        c_new = st.number_input("c para firmas adicionales (si N supera el actual)", value=float(cs_arr.mean()), step=1.0, min_value=0.0, format="%.2f")
-    with colN3:
-        run_N_sweep = st.button("Ejecutar barrido de N", use_container_width=True, key="btn_Nsweep")
-    if run_N_sweep:
-        Ns = parse_list_ints(N_values_txt)
-        rows = []
-        for NN in Ns:
-            if NN <= len(cs_arr):
-                cs_tmp = cs_arr[:NN].copy()
-            else:
-                extra = np.full(NN - len(cs_arr), c_new, dtype=float)
-                cs_tmp = np.concatenate([cs_arr, extra])
-            qN_e, QN_e, PN_e, piN_e = cournot_asym(a, b, cs_tmp)
-            qC_e, QC_e, PC_e, piC_e = cartel_equal_split(a, b, cs_tmp)
-            qD_e, PD_e, piD_e = one_shot_deviation_against_cartel(a, b, cs_tmp, QC_e)
-            _, dstar_e, bind_e = deltas_robust(piN_e, piC_e, piD_e)
-            rows.append({
-                "N": int(NN),
-                "δ*": round(dstar_e,2),
-                "binder": int(bind_e+1)
-            })
-        if rows:
-            dfN = pd.DataFrame(rows)
-            st.dataframe(dfN, use_container_width=True)
-            # pequeña gráfica opcional
-            try:
-                figN, axN = plt.subplots()
-                axN.plot(dfN["N"], dfN["δ*"], marker="o")
-                axN.set_xlabel("N"); axN.set_ylabel("δ*"); axN.set_ylim(0,1)
-                axN.set_title("δ* vs N (con tus costos)")
-                st.pyplot(figN)
-            except Exception:
-                pass
+@st.fragment
+def N_sweep_panel(a, b, cs_arr, cartel):
+    with st.expander("Barrido de entrada (lista de N)", expanded=False):
+        colN1, colN2, colN3 = st.columns([2,2,1])
+        with colN1:
+            N_values_txt = st.text_input("Valores de N (coma-separados, p. ej. 2,3,4)", value="", key="Nvals")
+        with colN2:
+            c_new = st.number_input("c para firmas adicionales (si N supera el actual)", value=float(cs_arr.mean()), step=1.0, min_value=0.0, format="%.2f")
+        with colN3:
+            run_N_sweep = st.button("Ejecutar barrido de N", use_container_width=True, key="btn_Nsweep")
+        if run_N_sweep:
+            Ns = [n for n in parse_list_ints(N_values_txt) if n >= 1]
+            if Ns:
+                dfN = N_sweep(a, b, cs_arr, Ns, c_new, cartel)
+                st.dataframe(dfN, use_container_width=True)
+                # pequeña gráfica opcional
+                try:
+                    def draw_delta_vs_N():
+                        figN, axN = subplots()
+                        axN.plot(dfN["N"], dfN["δ*"], marker="o")
+                        axN.set_xlabel("N"); axN.set_ylabel("δ*"); axN.set_ylim(0,1)
+                        axN.set_title("δ* vs N (con tus costos)")
+                        return figN
+
+                    show_chart(st, "colusion/delta_vs_N", (a, b, cs_arr, Ns, c_new, cartel), draw_delta_vs_N,
+                               spec=lambda: charts.line_vs_k_spec(dfN["N"].to_numpy(), dfN["δ*"].to_numpy(), "δ*",
+                                                                  "δ* vs N (con tus costos)", xtitle="N", ydomain=(0, 1)))
+                except Exception:
+                    pass
+
+N_sweep_panel(a, b, cs_arr, cartel)
+
+# ----- Malla completa b × c_i × N (mapa de calor de δ*) -----
+def grid_panel(a, cs_arr, N, delta_user, cartel):
+    with st.expander("Malla δ* (b × c_i × N, mapa de calor)", expanded=False):
+        g1, g2, g3 = st.columns(3)
+        b_lo = g1.number_input("b mínimo", value=0.2, step=0.1, min_value=0.0001, format="%.4f", key="grid_b_lo")
+        b_hi = g1.number_input("b máximo", value=3.0, step=0.1, min_value=0.0001, format="%.4f", key="grid_b_hi")
+        n_b = g1.number_input("Valores de b", value=200, min_value=2, max_value=400, step=10, key="grid_n_b")
+        i_firma = g2.number_input("Firma a barrer (i)", min_value=1, max_value=int(N), value=1, step=1, key="grid_i")
+        c_lo = g2.number_input("c_i mínimo", value=5.0, step=1.0, min_value=0.0, format="%.2f", key="grid_c_lo")
+        c_hi = g2.number_input("c_i máximo", value=60.0, step=1.0, min_value=0.0, format="%.2f", key="grid_c_hi")
+        n_c = g2.number_input("Valores de c_i", value=200, min_value=2, max_value=400, step=10, key="grid_n_c")
+        N_lo = g3.number_input("N mínimo", value=2, min_value=1, max_value=50, step=1, key="grid_N_lo")
+        N_hi = g3.number_input("N máximo", value=20, min_value=1, max_value=50, step=1, key="grid_N_hi")
+        c_new = g3.number_input("c para firmas adicionales", value=float(cs_arr.mean()), step=1.0, min_value=0.0,
+                                format="%.2f", key="grid_c_new")
+        b_vals = np.linspace(min(b_lo, b_hi), max(b_lo, b_hi), int(n_b))
+        c_vals = np.linspace(min(c_lo, c_hi), max(c_lo, c_hi), int(n_c))
+        params = (a, cs_arr, int(i_firma), b_vals, c_vals, c_new, cartel)
+        Ns_all = list(range(min(N_lo, N_hi), max(N_lo, N_hi) + 1))
+        shown = make_key(params, Ns_all)          # el rango de N también cuenta para el aviso
+        if st.button("Calcular malla", use_container_width=True, key="btn_grid"):
+            # La malla corre en segundo plano (iolab.jobs): se llena por valores de N, se puede
+            # cancelar y sobrevive a los reruns (la sesión solo guarda el id del trabajo)
+            start("job_grid", functools.partial(grid_slice, *params), Ns_all, ("colusion_malla", params, Ns_all),
+                  shown, axes=(b_vals, c_vals, int(i_firma)))
+        job = job_view("job_grid", shown, unit="valores de N", what="la malla")
+        rows = job.rows() if job is not None else []
+        if not rows:
+            return
+        # Filas listas (valores de N terminados); el mapa crece a medida que llegan
+        b_vals, c_vals, i_firma = st.session_state["job_grid"]["axes"]
+        Ns = np.array([r["N"] for r in rows])
+        D = np.stack([r["delta"] for r in rows])
+        binder = np.stack([r["binder"] for r in rows])
+        st.caption(f"{D.size:,} mercados (b × c_i × N) resueltos por lotes; con δ = {delta_user:.2f} el cartel "
+                   f"se sostiene en el {100 * (D <= delta_user + 1e-12).mean():.1f}% de la malla.")
+        # Con demanda lineal todas las utilidades escalan con 1/b, así que δ* no cambia con b
+        # (sí Q y P): el mapa va en c_i × N para el b elegido
+        jb = st.select_slider("b del mapa de calor", options=list(range(b_vals.size)), value=0,
+                              format_func=lambda j: f"{b_vals[j]:.3f}", key="grid_b_pick")
+        Z = D[:, jb, :]
+        h1, h2 = st.columns(2)
+
+        def draw_heatmap():
+            figH, axH = subplots()
+            mesh = axH.pcolormesh(c_vals, Ns, Z, shading="nearest", vmin=0, vmax=1, cmap="viridis")
+            figH.colorbar(mesh, ax=axH, label="δ*")
+            if Ns.size > 1 and Z.min() < delta_user < Z.max():
+                axH.contour(c_vals, Ns, Z, levels=[delta_user], colors="white", linewidths=1.5)
+            axH.set_xlabel(f"c_{int(i_firma)}"); axH.set_ylabel("N")
+            axH.set_title(f"δ* con b = {b_vals[jb]:.3f} (contorno: δ = {delta_user:.2f})")
+            return figH
+
+        show_chart(h1, "colusion/malla_delta", (a, cs_arr, int(i_firma), b_vals, c_vals, Ns, c_new, jb, delta_user),
+                   draw_heatmap, spec=lambda: charts.heatmap_spec(c_vals, Ns, Z, f"δ* con b = {b_vals[jb]:.3f}",
+                                                                  f"c_{int(i_firma)}", "N", "δ*", zdomain=(0, 1)))
+        share = (D <= delta_user + 1e-12).mean(axis=(1, 2))
+
+        def draw_share():
+            figS, axS = subplots()
+            axS.plot(Ns, share, marker="o")
+            axS.set_xlabel("N"); axS.set_ylabel("Fracción sostenible"); axS.set_ylim(0, 1)
+            axS.set_title(f"Malla (b, c_i) con δ* ≤ {delta_user:.2f}")
+            return figS
+
+        show_chart(h2, "colusion/malla_sostenible", (a, cs_arr, int(i_firma), b_vals, c_vals, Ns, c_new, delta_user),
+                   draw_share, spec=lambda: charts.line_vs_k_spec(Ns, share, "Fracción sostenible",
+                                                                  f"Malla (b, c_i) con δ* ≤ {delta_user:.2f}",
+                                                                  xtitle="N", ydomain=(0, 1)))
+        firms, counts = np.unique(binder[:, jb, :], return_counts=True)
+        st.caption("Firma que fija δ* en el mapa: " + ", ".join(
+            f"i={f} ({100 * n / Z.size:.0f}%)" for f, n in zip(firms, counts))
+            + ". δ* no depende de b con demanda lineal (todas las utilidades escalan con 1/b).")
+
+live_fragment("job_grid")(grid_panel)(a, cs_arr, N, delta_user, cartel)
+
+# ----- Juego repetido: simulación Monte Carlo de las estrategias de gatillo -----
+REP_STRATEGIES = {
+    "Gatillo (Cournot para siempre)": "grim",
+    "Castigo finito (L periodos)": "finite",
+    "Green–Porter (choques no observables, precio gatillo)": "green_porter",
+}
+REP_CHUNKS = 10            # bloques de trayectorias del trabajo (progreso y cancelación)
+
+def repeated_panel(a, b, cs_arr, N, delta_user, PN, PC, cartel):
+    with st.expander("Juego repetido con demanda estocástica (simulación)", expanded=False):
+        st.caption("Se juega el Cournot repetido hacia adelante con choques aₜ = a + σ·zₜ (z normal). Con gatillo y "
+                   "castigo finito el choque se observa antes de producir y una firma rompe si la ganancia de hoy "
+                   "supera la pérdida esperada del castigo; en Green–Porter nadie se desvía, pero un precio bajo el "
+                   "gatillo p̄ (por un choque malo) desata L periodos de guerra de precios.")
+        r1, r2, r3 = st.columns(3)
+        strategy = REP_STRATEGIES[r1.radio("Estrategia", list(REP_STRATEGIES), key="rep_strategy")]
+        sigma = r1.number_input("σ del choque en a", value=10.0, step=1.0, min_value=0.0, format="%.2f", key="rep_sigma")
+        T = r2.number_input("Periodos T", value=500, min_value=10, max_value=5000, step=100, key="rep_T")
+        paths = r2.number_input("Trayectorias", value=20000, min_value=1000, max_value=200000, step=5000, key="rep_paths")
+        L = r3.number_input("Castigo L (periodos)", value=5, min_value=1, max_value=200, step=1, key="rep_L",
+                            disabled=strategy == "grim")
+        seed = r3.number_input("Semilla", value=0, min_value=0, step=1, key="rep_seed")
+        p_bar = None
+        if strategy == "green_porter":
+            lo, hi = float(min(PN, PC)), float(max(PN, PC))
+            p_bar = st.slider("Precio gatillo p̄", min_value=lo, max_value=hi if hi > lo else lo + 1.0,
+                              value=lo + 0.7 * (hi - lo), key="rep_pbar")
+        params = (a, b, cs_arr, cartel, delta_user, strategy, int(T), int(paths) // REP_CHUNKS, sigma,
+                  int(L), p_bar, int(seed))
+        if st.button("Simular", use_container_width=True, key="btn_rep"):
+            start("job_rep", functools.partial(repeated_chunk, *params), range(REP_CHUNKS),
+                  ("colusion_repetido", params), make_key(params), T=int(T), N=len(cs_arr))
+        job = job_view("job_rep", make_key(params), unit="bloques de trayectorias", what="la simulación")
+        rows = job.rows() if job is not None else []
+        if not rows:
+            return
+        T_run = st.session_state["job_rep"]["T"]
+        cat = {k: np.concatenate([r[k] for r in rows]) for k in ("duration", "censored", "wars", "collusive_share",
+                                                                  "price", "value")}
+        colluding = np.mean([r["colluding"] for r in rows], axis=0)
+        breaks = np.sum([r["breaks_by_firm"] for r in rows], axis=0)
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Duración del primer cartel", f"{cat['duration'].mean():.1f}",
+                  help=f"Periodos hasta la primera ruptura; {100 * cat['censored'].mean():.0f}% de las "
+                       f"trayectorias no rompe en {T_run} periodos (se cuentan como {T_run}).")
+        m2.metric("Periodos en guerra", f"{100 * (1 - cat['collusive_share'].mean()):.1f}%")
+        m3.metric("Guerras cada 100 periodos", f"{100 * cat['wars'].mean() / T_run:.2f}")
+        m4.metric("Precio medio", f"{cat['price'].mean():.2f}")
+        stats, hists = summarize({"duration": cat["duration"], "value": cat["value"]})
+        h1, h2 = st.columns(2)
+        t = np.arange(T_run)
+
+        def draw_colluding():
+            figR, axR = subplots()
+            axR.plot(t, colluding)
+            axR.set_xlabel("Periodo t"); axR.set_ylabel("Fracción en cartel"); axR.set_ylim(0, 1.02)
+            axR.set_title("Trayectorias en cartel")
+            return figR
+
+        show_chart(h1, "colusion/repetido_cartel", (params, len(rows)), draw_colluding,
+                   spec=lambda: charts.lines_spec(t, {"En cartel": colluding}, "Trayectorias en cartel",
+                                                  "Periodo t", "Fracción en cartel", ydomain=(0, 1)))
+        edges, counts = hists["duration"]
+
+        def draw_duration():
+            figD, axD = subplots()
+            axD.stairs(counts, edges, fill=True)
+            axD.set_xlabel("Periodos hasta la primera ruptura"); axD.set_ylabel("Trayectorias")
+            axD.set_title("Duración del primer cartel")
+            return figD
+
+        show_chart(h2, "colusion/repetido_duracion", (params, len(rows)), draw_duration,
+                   spec=lambda: charts.histogram_spec(edges, counts, "Duración del primer cartel",
+                                                      "Periodos hasta la primera ruptura", ytitle="Trayectorias"))
+        note = (f"Probabilidad de ruptura en un periodo de cartel: {100 * rows[0]['p_break']:.2f}%. "
+                f"Valor (1-δ)∑δᵗ∑π: media {stats['value']['media']:.1f} (q05 {stats['value']['q05']:.1f}, "
+                f"q95 {stats['value']['q95']:.1f}).")
+        if breaks.sum():
+            note += " Desvíos por firma: " + ", ".join(f"i={i + 1} ({100 * n / breaks.sum():.0f}%)"
+                                                      for i, n in enumerate(breaks) if n) + "."
+        st.caption(f"{cat['duration'].size:,} trayectorias × {T_run} periodos. " + note)
+
+live_fragment("job_rep")(repeated_panel)(a, b, cs_arr, N, delta_user, PN, PC, cartel)
 
 # ========================= Notas =========================
-st.caption("Nota: el 'cartel simple' reparte Q^C por igual. En costos asimétricos, no es el cartel eficiente; aquí se usa por transparencia pedagógica.")
+st.caption("Nota: el 'cartel simple' reparte Q^C por igual. En costos asimétricos no es el cartel eficiente, que concentra "
+           "la producción en la firma más barata y sin pagos laterales no se sostiene (δ* = 1); las cuotas que "
+           "minimizan δ* mantienen el Q^C del reparto igual y dan más cuota a quien más tienta desviarse. "
+           "Elige el reparto en la barra lateral.")
 
 
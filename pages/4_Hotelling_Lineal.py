@@ -1,7 +1,10 @@
 # pages/4_Hotelling_Lineal.py
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+
+from iolab import hotelling_nash_prices, hotelling_outcomes
+from iolab.figures import show_figure, subplots
+from iolab.profiling import stage
 
 st.title("Hotelling lineal (dos firmas en 0 y 1)")
 st.caption("Demanda unitaria. Graficamos: superávit del consumidor por ubicación y el mapa de precios entregados.")
@@ -17,25 +20,37 @@ c2 = colC.number_input("Costo marginal c₂", min_value=0.0, value=1.0, step=0.1
 
 modo = st.radio("Precios", ["Equilibrio de Nash (cobertura total)", "Elegir manualmente"], horizontal=True)
 if modo.startswith("Equilibrio"):
-    # Equilibrio estándar con cobertura total:
-    # p1* = (2c1 + c2 + 3t)/3,  p2* = (c1 + 2c2 + 3t)/3
-    p1 = (2*c1 + c2 + 3*t) / 3
-    p2 = (c1 + 2*c2 + 3*t) / 3
+    # Equilibrio estándar con cobertura total (iolab.hotelling)
+    p1, p2 = hotelling_nash_prices(c1, c2, t)
     st.info(f"Precios de equilibrio: p₁* = {p1:.2f}, p₂* = {p2:.2f}")
 else:
     colp1, colp2 = st.columns(2)
+    p1_eq, p2_eq = hotelling_nash_prices(c1, c2, t)
     p1 = colp1.number_input(
         "Precio p₁", min_value=0.0,
-        value=float(round((2*c1 + c2 + 3*t)/3, 2)), step=0.1, format="%.2f"
+        value=float(round(p1_eq, 2)), step=0.1, format="%.2f"
     )
     p2 = colp2.number_input(
         "Precio p₂", min_value=0.0,
-        value=float(round((c1 + 2*c2 + 3*t)/3, 2)), step=0.1, format="%.2f"
+        value=float(round(p2_eq, 2)), step=0.1, format="%.2f"
     )
 
 # -------------------------
 # Cálculos
 # -------------------------
+# Cuotas, ganancias y CS exactos (rompe empates hacia la firma 1)
+with stage("solve"):
+    res = hotelling_outcomes(S, t, c1, c2, p1, p2)
+x_star = res["x_star"]                       # punto indiferente x^ entre firmas
+q1, q2, no_buy = res["q1"], res["q2"], res["no_buy"]
+pi1, pi2 = res["pi1"], res["pi2"]
+CS = float(res["CS"])
+
+# Cortes de cobertura con S: S = p1 + t*a  y  S = p2 + t*(1 - (1-b))
+a = res["a_cut"]
+one_minus_b = res["one_minus_b"]
+
+# Malla para las gráficas
 n = 2001
 x = np.linspace(0.0, 1.0, n)
 
@@ -43,31 +58,9 @@ x = np.linspace(0.0, 1.0, n)
 P1x = p1 + t*x
 P2x = p2 + t*(1 - x)
 
-# Elección del consumidor (rompe empates hacia la firma 1)
-buy1 = (P1x <= P2x) & (S - P1x > 0)
-buy2 = (P2x <  P1x) & (S - P2x > 0)
-
-q1 = buy1.mean()  # longitud atendida por firma 1
-q2 = buy2.mean()  # longitud atendida por firma 2
-no_buy = 1.0 - (q1 + q2)
-
-# Punto indiferente x^ entre firmas
-x_star = np.clip((p2 - p1 + t) / (2*t), 0.0, 1.0)
-
-# Márgenes y ganancias (para métricas)
-m1 = max(p1 - c1, 0.0)
-m2 = max(p2 - c2, 0.0)
-pi1 = m1 * q1
-pi2 = m2 * q2
-
 # Superávit del consumidor por ubicación (envolvente truncada en 0)
 Pmin = np.minimum(P1x, P2x)
 cs_density = np.maximum(S - Pmin, 0.0)
-CS = float(np.trapz(cs_density, x))
-
-# Cortes de cobertura con S: S = p1 + t*a  y  S = p2 + t*(1 - (1-b))
-a = np.clip((S - p1)/t, 0.0, 1.0)
-one_minus_b = np.clip(1 - (S - p2)/t, 0.0, 1.0)
 
 # -------------------------
 # Métricas
@@ -83,53 +76,59 @@ if no_buy > 1e-6:
 # -------------------------
 # (1) Superávit del consumidor por ubicación
 # -------------------------
-fig2, ax2 = plt.subplots()
-ax2.plot(x, cs_density, linewidth=2)
-ax2.fill_between(x, 0, cs_density, alpha=0.3)
-ax2.axvline(x_star, linestyle="--", linewidth=1)
-ax2.set_xlabel("Ubicación x ∈ [0,1]")
-ax2.set_ylabel("Superávit del consumidor")
-ax2.set_title("Superávit del consumidor (S - precio entregado)")
-st.pyplot(fig2, clear_figure=True)
+def draw_cs_by_location():
+    fig2, ax2 = subplots()
+    ax2.plot(x, cs_density, linewidth=2)
+    ax2.fill_between(x, 0, cs_density, alpha=0.3)
+    ax2.axvline(x_star, linestyle="--", linewidth=1)
+    ax2.set_xlabel("Ubicación x ∈ [0,1]")
+    ax2.set_ylabel("Superávit del consumidor")
+    ax2.set_title("Superávit del consumidor (S - precio entregado)")
+    return fig2
+
+show_figure(st, "hotelling/cs_ubicacion", (S, t, c1, c2, p1, p2), draw_cs_by_location)
 
 # -------------------------
 # (2) Mapa de precios entregados, a y 1-b
 # -------------------------
-fig3, ax3 = plt.subplots()
-
-ax3.plot(x, P1x, linewidth=2, label="p₁ + t·x")
-ax3.plot(x, P2x, linewidth=2, label="p₂ + t·(1-x)")
-
-# Envolvente (precio mínimo) resaltada donde S permite compra
-mask_buy = (Pmin <= S)
-ax3.plot(x[mask_buy], Pmin[mask_buy], linewidth=3)
-
-# Líneas verticales en a, 1-b y x^
-ax3.axvline(a, linewidth=1, color="k")
-ax3.axvline(one_minus_b, linewidth=1, color="k")
-ax3.axvline(x_star, linestyle="--", linewidth=1)
-
-# Horizontales punteadas en p1 y p2
-ax3.hlines(p1, 0, 1, linestyles="dashed")
-ax3.hlines(p2, 0, 1, linestyles="dashed")
-
-# Etiquetas de a y 1-b
-ymin, ymax = ax3.get_ylim()
-y_txt = ymin + 0.05*(ymax - ymin)
-ax3.text(a, y_txt, "a", ha="center", va="bottom")
-ax3.text(one_minus_b, y_txt, "1 - b", ha="center", va="bottom")
-
-# Sombrear zona de no compra (si existe un hueco entre cortes)
-gap_L = min(a, x_star)
-gap_R = max(one_minus_b, x_star)
-if gap_R > gap_L:
-    ax3.axvspan(gap_L, gap_R, alpha=0.10)
-
-ax3.set_xlabel("x")
-ax3.set_ylabel("Precio entregado")
-ax3.set_title("Precios entregados y región de cobertura (estilo figura)")
-ax3.legend()
-st.pyplot(fig3, clear_figure=True)
+def draw_delivered_prices():
+    fig3, ax3 = subplots()
+
+    ax3.plot(x, P1x, linewidth=2, label="p₁ + t·x")
+    ax3.plot(x, P2x, linewidth=2, label="p₂ + t·(1-x)")
+
+    # Envolvente (precio mínimo) resaltada donde S permite compra
+    mask_buy = (Pmin <= S)
+    ax3.plot(x[mask_buy], Pmin[mask_buy], linewidth=3)
+
+    # Líneas verticales en a, 1-b y x^
+    ax3.axvline(a, linewidth=1, color="k")
+    ax3.axvline(one_minus_b, linewidth=1, color="k")
+    ax3.axvline(x_star, linestyle="--", linewidth=1)
+
+    # Horizontales punteadas en p1 y p2
+    ax3.hlines(p1, 0, 1, linestyles="dashed")
+    ax3.hlines(p2, 0, 1, linestyles="dashed")
+
+    # Etiquetas de a y 1-b
+    ymin, ymax = ax3.get_ylim()
+    y_txt = ymin + 0.05*(ymax - ymin)
+    ax3.text(a, y_txt, "a", ha="center", va="bottom")
+    ax3.text(one_minus_b, y_txt, "1 - b", ha="center", va="bottom")
+
+    # Sombrear zona de no compra (si existe un hueco entre cortes)
+    gap_L = min(a, x_star)
+    gap_R = max(one_minus_b, x_star)
+    if gap_R > gap_L:
+        ax3.axvspan(gap_L, gap_R, alpha=0.10)
+
+    ax3.set_xlabel("x")
+    ax3.set_ylabel("Precio entregado")
+    ax3.set_title("Precios entregados y región de cobertura (estilo figura)")
+    ax3.legend()
+    return fig3
+
+show_figure(st, "hotelling/precios_entregados", (S, t, c1, c2, p1, p2), draw_delivered_prices)
 
 
 
@@ -2,11 +2,128 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+
+from iolab import concentration, cournot_asim, cournot_k_sweep, free_entry, welfare_metrics
+from iolab.cache import memoize
+from iolab.costs import FORMATS, load_costs, parse_costs_text
+from iolab import charts
+from iolab.charts import show_chart
+from iolab.figures import subplots
+from iolab.mergers import pairwise_mergers, simulate_merger
+from iolab.multimarket import load_incidence, multimarket_cournot, random_incidence
+from iolab.montecarlo import COST_DISTRIBUTIONS, monte_carlo, summarize
+from iolab.profiling import stage
 
 st.title("Oligopolio de Cournot — costos asimétricos")
 st.caption("Demanda P(Q)=a−bQ. Cada firma i tiene costo marginal cᵢ (constante). No simétrico.")
 
+# -----------------------
+# Modo multimercado: firmas en varios mercados con costo convexo compartido
+# -----------------------
+@memoize
+def load_uploaded_incidence(data, name):
+    return load_incidence(data, name=name)
+
+@memoize
+def generated_markets(N, M, k, c_hi, seed):
+    firm, market = random_incidence(N, M, k, seed=seed)
+    return firm, market, np.random.default_rng(seed).uniform(0.0, c_hi, N)
+
+@memoize
+def solve_multimarket(a, b, firm, market, c, d, N, M):
+    return multimarket_cournot(a, b, firm, market, c, d, n_firms=N, n_markets=M)
+
+def multimarket_view():
+    st.caption("Cada firma i compite en varios mercados m (incidencia dispersa firma–mercado) con demanda "
+               "Pₘ = aₘ − bₘQₘ y costo compartido Cᵢ(Xᵢ) = cᵢXᵢ + dᵢXᵢ²/2, Xᵢ = ∑ₘ xᵢₘ.")
+    colA, colB, colD = st.columns(3)
+    a_in = colA.number_input("Intercepto aₘ (si no viene en el archivo)", min_value=0.0, value=30.0,
+                             step=0.5, format="%.2f", key="mm_a")
+    b_in = colB.number_input("Pendiente bₘ (si no viene en el archivo)", min_value=0.01, value=1.0,
+                             step=0.01, format="%.2f", key="mm_b")
+    d_in = colD.number_input("Convexidad del costo dᵢ", min_value=0.0, value=0.05, step=0.01,
+                             format="%.3f", key="mm_d", help="0: costo marginal constante (mercados independientes).")
+    source = st.radio("Incidencia firma–mercado", ["Generar aleatoria", "Subir archivo"], horizontal=True,
+                      key="mm_source")
+    if source == "Generar aleatoria":
+        g1, g2, g3, g4, g5 = st.columns(5)
+        N = int(g1.number_input("Firmas", min_value=2, max_value=50_000, value=2000, step=500, key="mm_N"))
+        M = int(g2.number_input("Mercados", min_value=1, max_value=5000, value=200, step=50, key="mm_M"))
+        k = int(g3.number_input("Mercados por firma", min_value=1, max_value=200, value=5, step=1, key="mm_k"))
+        c_hi = g4.number_input("Costo cᵢ máximo", min_value=0.0, value=20.0, step=0.5, format="%.2f", key="mm_c_hi")
+        seed = int(g5.number_input("Semilla", min_value=0, value=0, step=1, key="mm_seed"))
+        firm, market, c = generated_markets(N, M, k, c_hi, seed)
+        a_m, b_m, d_i = np.full(M, a_in), np.full(M, b_in), np.full(N, d_in)
+        market_labels = np.arange(1, M + 1)
+    else:
+        upload = st.file_uploader("Incidencia (CSV/TXT o Parquet): columnas firm, market y opcionales c, d "
+                                  "(por firma), a, b (por mercado)", type=["csv", "txt", "parquet"], key="mm_file")
+        c_in = st.number_input("Costo cᵢ (si no viene en el archivo)", min_value=0.0, value=5.0, step=0.5,
+                               format="%.2f", key="mm_c")
+        if upload is None:
+            st.info("Sube la incidencia firma–mercado (una fila por par firma, mercado).")
+            return
+        try:
+            with stage("parse"):
+                firm, market, _, market_labels, params = load_uploaded_incidence(upload.getvalue(), upload.name)
+        except ValueError as e:
+            st.error(f"No se pudo leer el archivo: {e}")
+            return
+        N, M = int(params["c"].size), int(params["a"].size)
+        fill = lambda v, x: np.where(np.isnan(v), x, v)
+        a_m, b_m = fill(params["a"], a_in), fill(params["b"], b_in)
+        c, d_i = fill(params["c"], c_in), fill(params["d"], d_in)
+        st.caption(f"{firm.size:,} pares firma–mercado: {N:,} firmas y {M:,} mercados.")
+    if firm.size == 0:
+        st.info("La incidencia está vacía.")
+        return
+    try:
+        with stage("solve"):
+            r = solve_multimarket(a_m, b_m, firm, market, c, d_i, N, M)
+    except ValueError as e:
+        st.error(f"Parámetros inválidos: {e}")
+        return
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Precio medio", f"{r['P'].mean():.2f}")
+    m2.metric("Firmas activas por mercado", f"{r['n_active'].mean():.1f}")
+    m3.metric("Firmas que producen", f"{int((r['X'] > 0).sum()):,} de {N:,}")
+    m4.metric("Iteraciones de Newton", f"{r['iterations']}", help=f"Residuo final {r['residual']:.1e}")
+
+    h1, h2 = st.columns(2)
+    hists = {"P": ("Precio Pₘ", r["P"], 40), "n_active": ("Firmas activas", r["n_active"], None)}
+    for target, (key, (label, v, bins)) in zip((h1, h2), hists.items()):
+        if bins is None:
+            edges = np.arange(v.min() - 0.5, v.max() + 1.5)
+        else:
+            edges = np.linspace(v.min(), v.max() if v.max() > v.min() else v.min() + 1.0, bins + 1)
+        counts = np.histogram(v, bins=edges)[0]
+
+        def draw_hist(edges=edges, counts=counts, label=label):
+            figH, axH = subplots()
+            axH.stairs(counts, edges, fill=True, alpha=0.8)
+            axH.set_xlabel(label); axH.set_ylabel("Mercados")
+            axH.set_title(f"{label} por mercado")
+            return figH
+
+        show_chart(target, f"oligopolio/mm_{key}", (a_m, b_m, firm, market, c, d_i), draw_hist,
+                   spec=lambda edges=edges, counts=counts, label=label: charts.histogram_spec(
+                       edges, counts, f"{label} por mercado", label))
+
+    dfm = pd.DataFrame({"mercado": market_labels, "aₘ": a_m, "bₘ": b_m, "precio Pₘ": r["P"],
+                        "cantidad Qₘ": r["Q"], "firmas activas": r["n_active"], "CSₘ": r["CS"]})
+    with stage("table"):
+        st.dataframe(dfm.sort_values("precio Pₘ", ascending=False),
+                     column_config={k: st.column_config.NumberColumn(format="%.2f")
+                                    for k in ("aₘ", "bₘ", "precio Pₘ", "cantidad Qₘ", "CSₘ")},
+                     hide_index=True, use_container_width=True)
+
+mode = st.radio("Modo", ["Un mercado", "Multimercado (firmas en varios mercados)"], horizontal=True,
+                key="oligo_mode")
+if mode != "Un mercado":
+    multimarket_view()
+    st.stop()
+
 # -----------------------
 # Parámetros
 # -----------------------
@@ -14,132 +131,188 @@ col1, col2 = st.columns(2)
 a = col1.number_input("Intersección de demanda (a)", min_value=0.0, value=20.0, step=0.5, format="%.2f")
 b = col2.number_input("Pendiente de demanda (b>0)", min_value=0.01, value=1.0, step=0.01, format="%.2f")
 
-costs_txt = st.text_input(
-    "Costos marginales cᵢ (separados por comas, p.ej. 4, 6, 7.5, 9)",
-    value="6, 7.5, 9, 11"
-)
-# parseo robusto
-costs = []
-for t in costs_txt.split(","):
-    t = t.strip()
-    if t:
-        try:
-            costs.append(float(t))
-        except ValueError:
-            pass
-costs = np.array(costs, dtype=float)
+# Archivos subidos: se parsean una vez por contenido (caché compartida), por bloques y sin copiar los .npy
+@memoize
+def load_uploaded_costs(data, name, column):
+    return load_costs(data, name=name, column=column)
+
+source = st.radio("Fuente de costos", ["Escribir", "Subir archivo"], horizontal=True, key="cost_source")
+if source == "Escribir":
+    costs_txt = st.text_input(
+        "Costos marginales cᵢ (separados por comas, p.ej. 4, 6, 7.5, 9)",
+        value="6, 7.5, 9, 11"
+    )
+    # parseo robusto (los tokens no numéricos se descartan)
+    with stage("parse"):
+        costs, dropped = parse_costs_text(costs_txt)
+else:
+    colF1, colF2 = st.columns([3, 1])
+    upload = colF1.file_uploader("Archivo de costos (CSV/TXT con una columna o una fila, NPY o Parquet)",
+                                 type=list(FORMATS), key="cost_file")
+    cost_column = colF2.text_input("Columna (opcional)", value="", key="cost_column",
+                                   help="Nombre (o índice si no hay encabezado). Por defecto: c, costo, cost... o la primera.")
+    if upload is None:
+        st.info("Sube un archivo con los costos marginales de las firmas.")
+        st.stop()
+    try:
+        with stage("parse"):
+            costs, dropped = load_uploaded_costs(upload.getvalue(), upload.name, cost_column.strip() or None)
+    except ValueError as e:
+        st.error(f"No se pudo leer el archivo: {e}")
+        st.stop()
+    st.caption(f"{costs.size:,} firmas leídas de {upload.name}.")
+if dropped:
+    st.caption(f"Se descartaron {dropped:,} valores no numéricos.")
 if costs.size == 0:
     st.stop()
 
-# -----------------------
-# Equilibrio con tu fórmula (c̄_{-i})
-# -----------------------
-def cournot_asim(a, b, c_list):
-    """
-    Equilibrio de Cournot con P(Q)=a-bQ y costos c_i heterogéneos.
-    Usa explícitamente:
-        q_i = [ a + N*(c̄_{-i} - c_i) - c̄_{-i} ] / [ b*(N+1) ],
-    con  c̄_{-i} = (1/(N-1)) * sum_{j≠i} c_j  y  N = |S| (firmas activas).
-    Elimina iterativamente firmas con q_i<=0 y recalcula.
-    Para N=1: q = (a - c_1)/(2b).
-    Retorna: q (con ceros en inactivas), P, Q, π.
-    """
-    c = np.array(c_list, dtype=float)
-    n_all = len(c)
-    active_idx = list(range(n_all))
-
-    while True:
-        N = len(active_idx)
-        if N == 0:
-            q = np.zeros(n_all); P = a; pi = np.zeros(n_all)
-            return q, P, 0.0, pi
-
-        c_act = c[active_idx]
-        if N == 1:
-            q_act = np.array([(a - c_act[0])/(2*b)])
-        else:
-            sum_c = float(np.sum(c_act))
-            cbar_minus = (sum_c - c_act) / (N - 1)        # promedio de los otros
-            q_act = (a + N*(cbar_minus - c_act) - cbar_minus) / (b*(N + 1))
-
-        # Mantener solo q_i>0
-        mask_pos = q_act > 1e-12
-        if np.all(mask_pos):
-            q = np.zeros(n_all)
-            for pos, idx in enumerate(active_idx):
-                q[idx] = q_act[pos]
-            Q = float(np.sum(q_act))
-            P = float(a - b*Q)
-            pi = np.zeros(n_all)
-            for idx in active_idx:
-                pi[idx] = (P - c[idx]) * q[idx]
-            return q, P, Q, pi
-        else:
-            active_idx = [idx for keep, idx in zip(mask_pos, active_idx) if keep]
-
-def welfare_metrics(a, b, q, P, costs):
-    Q = float(np.sum(q))
-    CS = 0.5 * Q * (a - P)                      # lineal
-    PS = float(np.sum((P - costs) * q))
-    cmin = float(np.min(costs))
-    if a <= cmin:
-        TS_pc = 0.0
-    else:
-        Q_pc = (a - cmin) / b
-        TS_pc = 0.5 * (a - cmin) * Q_pc         # PS competitivo = 0 con CMg constante
-    TS = CS + PS
-    DWL = max(TS_pc - TS, 0.0)
-    return CS, PS, TS, DWL
-
 # -----------------------------------------
 # Comparativas: variar número de firmas k
 # -----------------------------------------
-c_sorted = np.sort(costs)
-K = len(c_sorted)
-k_for_detail = st.slider("Número de firmas activas para el detalle (k)", 1, K, K, step=1)
+# Memoizadas en la caché LRU compartida: mover el slider de k no rehace el barrido.
+# El barrido usa sumas acumuladas sobre los costos ordenados: todos los k en una pasada lineal.
+@memoize
+def k_sweep(a, b, c_sorted):
+    return np.column_stack(cournot_k_sweep(a, b, c_sorted))
 
-rows = []
-for k in range(1, K + 1):
-    c_k = c_sorted[:k]
+@memoize
+def scenario_detail(a, b, c_k):
     q_k, P_k, Q_k, pi_k = cournot_asim(a, b, c_k)
     CS_k, PS_k, TS_k, DWL_k = welfare_metrics(a, b, q_k, P_k, c_k)
-    rows.append((k, P_k, CS_k, np.sum(pi_k), DWL_k))
+    return q_k, P_k, Q_k, pi_k, CS_k, DWL_k
 
-arr = np.array(rows)
+c_sorted = np.sort(costs)
+K = len(c_sorted)
+k_for_detail = st.slider("Número de firmas activas para el detalle (k)", 1, K, K, step=1)
+
+with stage("solve"):
+    arr = k_sweep(a, b, c_sorted)
+# Con miles de firmas se grafican ~400 valores de k (el barrido completo sigue en arr)
+PLOT_POINTS = 400
+if K > PLOT_POINTS:
+    arr = arr[np.unique(np.linspace(0, K - 1, PLOT_POINTS).round().astype(int))]
 k_grid, P_grid, CS_grid, PI_grid, DWL_grid = arr.T
+mk = "o" if K <= 60 else None
 
 # -----------------------
 # Gráficas: P, CS, ∑π, DWL
 # -----------------------
 c1, c2 = st.columns(2)
 
-figP, axP = plt.subplots()
-axP.plot(k_grid, P_grid, marker="o")
-axP.set_xlabel("Número de firmas activas (k)")
-axP.set_ylabel("Precio P")
-axP.set_title("Precio vs número de firmas")
-c1.pyplot(figP, clear_figure=True)
-
-figCS, axCS = plt.subplots()
-axCS.plot(k_grid, CS_grid, marker="o")
-axCS.set_xlabel("Número de firmas activas (k)")
-axCS.set_ylabel("Excedente del consumidor")
-axCS.set_title("Excedente del consumidor vs k")
-c2.pyplot(figCS, clear_figure=True)
-
-figPI, axPI = plt.subplots()
-axPI.plot(k_grid, PI_grid, marker="o")
-axPI.set_xlabel("Número de firmas activas (k)")
-axPI.set_ylabel("Ganancias totales (∑π)")
-axPI.set_title("Ganancias de las empresas vs k")
-c1.pyplot(figPI, clear_figure=True)
-
-figDWL, axDWL = plt.subplots()
-axDWL.plot(k_grid, DWL_grid, marker="o")
-axDWL.set_xlabel("Número de firmas activas (k)")
-axDWL.set_ylabel("Pérdida de peso muerto (DWL)")
-axDWL.set_title("DWL vs k (óptimo: P=c_min)")
-c2.pyplot(figDWL, clear_figure=True)
+def draw_price_vs_k():
+    figP, axP = subplots()
+    axP.plot(k_grid, P_grid, marker=mk)
+    axP.set_xlabel("Número de firmas activas (k)")
+    axP.set_ylabel("Precio P")
+    axP.set_title("Precio vs número de firmas")
+    return figP
+
+show_chart(c1, "oligopolio/precio_vs_k", (a, b, c_sorted), draw_price_vs_k,
+           spec=lambda: charts.line_vs_k_spec(k_grid, P_grid, "Precio P", "Precio vs número de firmas", points=mk is not None))
+
+def draw_cs_vs_k():
+    figCS, axCS = subplots()
+    axCS.plot(k_grid, CS_grid, marker=mk)
+    axCS.set_xlabel("Número de firmas activas (k)")
+    axCS.set_ylabel("Excedente del consumidor")
+    axCS.set_title("Excedente del consumidor vs k")
+    return figCS
+
+show_chart(c2, "oligopolio/cs_vs_k", (a, b, c_sorted), draw_cs_vs_k,
+           spec=lambda: charts.line_vs_k_spec(k_grid, CS_grid, "Excedente del consumidor", "Excedente del consumidor vs k", points=mk is not None))
+
+def draw_profits_vs_k():
+    figPI, axPI = subplots()
+    axPI.plot(k_grid, PI_grid, marker=mk)
+    axPI.set_xlabel("Número de firmas activas (k)")
+    axPI.set_ylabel("Ganancias totales (∑π)")
+    axPI.set_title("Ganancias de las empresas vs k")
+    return figPI
+
+show_chart(c1, "oligopolio/pi_vs_k", (a, b, c_sorted), draw_profits_vs_k,
+           spec=lambda: charts.line_vs_k_spec(k_grid, PI_grid, "Ganancias totales (∑π)", "Ganancias de las empresas vs k", points=mk is not None))
+
+def draw_dwl_vs_k():
+    figDWL, axDWL = subplots()
+    axDWL.plot(k_grid, DWL_grid, marker=mk)
+    axDWL.set_xlabel("Número de firmas activas (k)")
+    axDWL.set_ylabel("Pérdida de peso muerto (DWL)")
+    axDWL.set_title("DWL vs k (óptimo: P=c_min)")
+    return figDWL
+
+show_chart(c2, "oligopolio/dwl_vs_k", (a, b, c_sorted), draw_dwl_vs_k,
+           spec=lambda: charts.line_vs_k_spec(k_grid, DWL_grid, "Pérdida de peso muerto (DWL)", "DWL vs k (óptimo: P=c_min)", points=mk is not None))
+
+# -----------------------
+# Entrada libre con costo fijo F (sobre el mismo barrido en k)
+# -----------------------
+st.divider()
+st.subheader("Entrada libre con costo fijo F")
+st.caption("Las firmas entran de la más barata a la más cara mientras la última gane al menos F. "
+           "Se compara con el número de firmas que maximiza CS + ∑π − kF (óptimo de segundo mejor).")
+
+ENTRY_GRID = 400
+
+# Curva de entrada en una malla de F hasta la ganancia de monopolio de la más barata
+@memoize
+def entry_curve(a, b, c_sorted):
+    F_grid = np.linspace(0.0, 1.1 * max(a - c_sorted[0], 0.0) ** 2 / (4 * b), ENTRY_GRID)
+    return F_grid, free_entry(a, b, c_sorted, F_grid)
+
+@memoize
+def entry_point(a, b, c_sorted, F):
+    return free_entry(a, b, c_sorted, F)
+
+@st.fragment
+def free_entry_panel(a, b, c_sorted):
+    if a <= c_sorted[0]:
+        st.info("Ninguna firma cubre sus costos variables (a ≤ c_min): no entra nadie.")
+        return
+    F = st.number_input("Costo fijo de entrada F", min_value=0.0, value=2.0, step=0.5, format="%.2f", key="fe_F")
+    with stage("solve"):
+        r = entry_point(a, b, c_sorted, F)
+        F_grid, curve = entry_curve(a, b, c_sorted)
+
+    e1, e2, e3, e4, e5 = st.columns(5)
+    e1.metric("Entrantes (libre entrada)", f"{r['n_entry']:,}")
+    e2.metric("Óptimo social", f"{r['n_opt']:,}")
+    e3.metric("Exceso de entrada", f"{r['excess']:+,}")
+    e4.metric("Precio con libre entrada", f"{r['P']:.2f}")
+    e5.metric("Pérdida de bienestar", f"{r['W_opt'] - r['W']:.2f}", help="W(óptimo) − W(libre entrada), W = CS + ∑π − kF")
+
+    f1, f2 = st.columns(2)
+    n_series = {"Libre entrada": curve["n_entry"], "Óptimo social": curve["n_opt"]}
+    W_series = {"W con libre entrada": curve["W"], "W óptimo": curve["W_opt"]}
+
+    def draw_entry_curve():
+        figE, axE = subplots()
+        for name, v in n_series.items():
+            axE.plot(F_grid, v, drawstyle="steps-post", label=name)
+        axE.axvline(F, color="k", ls=":", lw=1)
+        axE.set_xlabel("Costo fijo F"); axE.set_ylabel("Número de firmas")
+        axE.set_title("Curva de entrada")
+        axE.legend()
+        return figE
+
+    show_chart(f1, "oligopolio/entrada_n", (a, b, c_sorted, F), draw_entry_curve,
+               spec=lambda: charts.lines_spec(F_grid, n_series, "Curva de entrada", "Costo fijo F",
+                                              "Número de firmas", rule=F, step=True))
+
+    def draw_entry_welfare():
+        figW, axW = subplots()
+        for name, v in W_series.items():
+            axW.plot(F_grid, v, label=name)
+        axW.axvline(F, color="k", ls=":", lw=1)
+        axW.set_xlabel("Costo fijo F"); axW.set_ylabel("Bienestar W = CS + ∑π − kF")
+        axW.set_title("Bienestar: libre entrada vs óptimo")
+        axW.legend()
+        return figW
+
+    show_chart(f2, "oligopolio/entrada_w", (a, b, c_sorted, F), draw_entry_welfare,
+               spec=lambda: charts.lines_spec(F_grid, W_series, "Bienestar: libre entrada vs óptimo",
+                                              "Costo fijo F", "Bienestar W = CS + ∑π − kF", rule=F))
+
+free_entry_panel(a, b, c_sorted)
 
 st.divider()
 
@@ -148,8 +321,8 @@ st.divider()
 # -----------------------
 st.subheader("Detalle del escenario seleccionado")
 c_k = c_sorted[:k_for_detail]
-q_k, P_k, Q_k, pi_k = cournot_asim(a, b, c_k)
-CS_k, PS_k, TS_k, DWL_k = welfare_metrics(a, b, q_k, P_k, c_k)
+with stage("solve"):
+    q_k, P_k, Q_k, pi_k, CS_k, DWL_k = scenario_detail(a, b, c_k)
 
 m1, m2, m3, m4 = st.columns(4)
 m1.metric("Precio P", f"{P_k:.2f}")
@@ -157,26 +330,254 @@ m2.metric("Cantidad total Q", f"{Q_k:.2f}")
 m3.metric("CS", f"{CS_k:.2f}")
 m4.metric("DWL", f"{DWL_k:.2f}")
 
+# Con muchas firmas el detalle se agrega: pastel con las TOP_K mayores + "Otras", curva de
+# concentración submuestreada y tabla paginada (el costo de dibujar no crece con N)
+LARGE_N = 30
+TOP_K = 10
+
+@memoize
+def shares_detail(q_k, c_k, top):
+    conc = concentration(q_k, points=PLOT_POINTS)
+    order = np.argsort(-q_k, kind="stable")[:top]          # costos ordenados: las primeras
+    labels = [f"Firma {i+1} (c={c_k[i]:.2f})" for i in order]
+    values = q_k[order]
+    rest, n_rest = q_k.sum() - values.sum(), len(q_k) - len(order)
+    if n_rest > 0 and rest > 0:
+        labels.append(f"Otras ({n_rest:,} firmas)")
+        values = np.append(values, rest)
+    return conc, labels, values
+
+n_detail = len(c_k)
+conc, labels, values = shares_detail(q_k, c_k, n_detail if n_detail <= LARGE_N else TOP_K)
+
+m5, m6, m7, m8 = st.columns(4)
+m5.metric("HHI", f"{conc['HHI']:,.0f}")
+m6.metric("CR4", f"{conc['CR4']:.1%}")
+m7.metric("CR8", f"{conc['CR8']:.1%}")
+m8.metric("Firmas activas", f"{conc['n_active']:,}")
+
+p1, p2 = st.columns(2)
+
 # Pie de participaciones de mercado (por cantidades)
-shares = (q_k / q_k.sum()) if q_k.sum() > 0 else np.zeros_like(q_k)
-labels = [f"Firma {i+1} (c={c_k[i]:.2f})" for i in range(len(c_k))]
+def draw_shares_pie():
+    figPie, axPie = subplots()
+    axPie.pie(values, labels=labels, autopct=lambda p: f"{p:.1f}%" if p > 0 else "")
+    axPie.set_title("Participaciones de mercado (por cantidad)")
+    return figPie
+
+show_chart(p1, "oligopolio/cuotas_pie", (a, b, c_k), draw_shares_pie,
+           spec=lambda: charts.pie_spec(labels, values, "Participaciones de mercado (por cantidad)"))
+
+def draw_concentration():
+    figC, axC = subplots()
+    axC.plot(np.r_[0, conc["k"]] / n_detail, np.r_[0, conc["cr"]], label="CR_k (k mayores)")
+    axC.plot([0, 1], [0, 1], linestyle="--", color="gray", label="Cuotas iguales")
+    axC.set_xlim(0, 1); axC.set_ylim(0, 1)
+    axC.set_xlabel("Fracción de firmas (mayores primero)"); axC.set_ylabel("Cuota acumulada")
+    axC.set_title("Curva de concentración")
+    axC.legend(loc="lower right")
+    return figC
 
-figPie, axPie = plt.subplots()
-axPie.pie(shares, labels=labels, autopct=lambda p: f"{p:.1f}%" if p > 0 else "")
-axPie.set_title("Participaciones de mercado (por cantidad)")
-st.pyplot(figPie, clear_figure=True)
+show_chart(p2, "oligopolio/concentracion", (a, b, c_k), draw_concentration,
+           spec=lambda: charts.concentration_spec(conc["k"], conc["cr"], n_detail))
 
-# Tabla de detalle
+# Tabla de detalle: solo la página visible se arma y se envía; el formato lo aplica el navegador
+page_size, lo = n_detail, 0
+if n_detail > LARGE_N:
+    t1, t2 = st.columns(2)
+    page_size = t1.selectbox("Filas por página", (50, 200, 1000), key="detail_page_size")
+    n_pages = -(-n_detail // page_size)
+    # El valor vive solo en session_state (sin value= en el widget): se inicia y se acota aquí
+    st.session_state.detail_page = min(max(int(st.session_state.get("detail_page", 1)), 1), n_pages)
+    page = t2.number_input(f"Página (de {n_pages:,})", min_value=1, max_value=n_pages,
+                           step=1, key="detail_page")
+    lo = (int(page) - 1) * page_size
+rows = slice(lo, lo + page_size)
+Q_sum = q_k.sum()
 df = pd.DataFrame({
-    "costo cᵢ": c_k,
-    "qᵢ": q_k,
-    "participación (qᵢ/Q)": shares,
-    "πᵢ": pi_k
-})
-st.dataframe(
-    df.style.format({"costo cᵢ":"{:.2f}", "qᵢ":"{:.3f}", "participación (qᵢ/Q)":"{:.2%}", "πᵢ":"{:.2f}"}),
-    use_container_width=True
-)
+    "costo cᵢ": c_k[rows],
+    "qᵢ": q_k[rows],
+    "participación (qᵢ/Q)": q_k[rows] / Q_sum if Q_sum > 0 else np.zeros_like(q_k[rows]),
+    "πᵢ": pi_k[rows]
+}, index=pd.RangeIndex(lo + 1, lo + 1 + len(c_k[rows]), name="firma"))
+with stage("table"):
+    st.dataframe(
+        df,
+        column_config={
+            "costo cᵢ": st.column_config.NumberColumn(format="%.2f"),
+            "qᵢ": st.column_config.NumberColumn(format="%.3f"),
+            "participación (qᵢ/Q)": st.column_config.NumberColumn(format="percent"),
+            "πᵢ": st.column_config.NumberColumn(format="%.2f"),
+        },
+        use_container_width=True
+    )
+
+# -----------------------
+# Fusiones del escenario seleccionado: todas las parejas o un grupo de firmas
+# -----------------------
+st.divider()
+st.subheader("Simulación de fusiones")
+st.caption("La firma fusionada produce con el menor costo del grupo, reducido por la eficiencia; "
+           "el resto del mercado no cambia. Las firmas se numeran como en la tabla de detalle.")
+
+MAX_PAIRS_N = 2000          # ~2 millones de parejas
+TOP_PAIRS = 20
+MERGER_SORT = {"ΔCS (más dañinas primero)": ("dCS", True), "ΔP (mayor alza)": ("dP", False),
+               "ΔHHI (mayor alza)": ("dHHI", False), "Δπ de las fusionadas": ("dPI", False)}
+MERGER_COLUMNS = {"dP": "ΔP", "dCS": "ΔCS", "dHHI": "ΔHHI", "HHI": "HHI post",
+                  "dPI": "Δπ fusionadas", "dPI_rivals": "Δπ rivales", "dTS": "ΔTS"}
+
+# Todas las parejas en una llamada vectorizada; a la caché solo van las tablas top y el resumen
+@memoize
+def merger_screen(a, b, c, efficiency):
+    res = pairwise_mergers(a, b, c, efficiency)
+    tables = {}
+    for label, (key, ascending) in MERGER_SORT.items():
+        v = res[key]
+        top = np.argsort(v if ascending else -v, kind="stable")[:TOP_PAIRS]
+        i, j = res["i"][top], res["j"][top]
+        tables[label] = pd.DataFrame({"firma i": i + 1, "firma j": j + 1, "cᵢ": c[i], "cⱼ": c[j],
+                                      **{name: res[k][top] for k, name in MERGER_COLUMNS.items()}})
+    stats = {
+        "pairs": res["i"].size,
+        "raise_P": float((res["dP"] > 1e-12).mean()),
+        "profitable": float((res["dPI"] > 1e-12).mean()),
+        "presumed": int(((res["HHI"] > 1800) & (res["dHHI"] > 100)).sum()),
+    }
+    counts, edges = np.histogram(res["dCS"], bins=40)
+    return tables, stats, (edges, counts)
+
+@st.fragment
+def merger_panel(a, b, c):
+    colF1, colF2 = st.columns(2)
+    eff = colF1.slider("Eficiencia (% de reducción del costo de la fusionada)", 0, 50, 0, step=1,
+                       key="merger_eff") / 100
+    mode = colF2.radio("Fusiones a evaluar", ["Todas las parejas", "Un grupo de firmas"],
+                       horizontal=True, key="merger_mode")
+    if mode == "Un grupo de firmas":
+        txt = st.text_input("Firmas a fusionar (p. ej. 1, 2, 5)", value="1, 2", key="merger_group")
+        try:
+            group = [int(t) - 1 for t in txt.replace(";", ",").split(",") if t.strip()]
+            with stage("solve"):
+                res = simulate_merger(a, b, c, group, eff)
+        except ValueError as e:
+            st.error(f"Grupo inválido: {e}")
+            return
+        g1, g2, g3, g4 = st.columns(4)
+        g1.metric("ΔP", f"{res['dP']:+.3f}")
+        g2.metric("ΔCS", f"{res['dCS']:+.2f}")
+        g3.metric("ΔHHI", f"{res['dHHI']:+,.0f}", help=f"HHI post-fusión: {res['HHI']:,.0f}")
+        g4.metric("Δπ fusionadas", f"{res['dPI']:+.2f}")
+        g5, g6, g7, g8 = st.columns(4)
+        g5.metric("Δπ rivales", f"{res['dPI_rivals']:+.2f}")
+        g6.metric("ΔTS", f"{res['dTS']:+.2f}")
+        g7.metric("Precio post", f"{res['P']:.2f}")
+        g8.metric("Firmas activas post", f"{res['n_active']:,}")
+        return
+
+    if len(c) < 2:
+        st.info("Se necesitan al menos dos firmas.")
+        return
+    if len(c) > MAX_PAIRS_N:
+        st.info(f"Con {len(c):,} firmas hay demasiadas parejas: elige k ≤ {MAX_PAIRS_N:,} "
+                "o evalúa un grupo de firmas.")
+        return
+    sort_label = st.selectbox("Ordenar por", list(MERGER_SORT), key="merger_sort")
+    with stage("solve"):
+        tables, stats, (edges, counts) = merger_screen(a, b, c, eff)
+
+    s1, s2, s3, s4 = st.columns(4)
+    s1.metric("Parejas evaluadas", f"{stats['pairs']:,}")
+    s2.metric("Suben el precio", f"{stats['raise_P']:.0%}")
+    s3.metric("Rentables para las fusionadas", f"{stats['profitable']:.0%}")
+    s4.metric("HHI>1800 y ΔHHI>100", f"{stats['presumed']:,}",
+              help="Umbral de presunción de las guías de fusiones de EE. UU. (2023).")
+    fmt = {name: st.column_config.NumberColumn(format="%.3f" if name == "ΔP" else "%.2f")
+           for name in ("cᵢ", "cⱼ", *MERGER_COLUMNS.values())}
+    fmt["ΔHHI"] = fmt["HHI post"] = st.column_config.NumberColumn(format="%.0f")
+    with stage("table"):
+        st.dataframe(tables[sort_label], column_config=fmt, hide_index=True, use_container_width=True)
+
+    def draw_dcs_hist():
+        figH, axH = subplots()
+        axH.stairs(counts, edges, fill=True, alpha=0.8)
+        axH.set_xlabel("ΔCS"); axH.set_ylabel("Parejas")
+        axH.set_title("Cambio en el excedente del consumidor por pareja")
+        return figH
+
+    show_chart(st, "oligopolio/fusiones_dcs", (a, b, c, eff), draw_dcs_hist,
+               spec=lambda: charts.histogram_spec(edges, counts, "Cambio en el excedente del consumidor por pareja",
+                                                  "ΔCS", ytitle="Parejas"))
+
+merger_panel(a, b, c_k)
+
+# -----------------------
+# Monte Carlo: distribución de resultados con costos aleatorios
+# -----------------------
+st.divider()
+st.subheader("Simulación Monte Carlo (costos aleatorios)")
+st.caption("Muchos mercados con N firmas cuyos costos salen de una distribución; "
+           "se resuelven como arreglo mercados × firmas (las que salen quedan con qᵢ=0).")
+
+DIST_LABELS = {"Uniforme": "uniform", "Normal (truncada en 0)": "normal",
+               "Lognormal": "lognormal", "Triangular": "triangular"}
+PARAM_LABELS = {"low": "mínimo", "high": "máximo", "mean": "media", "sd": "desv. estándar", "mode": "moda"}
+PARAM_DEFAULTS = {"low": 2.0, "high": 12.0, "mean": 7.0, "sd": 2.5, "mode": 5.0}
+OUTCOME_LABELS = {"P": "Precio P", "Q": "Cantidad Q", "HHI": "HHI", "CS": "CS",
+                  "DWL": "DWL", "n_active": "Firmas activas"}
+
+# Solo el resumen (cuantiles e histogramas) va a la caché: los arreglos por mercado no
+@memoize
+def mc_summary(a, b, N, dist, params, n_markets, seed):
+    return summarize(monte_carlo(a, b, N, dist, params, n_markets, seed=seed))
+
+@st.fragment
+def monte_carlo_panel(a, b, N_default):
+    colM1, colM2, colM3 = st.columns(3)
+    with colM1:
+        dist = DIST_LABELS[st.selectbox("Distribución de costos", list(DIST_LABELS), key="mc_dist")]
+    with colM2:
+        N_mc = st.number_input("Firmas por mercado (N)", min_value=1, max_value=5000,
+                               value=min(int(N_default), 5000), step=1, key="mc_N")
+    with colM3:
+        n_markets = st.number_input("Mercados simulados", min_value=1000, max_value=2_000_000,
+                                    value=100_000, step=10_000, key="mc_markets")
+    pcols = st.columns(len(COST_DISTRIBUTIONS[dist]) + 1)
+    params = tuple(
+        pcols[i].number_input(f"{PARAM_LABELS[name]} de cᵢ", min_value=0.0, value=PARAM_DEFAULTS[name],
+                              step=0.5, format="%.2f", key=f"mc_{dist}_{name}")
+        for i, name in enumerate(COST_DISTRIBUTIONS[dist])
+    )
+    seed = pcols[-1].number_input("Semilla", min_value=0, value=0, step=1, key="mc_seed")
+    if not st.button("Simular mercados", use_container_width=True, key="btn_mc"):
+        return
+    try:
+        with stage("solve"):
+            stats, hists = mc_summary(a, b, int(N_mc), dist, params, int(n_markets), int(seed))
+    except ValueError as e:
+        st.error(f"Parámetros inválidos: {e}")
+        return
+
+    table = pd.DataFrame(stats).T.rename(index=OUTCOME_LABELS)
+    with stage("table"):
+        st.dataframe(table.style.format("{:.2f}"), use_container_width=True)
+
+    h1, h2 = st.columns(2)
+    for target, key in zip((h1, h2, h1, h2), ("P", "HHI", "CS", "DWL")):
+        edges, counts = hists[key]
+
+        def draw_hist(edges=edges, counts=counts, key=key):
+            figH, axH = subplots()
+            axH.stairs(counts, edges, fill=True, alpha=0.8)
+            axH.set_xlabel(OUTCOME_LABELS[key]); axH.set_ylabel("Mercados")
+            axH.set_title(f"Distribución de {OUTCOME_LABELS[key]}")
+            return figH
+
+        show_chart(target, f"oligopolio/mc_{key}", (a, b, int(N_mc), dist, params, int(n_markets), int(seed)),
+                   draw_hist, spec=lambda edges=edges, counts=counts, key=key: charts.histogram_spec(
+                       edges, counts, f"Distribución de {OUTCOME_LABELS[key]}", OUTCOME_LABELS[key]))
+
+monte_carlo_panel(a, b, K)
 
 with st.expander("Fórmulas usadas"):
     st.markdown(
@@ -186,11 +587,14 @@ with st.expander("Fórmulas usadas"):
   q_i=\frac{a+N(\bar c_{-i}-c_i)-\bar c_{-i}}{b(N+1)},\qquad
   \bar c_{-i}=\frac{1}{N-1}\sum_{j\ne i} c_j.
   \]
-  Si \(q_i\le0\), la firma sale del conjunto activo y se recalcula.
+  Si \(q_i\le0\), la firma sale del conjunto activo. Con costos ordenados, las activas son las \(k^*\)
+  más baratas: \(k^*\) es el mayor \(k\) con \(c_{(k)} < P_k=\frac{a+\sum_{j\le k}c_{(j)}}{k+1}\).
 - **Precio**: \( P = a - bQ \).  
 - **CS**: \( \tfrac{1}{2}Q(a-P) \).  
 - **Ganancia i**: \( \pi_i = (P-c_i)q_i \).  
 - **Óptimo competitivo**: \( P=c_{\min}\Rightarrow Q^{pc}=\frac{a-c_{\min}}{b}\) (si \(a>c_{\min}\)).  
 - **DWL**: \( \text{DWL} = TS^{pc} - (CS + \sum_i \pi_i)\).
+- **Entrada libre con costo fijo \(F\)**: entran en orden de costo mientras la última gane
+  \(\pi_{(k)}=(P_k-c_{(k)})^2/b \ge F\); el óptimo de segundo mejor maximiza \(CS_k+\sum\pi_k-kF\).
         """
     )
@@ -0,0 +1,187 @@
+# pages/6_Cournot_Diferenciado.py
+import streamlit as st
+import numpy as np
+import pandas as pd
+
+from iolab import cournot_differentiated, differentiated_factor, substitution_matrix
+from iolab.cache import memoize
+from iolab import charts
+from iolab.charts import show_chart
+from iolab.costs import parse_costs_text
+from iolab.figures import subplots
+from iolab.montecarlo import summarize
+from iolab.profiling import stage
+
+st.title("Cournot con bienes diferenciados")
+st.caption("Demanda inversa pᵢ = αᵢ − ∑ⱼ Bᵢⱼ qⱼ con Bᵢᵢ = b y Bᵢⱼ = γ·b (o γ^|i−j|·b con firmas en línea). "
+           "γ = 1: bien homogéneo (Cournot usual); γ = 0: cada firma es un monopolio.")
+
+MAX_N = 2000               # M⁻¹ de 2000×2000 ocupa 32 MB en la caché
+KINDS = {"Común (todas con todas)": "common", "En línea (más con las vecinas)": "line"}
+
+# -----------------------
+# Parámetros
+# -----------------------
+col1, col2, col3 = st.columns(3)
+a = col1.number_input("Intercepto de demanda (α)", min_value=0.0, value=20.0, step=0.5, format="%.2f")
+b = col2.number_input("Pendiente propia (b>0)", min_value=0.01, value=1.0, step=0.01, format="%.2f")
+gamma = col3.slider("Sustitución γ", 0.0, 1.0, 0.5, step=0.05)
+kind = KINDS[st.radio("Estructura de sustitución", list(KINDS), horizontal=True, key="dif_kind")]
+
+source = st.radio("Costos", ["Escribir", "Aleatorios"], horizontal=True, key="dif_cost_source")
+if source == "Escribir":
+    costs_txt = st.text_input("Costos marginales cᵢ (separados por comas)", value="6, 7.5, 9, 11")
+    with stage("parse"):
+        costs, dropped = parse_costs_text(costs_txt)
+    if dropped:
+        st.caption(f"Se descartaron {dropped:,} valores no numéricos.")
+else:
+    colR1, colR2, colR3, colR4 = st.columns(4)
+    N_rand = colR1.number_input("Firmas (N)", min_value=2, max_value=MAX_N, value=200, step=10, key="dif_N")
+    c_lo = colR2.number_input("Costo mínimo", min_value=0.0, value=4.0, step=0.5, format="%.2f", key="dif_c_lo")
+    c_hi = colR3.number_input("Costo máximo", min_value=0.0, value=14.0, step=0.5, format="%.2f", key="dif_c_hi")
+    seed = colR4.number_input("Semilla", min_value=0, value=0, step=1, key="dif_seed")
+    costs = np.random.default_rng(int(seed)).uniform(min(c_lo, c_hi), max(c_lo, c_hi), int(N_rand))
+N = costs.size
+if N < 2:
+    st.info("Se necesitan al menos dos firmas.")
+    st.stop()
+if N > MAX_N:
+    st.error(f"Máximo {MAX_N:,} firmas en esta página.")
+    st.stop()
+
+# La inversa de M = B + diag(B) se calcula una vez por demanda (N, b, γ, estructura) y se
+# reutiliza al cambiar costos o escenarios: cada escenario interior cuesta un producto matriz-vector
+@memoize
+def demand_inverse(N, b, gamma, kind):
+    return differentiated_factor(substitution_matrix(N, b, gamma, kind))[1]
+
+def solve_scenarios(a, b, gamma, kind, costs):
+    B = substitution_matrix(costs.shape[-1], b, gamma, kind)
+    factor = (B + np.diag(np.diag(B)), demand_inverse(costs.shape[-1], b, gamma, kind))
+    return cournot_differentiated(np.full(costs.shape[-1], a), B, costs, factor=factor)
+
+@memoize
+def equilibrium(a, b, gamma, kind, costs):
+    return solve_scenarios(a, b, gamma, kind, costs)
+
+try:
+    with stage("solve"):
+        q, p, CS, pi = equilibrium(a, b, gamma, kind, costs)
+except ValueError as e:
+    st.error(f"Demanda inválida: {e}")
+    st.stop()
+
+# -----------------------
+# Resultados del escenario
+# -----------------------
+Q = q.sum()
+m1, m2, m3, m4, m5 = st.columns(5)
+m1.metric("Precio promedio (ponderado)", f"{(p * q).sum() / Q:.2f}" if Q > 0 else "—")
+m2.metric("Cantidad total Q", f"{Q:.2f}")
+m3.metric("CS", f"{CS:.2f}")
+m4.metric("∑π", f"{pi.sum():.2f}")
+m5.metric("Firmas activas", f"{int((q > 0).sum()):,} de {N:,}")
+
+firm = np.arange(1, N + 1)
+g1, g2 = st.columns(2)
+
+def draw_quantities():
+    figQ, axQ = subplots()
+    if N <= 30:
+        axQ.bar(firm, q)
+    else:
+        axQ.plot(firm, q)
+    axQ.set_xlabel("Firma i"); axQ.set_ylabel("qᵢ")
+    axQ.set_title("Cantidades por firma")
+    return figQ
+
+def quantities_spec():
+    if N <= 30:
+        return charts.bars_spec(q, "Cantidades por firma", "qᵢ")
+    return charts.line_vs_k_spec(firm, q, "qᵢ", "Cantidades por firma", xtitle="Firma i", points=False)
+
+show_chart(g1, "diferenciado/cantidades", (a, b, gamma, kind, costs), draw_quantities, spec=quantities_spec)
+
+def draw_prices():
+    figP, axP = subplots()
+    axP.plot(firm, p, marker="o" if N <= 30 else None, label="Precio pᵢ")
+    axP.plot(firm, costs, marker="o" if N <= 30 else None, linestyle="--", label="Costo cᵢ")
+    axP.set_xlabel("Firma i"); axP.set_ylabel("Precio / costo")
+    axP.set_title("Precios y costos por firma")
+    axP.legend()
+    return figP
+
+show_chart(g2, "diferenciado/precios", (a, b, gamma, kind, costs), draw_prices,
+           spec=lambda: charts.lines_spec(firm, {"Precio pᵢ": p, "Costo cᵢ": costs},
+                                          "Precios y costos por firma", "Firma i", "Precio / costo"))
+
+df = pd.DataFrame({"costo cᵢ": costs, "qᵢ": q, "precio pᵢ": p, "margen pᵢ−cᵢ": p - costs, "πᵢ": pi},
+                  index=pd.RangeIndex(1, N + 1, name="firma"))
+with stage("table"):
+    st.dataframe(df, column_config={k: st.column_config.NumberColumn(format="%.3f") for k in df.columns},
+                 use_container_width=True, height=min(38 + 35 * N, 400))
+
+# -----------------------
+# Muchos escenarios de costos con la misma demanda (una llamada, una factorización);
+# a la caché solo va el resumen
+# -----------------------
+st.divider()
+st.subheader("Escenarios de costos")
+st.caption("Choques cᵢ + σ·εᵢ (truncados en 0) sobre los costos de arriba; todos los escenarios se "
+           "resuelven en una llamada reutilizando M⁻¹.")
+OUTCOME_LABELS = {"P": "Precio promedio", "Q": "Cantidad Q", "CS": "CS", "PI": "∑π", "n_active": "Firmas activas"}
+
+@memoize
+def scenario_summary(a, b, gamma, kind, costs, n_scen, sd, seed):
+    shocks = np.random.default_rng(seed).normal(0.0, sd, (n_scen, costs.size))
+    q_s, p_s, CS_s, pi_s = solve_scenarios(a, b, gamma, kind, np.maximum(costs + shocks, 0.0))
+    Q_s = q_s.sum(axis=-1)
+    P_s = np.where(Q_s > 0, (p_s * q_s).sum(axis=-1) / np.where(Q_s > 0, Q_s, 1.0), a)
+    return summarize({"P": P_s, "Q": Q_s, "CS": CS_s, "PI": pi_s.sum(axis=-1),
+                      "n_active": (q_s > 0).sum(axis=-1)})
+
+@st.fragment
+def scenarios_panel(a, b, gamma, kind, costs):
+    s1, s2, s3 = st.columns(3)
+    n_scen = s1.number_input("Escenarios", min_value=10, max_value=5000, value=200, step=50, key="dif_scen")
+    sd = s2.number_input("Desviación de los choques σ", min_value=0.0, value=1.0, step=0.25, format="%.2f",
+                         key="dif_sd")
+    seed = s3.number_input("Semilla de los choques", min_value=0, value=0, step=1, key="dif_scen_seed")
+    if not st.button("Resolver escenarios", use_container_width=True, key="btn_dif_scen"):
+        return
+    with stage("solve"):
+        stats, hists = scenario_summary(a, b, gamma, kind, costs, int(n_scen), float(sd), int(seed))
+    with stage("table"):
+        st.dataframe(pd.DataFrame(stats).T.rename(index=OUTCOME_LABELS).style.format("{:.2f}"),
+                     use_container_width=True)
+    h1, h2 = st.columns(2)
+    for target, key in ((h1, "P"), (h2, "n_active")):
+        edges, counts = hists[key]
+
+        def draw_hist(edges=edges, counts=counts, key=key):
+            figH, axH = subplots()
+            axH.stairs(counts, edges, fill=True, alpha=0.8)
+            axH.set_xlabel(OUTCOME_LABELS[key]); axH.set_ylabel("Escenarios")
+            axH.set_title(f"Distribución de {OUTCOME_LABELS[key]}")
+            return figH
+
+        show_chart(target, f"diferenciado/esc_{key}", (a, b, gamma, kind, costs, int(n_scen), float(sd), int(seed)),
+                   draw_hist, spec=lambda edges=edges, counts=counts, key=key: charts.histogram_spec(
+                       edges, counts, f"Distribución de {OUTCOME_LABELS[key]}", OUTCOME_LABELS[key],
+                       ytitle="Escenarios"))
+
+scenarios_panel(a, b, gamma, kind, costs)
+
+with st.expander("Fórmulas usadas"):
+    st.markdown(
+        r"""
+- **Demanda**: \( p_i = \alpha_i - b\,q_i - \sum_{j\ne i} B_{ij}\,q_j \), con \(B_{ij}=\gamma b\) (común)
+  o \(B_{ij}=\gamma^{|i-j|} b\) (en línea).
+- **FOC**: \( \alpha_i - c_i - 2b\,q_i - \sum_{j\ne i} B_{ij} q_j = 0 \) si \(q_i>0\), es decir
+  \( (B+\operatorname{diag}B)\,q = \alpha - c \) sobre las activas.
+- **Con salidas** (\(q_i\ge0\)): complementariedad lineal \(q\ge0,\ w=Mq-(\alpha-c)\ge0,\ q\cdot w=0\),
+  \(M=B+\operatorname{diag}B\) definida positiva ⇒ solución única.
+- **CS**: \( \tfrac12\, q^\top B\, q \) (utilidad cuadrática). **Ganancia**: \( \pi_i=(p_i-c_i)\,q_i \).
+        """
+    )
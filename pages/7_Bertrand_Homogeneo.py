@@ -1,7 +1,10 @@
 # pages/7_Bertrand_Homogeneo.py
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+
+from iolab import bertrand_homogeneous
+from iolab.figures import show_figure, subplots
+from iolab.profiling import stage
 
 st.title("Duopolio de Bertrand — producto homogéneo")
 st.caption(
@@ -22,32 +25,20 @@ c2 = col4.number_input("c₂ (costo marginal 2)", min_value=0.0, value=9.0, step
 # -----------------------
 # Equilibrio "docente"
 # -----------------------
-c_min, c_max = min(c1, c2), max(c1, c2)
-p_star = c_max if not np.isclose(c1, c2) else c_min
-Q_star = max((a - p_star) / b, 0.0)
+with stage("solve"):
+    bt = bertrand_homogeneous(a, b, c1, c2)
+p_star, Q_star, c_min = bt["p"], bt["Q"], bt["c_min"]
+q1, q2 = bt["q1"], bt["q2"]
+pi1, pi2, PI = bt["pi1"], bt["pi2"], bt["PI"]
+CS, TS = bt["CS"], bt["TS"]
+Q_pc, TS_pc, DWL = bt["Q_pc"], bt["TS_pc"], bt["DWL"]   # benchmark competitivo (P=c_min)
 
 if np.isclose(c1, c2):
-    q1 = q2 = Q_star / 2.0
     winner = "Empate: ambas venden (p* = c₁ = c₂)."
 elif c1 < c2:
-    q1, q2, winner = Q_star, 0.0, "Vende la firma 1 (c₁ < c₂)."
-else:
-    q1, q2, winner = 0.0, Q_star, "Vende la firma 2 (c₂ < c₁)."
-
-pi1 = (p_star - c1) * q1
-pi2 = (p_star - c2) * q2
-PI  = pi1 + pi2
-CS  = 0.5 * Q_star * (a - p_star)
-TS  = CS + PI
-
-# Benchmark competitivo (P=c_min)
-if a > c_min:
-    Q_pc = (a - c_min) / b
-    TS_pc = 0.5 * (a - c_min) * Q_pc
+    winner = "Vende la firma 1 (c₁ < c₂)."
 else:
-    Q_pc = 0.0
-    TS_pc = 0.0
-DWL = max(TS_pc - TS, 0.0)
+    winner = "Vende la firma 2 (c₂ < c₁)."
 
 # -----------------------
 # Métricas
@@ -72,29 +63,32 @@ Qmax_plot = max(Q_int, Q_pc, Q_star)
 Q = np.linspace(0, max(Qmax_plot, 1e-9), 400)
 P_d = a - b * Q
 
-figA, axA = plt.subplots()
-axA.plot(Q, P_d, label="Demanda inversa P(Q)=a−bQ")
-axA.hlines(p_star, 0, max(Q_star, Q_pc), linestyles="--", label="p* (Bertrand)")
-axA.hlines(c_min,  0, max(Q_star, Q_pc), linestyles=":",  label="c_min (competencia)")
-axA.axvline(Q_star, linestyle=":", linewidth=1)
-axA.axvline(Q_pc,   linestyle=":", linewidth=1)
-
-if Q_star > 0:
-    Q_cs = np.linspace(0, Q_star, 200)
-    axA.fill_between(Q_cs, a - b*Q_cs, p_star, alpha=0.30, label="Excedente del consumidor")
-if Q_star > 0 and p_star > c_min:
-    axA.fill_between([0, Q_star], [c_min, c_min], [p_star, p_star], alpha=0.30, label="Ganancias del vendedor")
-if Q_pc > Q_star:
-    Q_dwl = np.linspace(Q_star, Q_pc, 200)
-    axA.fill_between(Q_dwl, a - b*Q_dwl, c_min, alpha=0.25, label="Pérdida de peso muerto")
-
-axA.set_xlim(0, max(Qmax_plot, 1e-9)*1.02)
-axA.set_ylim(0, max(a, p_star, c_min)*1.05)
-axA.set_xlabel("Cantidad Q")
-axA.set_ylabel("Precio / Costo")
-axA.set_title("Bertrand (duopolio): CS, π y DWL")
-axA.legend(loc="best")
-left.pyplot(figA, clear_figure=True)
+def draw_cs_pi_dwl():
+    figA, axA = subplots()
+    axA.plot(Q, P_d, label="Demanda inversa P(Q)=a−bQ")
+    axA.hlines(p_star, 0, max(Q_star, Q_pc), linestyles="--", label="p* (Bertrand)")
+    axA.hlines(c_min,  0, max(Q_star, Q_pc), linestyles=":",  label="c_min (competencia)")
+    axA.axvline(Q_star, linestyle=":", linewidth=1)
+    axA.axvline(Q_pc,   linestyle=":", linewidth=1)
+
+    if Q_star > 0:
+        Q_cs = np.linspace(0, Q_star, 200)
+        axA.fill_between(Q_cs, a - b*Q_cs, p_star, alpha=0.30, label="Excedente del consumidor")
+    if Q_star > 0 and p_star > c_min:
+        axA.fill_between([0, Q_star], [c_min, c_min], [p_star, p_star], alpha=0.30, label="Ganancias del vendedor")
+    if Q_pc > Q_star:
+        Q_dwl = np.linspace(Q_star, Q_pc, 200)
+        axA.fill_between(Q_dwl, a - b*Q_dwl, c_min, alpha=0.25, label="Pérdida de peso muerto")
+
+    axA.set_xlim(0, max(Qmax_plot, 1e-9)*1.02)
+    axA.set_ylim(0, max(a, p_star, c_min)*1.05)
+    axA.set_xlabel("Cantidad Q")
+    axA.set_ylabel("Precio / Costo")
+    axA.set_title("Bertrand (duopolio): CS, π y DWL")
+    axA.legend(loc="best")
+    return figA
+
+show_figure(left, "bertrand/cs_pi_dwl", (a, b, c1, c2), draw_cs_pi_dwl)
 
 # (B) Mejores respuestas (derecha) – tramos completos con separación ε
 p1_max = (a + c1) / 2.0
@@ -105,45 +99,48 @@ p_hi   = max(a, p1_max, p2_max, c1, c2, p_star) * 1.05
 # ε interno proporcional al rango, mínimo 0.1
 eps = max(0.02 * (p_hi - p_lo), 0.1)
 
-figC, axC = plt.subplots()
-
-# --- RF1 ---
-# vertical en x=c1 para p2 ≤ c1
-axC.plot([c1, c1], [p_lo, c1], color="#1f77b4", linewidth=3, label="RF₁: p₁*(p₂)")
-# tramo oblicuo (undercut estricto): y = x + ε para p2∈(c1, p1_max)
-x_mid1 = np.linspace(c1, p1_max, 300)
-y_mid1 = x_mid1 + eps
-axC.plot(x_mid1, y_mid1, color="#1f77b4", linewidth=3)
-# vertical en x=p1_max para p2 ≥ p1_max
-axC.plot([p1_max, p1_max], [p1_max, p_hi], color="#1f77b4", linewidth=3)
-
-# --- RF2 ---
-# horizontal en y=c2 para p1 ≤ c2
-axC.plot([p_lo, c2], [c2, c2], color="#2ca02c", linewidth=3, label="RF₂: p₂*(p₁)")
-# tramo oblicuo (undercut estricto): y = x − ε para p1∈(c2, p2_max)
-x_mid2 = np.linspace(c2, p2_max, 300)
-y_mid2 = x_mid2 - eps
-axC.plot(x_mid2, y_mid2, color="#2ca02c", linewidth=3)
-# horizontal en y=p2_max para p1 ≥ p2_max
-axC.plot([p2_max, p_hi], [p2_max, p2_max], color="#2ca02c", linewidth=3)
-
-# Referencias y equilibrio
-axC.plot([p_lo, p_hi], [p_lo, p_hi], linestyle="--", color="gray", linewidth=1)  # diagonal de 45°
-axC.axvline(p1_max, linestyle=":", color="#1f77b4", linewidth=1)
-axC.axhline(p2_max, linestyle=":", color="#2ca02c", linewidth=1)
-axC.axvline(c1,     linestyle="-", color="#1f77b4", linewidth=2, alpha=0.25)
-axC.axhline(c2,     linestyle="-", color="#2ca02c", linewidth=2, alpha=0.25)
-
-axC.scatter([p_star], [p_star], marker="x", s=80, color="k", zorder=5)
-axC.annotate("  (p*, p*)", (p_star, p_star), va="center")
-
-axC.set_xlim(p_lo, p_hi)
-axC.set_ylim(p_lo, p_hi)
-axC.set_xlabel("Precio p₁")
-axC.set_ylabel("Precio p₂")
-axC.set_title("Funciones de reacción en precios (duopolio Bertrand)")
-axC.legend(loc="lower right")
-right.pyplot(figC, clear_figure=True)
+def draw_reaction_functions():
+    figC, axC = subplots()
+
+    # --- RF1 ---
+    # vertical en x=c1 para p2 ≤ c1
+    axC.plot([c1, c1], [p_lo, c1], color="#1f77b4", linewidth=3, label="RF₁: p₁*(p₂)")
+    # tramo oblicuo (undercut estricto): y = x + ε para p2∈(c1, p1_max)
+    x_mid1 = np.linspace(c1, p1_max, 300)
+    y_mid1 = x_mid1 + eps
+    axC.plot(x_mid1, y_mid1, color="#1f77b4", linewidth=3)
+    # vertical en x=p1_max para p2 ≥ p1_max
+    axC.plot([p1_max, p1_max], [p1_max, p_hi], color="#1f77b4", linewidth=3)
+
+    # --- RF2 ---
+    # horizontal en y=c2 para p1 ≤ c2
+    axC.plot([p_lo, c2], [c2, c2], color="#2ca02c", linewidth=3, label="RF₂: p₂*(p₁)")
+    # tramo oblicuo (undercut estricto): y = x − ε para p1∈(c2, p2_max)
+    x_mid2 = np.linspace(c2, p2_max, 300)
+    y_mid2 = x_mid2 - eps
+    axC.plot(x_mid2, y_mid2, color="#2ca02c", linewidth=3)
+    # horizontal en y=p2_max para p1 ≥ p2_max
+    axC.plot([p2_max, p_hi], [p2_max, p2_max], color="#2ca02c", linewidth=3)
+
+    # Referencias y equilibrio
+    axC.plot([p_lo, p_hi], [p_lo, p_hi], linestyle="--", color="gray", linewidth=1)  # diagonal de 45°
+    axC.axvline(p1_max, linestyle=":", color="#1f77b4", linewidth=1)
+    axC.axhline(p2_max, linestyle=":", color="#2ca02c", linewidth=1)
+    axC.axvline(c1,     linestyle="-", color="#1f77b4", linewidth=2, alpha=0.25)
+    axC.axhline(c2,     linestyle="-", color="#2ca02c", linewidth=2, alpha=0.25)
+
+    axC.scatter([p_star], [p_star], marker="x", s=80, color="k", zorder=5)
+    axC.annotate("  (p*, p*)", (p_star, p_star), va="center")
+
+    axC.set_xlim(p_lo, p_hi)
+    axC.set_ylim(p_lo, p_hi)
+    axC.set_xlabel("Precio p₁")
+    axC.set_ylabel("Precio p₂")
+    axC.set_title("Funciones de reacción en precios (duopolio Bertrand)")
+    axC.legend(loc="lower right")
+    return figC
+
+show_figure(right, "bertrand/funciones_reaccion", (a, b, c1, c2), draw_reaction_functions)
 
 # -----------------------
 # Notas
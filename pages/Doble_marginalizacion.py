@@ -1,9 +1,16 @@
 # pages/Doble_Marginalizacion.py
+import functools
+
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd
 
+from iolab import vertical
+from iolab.jobs_ui import job_view, live_fragment, start
+from iolab.cache import memoize
+from iolab.figures import show_figure, subplots
+from iolab.profiling import stage
+
 st.set_page_config(layout="wide")
 st.title("Doble marginalización — simulador (U–D con N minoristas)")
 
@@ -16,100 +23,18 @@ st.markdown(
 def _round2(x):
     return float(f"{x:.2f}")
 
-def demand_price(a, b, Q):
-    return a - b*Q
-
-def cs_linear(a, b, P, Q):
-    # Con P(Q)=a-bQ: CS = 0.5 * Q * (a - P)
-    return 0.5 * Q * (a - P)
-
-def regime_vi(a, b, cU, cD):
-    # Integración vertical = monopolio con costo marginal cU + cD
-    c = cU + cD
-    p = (a + c)/2.0
-    Q = (a - p)/b            # = (a - c)/(2b)
-    P = p
-    pi = (p - c)*Q
-    CS = cs_linear(a, b, P, Q)
-    PS = pi
-    W = CS + PS
-    return {
-        "regimen": "VI",
-        "N": 1,
-        "w": None,
-        "p": _round2(p), "P": _round2(P), "Q": _round2(Q),
-        "pi_U": None, "pi_D": None, "pi_total": _round2(pi),
-        "CS": _round2(CS), "PS": _round2(PS), "W": _round2(W)
-    }
-
-def dm_opt_w(a, b, cU, cD):
-    # Óptimo de U con 1 minorista: 2w = a - cD + cU  => w* = (a - cD + cU)/2
-    return (a - cD + cU)/2.0
-
-def retailer_price_given_w(a, w, cD):
-    # Minorista fija p sobre costo (w + cD): p = (a + w + cD)/2
-    return (a + w + cD)/2.0
-
-def dm_duopolio_p(a, b, cU, cD):
-    # Caso N=1 (1 minorista): precio explícito p
-    w = dm_opt_w(a, b, cU, cD)
-    p = retailer_price_given_w(a, w, cD)
-    Q = (a - p)/b
-    P = p
-    pi_D = (p - (w + cD)) * Q
-    pi_U = (w - cU) * Q
-    CS = cs_linear(a, b, P, Q)
-    PS = pi_U + pi_D
-    W = CS + PS
-    return {
-        "regimen": "DM",
-        "N": 1,
-        "w": _round2(w),
-        "p": _round2(p), "P": _round2(P), "Q": _round2(Q),
-        "pi_U": _round2(pi_U), "pi_D": _round2(pi_D), "pi_total": _round2(PS),
-        "CS": _round2(CS), "PS": _round2(PS), "W": _round2(W)
-    }
-
-def dm_outcomes(a, b, cU, cD, N):
-    # DM con N minoristas simétricos (Cournot abajo).
-    # U elige w*; cada minorista compite en cantidades con costo marginal c_eff = w + cD
-    w = dm_opt_w(a, b, cU, cD)
-    c_eff = w + cD
-    # Cournot con N firmas y demanda P=a-bQ: Q = N*(a - c_eff)/(b*(N+1))
-    Q = N * (a - c_eff) / (b * (N + 1))
-    P = demand_price(a, b, Q)
-    margin_D = P - c_eff
-    pi_D_total = margin_D * Q           # suma de minoristas
-    pi_U = (w - cU) * Q
-    CS = cs_linear(a, b, P, Q)
-    PS = pi_U + pi_D_total
-    W = CS + PS
-    return {
-        "regimen": "DM",
-        "N": int(N),
-        "w": _round2(w),
-        "p": None, "P": _round2(P), "Q": _round2(Q),
-        "pi_U": _round2(pi_U), "pi_D": _round2(pi_D_total), "pi_total": _round2(PS),
-        "CS": _round2(CS), "PS": _round2(PS), "W": _round2(W)
-    }
-
-def regime_tpt(a, b, cU, cD, F=0.0):
-    # Tarifa en dos partes: w = cU; reproduce VI en p y Q. F redistribuye rentas.
-    vi = regime_vi(a, b, cU, cD)
-    pi_total = vi["pi_total"]
-    pi_U = F
-    pi_D = pi_total - F
-    out = dict(vi)
-    out.update({
-        "regimen": "TPT",
-        "w": _round2(cU), "pi_U": _round2(pi_U), "pi_D": _round2(pi_D)
-    })
-    return out
+def _regime_row(regimen, N, d):
+    # Resultado de iolab.vertical redondeado a 2 decimales (None/NaN -> None)
+    row = {"regimen": regimen, "N": int(N)}
+    for k, v in d.items():
+        row[k] = None if v is None or np.isnan(v) else _round2(v)
+    return row
 
+@memoize  # caché LRU compartida: los barridos reutilizan filas ya calculadas
 def compare_regimes(a, b, cU, cD, N, F):
-    dm = dm_duopolio_p(a, b, cU, cD) if N == 1 else dm_outcomes(a, b, cU, cD, N)
-    vi = regime_vi(a, b, cU, cD)
-    tpt = regime_tpt(a, b, cU, cD, F)
+    dm = _regime_row("DM", N, vertical.dm_outcomes(a, b, cU, cD, N))
+    vi = _regime_row("VI", 1, vertical.regime_vi(a, b, cU, cD))
+    tpt = _regime_row("TPT", 1, vertical.regime_tpt(a, b, cU, cD, F))
     return dm, vi, tpt
 
 def parse_list_floats(txt):
@@ -134,7 +59,8 @@ with st.sidebar:
     F = st.number_input("Cuota fija F (solo redistribuye rentas en TPT)", value=0.0, step=10.0, min_value=0.0, format="%.2f")
 
 # ========================= Cálculo base =========================
-dm, vi, tpt = compare_regimes(a, b, cU, cD, int(N), F)
+with stage("solve"):
+    dm, vi, tpt = compare_regimes(a, b, cU, cD, int(N), F)
 
 # ========================= UI principal =========================
 c1, c2, c3, c4, c5, c6 = st.columns(6)
@@ -161,17 +87,21 @@ def row_from(d):
         "CS": d["CS"], "PS": d["PS"], "W": d["W"]
     }
 
-df = pd.DataFrame([row_from(dm), row_from(vi), row_from(tpt)])
-st.dataframe(df, use_container_width=True)
+with stage("table"):
+    df = pd.DataFrame([row_from(dm), row_from(vi), row_from(tpt)])
+    st.dataframe(df, use_container_width=True)
 
 # Gráfico único: Bienestar por régimen
-figW, axW = plt.subplots()
-vals = [dm["W"], vi["W"], tpt["W"]]
-labs = ["DM", "VI", "TPT"]
-axW.bar(labs, vals)
-axW.set_ylabel("W")
-axW.set_title("Bienestar por régimen")
-st.pyplot(figW)
+def draw_welfare_bars():
+    figW, axW = subplots()
+    vals = [dm["W"], vi["W"], tpt["W"]]
+    labs = ["DM", "VI", "TPT"]
+    axW.bar(labs, vals)
+    axW.set_ylabel("W")
+    axW.set_title("Bienestar por régimen")
+    return figW
+
+show_figure(st, "dm/bienestar_regimen", (a, b, cU, cD, int(N), F), draw_welfare_bars)
 
 # ========================= Snapshots para la PPT =========================
 st.divider()
@@ -209,98 +139,71 @@ if st.session_state.dm_snapshots:
 # ========================= Barridos personalizados =========================
 st.divider()
 st.subheader("Barridos personalizados (elige tus propios valores)")
+# Cada barrido es un fragmento: sus widgets vuelven a ejecutar solo esa sección
+# (con los parámetros de la última ejecución completa), no el equilibrio base ni los gráficos.
+# El barrido corre en segundo plano (iolab.jobs): la tabla se llena a medida que terminan los
+# valores, se puede cancelar y sobrevive a los reruns (la sesión solo guarda el id del trabajo).
+# Mientras corre, el fragmento se vuelve a ejecutar solo (iolab.jobs_ui).
+SWEEP_COLS = {"cU": "c_U", "cD": "c_D", "b": "b", "N": "N"}
+
+def dm_sweep_row(a, b, cU, cD, N, F, param, v):
+    args = {"a": a, "b": b, "cU": cU, "cD": cD, "N": int(N), "F": F}
+    args[param] = int(v) if param == "N" else v
+    dm_v, vi_v, _ = compare_regimes(*args.values())
+    return {
+        SWEEP_COLS[param]: int(v) if param == "N" else _round2(v),
+        "P_DM": dm_v["P"], "Q_DM": dm_v["Q"], "W_DM": dm_v["W"],
+        "P_VI": vi_v["P"], "Q_VI": vi_v["Q"], "W_VI": vi_v["W"],
+        "∆W(DM−VI)": _round2(dm_v["W"] - vi_v["W"])
+    }
 
-# ----- Barrido de c_U -----
-with st.expander("Barrido de c_U (lista de valores)", expanded=False):
-    colU1, colU2 = st.columns([3,1])
-    with colU1:
-        cU_values_txt = st.text_input("Valores de c_U (ej. 5,10,15,20)", value="", key="cU_vals")
-    with colU2:
-        run_cU = st.button("Ejecutar barrido c_U", use_container_width=True, key="btn_cU")
-    if run_cU:
-        vals = parse_list_floats(cU_values_txt)
-        rows = []
-        for v in vals:
-            dm_v, vi_v, _ = compare_regimes(a, b, v, cD, int(N), F)
-            rows.append({
-                "c_U": _round2(v),
-                "P_DM": dm_v["P"], "Q_DM": dm_v["Q"], "W_DM": dm_v["W"],
-                "P_VI": vi_v["P"], "Q_VI": vi_v["Q"], "W_VI": vi_v["W"],
-                "∆W(DM−VI)": _round2(dm_v["W"] - vi_v["W"])
-            })
-        if rows:
-            st.dataframe(pd.DataFrame(rows), use_container_width=True)
-
-# ----- Barrido de c_D -----
-with st.expander("Barrido de c_D (lista de valores)", expanded=False):
-    colD1, colD2 = st.columns([3,1])
-    with colD1:
-        cD_values_txt = st.text_input("Valores de c_D (ej. 5,10,15,20)", value="", key="cD_vals")
-    with colD2:
-        run_cD = st.button("Ejecutar barrido c_D", use_container_width=True, key="btn_cD")
-    if run_cD:
-        vals = parse_list_floats(cD_values_txt)
-        rows = []
-        for v in vals:
-            dm_v, vi_v, _ = compare_regimes(a, b, cU, v, int(N), F)
-            rows.append({
-                "c_D": _round2(v),
-                "P_DM": dm_v["P"], "Q_DM": dm_v["Q"], "W_DM": dm_v["W"],
-                "P_VI": vi_v["P"], "Q_VI": vi_v["Q"], "W_VI": vi_v["W"],
-                "∆W(DM−VI)": _round2(dm_v["W"] - vi_v["W"])
-            })
-        if rows:
-            st.dataframe(pd.DataFrame(rows), use_container_width=True)
-
-# ----- Barrido de b (elasticidad) -----
-with st.expander("Barrido de elasticidad (lista de b)", expanded=False):
-    colB1, colB2 = st.columns([3,1])
-    with colB1:
-        b_values_txt = st.text_input("Valores de b (ej. 0.6,1.0,1.8)", value="", key="b_vals_dm")
-    with colB2:
-        run_b = st.button("Ejecutar barrido b", use_container_width=True, key="btn_b_dm")
-    if run_b:
-        vals = parse_list_floats(b_values_txt)
-        rows = []
-        for v in vals:
-            dm_v, vi_v, _ = compare_regimes(a, v, cU, cD, int(N), F)
-            rows.append({
-                "b": _round2(v),
-                "P_DM": dm_v["P"], "Q_DM": dm_v["Q"], "W_DM": dm_v["W"],
-                "P_VI": vi_v["P"], "Q_VI": vi_v["Q"], "W_VI": vi_v["W"],
-                "∆W(DM−VI)": _round2(dm_v["W"] - vi_v["W"])
-            })
-        if rows:
-            st.dataframe(pd.DataFrame(rows), use_container_width=True)
-
-# ----- Barrido de N (entrada minorista) -----
-with st.expander("Barrido de N (lista de valores)", expanded=False):
-    colN1, colN2 = st.columns([3,1])
-    with colN1:
-        N_values_txt = st.text_input("Valores de N (ej. 1,2,3,5)", value="", key="N_vals_dm")
-    with colN2:
-        run_N = st.button("Ejecutar barrido N", use_container_width=True, key="btn_N_dm")
-    if run_N:
-        Ns = parse_list_ints(N_values_txt)
-        rows = []
-        for NN in Ns:
-            NN = int(NN)
-            dm_v, vi_v, _ = compare_regimes(a, b, cU, cD, NN, F)
-            rows.append({
-                "N": int(NN),
-                "P_DM": dm_v["P"], "Q_DM": dm_v["Q"], "W_DM": dm_v["W"],
-                "P_VI": vi_v["P"], "Q_VI": vi_v["Q"], "W_VI": vi_v["W"],
-                "∆W(DM−VI)": _round2(dm_v["W"] - vi_v["W"])
-            })
-        if rows:
-            dfN = pd.DataFrame(rows)
-            st.dataframe(dfN, use_container_width=True)
-            # pequeña gráfica lineal de Q_DM vs N
-            figN, axN = plt.subplots()
-            axN.plot(dfN["N"], dfN["Q_DM"], marker="o")
-            axN.set_xlabel("N"); axN.set_ylabel("Q bajo DM")
-            axN.set_title("Q (DM) vs N")
-            st.pyplot(figN)
+def sweep_panel(param, title, label, txt_key, btn_label, btn_key, parse, a, b, cU, cD, N, F):
+    state_key = f"job_{btn_key}"
+    params = (a, b, cU, cD, int(N), F)
+
+    @live_fragment(state_key)
+    def panel():
+        with st.expander(title, expanded=False):
+            col1, col2 = st.columns([3,1])
+            with col1:
+                values_txt = st.text_input(label, value="", key=txt_key)
+            with col2:
+                run = st.button(btn_label, use_container_width=True, key=btn_key)
+            if run:
+                vals = parse(values_txt)
+                if vals:
+                    start(state_key, functools.partial(dm_sweep_row, *params, param), vals,
+                          ("dm_sweep", param, params, vals), params, chunk=max(1, len(vals) // 20))
+            job = job_view(state_key, params)
+            rows = job.rows() if job is not None else []
+            if not rows:
+                return
+            df = pd.DataFrame(rows)
+            st.dataframe(df, use_container_width=True)
+            if param == "N":
+                # pequeña gráfica lineal de Q_DM vs N
+                def draw_Q_vs_N():
+                    figN, axN = subplots()
+                    axN.plot(df["N"], df["Q_DM"], marker="o")
+                    axN.set_xlabel("N"); axN.set_ylabel("Q bajo DM")
+                    axN.set_title("Q (DM) vs N")
+                    return figN
+
+                show_figure(st, "dm/Q_vs_N", (st.session_state[state_key]["params"], df["N"].to_numpy(),
+                                              df["Q_DM"].to_numpy()), draw_Q_vs_N)
+
+    # Cada panel en su propio contenedor: el id del fragmento depende de la ruta del contenedor
+    with st.container():
+        panel()
+
+sweep_panel("cU", "Barrido de c_U (lista de valores)", "Valores de c_U (ej. 5,10,15,20)", "cU_vals",
+            "Ejecutar barrido c_U", "btn_cU", parse_list_floats, a, b, cU, cD, N, F)
+sweep_panel("cD", "Barrido de c_D (lista de valores)", "Valores de c_D (ej. 5,10,15,20)", "cD_vals",
+            "Ejecutar barrido c_D", "btn_cD", parse_list_floats, a, b, cU, cD, N, F)
+sweep_panel("b", "Barrido de elasticidad (lista de b)", "Valores de b (ej. 0.6,1.0,1.8)", "b_vals_dm",
+            "Ejecutar barrido b", "btn_b_dm", parse_list_floats, a, b, cU, cD, N, F)
+sweep_panel("N", "Barrido de N (lista de valores)", "Valores de N (ej. 1,2,3,5)", "N_vals_dm",
+            "Ejecutar barrido N", "btn_N_dm", parse_list_ints, a, b, cU, cD, N, F)
 
 # ========================= Notas =========================
 st.caption("Notas: (i) Bajo TPT con w=c_U se elimina la distorsión de DM y se recupera VI en P y Q. (ii) Con N minoristas en Cournot, la DM se atenúa al aumentar N.")
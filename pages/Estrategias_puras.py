@@ -2,6 +2,9 @@ import streamlit as st
 import numpy as np
 import pandas as pd
 
+from iolab import pure_best_responses
+from iolab.profiling import stage
+
 st.set_page_config(page_title="Juego bimatricial", layout="wide")
 st.title("Juego en forma normal (2 jugadores): mejores respuestas y equilibrios puros")
 
@@ -17,24 +20,11 @@ def parse_commas(text, default_prefix, k):
 
 def best_responses(U1, U2, row_names, col_names):
     n, m = U1.shape
+    BR1, BR2, NE_mask = pure_best_responses(U1, U2)
 
-    BR1_by_col = []
-    for j in range(m):
-        col_vals = U1[:, j]
-        mx = np.max(col_vals)
-        BR1_by_col.append([row_names[i] for i in range(n) if col_vals[i] == mx])
-
-    BR2_by_row = []
-    for i in range(n):
-        row_vals = U2[i, :]
-        mx = np.max(row_vals)
-        BR2_by_row.append([col_names[j] for j in range(m) if row_vals[j] == mx])
-
-    NE = []
-    for i in range(n):
-        for j in range(m):
-            if (row_names[i] in BR1_by_col[j]) and (col_names[j] in BR2_by_row[i]):
-                NE.append((i, j))
+    BR1_by_col = [[row_names[i] for i in range(n) if BR1[i, j]] for j in range(m)]
+    BR2_by_row = [[col_names[j] for j in range(m) if BR2[i, j]] for i in range(n)]
+    NE = [(int(i), int(j)) for i, j in zip(*np.nonzero(NE_mask))]
 
     return BR1_by_col, BR2_by_row, NE
 
@@ -147,7 +137,8 @@ U2 = U2_df.to_numpy(dtype=float)
 # -----------------------------
 # Compute + display results
 # -----------------------------
-BR1_by_col, BR2_by_row, NE = best_responses(U1, U2, row_names, col_names)
+with stage("solve"):
+    BR1_by_col, BR2_by_row, NE = best_responses(U1, U2, row_names, col_names)
 
 st.divider()
 st.subheader("Resultados")
@@ -178,4 +169,5 @@ tbl = payoff_table(U1, U2, row_names, col_names, decimals=decimals)
 styler_fn = style_marks(row_names, col_names, BR1_by_col, BR2_by_row, NE)
 
 st.caption("Verde = equilibrio puro; azul = BR de J1; morado = BR de J2; amarillo = ambos BR.")
-st.dataframe(tbl.style.apply(styler_fn, axis=None), use_container_width=True)
+with stage("table"):
+    st.dataframe(tbl.style.apply(styler_fn, axis=None), use_container_width=True)
@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 
-import io, textwrap
-import matplotlib.pyplot as plt
-import matplotlib.patheffects as pe
+import textwrap
 import streamlit as st
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import Dict, List, Tuple
 
+from iolab.figures import figure_bytes, show_figure, subplots
+from iolab.startup import lazy_import
+
+# matplotlib solo se carga si alguna figura no está en la caché
+mpatches = lazy_import("matplotlib.patches")
+pe = lazy_import("matplotlib.patheffects")
+
 # -------------------- Tema / constantes --------------------
 THEME = {
     "node_radius": 0.40, "name_font_size": 9, "name_max_chars": 10,
@@ -124,7 +129,7 @@ def _assign_positions(state: GameState, theme):
     dfs(state.get_root(),0); return pos
 
 def render(state: GameState, theme, ax=None, title=None):
-    if ax is None: _, ax = plt.subplots(figsize=(11,7))
+    if ax is None: _, ax = subplots(figsize=(11,7))
     pos=_assign_positions(state, theme)
 
     for (u,v,lab,mk) in state.edges():
@@ -147,7 +152,7 @@ def render(state: GameState, theme, ax=None, title=None):
         x,y=pos[u]; pid=nd.player
         face = state.player_colors.get(pid, "#2a9d8f")
         name = _short_name(state.player_names.get(pid,f"J{pid}"), theme["name_max_chars"])
-        ax.add_patch(plt.Circle((x,y), R, fc=face, ec=theme["node_edge_color"], lw=2.5, alpha=theme["node_alpha"]))
+        ax.add_patch(mpatches.Circle((x,y), R, fc=face, ec=theme["node_edge_color"], lw=2.5, alpha=theme["node_alpha"]))
         ax.text(x,y,name,fontsize=theme["name_font_size"],color="white",ha="center",va="center")
         ax.text(x-R*0.6, y+R*0.8, str(u), fontsize=9, ha="right")
 
@@ -252,20 +257,22 @@ with left:
 # ----- Columna derecha: vista y exportación -----
 with right:
     st.subheader("Vista previa")
-    fig, ax = plt.subplots(figsize=(11,7))
-    render(S, THEME, ax=ax)   # sin título en preview
-    st.pyplot(fig, use_container_width=True)
-    plt.close(fig)
+    tree_key = (asdict(S), THEME)   # el árbol y el tema determinan la figura
+    def draw_preview():
+        fig, ax = subplots(figsize=(11,7))
+        render(S, THEME, ax=ax)   # sin título en preview
+        return fig
+    show_figure(st, "arbol/preview", tree_key, draw_preview)
 
     st.markdown("---")
     c1, c2 = st.columns([3,1])
     with c1:
         png_title = st.text_input("Título opcional para el PNG", "")
     with c2:
-        buf = io.BytesIO()
-        fig2, ax2 = plt.subplots(figsize=(11,7))
-        render(S, THEME, ax=ax2, title=(png_title.strip() or None))
-        fig2.savefig(buf, format="png", dpi=220, bbox_inches="tight")
-        plt.close(fig2); buf.seek(0)
-        st.download_button("Descargar PNG", data=buf, file_name="arbol.png",
+        def draw_export():
+            fig2, ax2 = subplots(figsize=(11,7))
+            render(S, THEME, ax=ax2, title=(png_title.strip() or None))
+            return fig2
+        png = figure_bytes("arbol/png", (tree_key, png_title.strip()), draw_export, dpi=220)
+        st.download_button("Descargar PNG", data=png, file_name="arbol.png",
                            mime="image/png", use_container_width=True)
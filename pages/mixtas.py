@@ -1,11 +1,18 @@
-import io
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MultipleLocator
-from matplotlib.lines import Line2D
 import streamlit as st
 
+from iolab import mixed_2x2
+from iolab import charts
+from iolab.charts import show_chart
+from iolab.figures import figure_bytes, subplots
+from iolab.profiling import stage
+from iolab.startup import lazy_import
+
+# matplotlib solo se carga si alguna figura no está en la caché
+mticker = lazy_import("matplotlib.ticker")
+mlines = lazy_import("matplotlib.lines")
+
 st.set_page_config(page_title="Mixto estricto (2×2)", layout="wide")
 st.title("Equilibrio de Nash estrictamente mixto — Juego 2×2")
 st.caption("Convención: p = Pr[J1 juega U]; q = Pr[J2 juega L]. Ejes del diagrama: x=p, y=q.")
@@ -45,21 +52,10 @@ B = B_df.to_numpy(dtype=float)  # pagos J2
 # ====================== 2) Mixto estrictamente interior ======================
 # q* = (a22 - a12) / (a11 - a12 - a21 + a22)
 # p* = (b22 - b21) / (b11 - b12 - b21 + b22)
-den_q = (A[0,0] - A[0,1] - A[1,0] + A[1,1])
-den_p = (B[0,0] - B[0,1] - B[1,0] + B[1,1])
-
-has_q = abs(den_q) > 1e-12
-has_p = abs(den_p) > 1e-12
-
-q_star = (A[1,1] - A[0,1]) / den_q if has_q else np.nan
-p_star = (B[1,1] - B[1,0]) / den_p if has_p else np.nan
-
-eps = 1e-9
-mixed_strict = (
-    has_q and has_p
-    and (q_star > eps) and (q_star < 1 - eps)
-    and (p_star > eps) and (p_star < 1 - eps)
-)
+with stage("solve"):
+    mix = mixed_2x2(A, B)
+p_star, q_star = mix["p_star"], mix["q_star"]
+mixed_strict = bool(mix["mixed_strict"])
 
 # ====================== 3) Resultado ======================
 st.subheader("Resultado")
@@ -67,8 +63,7 @@ st.subheader("Resultado")
 if mixed_strict:
     p_show = round(float(p_star), 2)
     q_show = round(float(q_star), 2)
-    EU1 = q_star*A[0,0] + (1 - q_star)*A[0,1]
-    EU2 = p_star*B[0,0] + (1 - p_star)*B[1,0]
+    EU1, EU2 = mix["EU1"], mix["EU2"]
     st.success(f"Equilibrio estrictamente mixto:  p* = {p_show},  q* = {q_show}")
     st.write(f"EU₁(p*,q*) = {round(float(EU1), 2)}   |   EU₂(p*,q*) = {round(float(EU2), 2)}")
 else:
@@ -83,68 +78,76 @@ q_grid = np.linspace(0, 1, 401)
 EU_U = q_grid*A[0,0] + (1 - q_grid)*A[0,1]
 EU_D = q_grid*A[1,0] + (1 - q_grid)*A[1,1]
 
-gA, axA = plt.subplots(figsize=(6.8, 4.6), dpi=140)
-axA.plot(q_grid, EU_U, label=r"$EU_1(U,q)$", linewidth=2)
-axA.plot(q_grid, EU_D, label=r"$EU_1(D,q)$", linewidth=2, linestyle="--")
-if mixed_strict:
-    y_int = q_star*A[0,0] + (1 - q_star)*A[0,1]
-    axA.scatter([q_star], [y_int], zorder=5)
-axA.set_xlabel("q"); axA.set_ylabel("EU₁"); axA.set_xlim(0,1)
-axA.grid(alpha=0.3); axA.legend(); gA.tight_layout()
+def draw_eu1():
+    gA, axA = subplots(figsize=(6.8, 4.6), dpi=140)
+    axA.plot(q_grid, EU_U, label=r"$EU_1(U,q)$", linewidth=2)
+    axA.plot(q_grid, EU_D, label=r"$EU_1(D,q)$", linewidth=2, linestyle="--")
+    if mixed_strict:
+        y_int = q_star*A[0,0] + (1 - q_star)*A[0,1]
+        axA.scatter([q_star], [y_int], zorder=5)
+    axA.set_xlabel("q"); axA.set_ylabel("EU₁"); axA.set_xlim(0,1)
+    axA.grid(alpha=0.3); axA.legend(); gA.tight_layout()
+    return gA
 
 # B) Diagrama BR (solo si hay mixto interior)
 c_1, c_2, lw = "tab:blue", "tab:purple", 3.0
-gB, axB = plt.subplots(figsize=(6.8, 6.8), dpi=140)
-axB.plot([0,1,1,0,0],[0,0,1,1,0], color="black", lw=1.3, zorder=1)
-
-if mixed_strict:
-    # BR J1 (p | q): verticales por tramos usando q*
-    axB.vlines(x=0, ymin=0, ymax=q_star, color=c_1, lw=lw, zorder=9)
-    axB.hlines(y=q_star, xmin=0, xmax=1, color=c_1, lw=lw, zorder=9)  # guía de indiferencia
-    axB.vlines(x=1, ymin=q_star, ymax=1, color=c_1, lw=lw, zorder=9)
-    # BR J2 (q | p): horizontales por tramos usando p*
-    axB.hlines(y=0, xmin=0, xmax=p_star, color=c_2, lw=lw, zorder=10)
-    axB.vlines(x=p_star, ymin=0, ymax=1, color=c_2, lw=lw, zorder=10)  # guía de indiferencia
-    axB.hlines(y=1, xmin=p_star, xmax=1, color=c_2, lw=lw, zorder=10)
-    axB.scatter([p_star], [q_star], s=70, color="black", zorder=11)
-else:
-    axB.text(0.5, 0.5, "No hay mixto interior", ha="center", va="center", alpha=0.4)
-
-axB.set_xlim(0,1); axB.set_ylim(0,1); axB.set_aspect("equal","box")
-axB.xaxis.set_major_locator(MultipleLocator(0.1))
-axB.yaxis.set_major_locator(MultipleLocator(0.1))
-axB.xaxis.set_minor_locator(MultipleLocator(0.05))
-axB.yaxis.set_minor_locator(MultipleLocator(0.05))
-axB.tick_params(which="major", length=5); axB.tick_params(which="minor", length=3)
-axB.grid(False)
-handles = [Line2D([0,1],[0,0], color=c_1, lw=lw),
-           Line2D([0,1],[0,0], color=c_2, lw=lw)]
-axB.legend(handles, ["BR J1 (p|q)", "BR J2 (q|p)"], loc="lower right")
-axB.set_xlabel("p"); axB.set_ylabel("q")
-gB.tight_layout()
+def draw_br_square():
+    gB, axB = subplots(figsize=(6.8, 6.8), dpi=140)
+    axB.plot([0,1,1,0,0],[0,0,1,1,0], color="black", lw=1.3, zorder=1)
+
+    if mixed_strict:
+        # BR J1 (p | q): verticales por tramos usando q*
+        axB.vlines(x=0, ymin=0, ymax=q_star, color=c_1, lw=lw, zorder=9)
+        axB.hlines(y=q_star, xmin=0, xmax=1, color=c_1, lw=lw, zorder=9)  # guía de indiferencia
+        axB.vlines(x=1, ymin=q_star, ymax=1, color=c_1, lw=lw, zorder=9)
+        # BR J2 (q | p): horizontales por tramos usando p*
+        axB.hlines(y=0, xmin=0, xmax=p_star, color=c_2, lw=lw, zorder=10)
+        axB.vlines(x=p_star, ymin=0, ymax=1, color=c_2, lw=lw, zorder=10)  # guía de indiferencia
+        axB.hlines(y=1, xmin=p_star, xmax=1, color=c_2, lw=lw, zorder=10)
+        axB.scatter([p_star], [q_star], s=70, color="black", zorder=11)
+    else:
+        axB.text(0.5, 0.5, "No hay mixto interior", ha="center", va="center", alpha=0.4)
+
+    axB.set_xlim(0,1); axB.set_ylim(0,1); axB.set_aspect("equal","box")
+    axB.xaxis.set_major_locator(mticker.MultipleLocator(0.1))
+    axB.yaxis.set_major_locator(mticker.MultipleLocator(0.1))
+    axB.xaxis.set_minor_locator(mticker.MultipleLocator(0.05))
+    axB.yaxis.set_minor_locator(mticker.MultipleLocator(0.05))
+    axB.tick_params(which="major", length=5); axB.tick_params(which="minor", length=3)
+    axB.grid(False)
+    handles = [mlines.Line2D([0,1],[0,0], color=c_1, lw=lw),
+               mlines.Line2D([0,1],[0,0], color=c_2, lw=lw)]
+    axB.legend(handles, ["BR J1 (p|q)", "BR J2 (q|p)"], loc="lower right")
+    axB.set_xlabel("p"); axB.set_ylabel("q")
+    gB.tight_layout()
+    return gB
 
 # Mostrar lado a lado
 col1, col2 = st.columns(2)
-with col1: st.pyplot(gA, use_container_width=True); plt.close(gA)
-with col2: st.pyplot(gB, use_container_width=True); plt.close(gB)
+show_chart(col1, "mixtas/eu1", (A, B), draw_eu1,
+           spec=lambda: charts.eu_lines_spec(A, q_star if mixed_strict else None))
+show_chart(col2, "mixtas/br", (A, B), draw_br_square,
+           spec=lambda: charts.mixed_br_square_spec(p_star, q_star, mixed_strict))
 
 # ====================== 5) Export PNG (solo si existe) ======================
 st.markdown("---")
 if mixed_strict:
-    buf = io.BytesIO()
-    gB2, axB2 = plt.subplots(figsize=(7,7), dpi=220)
-    axB2.plot([0,1,1,0,0],[0,0,1,1,0], color="black", lw=1.3, zorder=1)
-    axB2.vlines(x=0, ymin=0, ymax=q_star, color=c_1, lw=lw, zorder=9)
-    axB2.hlines(y=q_star, xmin=0, xmax=1, color=c_1, lw=lw, zorder=9)
-    axB2.vlines(x=1, ymin=q_star, ymax=1, color=c_1, lw=lw, zorder=9)
-    axB2.hlines(y=0, xmin=0, xmax=p_star, color=c_2, lw=lw, zorder=10)
-    axB2.vlines(x=p_star, ymin=0, ymax=1, color=c_2, lw=lw, zorder=10)
-    axB2.hlines(y=1, xmin=p_star, xmax=1, color=c_2, lw=lw, zorder=10)
-    axB2.scatter([p_star], [q_star], s=70, color="black", zorder=11)
-    axB2.set_xlim(0,1); axB2.set_ylim(0,1); axB2.set_aspect("equal","box")
-    axB2.set_xlabel("p"); axB2.set_ylabel("q")
-    gB2.tight_layout()
-    gB2.savefig(buf, format="png", bbox_inches="tight"); plt.close(gB2); buf.seek(0)
+    def draw_br_export():
+        gB2, axB2 = subplots(figsize=(7,7), dpi=220)
+        axB2.plot([0,1,1,0,0],[0,0,1,1,0], color="black", lw=1.3, zorder=1)
+        axB2.vlines(x=0, ymin=0, ymax=q_star, color=c_1, lw=lw, zorder=9)
+        axB2.hlines(y=q_star, xmin=0, xmax=1, color=c_1, lw=lw, zorder=9)
+        axB2.vlines(x=1, ymin=q_star, ymax=1, color=c_1, lw=lw, zorder=9)
+        axB2.hlines(y=0, xmin=0, xmax=p_star, color=c_2, lw=lw, zorder=10)
+        axB2.vlines(x=p_star, ymin=0, ymax=1, color=c_2, lw=lw, zorder=10)
+        axB2.hlines(y=1, xmin=p_star, xmax=1, color=c_2, lw=lw, zorder=10)
+        axB2.scatter([p_star], [q_star], s=70, color="black", zorder=11)
+        axB2.set_xlim(0,1); axB2.set_ylim(0,1); axB2.set_aspect("equal","box")
+        axB2.set_xlabel("p"); axB2.set_ylabel("q")
+        gB2.tight_layout()
+        return gB2
+
+    png = figure_bytes("mixtas/br_export", (A, B), draw_br_export, dpi=220)
     st.download_button("Descargar PNG del diagrama BR",
-        data=buf, file_name="BR_mixto_estricto_2x2.png",
+        data=png, file_name="BR_mixto_estricto_2x2.png",
         mime="image/png", use_container_width=True)
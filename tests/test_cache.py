@@ -0,0 +1,60 @@
+# tests/test_cache.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from iolab.cache import LRUCache, make_key, memoize
+
+
+def test_make_key_types_and_content():
+    assert make_key(1, b=2) == make_key(1, b=2)
+    assert make_key(1) != make_key(1.0)                  # el tipo es parte de la llave
+    assert make_key([1, 2]) != make_key((1, 2))
+    x = np.arange(4.0)
+    assert make_key(x) == make_key(x.copy())
+    assert make_key(x) != make_key(x.astype(np.float32)) != make_key(x.reshape(2, 2))
+    with pytest.raises(TypeError):
+        make_key(object())
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    c = LRUCache(max_entries=2, max_bytes=10**6)
+    c.put("a", 1); c.put("b", 2)
+    assert c.get("a") == 1                               # "a" pasa a ser la más reciente
+    c.put("c", 3)
+    assert "b" not in c and "a" in c and c.stats()["evictions"] == 1
+    c = LRUCache(max_entries=10, max_bytes=1000)
+    c.put("x", np.zeros(50)); c.put("y", np.zeros(50))
+    assert "x" not in c and c.nbytes <= 1000
+    assert not c.put("z", np.zeros(1000))                # no cabe ni sola
+
+
+def test_memoize_hits_and_code_constants():
+    c = LRUCache()
+    calls = []
+
+    def make(k):
+        def f(x):
+            calls.append(x)
+            return x * k
+        return f
+
+    f = memoize(make(2), cache=c)
+    assert f(3) == 6 and f(3) == 6 and calls == [3]
+    assert c.stats()["hits"] == 1
+    # Mismo archivo, nombre y bytecode; solo cambia un literal: llaves distintas
+    ns2, ns3 = {}, {}
+    exec("def g(x): return x * 2", ns2)
+    exec("def g(x): return x * 3", ns3)
+    assert memoize(ns2["g"], cache=c)(1) == 2 and memoize(ns3["g"], cache=c)(1) == 3
+
+
+def test_memoize_freezes_arrays_and_copies_frames():
+    c = LRUCache()
+    f = memoize(lambda n: {"v": np.arange(n), "t": pd.DataFrame({"a": range(n)})}, cache=c)
+    r = f(3)
+    with pytest.raises(ValueError):
+        r["v"][0] = 9
+    r["t"].loc[0, "a"] = 99
+    assert f(3)["t"].loc[0, "a"] == 0
+    assert f(3)["v"] is r["v"]
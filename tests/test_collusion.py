@@ -0,0 +1,53 @@
+# tests/test_collusion.py
+import numpy as np
+import pytest
+
+from iolab import cartel_efficient, cartel_min_delta, collusion_outcomes
+from iolab.collusion import collusion_grid
+
+
+def test_min_delta_not_above_equal_split():
+    rng = np.random.default_rng(3)
+    c = rng.uniform(10.0, 40.0, (300, 5))
+    eq = collusion_outcomes(100.0, 1.0, c, "equal")
+    md = collusion_outcomes(100.0, 1.0, c, "min_delta")
+    assert (md["delta_star"] <= eq["delta_star"] + 1e-9).all()
+    # Mismo Q del cartel (mismo precio), repartido sin cuotas negativas
+    np.testing.assert_allclose(md["QC"], eq["QC"])
+    np.testing.assert_allclose(md["qC"].sum(axis=-1), md["QC"], rtol=1e-9)
+    assert (md["qC"] >= 0).all()
+
+
+def test_min_delta_symmetric_equals_equal_split():
+    q, Q, P, pi = cartel_min_delta(100.0, 1.0, np.full(4, 20.0))
+    np.testing.assert_allclose(q, Q / 4)
+
+
+def test_efficient_cartel_maximizes_joint_profit():
+    c = np.array([[12.0, 20.0, 30.0], [15.0, 15.0, 40.0]])
+    q, Q, P, pi = cartel_efficient(100.0, 2.0, c)
+    np.testing.assert_allclose(Q, [22.0, 21.25])                   # monopolio con c_min
+    np.testing.assert_allclose(q, [[22.0, 0, 0], [10.625, 10.625, 0]])
+    np.testing.assert_allclose(pi.sum(axis=-1), (100.0 - c.min(axis=-1)) ** 2 / 8.0)
+
+
+@pytest.mark.parametrize("cartel", ["equal", "efficient", "min_delta"])
+def test_collusion_grid_matches_outcomes(cartel):
+    c = np.array([15.0, 20.0, 25.0, 30.0])
+    b_vals, c_vals = np.array([0.5, 1.0, 2.0]), np.array([10.0, 20.0, 35.0])
+    g = collusion_grid(100.0, b_vals, c, i=0, c_vals=c_vals, Ns=[2, 4, 6], cartel=cartel)
+    for k, n in enumerate([2, 4, 6]):
+        for ib, b in enumerate(b_vals):
+            for ic, ci in enumerate(c_vals):
+                costs = np.r_[c, np.full(max(n - c.size, 0), c.mean())][:n]
+                costs[0] = ci
+                r = collusion_outcomes(100.0, b, costs, cartel)
+                assert g["delta_star"][k, ib, ic] == pytest.approx(float(r["delta_star"]))
+                assert g["binder_idx"][k, ib, ic] == int(r["binder_idx"])
+
+
+def test_collusion_grid_errors():
+    with pytest.raises(ValueError):
+        collusion_grid(100.0, [1.0], [10.0, 20.0], Ns=[0, 2])
+    with pytest.raises(ValueError):
+        collusion_grid(100.0, [0.0, 1.0], [10.0, 20.0])
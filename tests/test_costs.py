@@ -0,0 +1,55 @@
+# tests/test_costs.py
+import io
+
+import numpy as np
+import pytest
+
+from iolab.costs import load_costs, parse_costs_text
+
+
+def test_parse_costs_text():
+    c, dropped = parse_costs_text("4, 6, x, 7.5, ")
+    assert c.tolist() == [4.0, 6.0, 7.5] and dropped == 1
+
+
+def test_csv_header_and_columns():
+    data = b"firma,costo\n1,10.5\n2,abc\n3,12\n"
+    c, dropped = load_costs(data, "c.csv")
+    assert c.tolist() == [10.5, 12.0] and dropped == 1         # "costo" está en COST_COLUMNS
+    assert load_costs(data, "c.csv", column="firma")[0].tolist() == [1.0, 2.0, 3.0]
+    with pytest.raises(ValueError, match="no existe la columna"):
+        load_costs(data, "c.csv", column="precio")
+
+
+def test_csv_without_header():
+    data = b"1,2\n3,4\n5,6\n"
+    assert load_costs(data, "c.csv")[0].tolist() == [1.0, 3.0, 5.0]
+    assert load_costs(data, "c.csv", column=1)[0].tolist() == [2.0, 4.0, 6.0]
+    with pytest.raises(ValueError, match="no tiene encabezado"):
+        load_costs(data, "c.csv", column="costo")
+    with pytest.raises(ValueError, match="no existe la columna 5"):
+        load_costs(data, "c.csv", column=5)
+
+
+def test_single_row_and_decimal_comma():
+    assert load_costs(b"4, 6, 7.5\n", "c.txt")[0].tolist() == [4.0, 6.0, 7.5]
+    assert load_costs(b"4 6 7.5", "c.txt")[0].tolist() == [4.0, 6.0, 7.5]
+    # ";" como separador: la coma es el decimal, en una fila o en varias
+    assert load_costs(b"7,5;8,2;9\n", "c.csv")[0].tolist() == [7.5, 8.2, 9.0]
+    assert load_costs(b"costo;firma\n7,5;1\n8,25;2\n", "c.csv")[0].tolist() == [7.5, 8.25]
+
+
+def test_npy_and_parquet(tmp_path):
+    arr = np.array([[1.0, np.nan], [3.0, 4.0]])
+    buf = io.BytesIO()
+    np.save(buf, arr)
+    c, dropped = load_costs(buf.getvalue(), "c.npy")
+    assert c.tolist() == [1.0, 3.0, 4.0] and dropped == 1
+    np.save(tmp_path / "c.npy", arr)
+    assert load_costs(tmp_path / "c.npy")[0].tolist() == [1.0, 3.0, 4.0]
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    pd.DataFrame({"id": [1, 2, 3], "mc": [5.0, 6.0, 7.0]}).to_parquet(tmp_path / "c.parquet")
+    assert load_costs(tmp_path / "c.parquet", chunk_rows=2)[0].tolist() == [5.0, 6.0, 7.0]
+    with pytest.raises(ValueError, match="formato no soportado"):
+        load_costs(b"", "c.xlsx")
@@ -0,0 +1,31 @@
+# tests/test_general.py
+import numpy as np
+import pytest
+
+from iolab import cournot_asim, cournot_general
+
+
+def test_linear_matches_cournot_asim():
+    c = np.random.default_rng(1).uniform(5.0, 90.0, (100, 8))
+    res = cournot_general("linear", (100.0, 1.5), c)
+    q, P, Q, pi = cournot_asim(100.0, 1.5, c)
+    assert res["converged"].all()
+    np.testing.assert_allclose(res["q"], q, atol=1e-8)
+    np.testing.assert_allclose(res["P"], P, atol=1e-8)
+
+
+def test_symmetric_closed_forms():
+    # Lineal con costo convexo: q = (a - c)/(b(N+1) + d)
+    res = cournot_general("linear", (100.0, 1.0), np.full(4, 10.0), d=2.0)
+    np.testing.assert_allclose(res["q"], 90.0 / 7.0)
+    # Isoelástica P = A Q^(-1/ε): P (1 - 1/(Nε)) = c
+    res = cournot_general("isoelastic", (100.0, 2.0), np.full(3, 5.0))
+    assert res["converged"] and float(res["P"]) == pytest.approx(5.0 / (1 - 1 / 6))
+    assert res["soc"].all()
+
+
+def test_invalid_inputs():
+    with pytest.raises(ValueError):
+        cournot_general("cubic", (1.0,), [1.0])
+    with pytest.raises(ValueError):
+        cournot_general("linear", (100.0, 1.0), [10.0], d=-1.0)
@@ -0,0 +1,78 @@
+# tests/test_jobs.py
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from iolab import jobs
+
+
+def wait(job, timeout=10.0):
+    t0 = time.time()
+    while job.running and time.time() - t0 < timeout:
+        time.sleep(0.01)
+    return job
+
+
+def test_rows_in_order_and_dedup():
+    key = ("test_jobs", uuid.uuid4().hex)
+    job = wait(jobs.submit(lambda x: {"x": x, "y": x * x}, range(10), key=key, chunk=3))
+    assert job.status == "done" and job.done == job.total == 10 and job.progress() == 1.0
+    assert [r["y"] for r in job.rows()] == [x * x for x in range(10)]
+    assert jobs.submit(lambda x: x, range(10), key=key) is job           # misma clave: se reutiliza
+    assert jobs.submit(lambda x: x, range(10), key=key + ("otra",)) is not job
+    assert jobs.get(job.id) is job and jobs.get(None) is None
+    assert wait(jobs.submit(lambda x: x, [])).status == "done"
+
+
+def test_error_is_reported():
+    job = wait(jobs.submit(lambda x: 1 / x, [1, 0, 2]))
+    assert job.status == "error" and "ZeroDivisionError" in job.error
+
+
+def test_cancel_waits_for_every_subscriber():
+    gate = threading.Event()
+    ex = ThreadPoolExecutor(max_workers=1)
+
+    def slow(x):
+        gate.wait(5)
+        return x
+
+    key = ("test_jobs_cancel", uuid.uuid4().hex)
+    job = jobs.submit(slow, range(5), key=key, executor=ex, subscriber="A")
+    assert jobs.submit(slow, range(5), key=key, executor=ex, subscriber="B") is job
+    assert job.subscribers == 2
+    assert job.cancel("A") is False and job.running                     # B lo sigue viendo
+    assert job.cancel("B") is True and job.status == "cancelled"
+    gate.set()
+    ex.shutdown(wait=True)
+    assert job.status == "cancelled" and job.done < job.total
+    # Un trabajo cancelado no se reutiliza: la misma clave lanza uno nuevo
+    again = wait(jobs.submit(lambda x: x, range(5), key=key))
+    assert again is not job and again.status == "done"
+
+
+def test_concurrent_identical_submits_share_one_job():
+    key = ("test_jobs_race", uuid.uuid4().hex)
+    gate = threading.Event()
+    got = []
+
+    def go(i):
+        gate.wait(5)
+        got.append(jobs.submit(lambda x: x, range(100), key=key, subscriber=i))
+
+    threads = [threading.Thread(target=go, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len({j.id for j in got}) == 1 and got[0].subscribers == 8
+
+
+@pytest.mark.parametrize("chunk", [0, -3])
+def test_chunk_is_at_least_one(chunk):
+    job = wait(jobs.submit(lambda x: x, range(4), chunk=chunk))
+    assert job.rows() == [0, 1, 2, 3]
@@ -0,0 +1,30 @@
+# tests/test_mergers.py
+# Las fusiones vectorizadas por parejas deben coincidir con simular cada fusión por separado.
+import numpy as np
+import pytest
+
+from iolab import pairwise_mergers, simulate_merger
+from iolab.mergers import MERGER_OUTCOMES
+
+
+@pytest.mark.parametrize("efficiency", [0.0, 0.15])
+def test_pairwise_matches_simulate_merger(efficiency):
+    rng = np.random.default_rng(2)
+    c = rng.uniform(10.0, 70.0, 12)
+    c[3] = c[7]                          # empate de costos
+    res = pairwise_mergers(100.0, 1.0, c, efficiency)
+    assert res["i"].size == 12 * 11 // 2
+    for k, (i, j) in enumerate(zip(res["i"], res["j"])):
+        want = simulate_merger(100.0, 1.0, c, [i, j], efficiency)
+        for name in MERGER_OUTCOMES:
+            assert res[name][k] == pytest.approx(want[name], rel=1e-9, abs=1e-7), (i, j, name)
+
+
+def test_pairwise_subset_of_pairs():
+    c = np.array([20.0, 35.0, 50.0, 65.0, 80.0])
+    pairs = np.array([[4, 0], [1, 2]])
+    res = pairwise_mergers(100.0, 1.0, c, pairs=pairs)
+    assert res["i"].tolist() == [0, 1] and res["j"].tolist() == [4, 2]
+    assert res["dP"][1] == pytest.approx(simulate_merger(100.0, 1.0, c, [1, 2])["dP"])
+    with pytest.raises(ValueError):
+        pairwise_mergers(100.0, 1.0, c, pairs=[[1, 1]])
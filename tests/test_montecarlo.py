@@ -0,0 +1,57 @@
+# tests/test_montecarlo.py
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+from iolab import cournot_asim
+from iolab.montecarlo import OUTCOMES, draw_costs, monte_carlo, simulate_markets, summarize
+
+
+def test_normal_is_truncated_not_censored():
+    c = draw_costs("normal", (1.0, 2.0), 200_000, np.random.default_rng(0))
+    assert c.min() > 0                                    # sin masa en c = 0
+    z = NormalDist()
+    alpha = -1.0 / 2.0
+    mean = 1.0 + 2.0 * z.pdf(alpha) / (1 - z.cdf(alpha))  # media de la normal truncada en 0
+    assert c.mean() == pytest.approx(mean, rel=0.01)
+    with pytest.raises(ValueError):
+        draw_costs("normal", (-10.0, 1.0), 10, np.random.default_rng(0))
+    with pytest.raises(ValueError):
+        draw_costs("gamma", (1.0, 2.0), 10, np.random.default_rng(0))
+
+
+def test_simulate_markets_matches_cournot_asim():
+    c = np.random.default_rng(1).uniform(5.0, 60.0, (30, 6))
+    res = simulate_markets(100.0, 1.0, c)
+    q, P, Q, pi = cournot_asim(100.0, 1.0, c)
+    np.testing.assert_allclose(res["P"], P)
+    np.testing.assert_array_equal(res["n_active"], (q > 0).sum(axis=-1))
+    np.testing.assert_allclose(res["HHI"], 10_000 * ((q / Q[:, None]) ** 2).sum(axis=-1))
+
+
+def test_monte_carlo_chunks_and_seeds():
+    kw = dict(a=100.0, b=1.0, N=5, dist="uniform", params=(10.0, 40.0), n_markets=2_503)
+    r = monte_carlo(**kw, chunk=1_000, workers=1, seed=3)
+    assert set(r) == set(OUTCOMES) and all(v.shape == (2_503,) for v in r.values())
+    # Misma semilla y mismos bloques: mismo resultado; otra semilla, otro
+    np.testing.assert_array_equal(r["P"], monte_carlo(**kw, chunk=1_000, workers=1, seed=3)["P"])
+    assert not np.array_equal(r["P"], monte_carlo(**kw, chunk=1_000, workers=1, seed=4)["P"])
+    assert monte_carlo(**{**kw, "n_markets": 0}, workers=1)["P"].size == 0
+
+
+def test_summarize():
+    v = np.arange(101.0)
+    stats, hists = summarize({"P": v, "n_active": np.array([1, 2, 2, 3])}, bins=10)
+    assert stats["P"]["media"] == 50.0 and stats["P"]["q50"] == 50.0 and stats["P"]["q05"] == 5.0
+    edges, counts = hists["P"]
+    assert edges.size == 11 and counts.sum() == 101
+    edges, counts = hists["n_active"]                     # un bin por entero
+    assert counts.tolist() == [1, 2, 1]
+
+
+def test_monte_carlo_independent_of_workers():
+    kw = dict(a=100.0, b=1.0, N=4, dist="triangular", params=(5.0, 10.0, 30.0), n_markets=3_000, chunk=1_000)
+    one, two = monte_carlo(**kw, workers=1), monte_carlo(**kw, workers=2)
+    for k in OUTCOMES:
+        np.testing.assert_array_equal(one[k], two[k])
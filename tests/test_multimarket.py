@@ -0,0 +1,34 @@
+# tests/test_multimarket.py
+import numpy as np
+
+from iolab import cournot_asim, multimarket_cournot
+from iolab.multimarket import random_incidence
+
+
+def test_uncoupled_markets_match_cournot_asim():
+    # Con d = 0 cada mercado es un Cournot asimétrico con los costos de sus firmas
+    firm, market = random_incidence(40, 10, 3, seed=4)
+    rng = np.random.default_rng(4)
+    c = rng.uniform(5.0, 60.0, 40)
+    a = rng.uniform(80.0, 120.0, 10)
+    b = rng.uniform(0.5, 2.0, 10)
+    res = multimarket_cournot(a, b, firm, market, c, d=0.0, n_firms=40, n_markets=10)
+    for m in range(10):
+        sel = market == m
+        q, P, Q, pi = cournot_asim(a[m], b[m], c[firm[sel]])
+        assert abs(res["P"][m] - float(P)) < 1e-8
+        np.testing.assert_allclose(res["x"][sel], q, atol=1e-8)
+
+
+def test_convex_costs_first_order_conditions():
+    # Con d > 0: x_im = (P_m - mc_i)₊/b_m, mc_i = c_i + d_i X_i y P_m = a_m - b_m Q_m
+    firm, market = random_incidence(60, 8, 4, seed=5)
+    rng = np.random.default_rng(5)
+    c, d = rng.uniform(5.0, 50.0, 60), rng.uniform(0.0, 2.0, 60)
+    a, b = rng.uniform(80.0, 120.0, 8), rng.uniform(0.5, 2.0, 8)
+    res = multimarket_cournot(a, b, firm, market, c, d, n_firms=60, n_markets=8)
+    assert res["residual"] < 1e-8
+    np.testing.assert_allclose(res["mc"], c + d * res["X"])
+    x = np.maximum(res["P"][market] - res["mc"][firm], 0.0) / b[market]
+    np.testing.assert_allclose(res["x"], x, atol=1e-8)
+    np.testing.assert_allclose(res["P"], a - b * np.bincount(market, x, minlength=8), atol=1e-8)
@@ -0,0 +1,106 @@
+# tests/test_oligopoly.py
+# cournot_asim (sumas prefijas) contra la eliminación iterativa original.
+import numpy as np
+import pytest
+
+from iolab import (
+    cournot_asim,
+    cournot_differentiated,
+    differentiated_factor,
+    free_entry,
+    substitution_matrix,
+)
+
+
+def cournot_iterative(a, b, c):
+    # Versión anterior de cournot_asim: elimina firmas con q_i ≤ 0 y recalcula
+    c = np.asarray(c, dtype=float)
+    a_col, b_col = np.asarray(a, float)[..., None], np.asarray(b, float)[..., None]
+    active = np.ones(c.shape, dtype=bool)
+    while True:
+        N = active.sum(axis=-1, keepdims=True)
+        S = np.where(active, c, 0.0).sum(axis=-1, keepdims=True)
+        q = np.where(active, (a_col + S - (N + 1)*c) / (b_col*(N + 1)), 0.0)
+        still = active & (q > 1e-12)
+        if np.array_equal(still, active):
+            break
+        active = still
+    Q = q.sum(axis=-1)
+    P = np.asarray(a, float) - np.asarray(b, float)*Q
+    return q, P, Q, np.where(active, (P[..., None] - c)*q, 0.0)
+
+
+@pytest.mark.parametrize("shape", [(7,), (200, 12), (50, 300)])
+def test_cournot_asim_matches_iterative(shape):
+    rng = np.random.default_rng(0)
+    c = rng.uniform(1.0, 80.0, shape)
+    a = rng.uniform(60.0, 120.0, shape[:-1])
+    b = rng.uniform(0.5, 2.0, shape[:-1])
+    for got, want in zip(cournot_asim(a, b, c), cournot_iterative(a, b, c)):
+        np.testing.assert_allclose(got, want, rtol=1e-10, atol=1e-9)
+
+
+def test_cournot_asim_sorted_ties_and_inactive():
+    # Costos ya ordenados (atajo sin ordenar), empates y firmas que no entran
+    c = np.array([[10.0, 10.0, 20.0, 90.0, 95.0], [5.0, 30.0, 30.0, 30.0, 200.0]])
+    q, P, Q, pi = cournot_asim(100.0, 1.0, c)
+    q0, P0, Q0, pi0 = cournot_iterative(100.0, 1.0, c)
+    np.testing.assert_allclose(q, q0, atol=1e-12)
+    np.testing.assert_allclose(P, P0)
+    assert (q[:, -1] == 0).all() and (pi >= 0).all()
+
+
+
+def test_free_entry_brute_force():
+    rng = np.random.default_rng(5)
+    c = np.sort(rng.uniform(5.0, 60.0, 15))
+    F = np.array([0.0, 5.0, 40.0, 150.0, 900.0, 5000.0])
+    res = free_entry(100.0, 1.0, c, F)
+    # Cournot con las k más baratas, k = 0..N: ganancia de la última y excedente total
+    last, TS = [np.inf], [0.0]
+    for k in range(1, c.size + 1):
+        q, P, Q, pi = cournot_asim(100.0, 1.0, c[:k])
+        last.append(pi[-1])
+        TS.append(float(Q) ** 2 / 2 + pi.sum())
+    last, TS = np.array(last), np.array(TS)
+    for f, n_e, n_o, W in zip(F, res["n_entry"], res["n_opt"], res["W"]):
+        assert n_e == max(k for k in range(c.size + 1) if (last[:k + 1] >= f).all() and (k == 0 or last[k] > 0))
+        ks = np.arange(c.size + 1)
+        assert TS[n_o] - n_o * f == pytest.approx((TS - ks * f).max())
+        assert W == pytest.approx(TS[n_e] - n_e * f)
+    assert (np.diff(res["n_entry"]) <= 0).all()
+
+
+def test_differentiated_homogeneous_matches_cournot_asim():
+    c = np.random.default_rng(6).uniform(5.0, 90.0, (40, 6))
+    B = substitution_matrix(6, 1.5, 1.0)
+    q, p, CS, pi = cournot_differentiated(np.full(6, 100.0), B, c)
+    q0, P0, Q0, pi0 = cournot_asim(100.0, 1.5, c)
+    np.testing.assert_allclose(q, q0, atol=1e-9)
+    np.testing.assert_allclose(pi, pi0, atol=1e-8)
+
+
+def test_differentiated_complementarity():
+    # q ≥ 0, w = Mq - (α - c) ≥ 0 y q·w = 0 en cada escenario (muchas firmas fuera)
+    N = 30
+    rng = np.random.default_rng(7)
+    B = substitution_matrix(N, 1.0, 0.6, "line")
+    alpha = rng.uniform(40.0, 60.0, N)
+    c = rng.uniform(0.0, 55.0, (25, N))
+    M, Minv = differentiated_factor(B)
+    q, p, CS, pi = cournot_differentiated(alpha, B, c, factor=(M, Minv))
+    w = q @ M - (alpha - c)
+    assert (q >= 0).all() and (w > -1e-9).all()
+    assert np.abs(q * w).max() < 1e-8
+    assert ((q == 0).sum(axis=1) > 0).any()
+    np.testing.assert_allclose(p, alpha - q @ B)
+
+
+def test_differentiated_independent_monopolies_and_errors():
+    B = substitution_matrix(3, 2.0, 0.0)
+    q = cournot_differentiated(np.array([10.0, 10.0, 10.0]), B, np.array([2.0, 12.0, 6.0]))[0]
+    np.testing.assert_allclose(q, [2.0, 0.0, 1.0])
+    with pytest.raises(ValueError):
+        differentiated_factor(np.array([[1.0, 2.0], [0.0, 1.0]]))
+    with pytest.raises(ValueError):
+        substitution_matrix(3, 1.0, 0.5, "ring")
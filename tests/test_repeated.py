@@ -0,0 +1,38 @@
+# tests/test_repeated.py
+import numpy as np
+import pytest
+
+from iolab import collusion_outcomes
+from iolab.repeated import repeated_game
+
+COSTS = np.array([18.0, 20.0, 22.0])
+
+
+def test_grim_without_shocks_follows_delta_star():
+    d_star = float(collusion_outcomes(100.0, 1.0, COSTS)["delta_star"])
+    hold = repeated_game(100.0, 1.0, COSTS, min(d_star + 0.05, 0.99), T=50, paths=20)
+    assert (hold["duration"] == 50).all() and hold["censored"].all()
+    broke = repeated_game(100.0, 1.0, COSTS, d_star - 0.05, T=50, paths=20)
+    # Rompen en t = 0 (ese periodo aún cuenta como de cartel) y luego Cournot para siempre
+    assert (broke["duration"] == 0).all() and (broke["collusive_share"] == 1 / 50).all()
+    assert broke["breaks_by_firm"].sum() == 20
+
+
+def test_green_porter_collusive_share():
+    # Guerras de L periodos con probabilidad p por periodo en cartel: fracción ≈ 1/(1 + pL)
+    res = repeated_game(100.0, 1.0, COSTS, 0.9, "green_porter", T=2000, paths=2000, sigma=5.0,
+                        punishment=3, trigger_price=57.0, seed=5)
+    p = res["stage"]["p_break"]
+    assert 0 < p < 1
+    assert res["collusive_share"].mean() == pytest.approx(1 / (1 + 3 * p), abs=0.01)
+    assert res["breaks_by_firm"].sum() == 0
+
+
+def test_finite_punishment_returns_to_cartel():
+    # Sin choques y δ bajo δ*: rompe, castiga L periodos y vuelve a romper (ciclos de L + 1)
+    d_star = float(collusion_outcomes(100.0, 1.0, COSTS)["delta_star"])
+    res = repeated_game(100.0, 1.0, COSTS, d_star - 0.05, "finite", T=40, paths=5, punishment=3)
+    assert (res["wars"] == 10).all()
+    assert res["collusive_share"] == pytest.approx(np.full(5, 0.25))
+    with pytest.raises(ValueError):
+        repeated_game(100.0, 1.0, COSTS, 0.9, "tit_for_tat")
@@ -0,0 +1,83 @@
+# tests/test_scenarios.py
+import threading
+
+import numpy as np
+import pytest
+
+from iolab import scenarios
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "s.sqlite")
+
+
+def test_save_dedups_across_owners(db):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"P": np.float64(40.0), "q": np.array([1.0, 2.0])}
+
+    h1, new1 = scenarios.save("colusion", {"a": 100, "N": 3}, compute, "Base", "A", path=db)
+    # 100.0 y np.int64(3) son el mismo escenario: no se recalcula, solo se agrega la etiqueta
+    h2, new2 = scenarios.save("colusion", {"a": 100.0, "N": np.int64(3)}, compute, "Otra", "B", path=db)
+    assert h1 == h2 and new1 and not new2 and len(calls) == 1
+    assert h1 == scenarios.scenario_hash("colusion", {"N": 3.0, "a": 100})
+    rows = scenarios.find("colusion", path=db)
+    assert [r["name"] for r in rows] == ["Otra", "Base"]
+    assert rows[0]["results"] == {"P": 40, "q": [1, 2]}
+    assert [r["name"] for r in scenarios.find("colusion", owner="A", path=db)] == ["Base"]
+    assert scenarios.store_stats(db)["scenarios"] == 1 and scenarios.store_stats(db)["labels"] == 2
+    with pytest.raises(TypeError):
+        scenarios.save("colusion", {"f": object()}, dict, "x", path=db)
+
+
+def test_find_filters_and_delete(db):
+    for n in range(1, 6):
+        scenarios.save("colusion", {"a": 100, "N": n, "c": [10.0, "x"]}, lambda: {"n": n}, f"N{n}", "A", path=db)
+    scenarios.save("otra", {"a": 100, "N": 3}, dict, "p", "A", path=db)
+    assert [r["params"]["N"] for r in scenarios.find("colusion", N=(2, 4), path=db)] == [4, 3, 2]
+    assert len(scenarios.find(a=100, N=3, path=db)) == 2
+    assert len(scenarios.find("colusion", limit=2, path=db)) == 2
+    df = scenarios.to_frame(scenarios.find("colusion", N=1, path=db))
+    assert df.loc[0, "c"] == "10.00, x" and df.loc[0, "escenario"] == "N1"
+    assert scenarios.export(scenarios.find(path=db), "csv").startswith(b"escenario,")
+    with pytest.raises(ValueError):
+        scenarios.export([], "xlsx")
+    last = scenarios.find("colusion", N=5, path=db)[0]
+    assert scenarios.delete(last["id"], path=db) and not scenarios.delete(last["id"], path=db)
+    assert scenarios.find("colusion", N=5, path=db) == []
+    assert scenarios.store_stats(db)["scenarios"] == 5              # se borró el escenario huérfano
+
+
+def test_retention_per_owner_and_total(db, monkeypatch):
+    monkeypatch.setattr(scenarios, "KEEP_PER_OWNER", 3)
+    monkeypatch.setattr(scenarios, "MAX_LABELS", 5)
+    for i in range(6):
+        scenarios.save("p", {"i": i}, dict, f"A{i}", "A", path=db)
+    assert [r["name"] for r in scenarios.find(owner="A", path=db)] == ["A5", "A4", "A3"]
+    for i in range(4):
+        scenarios.save("p", {"j": i}, dict, f"B{i}", "B", path=db)
+    names = [r["name"] for r in scenarios.find(path=db)]
+    assert names == ["B3", "B2", "B1", "A5", "A4"]
+    stats = scenarios.store_stats(db)
+    assert stats["scenarios"] == stats["labels"] == 5
+
+
+def test_concurrent_first_use(db):
+    errors = []
+
+    def go(i):
+        try:
+            scenarios.save("p", {"i": i % 3}, dict, f"s{i}", str(i), path=db)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=go, args=(i,)) for i in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors and scenarios.store_stats(db)["scenarios"] == 3
+    assert len(scenarios.find(path=db)) == 12